@@ -19,6 +19,10 @@ GO
 CREATE DATABASE SecureStudentRecords;
 GO
 
+-- The GUI's read pool runs reporting procedures at SNAPSHOT isolation
+ALTER DATABASE SecureStudentRecords SET ALLOW_SNAPSHOT_ISOLATION ON;
+GO
+
 USE SecureStudentRecords;
 GO
 
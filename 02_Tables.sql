@@ -16,11 +16,16 @@ GO
 -- ============================================
 
 -- Table: USERS (Authentication)
--- Security: Encrypted passwords using symmetric key (like examples)
+-- Security: PasswordHash is SHA2_256 of a salted PBKDF2-HMAC-SHA256 key
+-- (fn_PasswordHash), so a copied hash cannot be replayed as a login key;
+-- PasswordEncrypted only holds legacy passwords until their next login
 CREATE TABLE Users (
     UserID INT IDENTITY(1,1) PRIMARY KEY,
     Username NVARCHAR(50) UNIQUE NOT NULL,
-    PasswordEncrypted VARBINARY(MAX) NOT NULL, -- Encrypted password (like examples)
+    PasswordEncrypted VARBINARY(MAX) NULL, -- Legacy encrypted password, cleared on upgrade
+    PasswordHash BINARY(32) NULL,
+    PasswordSalt BINARY(16) NULL,
+    PasswordIterations INT NULL,
     Role NVARCHAR(20) NOT NULL CHECK (Role IN ('Admin', 'Instructor', 'TA', 'Student', 'Guest')),
     ClearanceLevel INT NOT NULL CHECK (ClearanceLevel BETWEEN 1 AND 4),
     IsActive BIT DEFAULT 1,
@@ -84,16 +89,24 @@ GO
 CREATE TABLE Grades (
     GradeID INT IDENTITY(1,1) PRIMARY KEY,
     StudentIDEncrypted VARBINARY(256) NOT NULL, -- Encrypted Student ID
+    StudentIDBlindIndex BINARY(32) NOT NULL, -- Keyed HMAC of Student ID (searchable, not reversible)
     CourseID INT NOT NULL,
     GradeValueEncrypted VARBINARY(256) NOT NULL, -- Encrypted grade value
     DateEntered DATETIME DEFAULT GETDATE(),
     EnteredByInstructorID INT NOT NULL,
     ClassificationLevel INT DEFAULT 3, -- Secret
+    RowVersion ROWVERSION, -- Bumped on every write; sp_ViewGradesSince polls by it
     CONSTRAINT FK_Grades_Course FOREIGN KEY (CourseID) REFERENCES Course(CourseID),
     CONSTRAINT FK_Grades_Instructor FOREIGN KEY (EnteredByInstructorID) REFERENCES Instructor(InstructorID)
 );
 GO
 
+-- Seek grades by student without decrypting StudentIDEncrypted on every row
+CREATE NONCLUSTERED INDEX IX_Grades_StudentIDBlindIndex
+    ON Grades (StudentIDBlindIndex)
+    INCLUDE (CourseID, GradeValueEncrypted, DateEntered);
+GO
+
 -- Table: ATTENDANCE (Secret - Level 3)
 CREATE TABLE Attendance (
     AttendanceID INT IDENTITY(1,1) PRIMARY KEY,
@@ -103,6 +116,7 @@ CREATE TABLE Attendance (
     DateRecorded DATETIME DEFAULT GETDATE(),
     RecordedByUserID INT NULL,
     ClassificationLevel INT DEFAULT 3, -- Secret
+    RowVersion ROWVERSION, -- Bumped on every write; sp_ViewAttendanceSince polls by it
     CONSTRAINT FK_Attendance_Student FOREIGN KEY (StudentID) REFERENCES Student(StudentID),
     CONSTRAINT FK_Attendance_Course FOREIGN KEY (CourseID) REFERENCES Course(CourseID),
     CONSTRAINT FK_Attendance_User FOREIGN KEY (RecordedByUserID) REFERENCES Users(UserID)
@@ -135,6 +149,58 @@ CREATE TABLE TAAssignment (
 );
 GO
 
+-- ============================================
+-- INFERENCE-CONTROL AGGREGATES (Secret - Level 3)
+-- Maintained by sp_EnterGrade, sp_RecordAttendance and the bulk procedures;
+-- read by 07_InferenceControl.sql, which still applies the minimum group size
+-- ============================================
+
+-- Table: GRADE_AGGREGATE - running totals per (Department, Course)
+CREATE TABLE GradeAggregate (
+    Department NVARCHAR(50) NOT NULL,
+    CourseID INT NOT NULL,
+    StudentCount INT NOT NULL, -- Distinct students with at least one grade
+    GradeCount INT NOT NULL,
+    GradeSum DECIMAL(18,2) NOT NULL,
+    MinGrade DECIMAL(5,2) NOT NULL,
+    MaxGrade DECIMAL(5,2) NOT NULL,
+    ClassificationLevel INT DEFAULT 3, -- Secret
+    CONSTRAINT PK_GradeAggregate PRIMARY KEY (Department, CourseID),
+    CONSTRAINT FK_GradeAggregate_Course FOREIGN KEY (CourseID) REFERENCES Course(CourseID)
+);
+GO
+
+-- Table: GRADE_AGGREGATE_MEMBER - which students are counted, by blind index only
+CREATE TABLE GradeAggregateMember (
+    CourseID INT NOT NULL,
+    StudentIDBlindIndex BINARY(32) NOT NULL,
+    GradeCount INT NOT NULL,
+    CONSTRAINT PK_GradeAggregateMember PRIMARY KEY (CourseID, StudentIDBlindIndex)
+);
+GO
+
+-- Table: ATTENDANCE_AGGREGATE - running totals per (Department, Course)
+CREATE TABLE AttendanceAggregate (
+    Department NVARCHAR(50) NOT NULL,
+    CourseID INT NOT NULL,
+    StudentCount INT NOT NULL, -- Distinct students with at least one record
+    PresentCount INT NOT NULL,
+    AbsentCount INT NOT NULL,
+    ClassificationLevel INT DEFAULT 3, -- Secret
+    CONSTRAINT PK_AttendanceAggregate PRIMARY KEY (Department, CourseID),
+    CONSTRAINT FK_AttendanceAggregate_Course FOREIGN KEY (CourseID) REFERENCES Course(CourseID)
+);
+GO
+
+-- Table: ATTENDANCE_AGGREGATE_MEMBER
+CREATE TABLE AttendanceAggregateMember (
+    CourseID INT NOT NULL,
+    StudentID INT NOT NULL,
+    RecordCount INT NOT NULL,
+    CONSTRAINT PK_AttendanceAggregateMember PRIMARY KEY (CourseID, StudentID)
+);
+GO
+
 -- ============================================
 -- PART B: Role Request Workflow Tables
 -- ============================================
@@ -153,6 +219,7 @@ CREATE TABLE RoleRequests (
     ProcessedDate DATETIME NULL,
     ProcessedByAdminID INT NULL,
     AdminComments NVARCHAR(MAX) NULL,
+    RowVersion ROWVERSION, -- Bumped on every write; sp_ViewPendingRoleRequestsSince polls by it
     CONSTRAINT FK_RoleRequest_User FOREIGN KEY (UserID) REFERENCES Users(UserID),
     CONSTRAINT FK_RoleRequest_Admin FOREIGN KEY (ProcessedByAdminID) REFERENCES Users(UserID)
 );
@@ -176,6 +243,173 @@ CREATE TABLE AuditLog (
 );
 GO
 
+-- Table: AUTH_CONTEXT_STATE (single row)
+-- Epoch invalidates every cached session authorization context when bumped;
+-- SigningKey authenticates the cached values (clients can set SESSION_CONTEXT too)
+CREATE TABLE AuthContextState (
+    StateID INT PRIMARY KEY DEFAULT 1 CHECK (StateID = 1),
+    Epoch BIGINT NOT NULL DEFAULT 1,
+    SigningKey BINARY(32) NOT NULL DEFAULT CAST(CRYPT_GEN_RANDOM(32) AS BINARY(32))
+);
+GO
+
+INSERT INTO AuthContextState DEFAULT VALUES;
+GO
+
+-- ============================================
+-- LOGIN SUPPORT
+-- ============================================
+
+-- Table: PASSWORD_POLICY (single row)
+-- HashIterations applies to new and upgraded hashes; existing hashes keep their
+-- own count until the user's next successful login. DecoySaltKey derives the
+-- salt sp_GetLoginSalt returns for unknown usernames
+CREATE TABLE PasswordPolicy (
+    PolicyID INT PRIMARY KEY DEFAULT 1 CHECK (PolicyID = 1),
+    HashIterations INT NOT NULL DEFAULT 2000 CHECK (HashIterations >= 1),
+    MaxFailedAttempts INT NOT NULL DEFAULT 5,
+    FailureWindowSeconds INT NOT NULL DEFAULT 900,
+    LockoutSeconds INT NOT NULL DEFAULT 300,
+    DecoySaltKey BINARY(32) NOT NULL DEFAULT CRYPT_GEN_RANDOM(32)
+);
+GO
+
+INSERT INTO PasswordPolicy DEFAULT VALUES;
+GO
+
+-- Table: LOGIN_THROTTLE
+-- Recent failed attempts per username (including unknown ones); a row with
+-- LockedUntil in the future rejects logins before any password work is done
+CREATE TABLE LoginThrottle (
+    Username NVARCHAR(50) PRIMARY KEY,
+    FailedCount INT NOT NULL,
+    WindowStart DATETIME NOT NULL,
+    LockedUntil DATETIME NULL
+);
+GO
+
+-- Table: LOGIN_ACTIVITY_QUEUE
+-- Successful logins waiting for sp_FlushLoginActivity to apply Users.LastLogin.
+-- Clustered on (Lane, QueueID) like AuditQueue, so inserts spread across 16 pages
+CREATE TABLE LoginActivityQueue (
+    QueueID BIGINT IDENTITY(1,1) NOT NULL,
+    Lane TINYINT NOT NULL DEFAULT (@@SPID % 16),
+    UserID INT NOT NULL,
+    LoginTime DATETIME NOT NULL DEFAULT GETDATE(),
+    CONSTRAINT PK_LoginActivityQueue PRIMARY KEY CLUSTERED (Lane, QueueID)
+);
+GO
+
+-- Synonym: AUDIT_SINK
+-- Every procedure writes its audit events here. Points at AuditLog (synchronous)
+-- by default; 15_AuditPipeline.sql can repoint it at the AuditQueue staging table
+CREATE SYNONYM AuditSink FOR AuditLog;
+GO
+
+-- ============================================
+-- BLIND INDEX SUPPORT
+-- Grades.StudentIDBlindIndex = HMAC-SHA256(key, StudentID as BINARY(4))
+-- The HMAC key is random and stored encrypted under StudentRecordsKey
+-- ============================================
+
+-- Table: BLIND_INDEX_KEY
+CREATE TABLE BlindIndexKey (
+    KeyName NVARCHAR(50) PRIMARY KEY,
+    KeyEncrypted VARBINARY(256) NOT NULL, -- 64-byte HMAC key, encrypted
+    CreatedDate DATETIME DEFAULT GETDATE()
+);
+GO
+
+OPEN SYMMETRIC KEY StudentRecordsKey
+DECRYPTION BY CERTIFICATE StudentRecordsCert;
+
+INSERT INTO BlindIndexKey (KeyName, KeyEncrypted)
+VALUES ('GradesStudentID', EncryptByKey(Key_GUID('StudentRecordsKey'), CRYPT_GEN_RANDOM(64)));
+
+CLOSE SYMMETRIC KEY StudentRecordsKey;
+GO
+
+-- Function: HMAC-SHA256 inner/outer pads for a 64-byte key
+-- Resolved once per call; each blind index is then two HASHBYTES:
+--   HASHBYTES('SHA2_256', OPad + HASHBYTES('SHA2_256', IPad + message))
+CREATE OR ALTER FUNCTION fn_HmacPads (@Key BINARY(64))
+RETURNS TABLE
+AS
+RETURN
+SELECT
+    CAST(CAST(SUBSTRING(@Key, 1, 8) AS BIGINT) ^ 0x3636363636363636 AS BINARY(8)) +
+    CAST(CAST(SUBSTRING(@Key, 9, 8) AS BIGINT) ^ 0x3636363636363636 AS BINARY(8)) +
+    CAST(CAST(SUBSTRING(@Key, 17, 8) AS BIGINT) ^ 0x3636363636363636 AS BINARY(8)) +
+    CAST(CAST(SUBSTRING(@Key, 25, 8) AS BIGINT) ^ 0x3636363636363636 AS BINARY(8)) +
+    CAST(CAST(SUBSTRING(@Key, 33, 8) AS BIGINT) ^ 0x3636363636363636 AS BINARY(8)) +
+    CAST(CAST(SUBSTRING(@Key, 41, 8) AS BIGINT) ^ 0x3636363636363636 AS BINARY(8)) +
+    CAST(CAST(SUBSTRING(@Key, 49, 8) AS BIGINT) ^ 0x3636363636363636 AS BINARY(8)) +
+    CAST(CAST(SUBSTRING(@Key, 57, 8) AS BIGINT) ^ 0x3636363636363636 AS BINARY(8)) AS IPad,
+    CAST(CAST(SUBSTRING(@Key, 1, 8) AS BIGINT) ^ 0x5C5C5C5C5C5C5C5C AS BINARY(8)) +
+    CAST(CAST(SUBSTRING(@Key, 9, 8) AS BIGINT) ^ 0x5C5C5C5C5C5C5C5C AS BINARY(8)) +
+    CAST(CAST(SUBSTRING(@Key, 17, 8) AS BIGINT) ^ 0x5C5C5C5C5C5C5C5C AS BINARY(8)) +
+    CAST(CAST(SUBSTRING(@Key, 25, 8) AS BIGINT) ^ 0x5C5C5C5C5C5C5C5C AS BINARY(8)) +
+    CAST(CAST(SUBSTRING(@Key, 33, 8) AS BIGINT) ^ 0x5C5C5C5C5C5C5C5C AS BINARY(8)) +
+    CAST(CAST(SUBSTRING(@Key, 41, 8) AS BIGINT) ^ 0x5C5C5C5C5C5C5C5C AS BINARY(8)) +
+    CAST(CAST(SUBSTRING(@Key, 49, 8) AS BIGINT) ^ 0x5C5C5C5C5C5C5C5C AS BINARY(8)) +
+    CAST(CAST(SUBSTRING(@Key, 57, 8) AS BIGINT) ^ 0x5C5C5C5C5C5C5C5C AS BINARY(8)) AS OPad;
+GO
+
+-- Function: Blind index pads for a named key (caller must have StudentRecordsKey open)
+CREATE OR ALTER FUNCTION fn_BlindIndexPads (@KeyName NVARCHAR(50))
+RETURNS TABLE
+AS
+RETURN
+SELECT p.IPad, p.OPad
+FROM BlindIndexKey k
+CROSS APPLY fn_HmacPads(CAST(DecryptByKey(k.KeyEncrypted) AS BINARY(64))) p
+WHERE k.KeyName = @KeyName;
+GO
+
+-- Function: PBKDF2-HMAC-SHA256 password hash (one 32-byte block)
+-- The password is keyed as NVARCHAR (UTF-16LE) bytes; matches Python's
+--   hashlib.pbkdf2_hmac('sha256', password.encode('utf-16-le'), salt, iterations)
+-- Logins derive this key on the client; the server only runs it to register
+-- an account or to upgrade a legacy or below-policy hash
+CREATE OR ALTER FUNCTION fn_PasswordHash (
+    @Password NVARCHAR(100),
+    @Salt BINARY(16),
+    @Iterations INT
+)
+RETURNS BINARY(32)
+AS
+BEGIN
+    -- HMAC keys longer than the 64-byte block are hashed first
+    DECLARE @Key VARBINARY(200) = CAST(@Password AS VARBINARY(200));
+    IF DATALENGTH(@Key) > 64
+        SET @Key = HASHBYTES('SHA2_256', @Key);
+    
+    DECLARE @IPad VARBINARY(64), @OPad VARBINARY(64);
+    SELECT @IPad = IPad, @OPad = OPad FROM fn_HmacPads(CAST(@Key AS BINARY(64)));
+    
+    -- U1 = HMAC(password, salt || INT(1)); the result is U1 ^ U2 ^ ... ^ Un
+    DECLARE @U BINARY(32) = HASHBYTES('SHA2_256', @OPad + HASHBYTES('SHA2_256', @IPad + @Salt + 0x00000001));
+    DECLARE @Part1 BIGINT = CAST(SUBSTRING(@U, 1, 8) AS BIGINT),
+            @Part2 BIGINT = CAST(SUBSTRING(@U, 9, 8) AS BIGINT),
+            @Part3 BIGINT = CAST(SUBSTRING(@U, 17, 8) AS BIGINT),
+            @Part4 BIGINT = CAST(SUBSTRING(@U, 25, 8) AS BIGINT);
+    DECLARE @Round INT = 1;
+    
+    WHILE @Round < @Iterations
+    BEGIN
+        SET @U = HASHBYTES('SHA2_256', @OPad + HASHBYTES('SHA2_256', @IPad + @U));
+        SET @Part1 ^= CAST(SUBSTRING(@U, 1, 8) AS BIGINT);
+        SET @Part2 ^= CAST(SUBSTRING(@U, 9, 8) AS BIGINT);
+        SET @Part3 ^= CAST(SUBSTRING(@U, 17, 8) AS BIGINT);
+        SET @Part4 ^= CAST(SUBSTRING(@U, 25, 8) AS BIGINT);
+        SET @Round += 1;
+    END
+    
+    RETURN CAST(@Part1 AS BINARY(8)) + CAST(@Part2 AS BINARY(8)) +
+           CAST(@Part3 AS BINARY(8)) + CAST(@Part4 AS BINARY(8));
+END
+GO
+
 PRINT 'All tables created successfully.';
 GO
 
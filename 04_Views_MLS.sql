@@ -193,8 +193,10 @@ SELECT
     c.CourseName,
     COUNT(*) AS StudentCount,
     AVG(CAST(CAST(DecryptByKey(g.GradeValueEncrypted) AS VARCHAR(10)) AS DECIMAL(5,2))) AS AverageGrade
-FROM Grades g
-INNER JOIN Student s ON s.StudentID = CAST(CAST(DecryptByKey(g.StudentIDEncrypted) AS VARCHAR(10)) AS INT)
+FROM Student s
+CROSS APPLY fn_BlindIndexPads('GradesStudentID') k -- Matches grades via blind index (no StudentID decryption)
+INNER JOIN Grades g ON g.StudentIDBlindIndex =
+    CAST(HASHBYTES('SHA2_256', k.OPad + HASHBYTES('SHA2_256', k.IPad + CAST(s.StudentID AS BINARY(4)))) AS BINARY(32))
 INNER JOIN Course c ON g.CourseID = c.CourseID
 GROUP BY s.Department, c.CourseID, c.CourseName
 HAVING COUNT(*) >= 3; -- Inference Control: Minimum group size
@@ -7,11 +7,85 @@
 USE SecureStudentRecords;
 GO
 
+-- ============================================
+-- SESSION AUTHORIZATION CONTEXT
+-- Role, InstructorID and TA course list are resolved once per session and
+-- kept in SESSION_CONTEXT, signed with AuthContextState.SigningKey. A cached
+-- context is only used while its UserID and Epoch match; sp_ProcessRoleRequest
+-- and sp_AssignTA bump the Epoch to invalidate every session.
+-- ============================================
+
+-- Function: Cached authorization context for @UserID (no row if missing, stale or forged)
+CREATE OR ALTER FUNCTION fn_SessionAuthContext (@UserID INT)
+RETURNS TABLE
+AS
+RETURN
+SELECT c.Role, c.ClearanceLevel, c.InstructorID, c.TACourses
+FROM (
+    SELECT 
+        CAST(SESSION_CONTEXT(N'SRMS.UserID') AS INT) AS UserID,
+        CAST(SESSION_CONTEXT(N'SRMS.Role') AS NVARCHAR(20)) AS Role,
+        CAST(SESSION_CONTEXT(N'SRMS.Clearance') AS INT) AS ClearanceLevel,
+        CAST(SESSION_CONTEXT(N'SRMS.InstructorID') AS INT) AS InstructorID,
+        CAST(SESSION_CONTEXT(N'SRMS.TACourses') AS NVARCHAR(4000)) AS TACourses,
+        CAST(SESSION_CONTEXT(N'SRMS.Epoch') AS BIGINT) AS Epoch,
+        CAST(SESSION_CONTEXT(N'SRMS.Mac') AS VARBINARY(32)) AS Mac
+) c
+CROSS JOIN AuthContextState s
+WHERE c.UserID = @UserID
+AND c.Epoch = s.Epoch
+AND c.Mac = HASHBYTES('SHA2_256', s.SigningKey + CAST(CONCAT(c.UserID, N'|', c.Role, N'|', c.ClearanceLevel, N'|',
+                                  c.InstructorID, N'|', c.TACourses, N'|', c.Epoch) AS VARBINARY(MAX)));
+GO
+
+-- SP: Look up the authorization context and cache it for this session
+CREATE OR ALTER PROCEDURE sp_ResolveAuthContext
+    @UserID INT,
+    @Role NVARCHAR(20) OUTPUT,
+    @InstructorID INT OUTPUT,
+    @TACourses NVARCHAR(4000) OUTPUT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    -- Epoch first: an invalidation that lands mid-lookup leaves the cache stale, never wrong
+    DECLARE @Epoch BIGINT, @SigningKey BINARY(32), @ClearanceLevel INT;
+    SELECT @Epoch = Epoch, @SigningKey = SigningKey FROM AuthContextState;
+    
+    SELECT @Role = Role, @ClearanceLevel = ClearanceLevel FROM Users WHERE UserID = @UserID;
+    SELECT @InstructorID = InstructorID FROM Instructor WHERE UserID = @UserID;
+    SELECT @TACourses = CONCAT(N',', STRING_AGG(CAST(CourseID AS NVARCHAR(10)), N','), N',')
+    FROM TAAssignment WHERE UserID = @UserID;
+    
+    -- Unknown users get a role no check accepts, and nothing is cached
+    IF @Role IS NULL
+    BEGIN
+        SET @Role = N'Unknown';
+        RETURN;
+    END
+    
+    -- Instructor record not created yet: do not cache the incomplete context
+    IF @Role = 'Instructor' AND @InstructorID IS NULL
+        RETURN;
+    
+    DECLARE @Mac VARBINARY(32) = HASHBYTES('SHA2_256', @SigningKey + CAST(CONCAT(@UserID, N'|', @Role, N'|', @ClearanceLevel, N'|',
+                                           @InstructorID, N'|', @TACourses, N'|', @Epoch) AS VARBINARY(MAX)));
+    
+    EXEC sp_set_session_context N'SRMS.UserID', @UserID;
+    EXEC sp_set_session_context N'SRMS.Role', @Role;
+    EXEC sp_set_session_context N'SRMS.Clearance', @ClearanceLevel;
+    EXEC sp_set_session_context N'SRMS.InstructorID', @InstructorID;
+    EXEC sp_set_session_context N'SRMS.TACourses', @TACourses;
+    EXEC sp_set_session_context N'SRMS.Epoch', @Epoch;
+    EXEC sp_set_session_context N'SRMS.Mac', @Mac;
+END
+GO
+
 -- ============================================
 -- AUTHENTICATION & USER MANAGEMENT
 -- ============================================
 
--- SP: User Registration (Simplified - using encryption like examples)
+-- SP: User Registration (salted password hash; no key needed)
 CREATE OR ALTER PROCEDURE sp_RegisterUser
     @Username NVARCHAR(50),
     @Password NVARCHAR(100),
@@ -36,28 +110,22 @@ BEGIN
             END
         END
         
-        -- Encrypt password using symmetric key (like examples)
-        OPEN SYMMETRIC KEY StudentRecordsKey
-        DECRYPTION BY CERTIFICATE StudentRecordsCert;
+        -- Hash password with a fresh salt at the current policy's iteration count
+        DECLARE @Iterations INT = (SELECT HashIterations FROM PasswordPolicy);
+        DECLARE @Salt BINARY(16) = CRYPT_GEN_RANDOM(16);
         
-        DECLARE @PasswordEncrypted VARBINARY(MAX) = EncryptByKey(Key_GUID('StudentRecordsKey'), @Password);
-        
-        CLOSE SYMMETRIC KEY StudentRecordsKey;
-        
-        INSERT INTO Users (Username, PasswordEncrypted, Role, ClearanceLevel)
-        VALUES (@Username, @PasswordEncrypted, @Role, @ClearanceLevel);
+        INSERT INTO Users (Username, PasswordHash, PasswordSalt, PasswordIterations, Role, ClearanceLevel)
+        VALUES (@Username, HASHBYTES('SHA2_256', dbo.fn_PasswordHash(@Password, @Salt, @Iterations)),
+                @Salt, @Iterations, @Role, @ClearanceLevel);
         
         -- Audit log
-        INSERT INTO AuditLog (Username, Action, TableAffected, RecordID, ActionDate)
+        INSERT INTO AuditSink (Username, Action, TableAffected, RecordID, ActionDate)
         VALUES (@Username, 'User Registration', 'Users', SCOPE_IDENTITY(), GETDATE());
         
         SELECT 'Success' AS Result, SCOPE_IDENTITY() AS UserID;
     END TRY
     BEGIN CATCH
-        IF (SELECT COUNT(*) FROM sys.openkeys WHERE key_name = 'StudentRecordsKey') > 0
-            CLOSE SYMMETRIC KEY StudentRecordsKey;
-            
-        INSERT INTO AuditLog (Username, Action, Success, ErrorMessage)
+        INSERT INTO AuditSink (Username, Action, Success, ErrorMessage)
         VALUES (@Username, 'User Registration Failed', 0, ERROR_MESSAGE());
         
         SELECT 'Error' AS Result, ERROR_MESSAGE() AS ErrorMessage;
@@ -65,15 +133,116 @@ BEGIN
 END
 GO
 
--- SP: User Login (Simplified - decrypt and compare like examples)
+-- SP: Count a failed login; locks the username out after too many in the window
+CREATE OR ALTER PROCEDURE sp_RecordLoginFailure
+    @Username NVARCHAR(50),
+    @UserID INT = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    DECLARE @MaxFailedAttempts INT, @FailureWindowSeconds INT, @LockoutSeconds INT;
+    SELECT @MaxFailedAttempts = MaxFailedAttempts,
+           @FailureWindowSeconds = FailureWindowSeconds,
+           @LockoutSeconds = LockoutSeconds
+    FROM PasswordPolicy;
+    
+    DECLARE @Now DATETIME = GETDATE();
+    DECLARE @WindowOpened DATETIME = DATEADD(SECOND, -@FailureWindowSeconds, @Now);
+    
+    BEGIN TRANSACTION;
+    
+    -- Upsert: UPDLOCK/SERIALIZABLE holds the key range so concurrent failures can't both insert
+    UPDATE LoginThrottle WITH (UPDLOCK, SERIALIZABLE)
+    SET FailedCount = CASE WHEN WindowStart < @WindowOpened THEN 1 ELSE FailedCount + 1 END,
+        WindowStart = CASE WHEN WindowStart < @WindowOpened THEN @Now ELSE WindowStart END
+    WHERE Username = @Username;
+    
+    IF @@ROWCOUNT = 0
+        INSERT INTO LoginThrottle (Username, FailedCount, WindowStart)
+        VALUES (@Username, 1, @Now);
+    
+    -- Lock out, and start a fresh window for when the lockout ends
+    UPDATE LoginThrottle
+    SET LockedUntil = DATEADD(SECOND, @LockoutSeconds, @Now),
+        FailedCount = 0,
+        WindowStart = @Now
+    WHERE Username = @Username
+    AND FailedCount >= @MaxFailedAttempts;
+    
+    IF @@ROWCOUNT > 0
+        INSERT INTO AuditSink (UserID, Username, Action, Success, ErrorMessage, TableAffected)
+        VALUES (@UserID, @Username, 'Login Throttled', 0,
+                CONCAT(@MaxFailedAttempts, ' failed attempts; locked for ', @LockoutSeconds, ' seconds'),
+                'LoginThrottle');
+    
+    COMMIT TRANSACTION;
+END
+GO
+
+-- SP: Salt and iteration count for deriving a login key on the client
+-- Unknown usernames get a decoy salt that is stable per username, so the
+-- answer does not say whether the account exists. Upgrade = 1 (legacy or
+-- below-policy hash) asks the client to send the password itself, once.
+-- Locked = 1 lets the client skip hashing for a throttled username.
+CREATE OR ALTER PROCEDURE sp_GetLoginSalt
+    @Username NVARCHAR(50)
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    DECLARE @PolicyIterations INT, @DecoySaltKey BINARY(32);
+    SELECT @PolicyIterations = HashIterations, @DecoySaltKey = DecoySaltKey FROM PasswordPolicy;
+    
+    DECLARE @Salt BINARY(16), @Iterations INT, @Upgrade BIT = 0;
+    SELECT
+        @Salt = PasswordSalt,
+        @Iterations = PasswordIterations,
+        @Upgrade = CASE WHEN PasswordHash IS NULL OR PasswordIterations < @PolicyIterations
+                        THEN 1 ELSE 0 END
+    FROM Users
+    WHERE Username = @Username;
+    
+    IF @Salt IS NULL
+        SELECT @Salt = CAST(HASHBYTES('SHA2_256', @DecoySaltKey + CAST(@Username AS VARBINARY(100))) AS BINARY(16)),
+               @Iterations = @PolicyIterations;
+    
+    SELECT
+        @Salt AS Salt,
+        @Iterations AS Iterations,
+        @Upgrade AS Upgrade,
+        CAST(CASE WHEN EXISTS (SELECT 1 FROM LoginThrottle
+                               WHERE Username = @Username AND LockedUntil > GETDATE())
+                  THEN 1 ELSE 0 END AS BIT) AS Locked;
+END
+GO
+
+-- SP: User Login
+-- Verifies a salted hash without opening StudentRecordsKey. The client sends
+-- @PasswordKey, the PBKDF2 key derived with sp_GetLoginSalt's salt, and the
+-- server hashes it once with HASHBYTES. A plain @Password is still accepted:
+-- it is hashed here with fn_PasswordHash, and accounts on the legacy encrypted
+-- password or below the policy's iteration count are upgraded that way.
+-- LastLogin is queued and applied in batches by sp_FlushLoginActivity.
 CREATE OR ALTER PROCEDURE sp_Login
     @Username NVARCHAR(50),
-    @Password NVARCHAR(100)
+    @Password NVARCHAR(100) = NULL,
+    @PasswordKey BINARY(32) = NULL
 AS
 BEGIN
     SET NOCOUNT ON;
     
+    -- Throttle: a locked-out username is rejected with one seek, before any hashing
+    IF EXISTS (SELECT 1 FROM LoginThrottle WHERE Username = @Username AND LockedUntil > GETDATE())
+    BEGIN
+        SELECT 'Error' AS Result, 'Too many failed attempts. Try again later' AS Message;
+        RETURN;
+    END
+    
     DECLARE @UserID INT;
+    DECLARE @StoredHash BINARY(32);
+    DECLARE @Salt BINARY(16);
+    DECLARE @Iterations INT;
     DECLARE @StoredPasswordEncrypted VARBINARY(MAX);
     DECLARE @Role NVARCHAR(20);
     DECLARE @ClearanceLevel INT;
@@ -82,6 +251,9 @@ BEGIN
     -- Get user details
     SELECT 
         @UserID = UserID,
+        @StoredHash = PasswordHash,
+        @Salt = PasswordSalt,
+        @Iterations = PasswordIterations,
         @StoredPasswordEncrypted = PasswordEncrypted,
         @Role = Role,
         @ClearanceLevel = ClearanceLevel,
@@ -91,37 +263,90 @@ BEGIN
     
     IF @UserID IS NULL
     BEGIN
-        INSERT INTO AuditLog (Username, Action, Success, ErrorMessage)
+        INSERT INTO AuditSink (Username, Action, Success, ErrorMessage)
         VALUES (@Username, 'Login Failed', 0, 'User not found');
         
+        EXEC sp_RecordLoginFailure @Username;
+        
         SELECT 'Error' AS Result, 'Invalid credentials' AS Message;
         RETURN;
     END
     
     IF @IsActive = 0
     BEGIN
-        INSERT INTO AuditLog (UserID, Username, Action, Success, ErrorMessage)
+        INSERT INTO AuditSink (UserID, Username, Action, Success, ErrorMessage)
         VALUES (@UserID, @Username, 'Login Failed', 0, 'Account disabled');
         
         SELECT 'Error' AS Result, 'Account is disabled' AS Message;
         RETURN;
     END
     
-    -- Decrypt stored password and compare (like examples)
-    OPEN SYMMETRIC KEY StudentRecordsKey
-    DECRYPTION BY CERTIFICATE StudentRecordsCert;
+    DECLARE @PolicyIterations INT = (SELECT HashIterations FROM PasswordPolicy);
+    DECLARE @Verified BIT = 0;
+    DECLARE @Rehash NVARCHAR(100) = NULL; -- Password to store under a fresh salt
     
-    DECLARE @DecryptedPassword NVARCHAR(100) = CONVERT(NVARCHAR(100), DecryptByKey(@StoredPasswordEncrypted));
-    
-    CLOSE SYMMETRIC KEY StudentRecordsKey;
+    IF @StoredHash IS NOT NULL
+    BEGIN
+        IF @PasswordKey IS NOT NULL
+        BEGIN
+            -- Client-derived key: one HASHBYTES instead of the PBKDF2 loop
+            IF HASHBYTES('SHA2_256', @PasswordKey) = @StoredHash
+                SET @Verified = 1;
+        END
+        ELSE IF @Password IS NOT NULL
+        BEGIN
+            IF HASHBYTES('SHA2_256', dbo.fn_PasswordHash(@Password, @Salt, @Iterations)) = @StoredHash
+            BEGIN
+                SET @Verified = 1;
+                IF @Iterations < @PolicyIterations
+                    SET @Rehash = @Password;
+            END
+        END
+    END
+    ELSE IF @Password IS NOT NULL
+    BEGIN
+        -- Legacy account: decrypt and compare once
+        OPEN SYMMETRIC KEY StudentRecordsKey
+        DECRYPTION BY CERTIFICATE StudentRecordsCert;
+        
+        DECLARE @DecryptedPassword NVARCHAR(100) = CONVERT(NVARCHAR(100), DecryptByKey(@StoredPasswordEncrypted));
+        
+        CLOSE SYMMETRIC KEY StudentRecordsKey;
+        
+        -- Hash the stored password, not the typed one: this comparison follows the
+        -- column collation, the hash comparison is exact
+        IF @Password = @DecryptedPassword
+            SELECT @Verified = 1, @Rehash = @DecryptedPassword;
+    END
     
-    IF @Password = @DecryptedPassword
+    IF @Verified = 1
     BEGIN
-        -- Update last login
-        UPDATE Users SET LastLogin = GETDATE() WHERE UserID = @UserID;
+        IF @Rehash IS NOT NULL
+        BEGIN
+            DECLARE @NewSalt BINARY(16) = CRYPT_GEN_RANDOM(16);
+            
+            UPDATE Users
+            SET PasswordHash = HASHBYTES('SHA2_256', dbo.fn_PasswordHash(@Rehash, @NewSalt, @PolicyIterations)),
+                PasswordSalt = @NewSalt,
+                PasswordIterations = @PolicyIterations,
+                PasswordEncrypted = NULL
+            WHERE UserID = @UserID;
+        END
+        
+        -- A successful login clears the username's failure count; most have none,
+        -- so check with a seek instead of a DELETE that logs and locks every time
+        IF EXISTS (SELECT 1 FROM LoginThrottle WHERE Username = @Username)
+            DELETE FROM LoginThrottle WHERE Username = @Username;
+        
+        -- Last login (applied to Users in batches)
+        INSERT INTO LoginActivityQueue (UserID) VALUES (@UserID);
+        
+        -- Resolve the authorization context once for this session
+        DECLARE @InstructorID INT, @TACourses NVARCHAR(4000);
+        EXEC sp_ResolveAuthContext @UserID, @Role OUTPUT, @InstructorID OUTPUT, @TACourses OUTPUT;
         
         -- Audit log
-        INSERT INTO AuditLog (UserID, Username, Action, ActionDate)
+        INSERT INTO AuditSink (UserID, Username, Action, ActionDate)
         VALUES (@UserID, @Username, 'Login Successful', GETDATE());
         
         SELECT 
@@ -133,9 +358,11 @@ BEGIN
     END
     ELSE
     BEGIN
-        INSERT INTO AuditLog (UserID, Username, Action, Success, ErrorMessage)
+        INSERT INTO AuditSink (UserID, Username, Action, Success, ErrorMessage)
         VALUES (@UserID, @Username, 'Login Failed', 0, 'Invalid password');
         
+        EXEC sp_RecordLoginFailure @Username, @UserID;
+        
         SELECT 'Error' AS Result, 'Invalid credentials' AS Message;
     END
 END
@@ -161,8 +388,13 @@ BEGIN
     
     BEGIN TRY
         -- RBAC Check
-        DECLARE @RequesterRole NVARCHAR(20);
-        SELECT @RequesterRole = Role FROM Users WHERE UserID = @RequestingUserID;
+        DECLARE @RequesterRole NVARCHAR(20), @RequesterInstructorID INT, @RequesterTACourses NVARCHAR(4000);
+        SELECT @RequesterRole = Role, @RequesterInstructorID = InstructorID, @RequesterTACourses = TACourses
+        FROM fn_SessionAuthContext(@RequestingUserID);
+        
+        IF @RequesterRole IS NULL
+            EXEC sp_ResolveAuthContext @RequestingUserID, @RequesterRole OUTPUT,
+                                       @RequesterInstructorID OUTPUT, @RequesterTACourses OUTPUT;
         
         IF @RequesterRole NOT IN ('Admin', 'Instructor')
         BEGIN
@@ -202,7 +434,7 @@ BEGIN
         CLOSE SYMMETRIC KEY StudentRecordsKey;
         
         -- Audit log
-        INSERT INTO AuditLog (UserID, Action, TableAffected, RecordID)
+        INSERT INTO AuditSink (UserID, Action, TableAffected, RecordID)
         VALUES (@RequestingUserID, 'Add Student', 'Student', @NewStudentID);
         
         SELECT 'Success' AS Result, @NewStudentID AS StudentID;
@@ -211,7 +443,7 @@ BEGIN
         IF (SELECT COUNT(*) FROM sys.openkeys WHERE key_name = 'StudentRecordsKey') > 0
             CLOSE SYMMETRIC KEY StudentRecordsKey;
             
-        INSERT INTO AuditLog (UserID, Action, Success, ErrorMessage)
+        INSERT INTO AuditSink (UserID, Action, Success, ErrorMessage)
         VALUES (@RequestingUserID, 'Add Student Failed', 0, ERROR_MESSAGE());
         
         SELECT 'Error' AS Result, ERROR_MESSAGE() AS ErrorMessage;
@@ -240,8 +472,13 @@ BEGIN
         END
         
         -- RBAC Check
-        DECLARE @RequesterRole NVARCHAR(20);
-        SELECT @RequesterRole = Role FROM Users WHERE UserID = @RequestingUserID;
+        DECLARE @RequesterRole NVARCHAR(20), @RequesterInstructorID INT, @RequesterTACourses NVARCHAR(4000);
+        SELECT @RequesterRole = Role, @RequesterInstructorID = InstructorID, @RequesterTACourses = TACourses
+        FROM fn_SessionAuthContext(@RequestingUserID);
+        
+        IF @RequesterRole IS NULL
+            EXEC sp_ResolveAuthContext @RequestingUserID, @RequesterRole OUTPUT,
+                                       @RequesterInstructorID OUTPUT, @RequesterTACourses OUTPUT;
         
         -- Students can only view their own profile
         IF @RequesterRole = 'Student'
@@ -274,7 +511,7 @@ BEGIN
         CLOSE SYMMETRIC KEY StudentRecordsKey;
         
         -- Audit log
-        INSERT INTO AuditLog (UserID, Action, TableAffected, RecordID)
+        INSERT INTO AuditSink (UserID, Action, TableAffected, RecordID)
         VALUES (@RequestingUserID, 'View Student Profile', 'Student', @StudentID);
         
     END TRY
@@ -304,8 +541,13 @@ BEGIN
     
     BEGIN TRY
         -- RBAC Check
-        DECLARE @RequesterRole NVARCHAR(20);
-        SELECT @RequesterRole = Role FROM Users WHERE UserID = @RequestingUserID;
+        DECLARE @RequesterRole NVARCHAR(20), @RequesterInstructorID INT, @RequesterTACourses NVARCHAR(4000);
+        SELECT @RequesterRole = Role, @RequesterInstructorID = InstructorID, @RequesterTACourses = TACourses
+        FROM fn_SessionAuthContext(@RequestingUserID);
+        
+        IF @RequesterRole IS NULL
+            EXEC sp_ResolveAuthContext @RequestingUserID, @RequesterRole OUTPUT,
+                                       @RequesterInstructorID OUTPUT, @RequesterTACourses OUTPUT;
         
         IF @RequesterRole NOT IN ('Admin', 'Instructor')
         BEGIN
@@ -321,8 +563,7 @@ BEGIN
         END
         
         -- Get Instructor ID
-        DECLARE @InstructorID INT;
-        SELECT @InstructorID = InstructorID FROM Instructor WHERE UserID = @RequestingUserID;
+        DECLARE @InstructorID INT = @RequesterInstructorID;
         
         IF @InstructorID IS NULL AND @RequesterRole != 'Admin'
         BEGIN
@@ -347,25 +588,77 @@ BEGIN
         DECLARE @StudentIDEncrypted VARBINARY(256) = EncryptByKey(Key_GUID('StudentRecordsKey'), CAST(@StudentID AS VARCHAR(10)));
         DECLARE @GradeValueEncrypted VARBINARY(256) = EncryptByKey(Key_GUID('StudentRecordsKey'), CAST(@GradeValue AS VARCHAR(10)));
         
+        -- Blind index so lookups by student can seek instead of decrypting
+        DECLARE @StudentBlindIndex BINARY(32);
+        SELECT @StudentBlindIndex = HASHBYTES('SHA2_256', OPad + HASHBYTES('SHA2_256', IPad + CAST(@StudentID AS BINARY(4))))
+        FROM fn_BlindIndexPads('GradesStudentID');
+        
         CLOSE SYMMETRIC KEY StudentRecordsKey;
         
+        IF @StudentBlindIndex IS NULL
+        BEGIN
+            RAISERROR('Blind index key not found', 16, 1);
+            RETURN;
+        END
+        
+        DECLARE @Department NVARCHAR(50);
+        SELECT @Department = Department FROM Student WHERE StudentID = @StudentID;
+        
+        IF @Department IS NULL
+        BEGIN
+            RAISERROR('Student not found', 16, 1);
+            RETURN;
+        END
+        
+        BEGIN TRANSACTION;
+        
         -- Insert grade
-        INSERT INTO Grades (StudentIDEncrypted, CourseID, GradeValueEncrypted, EnteredByInstructorID)
-        VALUES (@StudentIDEncrypted, @CourseID, @GradeValueEncrypted, ISNULL(@InstructorID, 1));
+        INSERT INTO Grades (StudentIDEncrypted, StudentIDBlindIndex, CourseID, GradeValueEncrypted, EnteredByInstructorID)
+        VALUES (@StudentIDEncrypted, @StudentBlindIndex, @CourseID, @GradeValueEncrypted, ISNULL(@InstructorID, 1));
         
         DECLARE @GradeID INT = SCOPE_IDENTITY();
         
+        -- Inference-control aggregates: count the student once per course
+        DECLARE @NewStudent INT = 0;
+        UPDATE GradeAggregateMember WITH (UPDLOCK, SERIALIZABLE)
+        SET GradeCount = GradeCount + 1
+        WHERE CourseID = @CourseID AND StudentIDBlindIndex = @StudentBlindIndex;
+        
+        IF @@ROWCOUNT = 0
+        BEGIN
+            INSERT INTO GradeAggregateMember (CourseID, StudentIDBlindIndex, GradeCount)
+            VALUES (@CourseID, @StudentBlindIndex, 1);
+            SET @NewStudent = 1;
+        END
+        
+        UPDATE GradeAggregate WITH (UPDLOCK, SERIALIZABLE)
+        SET StudentCount = StudentCount + @NewStudent,
+            GradeCount = GradeCount + 1,
+            GradeSum = GradeSum + @GradeValue,
+            MinGrade = CASE WHEN @GradeValue < MinGrade THEN @GradeValue ELSE MinGrade END,
+            MaxGrade = CASE WHEN @GradeValue > MaxGrade THEN @GradeValue ELSE MaxGrade END
+        WHERE Department = @Department AND CourseID = @CourseID;
+        
+        IF @@ROWCOUNT = 0
+            INSERT INTO GradeAggregate (Department, CourseID, StudentCount, GradeCount, GradeSum, MinGrade, MaxGrade)
+            VALUES (@Department, @CourseID, @NewStudent, 1, @GradeValue, @GradeValue, @GradeValue);
+        
         -- Audit log
-        INSERT INTO AuditLog (UserID, Action, TableAffected, RecordID)
+        INSERT INTO AuditSink (UserID, Action, TableAffected, RecordID)
         VALUES (@RequestingUserID, 'Enter Grade', 'Grades', @GradeID);
         
+        COMMIT TRANSACTION;
+        
         SELECT 'Success' AS Result, @GradeID AS GradeID;
     END TRY
     BEGIN CATCH
+        IF @@TRANCOUNT > 0
+            ROLLBACK TRANSACTION;
+        
         IF (SELECT COUNT(*) FROM sys.openkeys WHERE key_name = 'StudentRecordsKey') > 0
             CLOSE SYMMETRIC KEY StudentRecordsKey;
             
-        INSERT INTO AuditLog (UserID, Action, Success, ErrorMessage)
+        INSERT INTO AuditSink (UserID, Action, Success, ErrorMessage)
         VALUES (@RequestingUserID, 'Enter Grade Failed', 0, ERROR_MESSAGE());
         
         SELECT 'Error' AS Result, ERROR_MESSAGE() AS ErrorMessage;
@@ -392,8 +685,13 @@ BEGIN
         END
         
         -- RBAC Check
-        DECLARE @RequesterRole NVARCHAR(20);
-        SELECT @RequesterRole = Role FROM Users WHERE UserID = @RequestingUserID;
+        DECLARE @RequesterRole NVARCHAR(20), @RequesterInstructorID INT, @RequesterTACourses NVARCHAR(4000);
+        SELECT @RequesterRole = Role, @RequesterInstructorID = InstructorID, @RequesterTACourses = TACourses
+        FROM fn_SessionAuthContext(@RequestingUserID);
+        
+        IF @RequesterRole IS NULL
+            EXEC sp_ResolveAuthContext @RequestingUserID, @RequesterRole OUTPUT,
+                                       @RequesterInstructorID OUTPUT, @RequesterTACourses OUTPUT;
         
         IF @RequesterRole NOT IN ('Admin', 'Instructor')
         BEGIN
@@ -402,19 +700,21 @@ BEGIN
         END
         
         -- For Instructors: filter by their courses
-        DECLARE @InstructorID INT;
-        IF @RequesterRole = 'Instructor'
-        BEGIN
-            SELECT @InstructorID = InstructorID FROM Instructor WHERE UserID = @RequestingUserID;
-        END
+        DECLARE @InstructorID INT = CASE WHEN @RequesterRole = 'Instructor' THEN @RequesterInstructorID END;
         
         -- Open symmetric key for decryption
         OPEN SYMMETRIC KEY StudentRecordsKey
         DECRYPTION BY CERTIFICATE StudentRecordsCert;
         
+        -- Filter by student through the blind index: only matching rows are decrypted
+        DECLARE @StudentBlindIndex BINARY(32);
+        IF @StudentID IS NOT NULL
+            SELECT @StudentBlindIndex = HASHBYTES('SHA2_256', OPad + HASHBYTES('SHA2_256', IPad + CAST(@StudentID AS BINARY(4))))
+            FROM fn_BlindIndexPads('GradesStudentID');
+        
         SELECT 
             g.GradeID,
-            CAST(CAST(DecryptByKey(g.StudentIDEncrypted) AS VARCHAR(10)) AS INT) AS StudentID,
+            d.StudentID,
             s.FullName AS StudentName,
             g.CourseID,
             c.CourseName,
@@ -424,16 +724,18 @@ BEGIN
         FROM Grades g
         INNER JOIN Course c ON g.CourseID = c.CourseID
         INNER JOIN Instructor i ON g.EnteredByInstructorID = i.InstructorID
-        LEFT JOIN Student s ON s.StudentID = CAST(CAST(DecryptByKey(g.StudentIDEncrypted) AS VARCHAR(10)) AS INT)
+        CROSS APPLY (SELECT CAST(CAST(DecryptByKey(g.StudentIDEncrypted) AS VARCHAR(10)) AS INT) AS StudentID) d
+        LEFT JOIN Student s ON s.StudentID = d.StudentID
         WHERE 
-            (@StudentID IS NULL OR CAST(CAST(DecryptByKey(g.StudentIDEncrypted) AS VARCHAR(10)) AS INT) = @StudentID)
+            (@StudentID IS NULL OR g.StudentIDBlindIndex = @StudentBlindIndex)
             AND (@CourseID IS NULL OR g.CourseID = @CourseID)
-            AND (@RequesterRole = 'Admin' OR c.InstructorID = @InstructorID);
+            AND (@RequesterRole = 'Admin' OR c.InstructorID = @InstructorID)
+        OPTION (RECOMPILE); -- Optional filters: let each call get a seek plan
         
         CLOSE SYMMETRIC KEY StudentRecordsKey;
         
         -- Audit log
-        INSERT INTO AuditLog (UserID, Action, TableAffected)
+        INSERT INTO AuditSink (UserID, Action, TableAffected)
         VALUES (@RequestingUserID, 'View Grades', 'Grades');
         
     END TRY
@@ -468,18 +770,23 @@ BEGIN
         OPEN SYMMETRIC KEY StudentRecordsKey
         DECRYPTION BY CERTIFICATE StudentRecordsCert;
         
+        -- Seek own grades through the blind index instead of decrypting every row
+        DECLARE @StudentBlindIndex BINARY(32);
+        SELECT @StudentBlindIndex = HASHBYTES('SHA2_256', OPad + HASHBYTES('SHA2_256', IPad + CAST(@StudentID AS BINARY(4))))
+        FROM fn_BlindIndexPads('GradesStudentID');
+        
         SELECT 
             c.CourseName,
             CAST(CAST(DecryptByKey(g.GradeValueEncrypted) AS VARCHAR(10)) AS DECIMAL(5,2)) AS GradeValue,
             g.DateEntered
         FROM Grades g
         INNER JOIN Course c ON g.CourseID = c.CourseID
-        WHERE CAST(CAST(DecryptByKey(g.StudentIDEncrypted) AS VARCHAR(10)) AS INT) = @StudentID;
+        WHERE g.StudentIDBlindIndex = @StudentBlindIndex;
         
         CLOSE SYMMETRIC KEY StudentRecordsKey;
         
         -- Audit log
-        INSERT INTO AuditLog (UserID, Action, TableAffected)
+        INSERT INTO AuditSink (UserID, Action, TableAffected)
         VALUES (@RequestingUserID, 'View Own Grades', 'Grades');
         
     END TRY
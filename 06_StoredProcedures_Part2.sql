@@ -31,8 +31,13 @@ BEGIN
         END
         
         -- RBAC Check
-        DECLARE @RequesterRole NVARCHAR(20);
-        SELECT @RequesterRole = Role FROM Users WHERE UserID = @RequestingUserID;
+        DECLARE @RequesterRole NVARCHAR(20), @RequesterInstructorID INT, @RequesterTACourses NVARCHAR(4000);
+        SELECT @RequesterRole = Role, @RequesterInstructorID = InstructorID, @RequesterTACourses = TACourses
+        FROM fn_SessionAuthContext(@RequestingUserID);
+        
+        IF @RequesterRole IS NULL
+            EXEC sp_ResolveAuthContext @RequestingUserID, @RequesterRole OUTPUT,
+                                       @RequesterInstructorID OUTPUT, @RequesterTACourses OUTPUT;
         
         IF @RequesterRole NOT IN ('Admin', 'Instructor', 'TA')
         BEGIN
@@ -43,7 +48,7 @@ BEGIN
         -- For TAs: verify they are assigned to this course
         IF @RequesterRole = 'TA'
         BEGIN
-            IF NOT EXISTS (SELECT 1 FROM TAAssignment WHERE UserID = @RequestingUserID AND CourseID = @CourseID)
+            IF CHARINDEX(CONCAT(N',', @CourseID, N','), ISNULL(@RequesterTACourses, N'')) = 0
             BEGIN
                 RAISERROR('Access Denied: You are not assigned to this course', 16, 1);
                 RETURN;
@@ -53,8 +58,7 @@ BEGIN
         -- For Instructors: verify they teach this course
         IF @RequesterRole = 'Instructor'
         BEGIN
-            DECLARE @InstructorID INT;
-            SELECT @InstructorID = InstructorID FROM Instructor WHERE UserID = @RequestingUserID;
+            DECLARE @InstructorID INT = @RequesterInstructorID;
             
             IF NOT EXISTS (SELECT 1 FROM Course WHERE CourseID = @CourseID AND InstructorID = @InstructorID)
             BEGIN
@@ -63,6 +67,19 @@ BEGIN
             END
         END
         
+        DECLARE @Department NVARCHAR(50);
+        SELECT @Department = Department FROM Student WHERE StudentID = @StudentID;
+        
+        IF @Department IS NULL
+        BEGIN
+            RAISERROR('Student not found', 16, 1);
+            RETURN;
+        END
+        
+        DECLARE @Present INT = CASE WHEN @Status = 1 THEN 1 ELSE 0 END;
+        
+        BEGIN TRANSACTION;
+        
         -- Check if attendance already recorded for this date
         IF EXISTS (
             SELECT 1 FROM Attendance 
@@ -72,15 +89,29 @@ BEGIN
         )
         BEGIN
             -- Update existing record
+            DECLARE @Changed TABLE (OldStatus BIT, NewStatus BIT);
+            
             UPDATE Attendance
             SET Status = @Status, RecordedByUserID = @RequestingUserID
+            OUTPUT deleted.Status, inserted.Status INTO @Changed
             WHERE StudentID = @StudentID 
             AND CourseID = @CourseID 
             AND CAST(DateRecorded AS DATE) = CAST(GETDATE() AS DATE);
             
-            INSERT INTO AuditLog (UserID, Action, TableAffected)
+            -- Inference-control aggregates: move the changed marks between present and absent
+            DECLARE @PresentDelta INT;
+            SELECT @PresentDelta = SUM(CAST(NewStatus AS INT) - CAST(OldStatus AS INT)) FROM @Changed;
+            
+            UPDATE AttendanceAggregate
+            SET PresentCount = PresentCount + @PresentDelta,
+                AbsentCount = AbsentCount - @PresentDelta
+            WHERE Department = @Department AND CourseID = @CourseID AND @PresentDelta <> 0;
+            
+            INSERT INTO AuditSink (UserID, Action, TableAffected)
             VALUES (@RequestingUserID, 'Update Attendance', 'Attendance');
             
+            COMMIT TRANSACTION;
+            
             SELECT 'Success' AS Result, 'Attendance updated' AS Message;
         END
         ELSE
@@ -89,14 +120,44 @@ BEGIN
             INSERT INTO Attendance (StudentID, CourseID, Status, RecordedByUserID)
             VALUES (@StudentID, @CourseID, @Status, @RequestingUserID);
             
-            INSERT INTO AuditLog (UserID, Action, TableAffected, RecordID)
-            VALUES (@RequestingUserID, 'Record Attendance', 'Attendance', SCOPE_IDENTITY());
+            DECLARE @AttendanceID INT = SCOPE_IDENTITY();
+            
+            -- Inference-control aggregates: count the student once per course
+            DECLARE @NewStudent INT = 0;
+            UPDATE AttendanceAggregateMember WITH (UPDLOCK, SERIALIZABLE)
+            SET RecordCount = RecordCount + 1
+            WHERE CourseID = @CourseID AND StudentID = @StudentID;
+            
+            IF @@ROWCOUNT = 0
+            BEGIN
+                INSERT INTO AttendanceAggregateMember (CourseID, StudentID, RecordCount)
+                VALUES (@CourseID, @StudentID, 1);
+                SET @NewStudent = 1;
+            END
+            
+            UPDATE AttendanceAggregate WITH (UPDLOCK, SERIALIZABLE)
+            SET StudentCount = StudentCount + @NewStudent,
+                PresentCount = PresentCount + @Present,
+                AbsentCount = AbsentCount + 1 - @Present
+            WHERE Department = @Department AND CourseID = @CourseID;
+            
+            IF @@ROWCOUNT = 0
+                INSERT INTO AttendanceAggregate (Department, CourseID, StudentCount, PresentCount, AbsentCount)
+                VALUES (@Department, @CourseID, @NewStudent, @Present, 1 - @Present);
+            
+            INSERT INTO AuditSink (UserID, Action, TableAffected, RecordID)
+            VALUES (@RequestingUserID, 'Record Attendance', 'Attendance', @AttendanceID);
             
-            SELECT 'Success' AS Result, SCOPE_IDENTITY() AS AttendanceID;
+            COMMIT TRANSACTION;
+            
+            SELECT 'Success' AS Result, @AttendanceID AS AttendanceID;
         END
     END TRY
     BEGIN CATCH
-        INSERT INTO AuditLog (UserID, Action, Success, ErrorMessage)
+        IF @@TRANCOUNT > 0
+            ROLLBACK TRANSACTION;
+        
+        INSERT INTO AuditSink (UserID, Action, Success, ErrorMessage)
         VALUES (@RequestingUserID, 'Record Attendance Failed', 0, ERROR_MESSAGE());
         
         SELECT 'Error' AS Result, ERROR_MESSAGE() AS ErrorMessage;
@@ -123,8 +184,13 @@ BEGIN
         END
         
         -- RBAC Check
-        DECLARE @RequesterRole NVARCHAR(20);
-        SELECT @RequesterRole = Role FROM Users WHERE UserID = @RequestingUserID;
+        DECLARE @RequesterRole NVARCHAR(20), @RequesterInstructorID INT, @RequesterTACourses NVARCHAR(4000);
+        SELECT @RequesterRole = Role, @RequesterInstructorID = InstructorID, @RequesterTACourses = TACourses
+        FROM fn_SessionAuthContext(@RequestingUserID);
+        
+        IF @RequesterRole IS NULL
+            EXEC sp_ResolveAuthContext @RequestingUserID, @RequesterRole OUTPUT,
+                                       @RequesterInstructorID OUTPUT, @RequesterTACourses OUTPUT;
         
         IF @RequesterRole NOT IN ('Admin', 'Instructor', 'TA')
         BEGIN
@@ -156,8 +222,7 @@ BEGIN
         ELSE IF @RequesterRole = 'Instructor'
         BEGIN
             -- Instructors can see attendance for their courses
-            DECLARE @InstructorID INT;
-            SELECT @InstructorID = InstructorID FROM Instructor WHERE UserID = @RequestingUserID;
+            DECLARE @InstructorID INT = @RequesterInstructorID;
             
             SELECT 
                 a.AttendanceID,
@@ -194,7 +259,7 @@ BEGIN
         END
         
         -- Audit log
-        INSERT INTO AuditLog (UserID, Action, TableAffected)
+        INSERT INTO AuditSink (UserID, Action, TableAffected)
         VALUES (@RequestingUserID, 'View Attendance', 'Attendance');
         
     END TRY
@@ -235,7 +300,7 @@ BEGIN
         ORDER BY a.DateRecorded DESC;
         
         -- Audit log
-        INSERT INTO AuditLog (UserID, Action, TableAffected)
+        INSERT INTO AuditSink (UserID, Action, TableAffected)
         VALUES (@RequestingUserID, 'View Own Attendance', 'Attendance');
         
     END TRY
@@ -263,8 +328,13 @@ BEGIN
     
     BEGIN TRY
         -- RBAC Check
-        DECLARE @RequesterRole NVARCHAR(20);
-        SELECT @RequesterRole = Role FROM Users WHERE UserID = @RequestingUserID;
+        DECLARE @RequesterRole NVARCHAR(20), @RequesterInstructorID INT, @RequesterTACourses NVARCHAR(4000);
+        SELECT @RequesterRole = Role, @RequesterInstructorID = InstructorID, @RequesterTACourses = TACourses
+        FROM fn_SessionAuthContext(@RequestingUserID);
+        
+        IF @RequesterRole IS NULL
+            EXEC sp_ResolveAuthContext @RequestingUserID, @RequesterRole OUTPUT,
+                                       @RequesterInstructorID OUTPUT, @RequesterTACourses OUTPUT;
         
         IF @RequesterRole NOT IN ('Admin', 'Instructor')
         BEGIN
@@ -278,13 +348,13 @@ BEGIN
         DECLARE @CourseID INT = SCOPE_IDENTITY();
         
         -- Audit log
-        INSERT INTO AuditLog (UserID, Action, TableAffected, RecordID)
+        INSERT INTO AuditSink (UserID, Action, TableAffected, RecordID)
         VALUES (@RequestingUserID, 'Add Course', 'Course', @CourseID);
         
         SELECT 'Success' AS Result, @CourseID AS CourseID;
     END TRY
     BEGIN CATCH
-        INSERT INTO AuditLog (UserID, Action, Success, ErrorMessage)
+        INSERT INTO AuditSink (UserID, Action, Success, ErrorMessage)
         VALUES (@RequestingUserID, 'Add Course Failed', 0, ERROR_MESSAGE());
         
         SELECT 'Error' AS Result, ERROR_MESSAGE() AS ErrorMessage;
@@ -327,7 +397,7 @@ BEGIN
         -- Audit log
         IF @RequestingUserID IS NOT NULL
         BEGIN
-            INSERT INTO AuditLog (UserID, Action, TableAffected)
+            INSERT INTO AuditSink (UserID, Action, TableAffected)
             VALUES (@RequestingUserID, 'View Courses', 'Course');
         END
     END TRY
@@ -348,8 +418,13 @@ BEGIN
     
     BEGIN TRY
         -- RBAC Check
-        DECLARE @RequesterRole NVARCHAR(20);
-        SELECT @RequesterRole = Role FROM Users WHERE UserID = @RequestingUserID;
+        DECLARE @RequesterRole NVARCHAR(20), @RequesterInstructorID INT, @RequesterTACourses NVARCHAR(4000);
+        SELECT @RequesterRole = Role, @RequesterInstructorID = InstructorID, @RequesterTACourses = TACourses
+        FROM fn_SessionAuthContext(@RequestingUserID);
+        
+        IF @RequesterRole IS NULL
+            EXEC sp_ResolveAuthContext @RequestingUserID, @RequesterRole OUTPUT,
+                                       @RequesterInstructorID OUTPUT, @RequesterTACourses OUTPUT;
         
         IF @RequesterRole NOT IN ('Admin', 'Instructor')
         BEGIN
@@ -368,13 +443,13 @@ BEGIN
         VALUES (@StudentID, @CourseID);
         
         -- Audit log
-        INSERT INTO AuditLog (UserID, Action, TableAffected, RecordID)
+        INSERT INTO AuditSink (UserID, Action, TableAffected, RecordID)
         VALUES (@RequestingUserID, 'Enroll Student', 'CourseEnrollment', SCOPE_IDENTITY());
         
         SELECT 'Success' AS Result, SCOPE_IDENTITY() AS EnrollmentID;
     END TRY
     BEGIN CATCH
-        INSERT INTO AuditLog (UserID, Action, Success, ErrorMessage)
+        INSERT INTO AuditSink (UserID, Action, Success, ErrorMessage)
         VALUES (@RequestingUserID, 'Enroll Student Failed', 0, ERROR_MESSAGE());
         
         SELECT 'Error' AS Result, ERROR_MESSAGE() AS ErrorMessage;
@@ -393,8 +468,13 @@ BEGIN
     
     BEGIN TRY
         -- RBAC Check
-        DECLARE @RequesterRole NVARCHAR(20);
-        SELECT @RequesterRole = Role FROM Users WHERE UserID = @RequestingUserID;
+        DECLARE @RequesterRole NVARCHAR(20), @RequesterInstructorID INT, @RequesterTACourses NVARCHAR(4000);
+        SELECT @RequesterRole = Role, @RequesterInstructorID = InstructorID, @RequesterTACourses = TACourses
+        FROM fn_SessionAuthContext(@RequestingUserID);
+        
+        IF @RequesterRole IS NULL
+            EXEC sp_ResolveAuthContext @RequestingUserID, @RequesterRole OUTPUT,
+                                       @RequesterInstructorID OUTPUT, @RequesterTACourses OUTPUT;
         
         IF @RequesterRole NOT IN ('Admin', 'Instructor')
         BEGIN
@@ -419,17 +499,29 @@ BEGIN
             RETURN;
         END
         
+        BEGIN TRANSACTION;
+        
         INSERT INTO TAAssignment (UserID, CourseID)
         VALUES (@TAUserID, @CourseID);
         
+        DECLARE @AssignmentID INT = SCOPE_IDENTITY();
+        
+        -- Invalidate cached session authorization contexts (the TA's course list changed)
+        UPDATE AuthContextState SET Epoch = Epoch + 1;
+        
         -- Audit log
-        INSERT INTO AuditLog (UserID, Action, TableAffected, RecordID)
-        VALUES (@RequestingUserID, 'Assign TA', 'TAAssignment', SCOPE_IDENTITY());
+        INSERT INTO AuditSink (UserID, Action, TableAffected, RecordID)
+        VALUES (@RequestingUserID, 'Assign TA', 'TAAssignment', @AssignmentID);
         
-        SELECT 'Success' AS Result, SCOPE_IDENTITY() AS AssignmentID;
+        COMMIT TRANSACTION;
+        
+        SELECT 'Success' AS Result, @AssignmentID AS AssignmentID;
     END TRY
     BEGIN CATCH
-        INSERT INTO AuditLog (UserID, Action, Success, ErrorMessage)
+        IF @@TRANCOUNT > 0
+            ROLLBACK TRANSACTION;
+        
+        INSERT INTO AuditSink (UserID, Action, Success, ErrorMessage)
         VALUES (@RequestingUserID, 'Assign TA Failed', 0, ERROR_MESSAGE());
         
         SELECT 'Error' AS Result, ERROR_MESSAGE() AS ErrorMessage;
@@ -515,13 +607,13 @@ BEGIN
         DECLARE @RequestID INT = SCOPE_IDENTITY();
         
         -- Audit log
-        INSERT INTO AuditLog (UserID, Action, TableAffected, RecordID)
+        INSERT INTO AuditSink (UserID, Action, TableAffected, RecordID)
         VALUES (@RequestingUserID, 'Submit Role Request', 'RoleRequests', @RequestID);
         
         SELECT 'Success' AS Result, @RequestID AS RequestID, 'Your request has been submitted and is pending admin approval' AS Message;
     END TRY
     BEGIN CATCH
-        INSERT INTO AuditLog (UserID, Action, Success, ErrorMessage)
+        INSERT INTO AuditSink (UserID, Action, Success, ErrorMessage)
         VALUES (@RequestingUserID, 'Submit Role Request Failed', 0, ERROR_MESSAGE());
         
         SELECT 'Error' AS Result, ERROR_MESSAGE() AS ErrorMessage;
@@ -538,8 +630,13 @@ BEGIN
     
     BEGIN TRY
         -- RBAC Check
-        DECLARE @RequesterRole NVARCHAR(20);
-        SELECT @RequesterRole = Role FROM Users WHERE UserID = @RequestingUserID;
+        DECLARE @RequesterRole NVARCHAR(20), @RequesterInstructorID INT, @RequesterTACourses NVARCHAR(4000);
+        SELECT @RequesterRole = Role, @RequesterInstructorID = InstructorID, @RequesterTACourses = TACourses
+        FROM fn_SessionAuthContext(@RequestingUserID);
+        
+        IF @RequesterRole IS NULL
+            EXEC sp_ResolveAuthContext @RequestingUserID, @RequesterRole OUTPUT,
+                                       @RequesterInstructorID OUTPUT, @RequesterTACourses OUTPUT;
         
         IF @RequesterRole != 'Admin'
         BEGIN
@@ -562,7 +659,7 @@ BEGIN
         ORDER BY RequestDate ASC;
         
         -- Audit log
-        INSERT INTO AuditLog (UserID, Action, TableAffected)
+        INSERT INTO AuditSink (UserID, Action, TableAffected)
         VALUES (@RequestingUserID, 'View Pending Role Requests', 'RoleRequests');
         
     END TRY
@@ -643,6 +740,9 @@ BEGIN
             SET Role = @RequestedRole, ClearanceLevel = @NewClearance
             WHERE UserID = @UserID;
             
+            -- Invalidate cached session authorization contexts
+            UPDATE AuthContextState SET Epoch = Epoch + 1;
+            
             -- Update request status
             UPDATE RoleRequests
             SET Status = 'Approved',
@@ -652,7 +752,7 @@ BEGIN
             WHERE RequestID = @RequestID;
             
             -- Audit log
-            INSERT INTO AuditLog (UserID, Action, TableAffected, RecordID, NewValue)
+            INSERT INTO AuditSink (UserID, Action, TableAffected, RecordID, NewValue)
             VALUES (@AdminUserID, 'Approve Role Request', 'RoleRequests', @RequestID, 
                     'User: ' + @Username + ' upgraded to ' + @RequestedRole);
             
@@ -669,7 +769,7 @@ BEGIN
             WHERE RequestID = @RequestID;
             
             -- Audit log
-            INSERT INTO AuditLog (UserID, Action, TableAffected, RecordID)
+            INSERT INTO AuditSink (UserID, Action, TableAffected, RecordID)
             VALUES (@AdminUserID, 'Deny Role Request', 'RoleRequests', @RequestID);
             
             SELECT 'Success' AS Result, 'Role request denied' AS Message;
@@ -687,7 +787,7 @@ BEGIN
         IF @@TRANCOUNT > 0
             ROLLBACK TRANSACTION;
             
-        INSERT INTO AuditLog (UserID, Action, Success, ErrorMessage)
+        INSERT INTO AuditSink (UserID, Action, Success, ErrorMessage)
         VALUES (@AdminUserID, 'Process Role Request Failed', 0, ERROR_MESSAGE());
         
         SELECT 'Error' AS Result, ERROR_MESSAGE() AS ErrorMessage;
@@ -734,8 +834,13 @@ BEGIN
     
     BEGIN TRY
         -- RBAC Check
-        DECLARE @RequesterRole NVARCHAR(20);
-        SELECT @RequesterRole = Role FROM Users WHERE UserID = @RequestingUserID;
+        DECLARE @RequesterRole NVARCHAR(20), @RequesterInstructorID INT, @RequesterTACourses NVARCHAR(4000);
+        SELECT @RequesterRole = Role, @RequesterInstructorID = InstructorID, @RequesterTACourses = TACourses
+        FROM fn_SessionAuthContext(@RequestingUserID);
+        
+        IF @RequesterRole IS NULL
+            EXEC sp_ResolveAuthContext @RequestingUserID, @RequesterRole OUTPUT,
+                                       @RequesterInstructorID OUTPUT, @RequesterTACourses OUTPUT;
         
         IF @RequesterRole != 'Admin'
         BEGIN
@@ -768,7 +873,7 @@ BEGIN
             rr.RequestDate DESC;
         
         -- Audit log
-        INSERT INTO AuditLog (UserID, Action, TableAffected)
+        INSERT INTO AuditSink (UserID, Action, TableAffected)
         VALUES (@RequestingUserID, 'View All Role Requests', 'RoleRequests');
         
     END TRY
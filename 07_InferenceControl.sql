@@ -31,8 +31,13 @@ BEGIN
         END
         
         -- RBAC Check
-        DECLARE @RequesterRole NVARCHAR(20);
-        SELECT @RequesterRole = Role FROM Users WHERE UserID = @RequestingUserID;
+        DECLARE @RequesterRole NVARCHAR(20), @RequesterInstructorID INT, @RequesterTACourses NVARCHAR(4000);
+        SELECT @RequesterRole = Role, @RequesterInstructorID = InstructorID, @RequesterTACourses = TACourses
+        FROM fn_SessionAuthContext(@RequestingUserID);
+        
+        IF @RequesterRole IS NULL
+            EXEC sp_ResolveAuthContext @RequestingUserID, @RequesterRole OUTPUT,
+                                       @RequesterInstructorID OUTPUT, @RequesterTACourses OUTPUT;
         
         IF @RequesterRole NOT IN ('Admin', 'Instructor')
         BEGIN
@@ -40,39 +45,29 @@ BEGIN
             RETURN;
         END
         
-        -- Open symmetric key for decryption
-        OPEN SYMMETRIC KEY StudentRecordsKey
-        DECRYPTION BY CERTIFICATE StudentRecordsCert;
-        
         -- Query with Inference Control (minimum 3 students)
+        -- Answered from the maintained aggregates: no grade is decrypted per call
         SELECT 
-            s.Department,
-            c.CourseID,
+            a.Department,
+            a.CourseID,
             c.CourseName,
-            COUNT(DISTINCT s.StudentID) AS StudentCount,
-            AVG(CAST(CAST(DecryptByKey(g.GradeValueEncrypted) AS VARCHAR(10)) AS DECIMAL(5,2))) AS AverageGrade,
-            MIN(CAST(CAST(DecryptByKey(g.GradeValueEncrypted) AS VARCHAR(10)) AS DECIMAL(5,2))) AS MinGrade,
-            MAX(CAST(CAST(DecryptByKey(g.GradeValueEncrypted) AS VARCHAR(10)) AS DECIMAL(5,2))) AS MaxGrade
-        FROM Grades g
-        INNER JOIN Student s ON s.StudentID = CAST(CAST(DecryptByKey(g.StudentIDEncrypted) AS VARCHAR(10)) AS INT)
-        INNER JOIN Course c ON g.CourseID = c.CourseID
+            a.StudentCount,
+            CAST(a.GradeSum / a.GradeCount AS DECIMAL(5,2)) AS AverageGrade,
+            a.MinGrade,
+            a.MaxGrade
+        FROM GradeAggregate a
+        INNER JOIN Course c ON a.CourseID = c.CourseID
         WHERE 
-            (@Department IS NULL OR s.Department = @Department)
-            AND (@CourseID IS NULL OR c.CourseID = @CourseID)
-        GROUP BY s.Department, c.CourseID, c.CourseName
-        HAVING COUNT(DISTINCT s.StudentID) >= 3; -- Inference Control: Minimum group size
-        
-        CLOSE SYMMETRIC KEY StudentRecordsKey;
+            (@Department IS NULL OR a.Department = @Department)
+            AND (@CourseID IS NULL OR a.CourseID = @CourseID)
+            AND a.StudentCount >= 3; -- Inference Control: Minimum group size
         
         -- Audit log
-        INSERT INTO AuditLog (UserID, Action, TableAffected)
+        INSERT INTO AuditSink (UserID, Action, TableAffected)
         VALUES (@RequestingUserID, 'View Grade Statistics', 'Grades');
         
     END TRY
     BEGIN CATCH
-        IF (SELECT COUNT(*) FROM sys.openkeys WHERE key_name = 'StudentRecordsKey') > 0
-            CLOSE SYMMETRIC KEY StudentRecordsKey;
-            
         SELECT 'Error' AS Result, ERROR_MESSAGE() AS ErrorMessage;
     END CATCH
 END
@@ -97,8 +92,13 @@ BEGIN
         END
         
         -- RBAC Check
-        DECLARE @RequesterRole NVARCHAR(20);
-        SELECT @RequesterRole = Role FROM Users WHERE UserID = @RequestingUserID;
+        DECLARE @RequesterRole NVARCHAR(20), @RequesterInstructorID INT, @RequesterTACourses NVARCHAR(4000);
+        SELECT @RequesterRole = Role, @RequesterInstructorID = InstructorID, @RequesterTACourses = TACourses
+        FROM fn_SessionAuthContext(@RequestingUserID);
+        
+        IF @RequesterRole IS NULL
+            EXEC sp_ResolveAuthContext @RequestingUserID, @RequesterRole OUTPUT,
+                                       @RequesterInstructorID OUTPUT, @RequesterTACourses OUTPUT;
         
         IF @RequesterRole NOT IN ('Admin', 'Instructor', 'TA')
         BEGIN
@@ -106,26 +106,24 @@ BEGIN
             RETURN;
         END
         
-        -- Query with Inference Control
+        -- Query with Inference Control (answered from the maintained aggregates)
         SELECT 
             c.CourseID,
             c.CourseName,
-            s.Department,
-            COUNT(DISTINCT a.StudentID) AS TotalStudents,
-            SUM(CASE WHEN a.Status = 1 THEN 1 ELSE 0 END) AS TotalPresent,
-            SUM(CASE WHEN a.Status = 0 THEN 1 ELSE 0 END) AS TotalAbsent,
-            CAST(SUM(CASE WHEN a.Status = 1 THEN 1 ELSE 0 END) * 100.0 / COUNT(*) AS DECIMAL(5,2)) AS AttendancePercentage
-        FROM Attendance a
+            a.Department,
+            a.StudentCount AS TotalStudents,
+            a.PresentCount AS TotalPresent,
+            a.AbsentCount AS TotalAbsent,
+            CAST(a.PresentCount * 100.0 / NULLIF(a.PresentCount + a.AbsentCount, 0) AS DECIMAL(5,2)) AS AttendancePercentage
+        FROM AttendanceAggregate a
         INNER JOIN Course c ON a.CourseID = c.CourseID
-        INNER JOIN Student s ON a.StudentID = s.StudentID
         WHERE 
-            (@CourseID IS NULL OR c.CourseID = @CourseID)
-            AND (@Department IS NULL OR s.Department = @Department)
-        GROUP BY c.CourseID, c.CourseName, s.Department
-        HAVING COUNT(DISTINCT a.StudentID) >= 3; -- Inference Control
+            (@CourseID IS NULL OR a.CourseID = @CourseID)
+            AND (@Department IS NULL OR a.Department = @Department)
+            AND a.StudentCount >= 3; -- Inference Control
         
         -- Audit log
-        INSERT INTO AuditLog (UserID, Action, TableAffected)
+        INSERT INTO AuditSink (UserID, Action, TableAffected)
         VALUES (@RequestingUserID, 'View Attendance Statistics', 'Attendance');
         
     END TRY
@@ -155,8 +153,13 @@ BEGIN
         END
         
         -- RBAC Check
-        DECLARE @RequesterRole NVARCHAR(20);
-        SELECT @RequesterRole = Role FROM Users WHERE UserID = @RequestingUserID;
+        DECLARE @RequesterRole NVARCHAR(20), @RequesterInstructorID INT, @RequesterTACourses NVARCHAR(4000);
+        SELECT @RequesterRole = Role, @RequesterInstructorID = InstructorID, @RequesterTACourses = TACourses
+        FROM fn_SessionAuthContext(@RequestingUserID);
+        
+        IF @RequesterRole IS NULL
+            EXEC sp_ResolveAuthContext @RequestingUserID, @RequesterRole OUTPUT,
+                                       @RequesterInstructorID OUTPUT, @RequesterTACourses OUTPUT;
         
         IF @RequesterRole NOT IN ('Admin', 'Instructor', 'TA')
         BEGIN
@@ -195,7 +198,7 @@ BEGIN
             SELECT 'Warning' AS Result, 
                    'Query result set too small (less than 3 students). Result blocked for inference control.' AS Message;
             
-            INSERT INTO AuditLog (UserID, Action, Success, ErrorMessage)
+            INSERT INTO AuditSink (UserID, Action, Success, ErrorMessage)
             VALUES (@RequestingUserID, 'Student List Query Blocked', 0, 'Inference Control: Result set < 3');
         END
         ELSE IF @StudentCount = 0
@@ -213,7 +216,7 @@ BEGIN
             FROM #FilteredStudents
             ORDER BY FullName;
             
-            INSERT INTO AuditLog (UserID, Action, TableAffected)
+            INSERT INTO AuditSink (UserID, Action, TableAffected)
             VALUES (@RequestingUserID, 'View Student List', 'Student');
         END
         
@@ -251,7 +254,7 @@ BEGIN
     BEGIN
         SET @AllowQuery = 0;
         
-        INSERT INTO AuditLog (UserID, Action, Success, ErrorMessage)
+        INSERT INTO AuditSink (UserID, Action, Success, ErrorMessage)
         VALUES (@RequestingUserID, 'Query Blocked - ' + @QueryType, 0, 
                 'Inference Control: Would return ' + CAST(@ResultCount AS VARCHAR) + ' records');
     END
@@ -304,8 +307,13 @@ BEGIN
         END
         
         -- RBAC Check
-        DECLARE @RequesterRole NVARCHAR(20);
-        SELECT @RequesterRole = Role FROM Users WHERE UserID = @RequestingUserID;
+        DECLARE @RequesterRole NVARCHAR(20), @RequesterInstructorID INT, @RequesterTACourses NVARCHAR(4000);
+        SELECT @RequesterRole = Role, @RequesterInstructorID = InstructorID, @RequesterTACourses = TACourses
+        FROM fn_SessionAuthContext(@RequestingUserID);
+        
+        IF @RequesterRole IS NULL
+            EXEC sp_ResolveAuthContext @RequestingUserID, @RequesterRole OUTPUT,
+                                       @RequesterInstructorID OUTPUT, @RequesterTACourses OUTPUT;
         
         IF @RequesterRole NOT IN ('Admin', 'Instructor')
         BEGIN
@@ -313,32 +321,122 @@ BEGIN
             RETURN;
         END
         
+        -- Combined performance metrics with inference control
+        -- Grade and attendance totals come from the maintained aggregates; the
+        -- department head count is an index-only count on IX_Student_Department
+        SELECT 
+            d.Department,
+            d.TotalStudents,
+            ISNULL(g.GradeCount, 0) AS TotalGradeRecords,
+            CAST(g.GradeSum / NULLIF(g.GradeCount, 0) AS DECIMAL(5,2)) AS OverallAverageGrade,
+            CAST(at.PresentCount * 100.0 / NULLIF(at.MarkCount, 0) AS DECIMAL(5,2)) AS OverallAttendanceRate
+        FROM (
+            SELECT Department, COUNT(*) AS TotalStudents
+            FROM Student
+            WHERE (@Department IS NULL OR Department = @Department)
+            GROUP BY Department
+            HAVING COUNT(*) >= 3 -- Inference Control
+        ) d
+        LEFT JOIN (
+            SELECT Department, SUM(GradeCount) AS GradeCount, SUM(GradeSum) AS GradeSum
+            FROM GradeAggregate
+            GROUP BY Department
+        ) g ON g.Department = d.Department
+        LEFT JOIN (
+            SELECT Department, SUM(PresentCount) AS PresentCount, SUM(PresentCount + AbsentCount) AS MarkCount
+            FROM AttendanceAggregate
+            GROUP BY Department
+        ) at ON at.Department = d.Department;
+        
+        -- Audit log
+        INSERT INTO AuditSink (UserID, Action, TableAffected)
+        VALUES (@RequestingUserID, 'View Performance Report', 'Multiple');
+        
+    END TRY
+    BEGIN CATCH
+        SELECT 'Error' AS Result, ERROR_MESSAGE() AS ErrorMessage;
+    END CATCH
+END
+GO
+
+-- SP: Recompute the inference-control aggregates from the base tables (Admin only)
+-- Used after a migration, and to repair drift after writes outside the procedures
+CREATE OR ALTER PROCEDURE sp_RebuildInferenceAggregates
+    @RequestingUserID INT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    BEGIN TRY
+        IF NOT EXISTS (SELECT 1 FROM Users WHERE UserID = @RequestingUserID AND Role = 'Admin')
+        BEGIN
+            RAISERROR('Access Denied: Only Admins can rebuild aggregates', 16, 1);
+            RETURN;
+        END
+        
         OPEN SYMMETRIC KEY StudentRecordsKey
         DECRYPTION BY CERTIFICATE StudentRecordsCert;
         
-        -- Combined performance metrics with inference control
+        DECLARE @IPad BINARY(64), @OPad BINARY(64);
+        SELECT @IPad = IPad, @OPad = OPad FROM fn_BlindIndexPads('GradesStudentID');
+        
+        BEGIN TRANSACTION;
+        
+        -- Exclusive locks keep concurrent writers out until the rebuild commits
+        DELETE FROM GradeAggregateMember WITH (TABLOCKX);
+        DELETE FROM GradeAggregate WITH (TABLOCKX);
+        DELETE FROM AttendanceAggregateMember WITH (TABLOCKX);
+        DELETE FROM AttendanceAggregate WITH (TABLOCKX);
+        
+        INSERT INTO GradeAggregateMember (CourseID, StudentIDBlindIndex, GradeCount)
+        SELECT CourseID, StudentIDBlindIndex, COUNT(*)
+        FROM Grades
+        GROUP BY CourseID, StudentIDBlindIndex;
+        
+        INSERT INTO GradeAggregate (Department, CourseID, StudentCount, GradeCount, GradeSum, MinGrade, MaxGrade)
         SELECT 
             s.Department,
-            COUNT(DISTINCT s.StudentID) AS TotalStudents,
-            COUNT(DISTINCT g.GradeID) AS TotalGradeRecords,
-            AVG(CAST(CAST(DecryptByKey(g.GradeValueEncrypted) AS VARCHAR(10)) AS DECIMAL(5,2))) AS OverallAverageGrade,
-            CAST(SUM(CASE WHEN a.Status = 1 THEN 1 ELSE 0 END) * 100.0 / 
-                 NULLIF(COUNT(a.AttendanceID), 0) AS DECIMAL(5,2)) AS OverallAttendanceRate
+            g.CourseID,
+            COUNT(DISTINCT s.StudentID),
+            COUNT(*),
+            SUM(v.GradeValue),
+            MIN(v.GradeValue),
+            MAX(v.GradeValue)
         FROM Student s
-        LEFT JOIN Grades g ON s.StudentID = CAST(CAST(DecryptByKey(g.StudentIDEncrypted) AS VARCHAR(10)) AS INT)
-        LEFT JOIN Attendance a ON s.StudentID = a.StudentID
-        WHERE (@Department IS NULL OR s.Department = @Department)
-        GROUP BY s.Department
-        HAVING COUNT(DISTINCT s.StudentID) >= 3; -- Inference Control
+        INNER JOIN Grades g ON g.StudentIDBlindIndex =
+            CAST(HASHBYTES('SHA2_256', @OPad + HASHBYTES('SHA2_256', @IPad + CAST(s.StudentID AS BINARY(4)))) AS BINARY(32))
+        CROSS APPLY (SELECT CAST(CAST(DecryptByKey(g.GradeValueEncrypted) AS VARCHAR(10)) AS DECIMAL(5,2)) AS GradeValue) v
+        GROUP BY s.Department, g.CourseID;
         
-        CLOSE SYMMETRIC KEY StudentRecordsKey;
+        INSERT INTO AttendanceAggregateMember (CourseID, StudentID, RecordCount)
+        SELECT CourseID, StudentID, COUNT(*)
+        FROM Attendance
+        GROUP BY CourseID, StudentID;
         
-        -- Audit log
-        INSERT INTO AuditLog (UserID, Action, TableAffected)
-        VALUES (@RequestingUserID, 'View Performance Report', 'Multiple');
+        INSERT INTO AttendanceAggregate (Department, CourseID, StudentCount, PresentCount, AbsentCount)
+        SELECT 
+            s.Department,
+            a.CourseID,
+            COUNT(DISTINCT a.StudentID),
+            SUM(CASE WHEN a.Status = 1 THEN 1 ELSE 0 END),
+            SUM(CASE WHEN a.Status = 0 THEN 1 ELSE 0 END)
+        FROM Attendance a
+        INNER JOIN Student s ON a.StudentID = s.StudentID
+        GROUP BY s.Department, a.CourseID;
+        
+        INSERT INTO AuditSink (UserID, Action, TableAffected)
+        VALUES (@RequestingUserID, 'Rebuild Inference Aggregates', 'GradeAggregate');
+        
+        COMMIT TRANSACTION;
         
+        CLOSE SYMMETRIC KEY StudentRecordsKey;
+        
+        SELECT 'Success' AS Result;
     END TRY
     BEGIN CATCH
+        IF @@TRANCOUNT > 0
+            ROLLBACK TRANSACTION;
+        
         IF (SELECT COUNT(*) FROM sys.openkeys WHERE key_name = 'StudentRecordsKey') > 0
             CLOSE SYMMETRIC KEY StudentRecordsKey;
             
@@ -97,7 +97,7 @@ BEGIN
                 END + ' destination';
             
             -- Audit log
-            INSERT INTO AuditLog (UserID, Action, Success, ErrorMessage, TableAffected, RecordID)
+            INSERT INTO AuditSink (UserID, Action, Success, ErrorMessage, TableAffected, RecordID)
             VALUES (@RequestingUserID, 'Export Data Blocked', 0, @ErrorMsg, @TableName, @RecordID);
             
             RAISERROR('%s', 16, 1, @ErrorMsg);
@@ -105,14 +105,14 @@ BEGIN
         END
         
         -- Export allowed
-        INSERT INTO AuditLog (UserID, Action, TableAffected, RecordID)
+        INSERT INTO AuditSink (UserID, Action, TableAffected, RecordID)
         VALUES (@RequestingUserID, 'Export Data Allowed', @TableName, @RecordID);
         
         SELECT 'Success' AS Result, 'Data export allowed' AS Message;
         
     END TRY
     BEGIN CATCH
-        INSERT INTO AuditLog (UserID, Action, Success, ErrorMessage)
+        INSERT INTO AuditSink (UserID, Action, Success, ErrorMessage)
         VALUES (@RequestingUserID, 'Export Data Failed', 0, ERROR_MESSAGE());
         
         SELECT 'Error' AS Result, ERROR_MESSAGE() AS ErrorMessage;
@@ -161,7 +161,7 @@ BEGIN
                 CAST(@DestinationClassification AS VARCHAR) + ')';
             
             -- Audit log
-            INSERT INTO AuditLog (UserID, Action, Success, ErrorMessage)
+            INSERT INTO AuditSink (UserID, Action, Success, ErrorMessage)
             VALUES (@RequestingUserID, 'Data Transfer Blocked', 0, @FlowErrorMsg);
             
             RAISERROR('%s', 16, 1, @FlowErrorMsg);
@@ -176,7 +176,7 @@ BEGIN
         END
         
         -- Transfer allowed
-        INSERT INTO AuditLog (UserID, Action, TableAffected)
+        INSERT INTO AuditSink (UserID, Action, TableAffected)
         VALUES (@RequestingUserID, 'Data Transfer Allowed', @SourceTable + ' -> ' + @DestinationTable);
         
         SELECT 'Success' AS Result, 'Data transfer allowed' AS Message;
@@ -216,7 +216,7 @@ BEGIN
         IF @DataClassification >= 3 -- Secret or Top Secret
         BEGIN
             -- Audit the attempt
-            INSERT INTO AuditLog (UserID, Action, Success, ErrorMessage, TableAffected, RecordID)
+            INSERT INTO AuditSink (UserID, Action, Success, ErrorMessage, TableAffected, RecordID)
             VALUES (@RequestingUserID, @ExportType + ' Blocked', 0, 
                     'Flow Control: Cannot export Secret/Top Secret data', @TableName, @RecordID);
             
@@ -231,7 +231,7 @@ BEGIN
         -- MLS Check: User must have sufficient clearance
         IF @RequestingUserClearance < @DataClassification
         BEGIN
-            INSERT INTO AuditLog (UserID, Action, Success, ErrorMessage, TableAffected, RecordID)
+            INSERT INTO AuditSink (UserID, Action, Success, ErrorMessage, TableAffected, RecordID)
             VALUES (@RequestingUserID, @ExportType + ' Blocked', 0, 
                     'MLS: Insufficient clearance', @TableName, @RecordID);
             
@@ -267,7 +267,7 @@ AS
 BEGIN
     SET NOCOUNT ON;
     
-    INSERT INTO AuditLog (
+    INSERT INTO AuditSink (
         UserID, 
         Action, 
         TableAffected, 
@@ -309,7 +309,7 @@ BEGIN
         )
         BEGIN
             -- Log the violation
-            INSERT INTO AuditLog (Action, Success, ErrorMessage, TableAffected)
+            INSERT INTO AuditSink (Action, Success, ErrorMessage, TableAffected)
             VALUES ('Classification Downgrade Attempt', 0, 
                     'Flow Control: Cannot lower classification level', 'Student');
             
@@ -338,7 +338,7 @@ BEGIN
             WHERE i.ClassificationLevel < d.ClassificationLevel
         )
         BEGIN
-            INSERT INTO AuditLog (Action, Success, ErrorMessage, TableAffected)
+            INSERT INTO AuditSink (Action, Success, ErrorMessage, TableAffected)
             VALUES ('Classification Downgrade Attempt', 0, 
                     'Flow Control: Cannot lower grade classification', 'Grades');
             
@@ -367,7 +367,7 @@ BEGIN
             WHERE i.ClassificationLevel < d.ClassificationLevel
         )
         BEGIN
-            INSERT INTO AuditLog (Action, Success, ErrorMessage, TableAffected)
+            INSERT INTO AuditSink (Action, Success, ErrorMessage, TableAffected)
             VALUES ('Classification Downgrade Attempt', 0, 
                     'Flow Control: Cannot lower attendance classification', 'Attendance');
             
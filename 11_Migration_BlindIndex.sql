@@ -0,0 +1,135 @@
+-- ============================================
+-- Database Security Term Project
+-- Migration: Blind Index on Grades.StudentIDEncrypted
+-- ============================================
+-- Upgrades a database created before Grades.StudentIDBlindIndex existed.
+-- Safe to re-run: every step checks whether it has already been applied.
+-- After this script, re-run 04_Views_MLS.sql, 05_StoredProcedures_Part1.sql
+-- and 07_InferenceControl.sql to deploy the blind-index versions.
+
+USE SecureStudentRecords;
+GO
+
+-- ============================================
+-- STEP 1: HMAC key and helper functions
+-- ============================================
+
+IF OBJECT_ID('BlindIndexKey', 'U') IS NULL
+BEGIN
+    CREATE TABLE BlindIndexKey (
+        KeyName NVARCHAR(50) PRIMARY KEY,
+        KeyEncrypted VARBINARY(256) NOT NULL, -- 64-byte HMAC key, encrypted
+        CreatedDate DATETIME DEFAULT GETDATE()
+    );
+END
+GO
+
+IF NOT EXISTS (SELECT 1 FROM BlindIndexKey WHERE KeyName = 'GradesStudentID')
+BEGIN
+    OPEN SYMMETRIC KEY StudentRecordsKey
+    DECRYPTION BY CERTIFICATE StudentRecordsCert;
+    
+    INSERT INTO BlindIndexKey (KeyName, KeyEncrypted)
+    VALUES ('GradesStudentID', EncryptByKey(Key_GUID('StudentRecordsKey'), CRYPT_GEN_RANDOM(64)));
+    
+    CLOSE SYMMETRIC KEY StudentRecordsKey;
+END
+GO
+
+-- Same definitions as 02_Tables.sql
+CREATE OR ALTER FUNCTION fn_HmacPads (@Key BINARY(64))
+RETURNS TABLE
+AS
+RETURN
+SELECT
+    CAST(CAST(SUBSTRING(@Key, 1, 8) AS BIGINT) ^ 0x3636363636363636 AS BINARY(8)) +
+    CAST(CAST(SUBSTRING(@Key, 9, 8) AS BIGINT) ^ 0x3636363636363636 AS BINARY(8)) +
+    CAST(CAST(SUBSTRING(@Key, 17, 8) AS BIGINT) ^ 0x3636363636363636 AS BINARY(8)) +
+    CAST(CAST(SUBSTRING(@Key, 25, 8) AS BIGINT) ^ 0x3636363636363636 AS BINARY(8)) +
+    CAST(CAST(SUBSTRING(@Key, 33, 8) AS BIGINT) ^ 0x3636363636363636 AS BINARY(8)) +
+    CAST(CAST(SUBSTRING(@Key, 41, 8) AS BIGINT) ^ 0x3636363636363636 AS BINARY(8)) +
+    CAST(CAST(SUBSTRING(@Key, 49, 8) AS BIGINT) ^ 0x3636363636363636 AS BINARY(8)) +
+    CAST(CAST(SUBSTRING(@Key, 57, 8) AS BIGINT) ^ 0x3636363636363636 AS BINARY(8)) AS IPad,
+    CAST(CAST(SUBSTRING(@Key, 1, 8) AS BIGINT) ^ 0x5C5C5C5C5C5C5C5C AS BINARY(8)) +
+    CAST(CAST(SUBSTRING(@Key, 9, 8) AS BIGINT) ^ 0x5C5C5C5C5C5C5C5C AS BINARY(8)) +
+    CAST(CAST(SUBSTRING(@Key, 17, 8) AS BIGINT) ^ 0x5C5C5C5C5C5C5C5C AS BINARY(8)) +
+    CAST(CAST(SUBSTRING(@Key, 25, 8) AS BIGINT) ^ 0x5C5C5C5C5C5C5C5C AS BINARY(8)) +
+    CAST(CAST(SUBSTRING(@Key, 33, 8) AS BIGINT) ^ 0x5C5C5C5C5C5C5C5C AS BINARY(8)) +
+    CAST(CAST(SUBSTRING(@Key, 41, 8) AS BIGINT) ^ 0x5C5C5C5C5C5C5C5C AS BINARY(8)) +
+    CAST(CAST(SUBSTRING(@Key, 49, 8) AS BIGINT) ^ 0x5C5C5C5C5C5C5C5C AS BINARY(8)) +
+    CAST(CAST(SUBSTRING(@Key, 57, 8) AS BIGINT) ^ 0x5C5C5C5C5C5C5C5C AS BINARY(8)) AS OPad;
+GO
+
+CREATE OR ALTER FUNCTION fn_BlindIndexPads (@KeyName NVARCHAR(50))
+RETURNS TABLE
+AS
+RETURN
+SELECT p.IPad, p.OPad
+FROM BlindIndexKey k
+CROSS APPLY fn_HmacPads(CAST(DecryptByKey(k.KeyEncrypted) AS BINARY(64))) p
+WHERE k.KeyName = @KeyName;
+GO
+
+-- ============================================
+-- STEP 2: Add the column (nullable until backfilled)
+-- ============================================
+
+IF COL_LENGTH('Grades', 'StudentIDBlindIndex') IS NULL
+    ALTER TABLE Grades ADD StudentIDBlindIndex BINARY(32) NULL;
+GO
+
+-- ============================================
+-- STEP 3: Backfill existing rows in batches
+-- Each StudentIDEncrypted is decrypted exactly once, here
+-- ============================================
+
+DECLARE @BatchSize INT = 5000;
+DECLARE @Updated INT = 1;
+DECLARE @Total INT = 0;
+DECLARE @IPad BINARY(64), @OPad BINARY(64);
+
+OPEN SYMMETRIC KEY StudentRecordsKey
+DECRYPTION BY CERTIFICATE StudentRecordsCert;
+
+SELECT @IPad = IPad, @OPad = OPad FROM fn_BlindIndexPads('GradesStudentID');
+
+WHILE @Updated > 0
+BEGIN
+    UPDATE TOP (@BatchSize) Grades
+    SET StudentIDBlindIndex = HASHBYTES('SHA2_256', @OPad + HASHBYTES('SHA2_256', @IPad +
+            CAST(CAST(CAST(DecryptByKey(StudentIDEncrypted) AS VARCHAR(10)) AS INT) AS BINARY(4))))
+    WHERE StudentIDBlindIndex IS NULL;
+    
+    SET @Updated = @@ROWCOUNT;
+    SET @Total = @Total + @Updated;
+END
+
+CLOSE SYMMETRIC KEY StudentRecordsKey;
+
+PRINT 'Blind index backfilled for ' + CAST(@Total AS VARCHAR(20)) + ' grade rows.';
+GO
+
+-- ============================================
+-- STEP 4: Enforce and index
+-- ============================================
+
+IF EXISTS (SELECT 1 FROM Grades WHERE StudentIDBlindIndex IS NULL)
+BEGIN
+    RAISERROR('Backfill incomplete: rows without a blind index remain', 16, 1);
+END
+ELSE
+BEGIN
+    IF EXISTS (SELECT 1 FROM sys.columns
+               WHERE object_id = OBJECT_ID('Grades') AND name = 'StudentIDBlindIndex' AND is_nullable = 1)
+        ALTER TABLE Grades ALTER COLUMN StudentIDBlindIndex BINARY(32) NOT NULL;
+    
+    IF NOT EXISTS (SELECT 1 FROM sys.indexes
+                   WHERE object_id = OBJECT_ID('Grades') AND name = 'IX_Grades_StudentIDBlindIndex')
+        CREATE NONCLUSTERED INDEX IX_Grades_StudentIDBlindIndex
+            ON Grades (StudentIDBlindIndex)
+            INCLUDE (CourseID, GradeValueEncrypted, DateEntered);
+END
+GO
+
+PRINT 'Blind index migration completed. Re-run 04, 05 and 07 to deploy the updated views and procedures.';
+GO
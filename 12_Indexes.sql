@@ -0,0 +1,123 @@
+-- ============================================
+-- Database Security Term Project
+-- Performance: Secondary Indexes (v1)
+-- ============================================
+-- Covering indexes for the access paths used by the stored procedures in
+-- 05-08. Every index is created only if missing, so the script can be
+-- re-run safely on any database built from 01-02.
+
+USE SecureStudentRecords;
+GO
+
+-- ============================================
+-- GRADES
+-- ============================================
+
+-- sp_ViewGrades (@CourseID filter, Instructor course filter),
+-- sp_GetGradeStatsByDepartment (@CourseID), sp_CanExportData
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID('Grades') AND name = 'IX_Grades_CourseID')
+    CREATE NONCLUSTERED INDEX IX_Grades_CourseID
+        ON Grades (CourseID)
+        INCLUDE (StudentIDBlindIndex, StudentIDEncrypted, GradeValueEncrypted, DateEntered, EnteredByInstructorID);
+GO
+
+-- ============================================
+-- ATTENDANCE
+-- ============================================
+
+-- sp_RecordAttendance (already recorded today?), sp_StudentViewOwnAttendance,
+-- sp_ViewAttendance (@StudentID filter)
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID('Attendance') AND name = 'IX_Attendance_StudentID_CourseID')
+    CREATE NONCLUSTERED INDEX IX_Attendance_StudentID_CourseID
+        ON Attendance (StudentID, CourseID, DateRecorded)
+        INCLUDE (Status);
+GO
+
+-- sp_ViewAttendance (TA / Instructor course filters, ORDER BY DateRecorded DESC),
+-- sp_GetAttendanceStats
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID('Attendance') AND name = 'IX_Attendance_CourseID_DateRecorded')
+    CREATE NONCLUSTERED INDEX IX_Attendance_CourseID_DateRecorded
+        ON Attendance (CourseID, DateRecorded DESC)
+        INCLUDE (StudentID, Status);
+GO
+
+-- ============================================
+-- COURSE / INSTRUCTOR / STUDENT
+-- ============================================
+
+-- Instructor ownership checks: sp_EnterGrade, sp_RecordAttendance, sp_ViewGrades, sp_ViewAttendance
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID('Course') AND name = 'IX_Course_InstructorID')
+    CREATE NONCLUSTERED INDEX IX_Course_InstructorID
+        ON Course (InstructorID)
+        INCLUDE (CourseName);
+GO
+
+-- UserID -> InstructorID lookups in every instructor-scoped procedure
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID('Instructor') AND name = 'IX_Instructor_UserID')
+    CREATE NONCLUSTERED INDEX IX_Instructor_UserID
+        ON Instructor (UserID)
+        INCLUDE (FullName)
+        WHERE UserID IS NOT NULL;
+GO
+
+-- UserID -> StudentID lookups: sp_StudentViewOwnGrades, sp_StudentViewOwnAttendance, sp_ViewStudentProfile
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID('Student') AND name = 'IX_Student_UserID')
+    CREATE NONCLUSTERED INDEX IX_Student_UserID
+        ON Student (UserID)
+        WHERE UserID IS NOT NULL;
+GO
+
+-- Department filters: sp_GetGradeStatsByDepartment, sp_GetAttendanceStats,
+-- sp_GetStudentListByFilters, sp_GetAggregatePerformanceReport
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID('Student') AND name = 'IX_Student_Department')
+    CREATE NONCLUSTERED INDEX IX_Student_Department
+        ON Student (Department)
+        INCLUDE (FullName, Email);
+GO
+
+-- Course-side enrollment lookups (UK_Student_Course already covers StudentID first)
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID('CourseEnrollment') AND name = 'IX_CourseEnrollment_CourseID')
+    CREATE NONCLUSTERED INDEX IX_CourseEnrollment_CourseID
+        ON CourseEnrollment (CourseID, StudentID);
+GO
+
+-- ============================================
+-- ROLE REQUESTS
+-- ============================================
+
+-- sp_ViewPendingRoleRequests (Status = 'Pending' ORDER BY RequestDate), sp_ViewAllRoleRequests
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID('RoleRequests') AND name = 'IX_RoleRequests_Status_RequestDate')
+    CREATE NONCLUSTERED INDEX IX_RoleRequests_Status_RequestDate
+        ON RoleRequests (Status, RequestDate)
+        INCLUDE (UserID, Username, CurrentRole, RequestedRole);
+GO
+
+-- sp_SubmitRoleRequest (pending request exists?), sp_ViewOwnRoleRequests
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID('RoleRequests') AND name = 'IX_RoleRequests_UserID_Status')
+    CREATE NONCLUSTERED INDEX IX_RoleRequests_UserID_Status
+        ON RoleRequests (UserID, Status)
+        INCLUDE (RequestDate);
+GO
+
+-- ============================================
+-- AUDIT LOG
+-- Kept to two narrow indexes: every procedure inserts here
+-- ============================================
+
+-- Date-range security reviews (superseded by the partitioned clustered key from 16_AuditPartitioning.sql)
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID('AuditLog') AND name = 'IX_AuditLog_ActionDate')
+    AND NOT EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID('AuditLog') AND name = 'PK_AuditLog')
+    CREATE NONCLUSTERED INDEX IX_AuditLog_ActionDate
+        ON AuditLog (ActionDate)
+        INCLUDE (UserID, Action, Success);
+GO
+
+-- Per-user activity reviews
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID('AuditLog') AND name = 'IX_AuditLog_UserID_ActionDate')
+    CREATE NONCLUSTERED INDEX IX_AuditLog_UserID_ActionDate
+        ON AuditLog (UserID, ActionDate)
+        INCLUDE (Action, Success);
+GO
+
+PRINT 'Secondary indexes created successfully.';
+GO
@@ -0,0 +1,148 @@
+-- ============================================
+-- Database Security Term Project
+-- Performance: Before/After Report Harness
+-- ============================================
+-- Captures per-procedure timings, logical reads and cached plans from
+-- sys.dm_exec_procedure_stats under a label, and compares two labels.
+-- Workflow (see PERFORMANCE_TUNING.md):
+--   1. Load a scaled dataset, DBCC FREEPROCCACHE, run 10_TestingScript.sql
+--   2. EXEC sp_CapturePerfBaseline @RunLabel = 'before'
+--   3. Run 12_Indexes.sql, DBCC FREEPROCCACHE, run 10_TestingScript.sql
+--   4. EXEC sp_CapturePerfBaseline @RunLabel = 'after'
+--   5. EXEC sp_ComparePerfBaseline @BeforeLabel = 'before', @AfterLabel = 'after'
+-- sp_BenchmarkAuthContext measures the per-call cost of the authorization lookups.
+-- Requires VIEW SERVER STATE. Run on a test server, never in production.
+
+USE SecureStudentRecords;
+GO
+
+IF OBJECT_ID('PerfBaseline', 'U') IS NULL
+BEGIN
+    CREATE TABLE PerfBaseline (
+        BaselineID INT IDENTITY(1,1) PRIMARY KEY,
+        RunLabel NVARCHAR(50) NOT NULL,
+        ProcedureName NVARCHAR(128) NOT NULL,
+        ExecutionCount BIGINT NOT NULL,
+        AvgElapsedMs DECIMAL(18,3) NOT NULL,
+        AvgWorkerMs DECIMAL(18,3) NOT NULL,
+        AvgLogicalReads DECIMAL(18,1) NOT NULL,
+        QueryPlan XML NULL,
+        CapturedAt DATETIME DEFAULT GETDATE()
+    );
+END
+GO
+
+-- SP: Snapshot procedure statistics for this database under a label
+CREATE OR ALTER PROCEDURE sp_CapturePerfBaseline
+    @RunLabel NVARCHAR(50)
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    DELETE FROM PerfBaseline WHERE RunLabel = @RunLabel;
+    
+    INSERT INTO PerfBaseline (RunLabel, ProcedureName, ExecutionCount, AvgElapsedMs,
+                              AvgWorkerMs, AvgLogicalReads, QueryPlan)
+    SELECT 
+        @RunLabel,
+        OBJECT_NAME(ps.object_id, ps.database_id),
+        ps.execution_count,
+        ps.total_elapsed_time / 1000.0 / ps.execution_count,
+        ps.total_worker_time / 1000.0 / ps.execution_count,
+        ps.total_logical_reads * 1.0 / ps.execution_count,
+        qp.query_plan
+    FROM sys.dm_exec_procedure_stats ps
+    OUTER APPLY sys.dm_exec_query_plan(ps.plan_handle) qp
+    WHERE ps.database_id = DB_ID()
+    AND OBJECT_NAME(ps.object_id, ps.database_id) LIKE 'sp[_]%';
+    
+    SELECT @RunLabel AS RunLabel, @@ROWCOUNT AS ProceduresCaptured;
+END
+GO
+
+-- SP: Side-by-side comparison of two captured runs
+CREATE OR ALTER PROCEDURE sp_ComparePerfBaseline
+    @BeforeLabel NVARCHAR(50),
+    @AfterLabel NVARCHAR(50)
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    SELECT 
+        COALESCE(b.ProcedureName, a.ProcedureName) AS ProcedureName,
+        b.AvgElapsedMs AS BeforeElapsedMs,
+        a.AvgElapsedMs AS AfterElapsedMs,
+        b.AvgLogicalReads AS BeforeLogicalReads,
+        a.AvgLogicalReads AS AfterLogicalReads,
+        CAST(100.0 * (b.AvgElapsedMs - a.AvgElapsedMs) / NULLIF(b.AvgElapsedMs, 0) AS DECIMAL(6,1)) AS ElapsedSavedPct,
+        CAST(100.0 * (b.AvgLogicalReads - a.AvgLogicalReads) / NULLIF(b.AvgLogicalReads, 0) AS DECIMAL(6,1)) AS ReadsSavedPct,
+        b.QueryPlan AS BeforePlan,
+        a.QueryPlan AS AfterPlan
+    FROM (SELECT * FROM PerfBaseline WHERE RunLabel = @BeforeLabel) b
+    FULL OUTER JOIN (SELECT * FROM PerfBaseline WHERE RunLabel = @AfterLabel) a
+        ON a.ProcedureName = b.ProcedureName
+    ORDER BY b.AvgElapsedMs DESC;
+END
+GO
+
+-- ============================================
+-- MICRO-BENCHMARKS
+-- ============================================
+
+-- SP: Per-call cost of the authorization lookups, table lookups vs cached session context
+-- Runs inside one request, so round trips are excluded: only the saved work is measured
+CREATE OR ALTER PROCEDURE sp_BenchmarkAuthContext
+    @UserID INT,
+    @CourseID INT = 1,
+    @Iterations INT = 100000
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    DECLARE @i INT, @Started DATETIME2, @Reads BIGINT, @Denied INT;
+    DECLARE @Role NVARCHAR(20), @InstructorID INT, @TACourses NVARCHAR(4000);
+    DECLARE @Results TABLE (Method NVARCHAR(30), Iterations INT, TotalMs INT, MicrosecondsPerCall DECIMAL(10,2), LogicalReadsPerCall DECIMAL(10,2));
+    
+    -- 1. Table lookups, as every procedure did before the session context
+    SELECT @i = 0, @Denied = 0, @Started = SYSDATETIME(),
+           @Reads = (SELECT logical_reads FROM sys.dm_exec_requests WHERE session_id = @@SPID);
+    WHILE @i < @Iterations
+    BEGIN
+        SELECT @Role = Role FROM Users WHERE UserID = @UserID;
+        SELECT @InstructorID = InstructorID FROM Instructor WHERE UserID = @UserID;
+        IF NOT EXISTS (SELECT 1 FROM TAAssignment WHERE UserID = @UserID AND CourseID = @CourseID)
+            SET @Denied += 1;
+        SET @i += 1;
+    END
+    INSERT INTO @Results
+    SELECT 'Table lookups', @Iterations, DATEDIFF(MILLISECOND, @Started, SYSDATETIME()),
+           DATEDIFF(MICROSECOND, @Started, SYSDATETIME()) * 1.0 / @Iterations,
+           ((SELECT logical_reads FROM sys.dm_exec_requests WHERE session_id = @@SPID) - @Reads) * 1.0 / @Iterations;
+    
+    -- 2. Cached session context (resolved once, then verified per call)
+    EXEC sp_ResolveAuthContext @UserID, @Role OUTPUT, @InstructorID OUTPUT, @TACourses OUTPUT;
+    
+    SELECT @i = 0, @Denied = 0, @Started = SYSDATETIME(),
+           @Reads = (SELECT logical_reads FROM sys.dm_exec_requests WHERE session_id = @@SPID);
+    WHILE @i < @Iterations
+    BEGIN
+        SET @Role = NULL;
+        SELECT @Role = Role, @InstructorID = InstructorID, @TACourses = TACourses
+        FROM fn_SessionAuthContext(@UserID);
+        IF @Role IS NULL
+            EXEC sp_ResolveAuthContext @UserID, @Role OUTPUT, @InstructorID OUTPUT, @TACourses OUTPUT;
+        IF CHARINDEX(CONCAT(N',', @CourseID, N','), ISNULL(@TACourses, N'')) = 0
+            SET @Denied += 1;
+        SET @i += 1;
+    END
+    INSERT INTO @Results
+    SELECT 'Session context', @Iterations, DATEDIFF(MILLISECOND, @Started, SYSDATETIME()),
+           DATEDIFF(MICROSECOND, @Started, SYSDATETIME()) * 1.0 / @Iterations,
+           ((SELECT logical_reads FROM sys.dm_exec_requests WHERE session_id = @@SPID) - @Reads) * 1.0 / @Iterations;
+    
+    SELECT * FROM @Results;
+END
+GO
+
+PRINT 'Performance report harness created successfully.';
+GO
@@ -0,0 +1,491 @@
+-- ============================================
+-- Database Security Term Project
+-- Performance: Bulk (Set-Based) Operations
+-- ============================================
+-- Table-valued-parameter versions of per-row procedures. Authorization,
+-- MLS checks and key handling run once per call instead of once per row.
+
+USE SecureStudentRecords;
+GO
+
+-- ============================================
+-- TABLE TYPES
+-- ============================================
+
+IF TYPE_ID('GradeEntryList') IS NULL
+    CREATE TYPE GradeEntryList AS TABLE (
+        StudentID INT NOT NULL PRIMARY KEY, -- One grade per student per upload
+        GradeValue DECIMAL(5,2) NOT NULL
+    );
+GO
+
+IF TYPE_ID('AttendanceEntryList') IS NULL
+    CREATE TYPE AttendanceEntryList AS TABLE (
+        StudentID INT NOT NULL PRIMARY KEY, -- One mark per student per roll call
+        Status BIT NOT NULL -- 1 = Present, 0 = Absent
+    );
+GO
+
+-- ============================================
+-- BULK GRADE ENTRY
+-- ============================================
+
+-- SP: Enter Grades for one course in a single call (Instructor/Admin only)
+CREATE OR ALTER PROCEDURE sp_EnterGradesBulk
+    @CourseID INT,
+    @Grades GradeEntryList READONLY,
+    @RequestingUserID INT,
+    @RequestingUserClearance INT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    BEGIN TRY
+        -- RBAC Check (once for the whole batch)
+        DECLARE @RequesterRole NVARCHAR(20), @RequesterInstructorID INT, @RequesterTACourses NVARCHAR(4000);
+        SELECT @RequesterRole = Role, @RequesterInstructorID = InstructorID, @RequesterTACourses = TACourses
+        FROM fn_SessionAuthContext(@RequestingUserID);
+        
+        IF @RequesterRole IS NULL
+            EXEC sp_ResolveAuthContext @RequestingUserID, @RequesterRole OUTPUT,
+                                       @RequesterInstructorID OUTPUT, @RequesterTACourses OUTPUT;
+        
+        IF @RequesterRole NOT IN ('Admin', 'Instructor')
+        BEGIN
+            RAISERROR('Access Denied: Only Instructors and Admins can enter grades', 16, 1);
+            RETURN;
+        END
+        
+        -- MLS Check: No Write Down (Level 3 - Secret)
+        IF @RequestingUserClearance < 3
+        BEGIN
+            RAISERROR('MLS Violation: Cannot write to Secret level', 16, 1);
+            RETURN;
+        END
+        
+        -- Get Instructor ID
+        DECLARE @InstructorID INT = @RequesterInstructorID;
+        
+        IF @InstructorID IS NULL AND @RequesterRole != 'Admin'
+        BEGIN
+            RAISERROR('Instructor record not found', 16, 1);
+            RETURN;
+        END
+        
+        -- For Instructors: verify they teach this course
+        IF @RequesterRole = 'Instructor'
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM Course WHERE CourseID = @CourseID AND InstructorID = @InstructorID)
+            BEGIN
+                RAISERROR('Access Denied: You do not teach this course', 16, 1);
+                RETURN;
+            END
+        END
+        ELSE IF NOT EXISTS (SELECT 1 FROM Course WHERE CourseID = @CourseID)
+        BEGIN
+            RAISERROR('Course not found', 16, 1);
+            RETURN;
+        END
+        
+        DECLARE @RowCount INT = (SELECT COUNT(*) FROM @Grades);
+        IF @RowCount = 0
+        BEGIN
+            RAISERROR('No grades supplied', 16, 1);
+            RETURN;
+        END
+        
+        -- Validate every row up front: the batch is all-or-nothing
+        DECLARE @Invalid NVARCHAR(MAX);
+        SELECT @Invalid = STRING_AGG(CAST(x.StudentID AS NVARCHAR(10)), ', ')
+        FROM (
+            SELECT TOP (20) g.StudentID
+            FROM @Grades g
+            LEFT JOIN Student s ON s.StudentID = g.StudentID
+            WHERE s.StudentID IS NULL OR g.GradeValue < 0 OR g.GradeValue > 100
+            ORDER BY g.StudentID
+        ) x;
+        
+        IF @Invalid IS NOT NULL
+        BEGIN
+            DECLARE @InvalidMsg NVARCHAR(400) = 'Unknown student or grade outside 0-100 for StudentID: ' + @Invalid;
+            RAISERROR('%s', 16, 1, @InvalidMsg);
+            RETURN;
+        END
+        
+        -- Open symmetric key once for the whole batch
+        OPEN SYMMETRIC KEY StudentRecordsKey
+        DECRYPTION BY CERTIFICATE StudentRecordsCert;
+        
+        DECLARE @IPad BINARY(64), @OPad BINARY(64);
+        SELECT @IPad = IPad, @OPad = OPad FROM fn_BlindIndexPads('GradesStudentID');
+        
+        IF @IPad IS NULL
+        BEGIN
+            CLOSE SYMMETRIC KEY StudentRecordsKey;
+            RAISERROR('Blind index key not found', 16, 1);
+            RETURN;
+        END
+        
+        DECLARE @Entered TABLE (GradeID INT NOT NULL);
+        
+        BEGIN TRANSACTION;
+        
+        -- Set-based encrypt + insert; the new GradeIDs feed the per-row audit detail
+        INSERT INTO Grades (StudentIDEncrypted, StudentIDBlindIndex, CourseID, GradeValueEncrypted, EnteredByInstructorID)
+        OUTPUT inserted.GradeID INTO @Entered (GradeID)
+        SELECT 
+            EncryptByKey(Key_GUID('StudentRecordsKey'), CAST(g.StudentID AS VARCHAR(10))),
+            HASHBYTES('SHA2_256', @OPad + HASHBYTES('SHA2_256', @IPad + CAST(g.StudentID AS BINARY(4)))),
+            @CourseID,
+            EncryptByKey(Key_GUID('StudentRecordsKey'), CAST(g.GradeValue AS VARCHAR(10))),
+            ISNULL(@InstructorID, 1)
+        FROM @Grades g;
+        
+        DECLARE @Inserted INT = @@ROWCOUNT;
+        
+        -- Inference-control aggregates: one MERGE for the members, one per department
+        DECLARE @Members TABLE (StudentID INT NOT NULL, IsNew BIT NOT NULL);
+        
+        MERGE GradeAggregateMember WITH (HOLDLOCK) AS m
+        USING (
+            SELECT g.StudentID,
+                   CAST(HASHBYTES('SHA2_256', @OPad + HASHBYTES('SHA2_256', @IPad + CAST(g.StudentID AS BINARY(4)))) AS BINARY(32)) AS BlindIndex
+            FROM @Grades g
+        ) AS src
+        ON m.CourseID = @CourseID AND m.StudentIDBlindIndex = src.BlindIndex
+        WHEN MATCHED THEN
+            UPDATE SET GradeCount = m.GradeCount + 1
+        WHEN NOT MATCHED THEN
+            INSERT (CourseID, StudentIDBlindIndex, GradeCount) VALUES (@CourseID, src.BlindIndex, 1)
+        OUTPUT src.StudentID, CASE WHEN $action = 'INSERT' THEN 1 ELSE 0 END INTO @Members (StudentID, IsNew);
+        
+        MERGE GradeAggregate WITH (HOLDLOCK) AS a
+        USING (
+            SELECT s.Department,
+                   SUM(CAST(m.IsNew AS INT)) AS NewStudents,
+                   COUNT(*) AS GradeCount,
+                   SUM(g.GradeValue) AS GradeSum,
+                   MIN(g.GradeValue) AS MinGrade,
+                   MAX(g.GradeValue) AS MaxGrade
+            FROM @Grades g
+            INNER JOIN Student s ON s.StudentID = g.StudentID
+            INNER JOIN @Members m ON m.StudentID = g.StudentID
+            GROUP BY s.Department
+        ) AS d
+        ON a.Department = d.Department AND a.CourseID = @CourseID
+        WHEN MATCHED THEN
+            UPDATE SET StudentCount = a.StudentCount + d.NewStudents,
+                       GradeCount = a.GradeCount + d.GradeCount,
+                       GradeSum = a.GradeSum + d.GradeSum,
+                       MinGrade = CASE WHEN d.MinGrade < a.MinGrade THEN d.MinGrade ELSE a.MinGrade END,
+                       MaxGrade = CASE WHEN d.MaxGrade > a.MaxGrade THEN d.MaxGrade ELSE a.MaxGrade END
+        WHEN NOT MATCHED THEN
+            INSERT (Department, CourseID, StudentCount, GradeCount, GradeSum, MinGrade, MaxGrade)
+            VALUES (d.Department, @CourseID, d.NewStudents, d.GradeCount, d.GradeSum, d.MinGrade, d.MaxGrade);
+        
+        INSERT INTO AuditSink (UserID, Action, TableAffected, RecordID)
+        SELECT @RequestingUserID, 'Enter Grade (Bulk)', 'Grades', GradeID FROM @Entered;
+        
+        -- Summary audit row
+        INSERT INTO AuditSink (UserID, Action, TableAffected, RecordID, NewValue)
+        VALUES (@RequestingUserID, 'Enter Grades Bulk', 'Course', @CourseID,
+                CAST(@Inserted AS NVARCHAR(10)) + ' grades entered');
+        
+        COMMIT TRANSACTION;
+        
+        CLOSE SYMMETRIC KEY StudentRecordsKey;
+        
+        SELECT 'Success' AS Result, @Inserted AS GradesEntered;
+    END TRY
+    BEGIN CATCH
+        IF @@TRANCOUNT > 0
+            ROLLBACK TRANSACTION;
+        
+        IF (SELECT COUNT(*) FROM sys.openkeys WHERE key_name = 'StudentRecordsKey') > 0
+            CLOSE SYMMETRIC KEY StudentRecordsKey;
+            
+        INSERT INTO AuditSink (UserID, Action, TableAffected, RecordID, Success, ErrorMessage)
+        VALUES (@RequestingUserID, 'Enter Grades Bulk Failed', 'Course', @CourseID, 0, ERROR_MESSAGE());
+        
+        SELECT 'Error' AS Result, ERROR_MESSAGE() AS ErrorMessage;
+    END CATCH
+END
+GO
+
+-- ============================================
+-- BULK ATTENDANCE (ROLL CALL)
+-- ============================================
+
+-- SP: Course Roster with the marks already recorded for one day (Instructor/TA/Admin)
+CREATE OR ALTER PROCEDURE sp_GetCourseRoster
+    @CourseID INT,
+    @AttendanceDate DATE = NULL,
+    @RequestingUserID INT,
+    @RequestingUserClearance INT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    BEGIN TRY
+        -- MLS Check: No Read Up (Level 3 - Secret)
+        IF @RequestingUserClearance < 3
+        BEGIN
+            RAISERROR('MLS Violation: Cannot read Secret level data', 16, 1);
+            RETURN;
+        END
+        
+        -- RBAC Check
+        DECLARE @RequesterRole NVARCHAR(20), @RequesterInstructorID INT, @RequesterTACourses NVARCHAR(4000);
+        SELECT @RequesterRole = Role, @RequesterInstructorID = InstructorID, @RequesterTACourses = TACourses
+        FROM fn_SessionAuthContext(@RequestingUserID);
+        
+        IF @RequesterRole IS NULL
+            EXEC sp_ResolveAuthContext @RequestingUserID, @RequesterRole OUTPUT,
+                                       @RequesterInstructorID OUTPUT, @RequesterTACourses OUTPUT;
+        
+        IF @RequesterRole NOT IN ('Admin', 'Instructor', 'TA')
+        BEGIN
+            RAISERROR('Access Denied: Insufficient privileges', 16, 1);
+            RETURN;
+        END
+        
+        -- For TAs: verify they are assigned to this course
+        IF @RequesterRole = 'TA'
+            AND CHARINDEX(CONCAT(N',', @CourseID, N','), ISNULL(@RequesterTACourses, N'')) = 0
+        BEGIN
+            RAISERROR('Access Denied: You are not assigned to this course', 16, 1);
+            RETURN;
+        END
+        
+        -- For Instructors: verify they teach this course
+        IF @RequesterRole = 'Instructor'
+            AND NOT EXISTS (SELECT 1 FROM Course WHERE CourseID = @CourseID AND InstructorID = @RequesterInstructorID)
+        BEGIN
+            RAISERROR('Access Denied: You do not teach this course', 16, 1);
+            RETURN;
+        END
+        
+        DECLARE @DayStart DATETIME = CAST(ISNULL(@AttendanceDate, CAST(GETDATE() AS DATE)) AS DATETIME);
+        
+        -- Status is NULL for students not yet marked that day
+        SELECT 
+            ce.StudentID,
+            s.FullName AS StudentName,
+            a.Status
+        FROM CourseEnrollment ce
+        INNER JOIN Student s ON ce.StudentID = s.StudentID
+        OUTER APPLY (
+            SELECT TOP (1) att.Status
+            FROM Attendance att
+            WHERE att.StudentID = ce.StudentID
+            AND att.CourseID = @CourseID
+            AND att.DateRecorded >= @DayStart
+            AND att.DateRecorded < DATEADD(DAY, 1, @DayStart)
+            ORDER BY att.DateRecorded DESC
+        ) a
+        WHERE ce.CourseID = @CourseID
+        ORDER BY s.FullName;
+        
+        -- Audit log
+        INSERT INTO AuditSink (UserID, Action, TableAffected, RecordID)
+        VALUES (@RequestingUserID, 'View Course Roster', 'CourseEnrollment', @CourseID);
+        
+    END TRY
+    BEGIN CATCH
+        SELECT 'Error' AS Result, ERROR_MESSAGE() AS ErrorMessage;
+    END CATCH
+END
+GO
+
+-- SP: Record Attendance for a whole class in a single call (Instructor/TA/Admin)
+CREATE OR ALTER PROCEDURE sp_RecordAttendanceBatch
+    @CourseID INT,
+    @AttendanceDate DATE = NULL,
+    @Attendance AttendanceEntryList READONLY,
+    @RequestingUserID INT,
+    @RequestingUserClearance INT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    BEGIN TRY
+        -- MLS Check: No Write Down (Level 3 - Secret)
+        IF @RequestingUserClearance < 3
+        BEGIN
+            RAISERROR('MLS Violation: Cannot write to Secret level', 16, 1);
+            RETURN;
+        END
+        
+        -- RBAC Check (once for the whole class)
+        DECLARE @RequesterRole NVARCHAR(20), @RequesterInstructorID INT, @RequesterTACourses NVARCHAR(4000);
+        SELECT @RequesterRole = Role, @RequesterInstructorID = InstructorID, @RequesterTACourses = TACourses
+        FROM fn_SessionAuthContext(@RequestingUserID);
+        
+        IF @RequesterRole IS NULL
+            EXEC sp_ResolveAuthContext @RequestingUserID, @RequesterRole OUTPUT,
+                                       @RequesterInstructorID OUTPUT, @RequesterTACourses OUTPUT;
+        
+        IF @RequesterRole NOT IN ('Admin', 'Instructor', 'TA')
+        BEGIN
+            RAISERROR('Access Denied: Insufficient privileges', 16, 1);
+            RETURN;
+        END
+        
+        -- For TAs: verify they are assigned to this course
+        IF @RequesterRole = 'TA'
+            AND CHARINDEX(CONCAT(N',', @CourseID, N','), ISNULL(@RequesterTACourses, N'')) = 0
+        BEGIN
+            RAISERROR('Access Denied: You are not assigned to this course', 16, 1);
+            RETURN;
+        END
+        
+        -- For Instructors: verify they teach this course
+        IF @RequesterRole = 'Instructor'
+            AND NOT EXISTS (SELECT 1 FROM Course WHERE CourseID = @CourseID AND InstructorID = @RequesterInstructorID)
+        BEGIN
+            RAISERROR('Access Denied: You do not teach this course', 16, 1);
+            RETURN;
+        END
+        
+        IF @RequesterRole = 'Admin' AND NOT EXISTS (SELECT 1 FROM Course WHERE CourseID = @CourseID)
+        BEGIN
+            RAISERROR('Course not found', 16, 1);
+            RETURN;
+        END
+        
+        DECLARE @Today DATE = CAST(GETDATE() AS DATE);
+        SET @AttendanceDate = ISNULL(@AttendanceDate, @Today);
+        
+        IF @AttendanceDate > @Today
+        BEGIN
+            RAISERROR('Cannot record attendance for a future date', 16, 1);
+            RETURN;
+        END
+        
+        IF NOT EXISTS (SELECT 1 FROM @Attendance)
+        BEGIN
+            RAISERROR('No attendance marks supplied', 16, 1);
+            RETURN;
+        END
+        
+        -- Enrollment check for every row in one join: the roll call is all-or-nothing
+        DECLARE @NotEnrolled NVARCHAR(MAX);
+        SELECT @NotEnrolled = STRING_AGG(CAST(x.StudentID AS NVARCHAR(10)), ', ')
+        FROM (
+            SELECT TOP (20) a.StudentID
+            FROM @Attendance a
+            LEFT JOIN CourseEnrollment ce ON ce.StudentID = a.StudentID AND ce.CourseID = @CourseID
+            WHERE ce.EnrollmentID IS NULL
+            ORDER BY a.StudentID
+        ) x;
+        
+        IF @NotEnrolled IS NOT NULL
+        BEGIN
+            DECLARE @NotEnrolledMsg NVARCHAR(400) = 'Not enrolled in this course: StudentID ' + @NotEnrolled;
+            RAISERROR('%s', 16, 1, @NotEnrolledMsg);
+            RETURN;
+        END
+        
+        -- Sargable day range so IX_Attendance_CourseID_DateRecorded can seek
+        DECLARE @DayStart DATETIME = CAST(@AttendanceDate AS DATETIME);
+        DECLARE @DayEnd DATETIME = DATEADD(DAY, 1, @DayStart);
+        DECLARE @RecordedAt DATETIME = CASE WHEN @AttendanceDate = @Today THEN GETDATE() ELSE @DayStart END;
+        DECLARE @Updated INT, @Inserted INT;
+        DECLARE @Marked TABLE (AttendanceID INT NOT NULL, StudentID INT NOT NULL, IsUpdate BIT NOT NULL,
+                               OldStatus BIT NULL, NewStatus BIT NOT NULL);
+        
+        BEGIN TRANSACTION;
+        
+        -- Students already marked that day: update in place (same rule as sp_RecordAttendance)
+        UPDATE att
+        SET Status = a.Status, RecordedByUserID = @RequestingUserID
+        OUTPUT inserted.AttendanceID, inserted.StudentID, 1, deleted.Status, inserted.Status
+        INTO @Marked (AttendanceID, StudentID, IsUpdate, OldStatus, NewStatus)
+        FROM Attendance att
+        INNER JOIN @Attendance a ON a.StudentID = att.StudentID
+        WHERE att.CourseID = @CourseID
+        AND att.DateRecorded >= @DayStart
+        AND att.DateRecorded < @DayEnd;
+        
+        SET @Updated = @@ROWCOUNT;
+        
+        -- Everyone else: insert
+        INSERT INTO Attendance (StudentID, CourseID, Status, DateRecorded, RecordedByUserID)
+        OUTPUT inserted.AttendanceID, inserted.StudentID, 0, NULL, inserted.Status
+        INTO @Marked (AttendanceID, StudentID, IsUpdate, OldStatus, NewStatus)
+        SELECT a.StudentID, @CourseID, a.Status, @RecordedAt, @RequestingUserID
+        FROM @Attendance a
+        WHERE NOT EXISTS (
+            SELECT 1 FROM Attendance att
+            WHERE att.StudentID = a.StudentID
+            AND att.CourseID = @CourseID
+            AND att.DateRecorded >= @DayStart
+            AND att.DateRecorded < @DayEnd
+        );
+        
+        SET @Inserted = @@ROWCOUNT;
+        
+        -- Inference-control aggregates: new records count students and marks,
+        -- updated records only move marks between present and absent
+        DECLARE @Members TABLE (StudentID INT NOT NULL, IsNew BIT NOT NULL);
+        
+        MERGE AttendanceAggregateMember WITH (HOLDLOCK) AS m
+        USING (SELECT StudentID FROM @Marked WHERE IsUpdate = 0) AS src
+        ON m.CourseID = @CourseID AND m.StudentID = src.StudentID
+        WHEN MATCHED THEN
+            UPDATE SET RecordCount = m.RecordCount + 1
+        WHEN NOT MATCHED THEN
+            INSERT (CourseID, StudentID, RecordCount) VALUES (@CourseID, src.StudentID, 1)
+        OUTPUT src.StudentID, CASE WHEN $action = 'INSERT' THEN 1 ELSE 0 END INTO @Members (StudentID, IsNew);
+        
+        MERGE AttendanceAggregate WITH (HOLDLOCK) AS a
+        USING (
+            SELECT s.Department,
+                   SUM(CAST(ISNULL(mb.IsNew, 0) AS INT)) AS NewStudents,
+                   SUM(CAST(mk.NewStatus AS INT) - CAST(ISNULL(mk.OldStatus, 0) AS INT)) AS PresentDelta,
+                   SUM(CASE WHEN mk.IsUpdate = 0 THEN 1 - CAST(mk.NewStatus AS INT)
+                            ELSE CAST(mk.OldStatus AS INT) - CAST(mk.NewStatus AS INT) END) AS AbsentDelta
+            FROM @Marked mk
+            INNER JOIN Student s ON s.StudentID = mk.StudentID
+            LEFT JOIN @Members mb ON mb.StudentID = mk.StudentID
+            GROUP BY s.Department
+        ) AS d
+        ON a.Department = d.Department AND a.CourseID = @CourseID
+        WHEN MATCHED THEN
+            UPDATE SET StudentCount = a.StudentCount + d.NewStudents,
+                       PresentCount = a.PresentCount + d.PresentDelta,
+                       AbsentCount = a.AbsentCount + d.AbsentDelta
+        WHEN NOT MATCHED THEN
+            INSERT (Department, CourseID, StudentCount, PresentCount, AbsentCount)
+            VALUES (d.Department, @CourseID, d.NewStudents, d.PresentDelta, d.AbsentDelta);
+        
+        INSERT INTO AuditSink (UserID, Action, TableAffected, RecordID)
+        SELECT @RequestingUserID,
+               CASE WHEN IsUpdate = 1 THEN 'Update Attendance (Batch)' ELSE 'Record Attendance (Batch)' END,
+               'Attendance', AttendanceID
+        FROM @Marked;
+        
+        -- Summary audit row
+        INSERT INTO AuditSink (UserID, Action, TableAffected, RecordID, NewValue)
+        VALUES (@RequestingUserID, 'Record Attendance Batch', 'Course', @CourseID,
+                CONVERT(NVARCHAR(10), @AttendanceDate, 23) + ': ' + CAST(@Inserted AS NVARCHAR(10))
+                + ' recorded, ' + CAST(@Updated AS NVARCHAR(10)) + ' updated');
+        
+        COMMIT TRANSACTION;
+        
+        SELECT 'Success' AS Result, @Inserted AS Recorded, @Updated AS Updated;
+    END TRY
+    BEGIN CATCH
+        IF @@TRANCOUNT > 0
+            ROLLBACK TRANSACTION;
+        
+        INSERT INTO AuditSink (UserID, Action, TableAffected, RecordID, Success, ErrorMessage)
+        VALUES (@RequestingUserID, 'Record Attendance Batch Failed', 'Course', @CourseID, 0, ERROR_MESSAGE());
+        
+        SELECT 'Error' AS Result, ERROR_MESSAGE() AS ErrorMessage;
+    END CATCH
+END
+GO
+
+PRINT 'Bulk operation procedures created successfully.';
+GO
@@ -0,0 +1,218 @@
+-- ============================================
+-- Database Security Term Project
+-- Performance: Asynchronous Audit Pipeline
+-- ============================================
+-- Procedures write audit events through the AuditSink synonym. In 'Sync' mode
+-- it points at AuditLog, so every request inserts into the single IDENTITY-keyed
+-- table and its indexes. In 'Async' mode it points at AuditQueue, a durable,
+-- unindexed staging table whose inserts spread across 16 lanes. A drain job then
+-- moves queued events into AuditLog in large batches.
+-- Events are committed with the request's transaction in both modes, so nothing
+-- is lost on a crash; queued events only wait for the next drain.
+-- Usage:
+--   EXEC sp_SetAuditMode @Mode = 'Async';   -- or 'Sync'
+--   EXEC sp_DrainAuditQueue;                -- normally run by the Agent job below
+--   EXEC sp_GetAuditPipelineStatus;
+
+USE SecureStudentRecords;
+GO
+
+-- ============================================
+-- STAGING QUEUE
+-- ============================================
+
+-- Same column names as AuditLog so the AuditSink synonym can point at either.
+-- Clustering on (Lane, QueueID) gives 16 insertion points instead of one hot last page.
+IF OBJECT_ID('AuditQueue', 'U') IS NULL
+BEGIN
+    CREATE TABLE AuditQueue (
+        QueueID BIGINT IDENTITY(1,1) NOT NULL,
+        Lane TINYINT NOT NULL DEFAULT (@@SPID % 16),
+        UserID INT NULL,
+        Username NVARCHAR(50) NULL,
+        Action NVARCHAR(100) NOT NULL,
+        TableAffected NVARCHAR(50) NULL,
+        RecordID INT NULL,
+        OldValue NVARCHAR(MAX) NULL,
+        NewValue NVARCHAR(MAX) NULL,
+        ActionDate DATETIME DEFAULT GETDATE(), -- Event time, kept when drained
+        IPAddress NVARCHAR(50) NULL,
+        Success BIT DEFAULT 1,
+        ErrorMessage NVARCHAR(MAX) NULL,
+        CONSTRAINT PK_AuditQueue PRIMARY KEY CLUSTERED (Lane, QueueID)
+    );
+END
+GO
+
+-- Databases built before the synonym existed (re-run scripts 05-08 and 14 afterwards)
+IF OBJECT_ID('AuditSink', 'SN') IS NULL
+    CREATE SYNONYM AuditSink FOR AuditLog;
+GO
+
+-- View: complete audit trail, including events not yet drained
+CREATE OR ALTER VIEW vw_AuditTrail
+AS
+SELECT LogID, UserID, Username, Action, TableAffected, RecordID, OldValue, NewValue,
+       ActionDate, IPAddress, Success, ErrorMessage, CAST(0 AS BIT) AS Pending
+FROM AuditLog
+UNION ALL
+SELECT NULL, UserID, Username, Action, TableAffected, RecordID, OldValue, NewValue,
+       ActionDate, IPAddress, Success, ErrorMessage, CAST(1 AS BIT)
+FROM AuditQueue;
+GO
+
+-- ============================================
+-- DRAIN
+-- ============================================
+
+-- SP: Move queued audit events into AuditLog in batches
+CREATE OR ALTER PROCEDURE sp_DrainAuditQueue
+    @BatchSize INT = 5000,
+    @MaxBatches INT = 200
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    DECLARE @Moved INT = 0, @Batches INT = 0, @BatchRows INT = 1;
+    
+    -- One drainer at a time; an overlapping run returns immediately
+    DECLARE @LockResult INT;
+    EXEC @LockResult = sp_getapplock @Resource = 'AuditQueueDrain', @LockMode = 'Exclusive',
+                                     @LockOwner = 'Session', @LockTimeout = 0;
+    IF @LockResult < 0
+    BEGIN
+        SELECT 'Skipped' AS Result, 0 AS EventsMoved, 0 AS Batches;
+        RETURN;
+    END
+    
+    BEGIN TRY
+        WHILE @BatchRows > 0 AND @Batches < @MaxBatches
+        BEGIN
+            -- Delete and insert commit together: an event is never lost or duplicated.
+            -- READPAST skips rows still locked by in-flight request transactions.
+            BEGIN TRANSACTION;
+            
+            DELETE TOP (@BatchSize) FROM AuditQueue WITH (READPAST)
+            OUTPUT deleted.UserID, deleted.Username, deleted.Action, deleted.TableAffected,
+                   deleted.RecordID, deleted.OldValue, deleted.NewValue, deleted.ActionDate,
+                   deleted.IPAddress, deleted.Success, deleted.ErrorMessage
+            INTO AuditLog (UserID, Username, Action, TableAffected, RecordID, OldValue, NewValue,
+                           ActionDate, IPAddress, Success, ErrorMessage);
+            
+            SET @BatchRows = @@ROWCOUNT;
+            
+            COMMIT TRANSACTION;
+            
+            SET @Moved += @BatchRows;
+            IF @BatchRows > 0
+                SET @Batches += 1;
+        END
+        
+        EXEC sp_releaseapplock @Resource = 'AuditQueueDrain', @LockOwner = 'Session';
+        
+        SELECT 'Success' AS Result, @Moved AS EventsMoved, @Batches AS Batches;
+    END TRY
+    BEGIN CATCH
+        IF @@TRANCOUNT > 0
+            ROLLBACK TRANSACTION;
+        
+        EXEC sp_releaseapplock @Resource = 'AuditQueueDrain', @LockOwner = 'Session';
+        
+        SELECT 'Error' AS Result, ERROR_MESSAGE() AS ErrorMessage;
+    END CATCH
+END
+GO
+
+-- ============================================
+-- MODE SWITCH AND STATUS
+-- ============================================
+
+-- SP: Point AuditSink at AuditLog ('Sync') or AuditQueue ('Async')
+CREATE OR ALTER PROCEDURE sp_SetAuditMode
+    @Mode NVARCHAR(10)
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    BEGIN TRY
+        IF @Mode NOT IN ('Sync', 'Async')
+        BEGIN
+            RAISERROR('Audit mode must be Sync or Async', 16, 1);
+            RETURN;
+        END
+        
+        -- Swap inside a transaction so concurrent requests block briefly instead of failing
+        BEGIN TRANSACTION;
+        
+        DROP SYNONYM IF EXISTS AuditSink;
+        
+        IF @Mode = 'Async'
+            EXEC('CREATE SYNONYM AuditSink FOR AuditQueue');
+        ELSE
+            EXEC('CREATE SYNONYM AuditSink FOR AuditLog');
+        
+        COMMIT TRANSACTION;
+        
+        -- Cached plans are bound to the old target table
+        EXEC sp_recompile N'AuditLog';
+        EXEC sp_recompile N'AuditQueue';
+        
+        -- Leaving async mode: nothing may stay stranded in the queue
+        IF @Mode = 'Sync'
+        BEGIN
+            DECLARE @Drain TABLE (Result NVARCHAR(20), EventsMoved INT, Batches INT);
+            INSERT INTO @Drain EXEC sp_DrainAuditQueue @MaxBatches = 2147483647;
+        END
+        
+        INSERT INTO AuditLog (Action, TableAffected, NewValue)
+        VALUES ('Set Audit Mode', 'AuditLog', @Mode);
+        
+        SELECT 'Success' AS Result, @Mode AS AuditMode;
+    END TRY
+    BEGIN CATCH
+        IF @@TRANCOUNT > 0
+            ROLLBACK TRANSACTION;
+        
+        SELECT 'Error' AS Result, ERROR_MESSAGE() AS ErrorMessage;
+    END CATCH
+END
+GO
+
+-- SP: Current mode, queue depth and drain lag
+CREATE OR ALTER PROCEDURE sp_GetAuditPipelineStatus
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    SELECT 
+        CASE WHEN base_object_name LIKE '%AuditQueue%' THEN 'Async' ELSE 'Sync' END AS AuditMode,
+        (SELECT SUM(row_count) FROM sys.dm_db_partition_stats
+         WHERE object_id = OBJECT_ID('AuditQueue') AND index_id IN (0, 1)) AS QueuedEvents,
+        (SELECT DATEDIFF(SECOND, MIN(ActionDate), GETDATE()) FROM AuditQueue WITH (READPAST)) AS OldestQueuedSeconds
+    FROM sys.synonyms
+    WHERE name = 'AuditSink';
+END
+GO
+
+-- ============================================
+-- DRAIN JOB (SQL Server Agent; not available on Express)
+-- Agent's minimum interval is 10 seconds. On Express, run a loop of
+-- EXEC sp_DrainAuditQueue; WAITFOR DELAY '00:00:05'; from a scheduled task.
+-- ============================================
+
+IF SERVERPROPERTY('EngineEdition') <> 4
+    AND NOT EXISTS (SELECT 1 FROM msdb.dbo.sysjobs WHERE name = N'SRMS Audit Queue Drain')
+BEGIN
+    EXEC msdb.dbo.sp_add_job @job_name = N'SRMS Audit Queue Drain',
+        @description = N'Moves queued audit events from AuditQueue into AuditLog';
+    EXEC msdb.dbo.sp_add_jobstep @job_name = N'SRMS Audit Queue Drain', @step_name = N'Drain',
+        @subsystem = N'TSQL', @database_name = N'SecureStudentRecords',
+        @command = N'EXEC sp_DrainAuditQueue;';
+    EXEC msdb.dbo.sp_add_jobschedule @job_name = N'SRMS Audit Queue Drain', @name = N'Every 10 seconds',
+        @freq_type = 4, @freq_interval = 1, @freq_subday_type = 2, @freq_subday_interval = 10;
+    EXEC msdb.dbo.sp_add_jobserver @job_name = N'SRMS Audit Queue Drain';
+END
+GO
+
+PRINT 'Audit pipeline created successfully.';
+GO
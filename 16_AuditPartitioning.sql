@@ -0,0 +1,407 @@
+-- ============================================
+-- Database Security Term Project
+-- Performance: AuditLog Partitioning, Retention and Archive
+-- ============================================
+-- AuditLog is partitioned by month on ActionDate. A sliding window keeps the
+-- most recent HotMonths in AuditLog. Older partitions are switched out and
+-- loaded into AuditLogArchive (clustered columnstore). Archived events older
+-- than RetentionMonths are purged.
+-- Requires SQL Server 2017+ (columnstore with NVARCHAR(MAX) columns).
+-- Run once on an existing database. Safe to re-run.
+-- Usage:
+--   EXEC sp_SetAuditRetention @HotMonths = 3, @RetentionMonths = 84, @RequestingUserID = 1;
+--   EXEC sp_SlideAuditWindow;   -- monthly, normally run by the Agent job below
+--   EXEC sp_GetAuditLogRange @FromDate = '2025-01-01', @ToDate = '2025-02-01', @RequestingUserID = 1;
+
+USE SecureStudentRecords;
+GO
+
+-- ============================================
+-- STEP 1: Monthly partition function and scheme
+-- 12 months back through 3 months ahead; sp_SlideAuditWindow keeps it rolling
+-- ============================================
+
+IF NOT EXISTS (SELECT 1 FROM sys.partition_functions WHERE name = 'pf_AuditLogMonthly')
+BEGIN
+    DECLARE @ThisMonth DATE = DATEFROMPARTS(YEAR(GETDATE()), MONTH(GETDATE()), 1);
+    DECLARE @Boundary DATE = DATEADD(MONTH, -12, @ThisMonth);
+    DECLARE @Boundaries NVARCHAR(MAX) = N'';
+    
+    WHILE @Boundary <= DATEADD(MONTH, 3, @ThisMonth)
+    BEGIN
+        SET @Boundaries += CASE WHEN @Boundaries = N'' THEN N'' ELSE N', ' END
+                         + N'''' + CONVERT(NVARCHAR(10), @Boundary, 112) + N'''';
+        SET @Boundary = DATEADD(MONTH, 1, @Boundary);
+    END
+    
+    EXEC(N'CREATE PARTITION FUNCTION pf_AuditLogMonthly (DATETIME) AS RANGE RIGHT FOR VALUES (' + @Boundaries + N')');
+END
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.partition_schemes WHERE name = 'ps_AuditLogMonthly')
+    CREATE PARTITION SCHEME ps_AuditLogMonthly AS PARTITION pf_AuditLogMonthly ALL TO ([PRIMARY]);
+GO
+
+-- ============================================
+-- STEP 2: Rebuild AuditLog on the partition scheme
+-- Clustered key (ActionDate, LogID): date-range reviews become range seeks and
+-- every index is partition-aligned, which SWITCH requires
+-- ============================================
+
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes i
+    INNER JOIN sys.partition_schemes ps ON i.data_space_id = ps.data_space_id
+    WHERE i.object_id = OBJECT_ID('AuditLog') AND i.index_id = 1
+)
+BEGIN
+    UPDATE AuditLog SET ActionDate = '19000101' WHERE ActionDate IS NULL;
+    
+    -- Superseded by the clustered key, and not partition-aligned
+    DROP INDEX IF EXISTS IX_AuditLog_ActionDate ON AuditLog;
+    DROP INDEX IF EXISTS IX_AuditLog_UserID_ActionDate ON AuditLog;
+    
+    DECLARE @PK SYSNAME = (SELECT name FROM sys.key_constraints
+                           WHERE parent_object_id = OBJECT_ID('AuditLog') AND type = 'PK');
+    IF @PK IS NOT NULL
+        EXEC(N'ALTER TABLE AuditLog DROP CONSTRAINT ' + QUOTENAME(@PK));
+    
+    ALTER TABLE AuditLog ALTER COLUMN ActionDate DATETIME NOT NULL;
+    
+    ALTER TABLE AuditLog ADD CONSTRAINT PK_AuditLog
+        PRIMARY KEY CLUSTERED (ActionDate, LogID) ON ps_AuditLogMonthly (ActionDate);
+END
+GO
+
+-- Per-user activity reviews (aligned)
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID('AuditLog') AND name = 'IX_AuditLog_UserID_ActionDate')
+    CREATE NONCLUSTERED INDEX IX_AuditLog_UserID_ActionDate
+        ON AuditLog (UserID, ActionDate)
+        INCLUDE (Action, Success)
+        ON ps_AuditLogMonthly (ActionDate);
+GO
+
+-- Keep OldValue/NewValue off the hot data pages (applies as rows are written)
+EXEC sp_tableoption 'AuditLog', 'large value types out of row', 1;
+GO
+
+-- ============================================
+-- STEP 3: Switch-out staging and columnstore archive
+-- ============================================
+
+-- Same structure and indexes as AuditLog, on the same filegroup: the SWITCH target
+IF OBJECT_ID('AuditLogSwitchOut', 'U') IS NULL
+BEGIN
+    CREATE TABLE AuditLogSwitchOut (
+        LogID INT IDENTITY(1,1) NOT NULL,
+        UserID INT NULL,
+        Username NVARCHAR(50) NULL,
+        Action NVARCHAR(100) NOT NULL,
+        TableAffected NVARCHAR(50) NULL,
+        RecordID INT NULL,
+        OldValue NVARCHAR(MAX) NULL,
+        NewValue NVARCHAR(MAX) NULL,
+        ActionDate DATETIME NOT NULL,
+        IPAddress NVARCHAR(50) NULL,
+        Success BIT NULL,
+        ErrorMessage NVARCHAR(MAX) NULL,
+        CONSTRAINT PK_AuditLogSwitchOut PRIMARY KEY CLUSTERED (ActionDate, LogID) ON [PRIMARY]
+    );
+    
+    CREATE NONCLUSTERED INDEX IX_AuditLogSwitchOut_UserID_ActionDate
+        ON AuditLogSwitchOut (UserID, ActionDate)
+        INCLUDE (Action, Success);
+    
+    EXEC sp_tableoption 'AuditLogSwitchOut', 'large value types out of row', 1;
+END
+GO
+
+-- Archived events, column-compressed. Each month is loaded in one pass, so its
+-- rowgroups cover a narrow ActionDate range and are eliminated by date filters.
+IF OBJECT_ID('AuditLogArchive', 'U') IS NULL
+BEGIN
+    CREATE TABLE AuditLogArchive (
+        LogID INT NOT NULL,
+        UserID INT NULL,
+        Username NVARCHAR(50) NULL,
+        Action NVARCHAR(100) NOT NULL,
+        TableAffected NVARCHAR(50) NULL,
+        RecordID INT NULL,
+        OldValue NVARCHAR(MAX) NULL,
+        NewValue NVARCHAR(MAX) NULL,
+        ActionDate DATETIME NOT NULL,
+        IPAddress NVARCHAR(50) NULL,
+        Success BIT NULL,
+        ErrorMessage NVARCHAR(MAX) NULL,
+        ArchivedDate DATETIME NOT NULL DEFAULT GETDATE()
+    );
+    
+    CREATE CLUSTERED COLUMNSTORE INDEX CCI_AuditLogArchive ON AuditLogArchive;
+END
+GO
+
+-- Table: AUDIT_RETENTION_POLICY (single row)
+IF OBJECT_ID('AuditRetentionPolicy', 'U') IS NULL
+BEGIN
+    CREATE TABLE AuditRetentionPolicy (
+        PolicyID INT PRIMARY KEY DEFAULT 1 CHECK (PolicyID = 1),
+        HotMonths INT NOT NULL CHECK (HotMonths >= 1), -- Full months kept in AuditLog
+        RetentionMonths INT NOT NULL, -- Events older than this are purged from the archive
+        ModifiedDate DATETIME DEFAULT GETDATE(),
+        ModifiedByUserID INT NULL,
+        CONSTRAINT CK_AuditRetention_Window CHECK (RetentionMonths >= HotMonths)
+    );
+    
+    INSERT INTO AuditRetentionPolicy (HotMonths, RetentionMonths) VALUES (3, 84);
+END
+GO
+
+-- ============================================
+-- STEP 4: Procedures
+-- ============================================
+
+-- SP: Change the retention policy (Admin only)
+CREATE OR ALTER PROCEDURE sp_SetAuditRetention
+    @HotMonths INT,
+    @RetentionMonths INT,
+    @RequestingUserID INT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    BEGIN TRY
+        -- RBAC Check
+        DECLARE @RequesterRole NVARCHAR(20), @RequesterInstructorID INT, @RequesterTACourses NVARCHAR(4000);
+        SELECT @RequesterRole = Role, @RequesterInstructorID = InstructorID, @RequesterTACourses = TACourses
+        FROM fn_SessionAuthContext(@RequestingUserID);
+        
+        IF @RequesterRole IS NULL
+            EXEC sp_ResolveAuthContext @RequestingUserID, @RequesterRole OUTPUT,
+                                       @RequesterInstructorID OUTPUT, @RequesterTACourses OUTPUT;
+        
+        IF @RequesterRole != 'Admin'
+        BEGIN
+            RAISERROR('Access Denied: Only Admins can change audit retention', 16, 1);
+            RETURN;
+        END
+        
+        IF @HotMonths < 1 OR @RetentionMonths < @HotMonths
+        BEGIN
+            RAISERROR('Retention must be at least 1 month and no shorter than the hot window', 16, 1);
+            RETURN;
+        END
+        
+        DECLARE @Old NVARCHAR(100);
+        SELECT @Old = CONCAT('Hot=', HotMonths, ', Retention=', RetentionMonths) FROM AuditRetentionPolicy;
+        
+        UPDATE AuditRetentionPolicy
+        SET HotMonths = @HotMonths, RetentionMonths = @RetentionMonths,
+            ModifiedDate = GETDATE(), ModifiedByUserID = @RequestingUserID;
+        
+        INSERT INTO AuditSink (UserID, Action, TableAffected, OldValue, NewValue)
+        VALUES (@RequestingUserID, 'Set Audit Retention', 'AuditRetentionPolicy', @Old,
+                CONCAT('Hot=', @HotMonths, ', Retention=', @RetentionMonths));
+        
+        SELECT 'Success' AS Result;
+    END TRY
+    BEGIN CATCH
+        SELECT 'Error' AS Result, ERROR_MESSAGE() AS ErrorMessage;
+    END CATCH
+END
+GO
+
+-- SP: Monthly sliding window - add future partitions, archive old ones, purge expired
+CREATE OR ALTER PROCEDURE sp_SlideAuditWindow
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    DECLARE @HotMonths INT, @RetentionMonths INT;
+    SELECT @HotMonths = HotMonths, @RetentionMonths = RetentionMonths FROM AuditRetentionPolicy;
+    
+    DECLARE @ThisMonth DATETIME = DATEFROMPARTS(YEAR(GETDATE()), MONTH(GETDATE()), 1);
+    DECLARE @HotStart DATETIME = DATEADD(MONTH, -@HotMonths, @ThisMonth);
+    DECLARE @PurgeBefore DATETIME = DATEADD(MONTH, -@RetentionMonths, @ThisMonth);
+    DECLARE @Boundary DATETIME, @Archived INT = 0, @Purged INT = 0, @Partitions INT = 0;
+    
+    BEGIN TRY
+        -- 1. Keep three empty future partitions; splitting an empty partition is metadata-only
+        SELECT @Boundary = MAX(CAST(rv.value AS DATETIME))
+        FROM sys.partition_range_values rv
+        INNER JOIN sys.partition_functions pf ON rv.function_id = pf.function_id
+        WHERE pf.name = 'pf_AuditLogMonthly';
+        
+        WHILE @Boundary < DATEADD(MONTH, 3, @ThisMonth)
+        BEGIN
+            SET @Boundary = DATEADD(MONTH, 1, @Boundary);
+            ALTER PARTITION SCHEME ps_AuditLogMonthly NEXT USED [PRIMARY];
+            ALTER PARTITION FUNCTION pf_AuditLogMonthly() SPLIT RANGE (@Boundary);
+        END
+        
+        -- 2. Archive every partition older than the hot window, oldest first.
+        --    With RANGE RIGHT, partition 1 holds everything below the lowest boundary.
+        WHILE 1 = 1
+        BEGIN
+            -- Rows left by an interrupted run are archived before anything new is switched out
+            IF EXISTS (SELECT 1 FROM AuditLogSwitchOut)
+            BEGIN
+                BEGIN TRANSACTION;
+                
+                INSERT INTO AuditLogArchive WITH (TABLOCK)
+                    (LogID, UserID, Username, Action, TableAffected, RecordID, OldValue, NewValue,
+                     ActionDate, IPAddress, Success, ErrorMessage)
+                SELECT LogID, UserID, Username, Action, TableAffected, RecordID, OldValue, NewValue,
+                       ActionDate, IPAddress, Success, ErrorMessage
+                FROM AuditLogSwitchOut;
+                
+                SET @Archived += @@ROWCOUNT;
+                TRUNCATE TABLE AuditLogSwitchOut;
+                
+                COMMIT TRANSACTION;
+            END
+            
+            SET @Boundary = NULL;
+            SELECT @Boundary = MIN(CAST(rv.value AS DATETIME))
+            FROM sys.partition_range_values rv
+            INNER JOIN sys.partition_functions pf ON rv.function_id = pf.function_id
+            WHERE pf.name = 'pf_AuditLogMonthly';
+            
+            IF @Boundary IS NULL OR @Boundary > @HotStart
+                BREAK;
+            
+            -- Metadata-only: AuditLog is locked only for the switch and the merge,
+            -- not while the rows are copied into the archive
+            BEGIN TRANSACTION;
+            ALTER TABLE AuditLog SWITCH PARTITION 1 TO AuditLogSwitchOut;
+            ALTER PARTITION FUNCTION pf_AuditLogMonthly() MERGE RANGE (@Boundary);
+            COMMIT TRANSACTION;
+            
+            SET @Partitions += 1;
+        END
+        
+        -- 3. Retention: months were loaded separately, so expired rows fill whole
+        --    rowgroups and REORGANIZE drops them
+        DELETE FROM AuditLogArchive WHERE ActionDate < @PurgeBefore;
+        SET @Purged = @@ROWCOUNT;
+        
+        IF @Archived > 0 OR @Purged > 0
+            ALTER INDEX CCI_AuditLogArchive ON AuditLogArchive REORGANIZE WITH (COMPRESS_ALL_ROW_GROUPS = ON);
+        
+        INSERT INTO AuditSink (Action, TableAffected, NewValue)
+        VALUES ('Slide Audit Window', 'AuditLog',
+                CONCAT(@Partitions, ' partitions / ', @Archived, ' events archived, ', @Purged, ' purged'));
+        
+        SELECT 'Success' AS Result, @Partitions AS PartitionsArchived, @Archived AS EventsArchived,
+               @Purged AS EventsPurged;
+    END TRY
+    BEGIN CATCH
+        IF @@TRANCOUNT > 0
+            ROLLBACK TRANSACTION;
+        
+        INSERT INTO AuditSink (Action, TableAffected, Success, ErrorMessage)
+        VALUES ('Slide Audit Window Failed', 'AuditLog', 0, ERROR_MESSAGE());
+        
+        SELECT 'Error' AS Result, ERROR_MESSAGE() AS ErrorMessage;
+    END CATCH
+END
+GO
+
+-- SP: Audit events in a date range for security reviews (Admin only)
+-- The half-open ActionDate range lets the optimizer touch only the partitions
+-- (and archive rowgroups) that overlap it
+CREATE OR ALTER PROCEDURE sp_GetAuditLogRange
+    @FromDate DATETIME,
+    @ToDate DATETIME,
+    @UserID INT = NULL,
+    @Action NVARCHAR(100) = NULL,
+    @IncludeArchive BIT = 0,
+    @MaxRows INT = 10000,
+    @RequestingUserID INT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    BEGIN TRY
+        -- RBAC Check
+        DECLARE @RequesterRole NVARCHAR(20), @RequesterInstructorID INT, @RequesterTACourses NVARCHAR(4000);
+        SELECT @RequesterRole = Role, @RequesterInstructorID = InstructorID, @RequesterTACourses = TACourses
+        FROM fn_SessionAuthContext(@RequestingUserID);
+        
+        IF @RequesterRole IS NULL
+            EXEC sp_ResolveAuthContext @RequestingUserID, @RequesterRole OUTPUT,
+                                       @RequesterInstructorID OUTPUT, @RequesterTACourses OUTPUT;
+        
+        IF @RequesterRole != 'Admin'
+        BEGIN
+            RAISERROR('Access Denied: Only Admins can review the audit log', 16, 1);
+            RETURN;
+        END
+        
+        IF @FromDate IS NULL OR @ToDate IS NULL OR @FromDate >= @ToDate
+        BEGIN
+            RAISERROR('A date range with FromDate before ToDate is required', 16, 1);
+            RETURN;
+        END
+        
+        IF @IncludeArchive = 1
+        BEGIN
+            SELECT TOP (@MaxRows) *
+            FROM (
+                SELECT LogID, UserID, Username, Action, TableAffected, RecordID, OldValue, NewValue,
+                       ActionDate, IPAddress, Success, ErrorMessage, 'Hot' AS Tier
+                FROM AuditLog
+                WHERE ActionDate >= @FromDate AND ActionDate < @ToDate
+                AND (@UserID IS NULL OR UserID = @UserID)
+                AND (@Action IS NULL OR Action = @Action)
+                UNION ALL
+                SELECT LogID, UserID, Username, Action, TableAffected, RecordID, OldValue, NewValue,
+                       ActionDate, IPAddress, Success, ErrorMessage, 'Archive'
+                FROM AuditLogArchive
+                WHERE ActionDate >= @FromDate AND ActionDate < @ToDate
+                AND (@UserID IS NULL OR UserID = @UserID)
+                AND (@Action IS NULL OR Action = @Action)
+            ) a
+            ORDER BY ActionDate DESC
+            OPTION (RECOMPILE);
+        END
+        ELSE
+        BEGIN
+            SELECT TOP (@MaxRows) LogID, UserID, Username, Action, TableAffected, RecordID, OldValue, NewValue,
+                   ActionDate, IPAddress, Success, ErrorMessage, 'Hot' AS Tier
+            FROM AuditLog
+            WHERE ActionDate >= @FromDate AND ActionDate < @ToDate
+            AND (@UserID IS NULL OR UserID = @UserID)
+            AND (@Action IS NULL OR Action = @Action)
+            ORDER BY ActionDate DESC
+            OPTION (RECOMPILE);
+        END
+        
+        INSERT INTO AuditSink (UserID, Action, TableAffected, NewValue)
+        VALUES (@RequestingUserID, 'Review Audit Log', 'AuditLog',
+                CONCAT(CONVERT(NVARCHAR(19), @FromDate, 120), ' to ', CONVERT(NVARCHAR(19), @ToDate, 120)));
+    END TRY
+    BEGIN CATCH
+        SELECT 'Error' AS Result, ERROR_MESSAGE() AS ErrorMessage;
+    END CATCH
+END
+GO
+
+-- ============================================
+-- STEP 5: Monthly job (SQL Server Agent; not available on Express)
+-- ============================================
+
+IF SERVERPROPERTY('EngineEdition') <> 4
+    AND NOT EXISTS (SELECT 1 FROM msdb.dbo.sysjobs WHERE name = N'SRMS Audit Sliding Window')
+BEGIN
+    EXEC msdb.dbo.sp_add_job @job_name = N'SRMS Audit Sliding Window',
+        @description = N'Archives AuditLog partitions older than the hot window and purges expired events';
+    EXEC msdb.dbo.sp_add_jobstep @job_name = N'SRMS Audit Sliding Window', @step_name = N'Slide',
+        @subsystem = N'TSQL', @database_name = N'SecureStudentRecords',
+        @command = N'EXEC sp_SlideAuditWindow;';
+    EXEC msdb.dbo.sp_add_jobschedule @job_name = N'SRMS Audit Sliding Window', @name = N'Monthly',
+        @freq_type = 16, @freq_interval = 1, @freq_recurrence_factor = 1, @active_start_time = 010000;
+    EXEC msdb.dbo.sp_add_jobserver @job_name = N'SRMS Audit Sliding Window';
+END
+GO
+
+PRINT 'AuditLog partitioning and archive created successfully.';
+GO
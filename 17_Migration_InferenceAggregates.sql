@@ -0,0 +1,92 @@
+-- ============================================
+-- Database Security Term Project
+-- Migration: Materialized Inference-Control Aggregates
+-- ============================================
+-- Upgrades a database created before the aggregate tables existed.
+-- Safe to re-run: every step checks whether it has already been applied.
+--   1. Run this script (creates the tables).
+--   2. Re-run 05_StoredProcedures_Part1.sql, 06_StoredProcedures_Part2.sql,
+--      07_InferenceControl.sql and 14_BulkOperations.sql.
+--   3. Run this script again: it fills the aggregates from the existing
+--      grades and attendance with sp_RebuildInferenceAggregates.
+
+USE SecureStudentRecords;
+GO
+
+-- ============================================
+-- STEP 1: Aggregate tables
+-- ============================================
+
+-- Table: GRADE_AGGREGATE - running totals per (Department, Course)
+IF OBJECT_ID('GradeAggregate', 'U') IS NULL
+BEGIN
+    CREATE TABLE GradeAggregate (
+        Department NVARCHAR(50) NOT NULL,
+        CourseID INT NOT NULL,
+        StudentCount INT NOT NULL, -- Distinct students with at least one grade
+        GradeCount INT NOT NULL,
+        GradeSum DECIMAL(18,2) NOT NULL,
+        MinGrade DECIMAL(5,2) NOT NULL,
+        MaxGrade DECIMAL(5,2) NOT NULL,
+        ClassificationLevel INT DEFAULT 3, -- Secret
+        CONSTRAINT PK_GradeAggregate PRIMARY KEY (Department, CourseID),
+        CONSTRAINT FK_GradeAggregate_Course FOREIGN KEY (CourseID) REFERENCES Course(CourseID)
+    );
+END
+GO
+
+-- Table: GRADE_AGGREGATE_MEMBER - which students are counted, by blind index only
+IF OBJECT_ID('GradeAggregateMember', 'U') IS NULL
+BEGIN
+    CREATE TABLE GradeAggregateMember (
+        CourseID INT NOT NULL,
+        StudentIDBlindIndex BINARY(32) NOT NULL,
+        GradeCount INT NOT NULL,
+        CONSTRAINT PK_GradeAggregateMember PRIMARY KEY (CourseID, StudentIDBlindIndex)
+    );
+END
+GO
+
+-- Table: ATTENDANCE_AGGREGATE - running totals per (Department, Course)
+IF OBJECT_ID('AttendanceAggregate', 'U') IS NULL
+BEGIN
+    CREATE TABLE AttendanceAggregate (
+        Department NVARCHAR(50) NOT NULL,
+        CourseID INT NOT NULL,
+        StudentCount INT NOT NULL, -- Distinct students with at least one record
+        PresentCount INT NOT NULL,
+        AbsentCount INT NOT NULL,
+        ClassificationLevel INT DEFAULT 3, -- Secret
+        CONSTRAINT PK_AttendanceAggregate PRIMARY KEY (Department, CourseID),
+        CONSTRAINT FK_AttendanceAggregate_Course FOREIGN KEY (CourseID) REFERENCES Course(CourseID)
+    );
+END
+GO
+
+-- Table: ATTENDANCE_AGGREGATE_MEMBER
+IF OBJECT_ID('AttendanceAggregateMember', 'U') IS NULL
+BEGIN
+    CREATE TABLE AttendanceAggregateMember (
+        CourseID INT NOT NULL,
+        StudentID INT NOT NULL,
+        RecordCount INT NOT NULL,
+        CONSTRAINT PK_AttendanceAggregateMember PRIMARY KEY (CourseID, StudentID)
+    );
+END
+GO
+
+-- ============================================
+-- STEP 2: Backfill (once the procedures from step 2 above are deployed)
+-- ============================================
+
+IF OBJECT_ID('sp_RebuildInferenceAggregates', 'P') IS NULL
+    PRINT 'Re-run 05, 06, 07 and 14, then run this script again to backfill the aggregates.'
+ELSE
+BEGIN
+    DECLARE @AdminID INT = (SELECT TOP (1) UserID FROM Users WHERE Role = 'Admin' ORDER BY UserID);
+    EXEC sp_RebuildInferenceAggregates @RequestingUserID = @AdminID;
+END
+GO
+
+PRINT 'Inference aggregate migration completed.';
+GO
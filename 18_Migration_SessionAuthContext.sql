@@ -0,0 +1,30 @@
+-- ============================================
+-- Database Security Term Project
+-- Migration: Session Authorization Context
+-- ============================================
+-- Upgrades a database created before AuthContextState existed.
+-- Safe to re-run: every step checks whether it has already been applied.
+-- After this script, re-run 05_StoredProcedures_Part1.sql,
+-- 06_StoredProcedures_Part2.sql, 07_InferenceControl.sql,
+-- 14_BulkOperations.sql and 16_AuditPartitioning.sql to deploy the
+-- cached-context versions.
+
+USE SecureStudentRecords;
+GO
+
+IF OBJECT_ID('AuthContextState', 'U') IS NULL
+BEGIN
+    CREATE TABLE AuthContextState (
+        StateID INT PRIMARY KEY DEFAULT 1 CHECK (StateID = 1),
+        Epoch BIGINT NOT NULL DEFAULT 1,
+        SigningKey BINARY(32) NOT NULL DEFAULT CAST(CRYPT_GEN_RANDOM(32) AS BINARY(32))
+    );
+END
+GO
+
+IF NOT EXISTS (SELECT 1 FROM AuthContextState)
+    INSERT INTO AuthContextState DEFAULT VALUES;
+GO
+
+PRINT 'Session authorization context migration completed.';
+GO
@@ -0,0 +1,453 @@
+-- ============================================
+-- Database Security Term Project
+-- Performance: Scalable Synthetic Data Generator
+-- ============================================
+-- Generates benchmark-sized data (e.g. 100k students, 2k courses, 10M
+-- attendance rows) with realistic skew. Departments, course popularity,
+-- grades and absences are uneven, as they are at a real university.
+-- Every value is derived from @Seed by hashing. The same seed and sizes
+-- always produce the same data, whatever IDENTITY values the rows receive.
+-- Rows are generated, encrypted and blind-indexed set-based and bulk-loaded
+-- with TABLOCK. Attendance is loaded in batches of @BatchSize rows.
+-- Run on a TEST server only, on a database built with scripts 01-18,
+-- ideally in SIMPLE or BULK_LOGGED recovery. Generated accounts use the
+-- 09_SampleData.sql password of their role, so they can log in.
+-- Usage:
+--   EXEC sp_GenerateSyntheticData @RequestingUserID = 1;   -- 100k / 2k / 10M defaults
+--   EXEC sp_GenerateSyntheticData @Students = 5000, @Courses = 200,
+--        @Instructors = 40, @TAs = 80, @AttendanceRows = 250000,
+--        @Seed = 7, @RequestingUserID = 1;
+
+USE SecureStudentRecords;
+GO
+
+-- ============================================
+-- HELPERS
+-- ============================================
+
+-- fn_NumberRange: the integers @Low..@High, generated without reading any table
+CREATE OR ALTER FUNCTION fn_NumberRange (@Low BIGINT, @High BIGINT)
+RETURNS TABLE
+AS
+RETURN
+    WITH L0 AS (SELECT 1 AS c FROM (VALUES (1),(1),(1),(1),(1),(1),(1),(1),
+                                            (1),(1),(1),(1),(1),(1),(1),(1)) v(c)), -- 16
+         L1 AS (SELECT 1 AS c FROM L0 a CROSS JOIN L0 b),                           -- 256
+         L2 AS (SELECT 1 AS c FROM L1 a CROSS JOIN L1 b),                           -- 65,536
+         L3 AS (SELECT 1 AS c FROM L2 a CROSS JOIN L2 b),                           -- 4.3 billion
+         Nums AS (SELECT ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) AS rn FROM L3)
+    SELECT TOP (CASE WHEN @High >= @Low THEN @High - @Low + 1 ELSE 0 END) @Low + rn - 1 AS n
+    FROM Nums
+    ORDER BY rn;
+GO
+
+-- fn_SeededRandom: four deterministic uniforms in [0, 1) for (seed, stream, n).
+-- One SHA-256 per row, split into 48-bit slices.
+CREATE OR ALTER FUNCTION fn_SeededRandom (@Seed INT, @Stream INT, @N BIGINT)
+RETURNS TABLE
+AS
+RETURN
+    SELECT
+        CAST(CAST(SUBSTRING(h.Bytes, 1, 6) AS BIGINT) AS FLOAT) / 281474976710656e0 AS U1,
+        CAST(CAST(SUBSTRING(h.Bytes, 7, 6) AS BIGINT) AS FLOAT) / 281474976710656e0 AS U2,
+        CAST(CAST(SUBSTRING(h.Bytes, 13, 6) AS BIGINT) AS FLOAT) / 281474976710656e0 AS U3,
+        CAST(CAST(SUBSTRING(h.Bytes, 19, 6) AS BIGINT) AS FLOAT) / 281474976710656e0 AS U4
+    FROM (SELECT HASHBYTES('SHA2_256', CAST(@Seed AS BINARY(4)) + CAST(@Stream AS BINARY(4))
+                                       + CAST(@N AS BINARY(8))) AS Bytes) h;
+GO
+
+-- ============================================
+-- GENERATOR
+-- ============================================
+
+-- SP: Generate a synthetic data set (Admin only, test servers only)
+CREATE OR ALTER PROCEDURE sp_GenerateSyntheticData
+    @Students INT = 100000,
+    @Courses INT = 2000,
+    @Instructors INT = 400,
+    @TAs INT = 800,
+    @EnrollmentsPerStudent INT = 5,     -- Picks per student; duplicate picks are dropped
+    @AttendanceRows BIGINT = 10000000,
+    @GradedShare FLOAT = 0.8,           -- Share of enrollments with a final grade
+    @PopularitySkew FLOAT = 2.0,        -- 1 = uniform; higher = more students in a few courses
+    @TermStart DATE = '2025-01-13',
+    @Seed INT = 42,
+    @BatchSize INT = 1000000,
+    @DisableIndexes BIT = 1,            -- Load Grades/Attendance without nonclustered indexes, then rebuild
+    @RequestingUserID INT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    DECLARE @Started DATETIME2 = SYSDATETIME();
+    DECLARE @Message NVARCHAR(200);
+    
+    BEGIN TRY
+        IF NOT EXISTS (SELECT 1 FROM Users WHERE UserID = @RequestingUserID AND Role = 'Admin')
+        BEGIN
+            RAISERROR('Access Denied: Only Admins can generate synthetic data', 16, 1);
+            RETURN;
+        END
+        
+        IF @Students < 1 OR @Courses < 1 OR @Instructors < 1 OR @TAs < 0 OR @AttendanceRows < 0
+            OR @EnrollmentsPerStudent NOT BETWEEN 1 AND 255 OR @BatchSize < 1
+            OR @GradedShare NOT BETWEEN 0 AND 1 OR @PopularitySkew < 1
+        BEGIN
+            RAISERROR('Invalid generator settings', 16, 1);
+            RETURN;
+        END
+        
+        IF EXISTS (SELECT 1 FROM Users WHERE Username LIKE 'syn.%')
+        BEGIN
+            RAISERROR('Synthetic data already exists: generate into a freshly built database', 16, 1);
+            RETURN;
+        END
+        
+        -- Department skew: a few large departments, a long tail of small ones
+        DECLARE @Departments TABLE (
+            DeptNo INT PRIMARY KEY,
+            Department NVARCHAR(50) NOT NULL,
+            CumulativeShare FLOAT NOT NULL
+        );
+        INSERT INTO @Departments VALUES
+            (1, 'Computer Science', 0.25), (2, 'Business', 0.45), (3, 'Mathematics', 0.60),
+            (4, 'Biology', 0.72), (5, 'Physics', 0.82), (6, 'English', 0.90),
+            (7, 'History', 0.95), (8, 'Art', 1.00);
+        
+        DECLARE @FirstNames TABLE (No INT PRIMARY KEY, Name NVARCHAR(20) NOT NULL);
+        INSERT INTO @FirstNames VALUES
+            (0, 'James'), (1, 'Mary'), (2, 'Omar'), (3, 'Aisha'), (4, 'Wei'), (5, 'Sofia'),
+            (6, 'David'), (7, 'Fatima'), (8, 'Lucas'), (9, 'Emma'), (10, 'Yusuf'), (11, 'Priya'),
+            (12, 'Noah'), (13, 'Layla'), (14, 'Mateo'), (15, 'Hana');
+        
+        DECLARE @LastNames TABLE (No INT PRIMARY KEY, Name NVARCHAR(20) NOT NULL);
+        INSERT INTO @LastNames VALUES
+            (0, 'Smith'), (1, 'Hassan'), (2, 'Chen'), (3, 'Garcia'), (4, 'Khan'), (5, 'Mueller'),
+            (6, 'Okafor'), (7, 'Rossi'), (8, 'Tanaka'), (9, 'Ali'), (10, 'Brown'), (11, 'Silva'),
+            (12, 'Novak'), (13, 'Ibrahim'), (14, 'Kim'), (15, 'Jones');
+        
+        -- ============================================
+        -- 1. People: accounts, instructors, students
+        --    Ordinals (not IDENTITY values) feed every random stream
+        -- ============================================
+        
+        CREATE TABLE #People (
+            Role NVARCHAR(20) NOT NULL,
+            Ordinal INT NOT NULL,
+            Username NVARCHAR(50) NOT NULL,
+            FullName NVARCHAR(100) NOT NULL,
+            Email NVARCHAR(100) NOT NULL,
+            Department NVARCHAR(50) NOT NULL,
+            Ability FLOAT NOT NULL, -- Students: drives grades and absences
+            UserID INT NULL,
+            PRIMARY KEY (Role, Ordinal)
+        );
+        
+        INSERT INTO #People (Role, Ordinal, Username, FullName, Email, Department, Ability)
+        SELECT
+            p.Role,
+            n.n,
+            CONCAT('syn.', p.Prefix, n.n),
+            CONCAT(p.Title, fn.Name, ' ', ln.Name),
+            CONCAT('syn.', p.Prefix, n.n, '@synthetic.srms.test'),
+            d.Department,
+            r.U4
+        FROM (VALUES ('Instructor', 'prof', 'Dr. ', 1, @Instructors),
+                     ('TA', 'ta', '', 2, @TAs),
+                     ('Student', 'student', '', 3, @Students)) p(Role, Prefix, Title, Stream, Total)
+        CROSS APPLY fn_NumberRange(1, p.Total) n
+        CROSS APPLY fn_SeededRandom(@Seed, p.Stream, n.n) r
+        INNER JOIN @FirstNames fn ON fn.No = FLOOR(r.U1 * 16)
+        INNER JOIN @LastNames ln ON ln.No = FLOOR(r.U2 * 16)
+        CROSS APPLY (SELECT TOP 1 Department FROM @Departments
+                     WHERE CumulativeShare > r.U3 ORDER BY DeptNo) d;
+        
+        OPEN SYMMETRIC KEY StudentRecordsKey
+        DECRYPTION BY CERTIFICATE StudentRecordsCert;
+        
+        DECLARE @IPad BINARY(64), @OPad BINARY(64);
+        SELECT @IPad = IPad, @OPad = OPad FROM fn_BlindIndexPads('GradesStudentID');
+        
+        IF @IPad IS NULL
+        BEGIN
+            CLOSE SYMMETRIC KEY StudentRecordsKey;
+            RAISERROR('Blind index key not found', 16, 1);
+            RETURN;
+        END
+        
+        BEGIN TRANSACTION;
+        
+        -- Passwords are encrypted set-based, the same way sp_RegisterUser does it one at a time
+        INSERT INTO Users WITH (TABLOCK) (Username, PasswordEncrypted, Role, ClearanceLevel)
+        SELECT
+            Username,
+            EncryptByKey(Key_GUID('StudentRecordsKey'),
+                         CAST(CASE Role WHEN 'Instructor' THEN N'Prof@123'
+                                        WHEN 'TA' THEN N'TA@123'
+                                        ELSE N'Student@123' END AS NVARCHAR(100))),
+            Role,
+            CASE Role WHEN 'Instructor' THEN 3 WHEN 'TA' THEN 2 ELSE 1 END
+        FROM #People
+        ORDER BY Role, Ordinal;
+        
+        UPDATE p SET UserID = u.UserID
+        FROM #People p
+        INNER JOIN Users u ON u.Username = p.Username;
+        
+        INSERT INTO Instructor WITH (TABLOCK) (FullName, Email, Department, ClearanceLevel, UserID)
+        SELECT FullName, Email, Department, 3, UserID
+        FROM #People
+        WHERE Role = 'Instructor'
+        ORDER BY Ordinal;
+        
+        INSERT INTO Student WITH (TABLOCK) (FullName, Email, PhoneEncrypted, DOB, Department, UserID)
+        SELECT
+            p.FullName,
+            p.Email,
+            EncryptByKey(Key_GUID('StudentRecordsKey'),
+                         CAST(CONCAT('555-', RIGHT(CONCAT('000000', CAST(r.U1 * 10000000 AS INT)), 7)) AS NVARCHAR(20))),
+            DATEADD(DAY, -CAST(r.U2 * 3650 AS INT), DATEADD(YEAR, -18, @TermStart)),
+            p.Department,
+            p.UserID
+        FROM #People p
+        CROSS APPLY fn_SeededRandom(@Seed, 4, p.Ordinal) r
+        WHERE p.Role = 'Student'
+        ORDER BY p.Ordinal;
+        
+        COMMIT TRANSACTION;
+        
+        CREATE TABLE #Students (
+            Ordinal INT PRIMARY KEY,
+            StudentID INT NOT NULL,
+            Ability FLOAT NOT NULL
+        );
+        
+        INSERT INTO #Students (Ordinal, StudentID, Ability)
+        SELECT p.Ordinal, s.StudentID, p.Ability
+        FROM #People p
+        INNER JOIN Student s ON s.Email = p.Email
+        WHERE p.Role = 'Student';
+        
+        -- The encrypted StudentID needs the IDENTITY value, so it is set in a second pass
+        UPDATE s
+        SET StudentIDEncrypted = EncryptByKey(Key_GUID('StudentRecordsKey'), CAST(s.StudentID AS VARCHAR(10)))
+        FROM Student s
+        INNER JOIN #Students t ON t.StudentID = s.StudentID;
+        
+        SET @Message = CONCAT(@Students, ' students, ', @Instructors, ' instructors and ', @TAs, ' TAs created');
+        RAISERROR(@Message, 0, 1) WITH NOWAIT;
+        
+        -- ============================================
+        -- 2. Courses (round-robin over instructors) and TA assignments
+        -- ============================================
+        
+        CREATE TABLE #Courses (
+            Ordinal INT PRIMARY KEY,
+            CourseName NVARCHAR(100) NOT NULL,
+            InstructorID INT NOT NULL,
+            InstructorUserID INT NOT NULL,
+            CourseID INT NULL
+        );
+        
+        INSERT INTO #Courses (Ordinal, CourseName, InstructorID, InstructorUserID)
+        SELECT
+            n.n,
+            CONCAT('SYN ', p.Department, ' ', 100 + n.n),
+            i.InstructorID,
+            p.UserID
+        FROM fn_NumberRange(1, @Courses) n
+        INNER JOIN #People p ON p.Role = 'Instructor' AND p.Ordinal = 1 + (n.n - 1) % @Instructors
+        INNER JOIN Instructor i ON i.Email = p.Email;
+        
+        INSERT INTO Course WITH (TABLOCK) (CourseName, Description, PublicInfo, InstructorID)
+        SELECT CourseName, CONCAT('Synthetic course ', Ordinal), 'Generated for benchmarking', InstructorID
+        FROM #Courses
+        ORDER BY Ordinal;
+        
+        -- Course names are not unique; the description carries the ordinal
+        UPDATE c SET CourseID = x.CourseID
+        FROM #Courses c
+        INNER JOIN Course x ON CAST(x.Description AS NVARCHAR(100)) = CONCAT('Synthetic course ', c.Ordinal);
+        
+        -- Each TA assists two courses
+        INSERT INTO TAAssignment WITH (TABLOCK) (UserID, CourseID)
+        SELECT DISTINCT p.UserID, c.CourseID
+        FROM #People p
+        CROSS APPLY fn_SeededRandom(@Seed, 5, p.Ordinal) r
+        CROSS APPLY (VALUES (r.U1), (r.U2)) pick(U)
+        INNER JOIN #Courses c ON c.Ordinal = 1 + FLOOR(pick.U * @Courses)
+        WHERE p.Role = 'TA';
+        
+        -- ============================================
+        -- 3. Enrollments: popularity follows U^skew, so low-numbered courses fill up
+        -- ============================================
+        
+        CREATE TABLE #Enrollment (
+            Ordinal INT PRIMARY KEY,
+            StudentOrdinal INT NOT NULL,
+            CourseOrdinal INT NOT NULL,
+            StudentID INT NOT NULL,
+            CourseID INT NOT NULL,
+            InstructorID INT NOT NULL,
+            InstructorUserID INT NOT NULL,
+            Ability FLOAT NOT NULL
+        );
+        
+        INSERT INTO #Enrollment (Ordinal, StudentOrdinal, CourseOrdinal, StudentID, CourseID,
+                                 InstructorID, InstructorUserID, Ability)
+        SELECT
+            ROW_NUMBER() OVER (ORDER BY e.StudentOrdinal, e.CourseOrdinal),
+            e.StudentOrdinal, e.CourseOrdinal, s.StudentID, c.CourseID,
+            c.InstructorID, c.InstructorUserID, s.Ability
+        FROM (
+            SELECT DISTINCT s.Ordinal AS StudentOrdinal,
+                   1 + CAST(FLOOR(POWER(r.U1, @PopularitySkew) * @Courses) AS INT) AS CourseOrdinal
+            FROM #Students s
+            CROSS APPLY fn_NumberRange(1, @EnrollmentsPerStudent) k
+            CROSS APPLY fn_SeededRandom(@Seed, 6, CAST(s.Ordinal AS BIGINT) * 256 + k.n) r
+        ) e
+        INNER JOIN #Students s ON s.Ordinal = e.StudentOrdinal
+        INNER JOIN #Courses c ON c.Ordinal = e.CourseOrdinal;
+        
+        DECLARE @EnrollmentCount INT = @@ROWCOUNT;
+        
+        INSERT INTO CourseEnrollment WITH (TABLOCK) (StudentID, CourseID, EnrollmentDate)
+        SELECT StudentID, CourseID, DATEADD(DAY, -7, CAST(@TermStart AS DATETIME))
+        FROM #Enrollment
+        ORDER BY Ordinal;
+        
+        SET @Message = CONCAT(@Courses, ' courses and ', @EnrollmentCount, ' enrollments created');
+        RAISERROR(@Message, 0, 1) WITH NOWAIT;
+        
+        -- ============================================
+        -- 4. Grades and attendance, optionally without nonclustered indexes
+        -- ============================================
+        
+        DECLARE @Sql NVARCHAR(MAX) = N'';
+        IF @DisableIndexes = 1
+        BEGIN
+            SELECT @Sql += N'ALTER INDEX ' + QUOTENAME(i.name) + N' ON '
+                         + QUOTENAME(OBJECT_NAME(i.object_id)) + N' DISABLE;'
+            FROM sys.indexes i
+            WHERE i.object_id IN (OBJECT_ID('Grades'), OBJECT_ID('Attendance'))
+              AND i.type = 2 AND i.is_primary_key = 0 AND i.is_unique_constraint = 0
+              AND i.is_disabled = 0;
+            EXEC sp_executesql @Sql;
+        END
+        
+        -- Grades: a bell-shaped spread around each student's ability
+        INSERT INTO Grades WITH (TABLOCK)
+            (StudentIDEncrypted, StudentIDBlindIndex, CourseID, GradeValueEncrypted, DateEntered, EnteredByInstructorID)
+        SELECT
+            EncryptByKey(Key_GUID('StudentRecordsKey'), CAST(e.StudentID AS VARCHAR(10))),
+            HASHBYTES('SHA2_256', @OPad + HASHBYTES('SHA2_256', @IPad + CAST(e.StudentID AS BINARY(4)))),
+            e.CourseID,
+            EncryptByKey(Key_GUID('StudentRecordsKey'), CAST(g.GradeValue AS VARCHAR(10))),
+            DATEADD(WEEK, 16, CAST(@TermStart AS DATETIME)),
+            e.InstructorID
+        FROM #Enrollment e
+        CROSS APPLY fn_SeededRandom(@Seed, 7, e.Ordinal) r
+        CROSS APPLY (SELECT CAST(CASE WHEN v.Grade > 100 THEN 100 ELSE v.Grade END AS DECIMAL(5,2)) AS GradeValue
+                     FROM (SELECT 40 + 40 * e.Ability + 20 * (r.U2 + r.U3) / 2 AS Grade) v) g
+        WHERE r.U1 < @GradedShare
+        ORDER BY e.Ordinal;
+        
+        SET @Message = CONCAT(@@ROWCOUNT, ' grades created');
+        RAISERROR(@Message, 0, 1) WITH NOWAIT;
+        
+        CLOSE SYMMETRIC KEY StudentRecordsKey;
+        
+        -- Attendance row n is class meeting 1 + (n-1) / @EnrollmentCount of enrollment
+        -- 1 + (n-1) % @EnrollmentCount: bigger courses get proportionally more rows,
+        -- and no student is marked twice for the same meeting.
+        -- Courses meet twice a week, on a weekday fixed per course.
+        DECLARE @From BIGINT = 1, @To BIGINT;
+        
+        WHILE @From <= @AttendanceRows
+        BEGIN
+            SET @To = CASE WHEN @From + @BatchSize - 1 > @AttendanceRows
+                           THEN @AttendanceRows ELSE @From + @BatchSize - 1 END;
+            
+            BEGIN TRANSACTION;
+            
+            INSERT INTO Attendance WITH (TABLOCK) (StudentID, CourseID, Status, DateRecorded, RecordedByUserID)
+            SELECT
+                e.StudentID,
+                e.CourseID,
+                -- Most students miss about 5% of classes; the weakest tenth miss about 30%
+                CASE WHEN r.U1 < CASE WHEN e.Ability < 0.1 THEN 0.30 ELSE 0.05 END THEN 0 ELSE 1 END,
+                DATEADD(MINUTE, 60 * (8 + e.CourseOrdinal % 9),
+                        DATEADD(DAY, 7 * (m.Meeting / 2) + e.CourseOrdinal % 3 + 2 * (m.Meeting % 2),
+                                CAST(@TermStart AS DATETIME))),
+                e.InstructorUserID
+            FROM fn_NumberRange(@From, @To) n
+            CROSS APPLY (SELECT 1 + (n.n - 1) % @EnrollmentCount AS EnrollmentOrdinal,
+                                CAST((n.n - 1) / @EnrollmentCount AS INT) AS Meeting) m
+            INNER JOIN #Enrollment e ON e.Ordinal = m.EnrollmentOrdinal
+            CROSS APPLY fn_SeededRandom(@Seed, 8, n.n) r
+            ORDER BY n.n;
+            
+            COMMIT TRANSACTION;
+            
+            SET @Message = CONCAT(@To, ' of ', @AttendanceRows, ' attendance rows loaded');
+            RAISERROR(@Message, 0, 1) WITH NOWAIT;
+            SET @From = @To + 1;
+        END
+        
+        IF @DisableIndexes = 1
+        BEGIN
+            ALTER INDEX ALL ON Grades REBUILD;
+            ALTER INDEX ALL ON Attendance REBUILD;
+        END
+        
+        -- ============================================
+        -- 5. Inference-control aggregates and statistics
+        -- ============================================
+        
+        EXEC sp_RebuildInferenceAggregates @RequestingUserID = @RequestingUserID;
+        
+        UPDATE STATISTICS Users;
+        UPDATE STATISTICS Student;
+        UPDATE STATISTICS Course;
+        UPDATE STATISTICS CourseEnrollment;
+        UPDATE STATISTICS TAAssignment;
+        
+        INSERT INTO AuditSink (UserID, Action, TableAffected, NewValue)
+        VALUES (@RequestingUserID, 'Generate Synthetic Data', 'Multiple',
+                CONCAT('Seed ', @Seed, ': ', @Students, ' students, ', @Courses, ' courses, ',
+                       @EnrollmentCount, ' enrollments, ', @AttendanceRows, ' attendance rows'));
+        
+        SELECT
+            'Success' AS Result,
+            @Seed AS Seed,
+            @Students AS Students,
+            @Courses AS Courses,
+            @EnrollmentCount AS Enrollments,
+            (SELECT COUNT_BIG(*) FROM Grades) AS GradesTotal,
+            (SELECT COUNT_BIG(*) FROM Attendance) AS AttendanceTotal,
+            DATEDIFF(SECOND, @Started, SYSDATETIME()) AS Seconds;
+    END TRY
+    BEGIN CATCH
+        IF @@TRANCOUNT > 0
+            ROLLBACK TRANSACTION;
+        
+        IF (SELECT COUNT(*) FROM sys.openkeys WHERE key_name = 'StudentRecordsKey') > 0
+            CLOSE SYMMETRIC KEY StudentRecordsKey;
+        
+        -- Never leave Grades or Attendance with disabled indexes behind
+        IF @DisableIndexes = 1
+        BEGIN
+            ALTER INDEX ALL ON Grades REBUILD;
+            ALTER INDEX ALL ON Attendance REBUILD;
+        END
+        
+        INSERT INTO AuditSink (UserID, Action, Success, ErrorMessage)
+        VALUES (@RequestingUserID, 'Generate Synthetic Data Failed', 0, ERROR_MESSAGE());
+        
+        SELECT 'Error' AS Result, ERROR_MESSAGE() AS ErrorMessage;
+    END CATCH
+END
+GO
+
+PRINT 'Synthetic data generator created successfully.';
+GO
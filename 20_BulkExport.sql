@@ -0,0 +1,243 @@
+-- ============================================
+-- Database Security Term Project
+-- Flow Control: Streaming Bulk Export
+-- ============================================
+-- Exports a course's grades or a term's attendance in one call.
+-- fn_CheckFlowControl is evaluated once per classification band present
+-- in the selection, not once per record. The export is all-or-nothing:
+-- one blocked band blocks the whole export. Allowed rows are returned as a
+-- single result set that the client reads in chunks (fetchmany) and writes
+-- to a file as they arrive, so neither side holds the whole export.
+-- Each call writes one summarized audit row instead of one per record,
+-- including plan-only calls and refused exports.
+-- Usage:
+--   -- Row counts per band and the flow decision, without exporting anything
+--   EXEC sp_BulkExport 'Grades', 3, NULL, NULL, 3, 1, 4, @PlanOnly = 1;
+--   -- Spring term attendance, every course, to a Top Secret destination
+--   EXEC sp_BulkExport 'Attendance', NULL, '2025-01-15', '2025-05-31', 4, 1, 4;
+
+USE SecureStudentRecords;
+GO
+
+-- SP: Bulk Export with per-band Flow Control (Instructor/Admin only)
+CREATE OR ALTER PROCEDURE sp_BulkExport
+    @TableName NVARCHAR(50), -- 'Grades' or 'Attendance'
+    @CourseID INT = NULL,
+    @FromDate DATE = NULL,
+    @ToDate DATE = NULL,
+    @DestinationClassification INT,
+    @RequestingUserID INT,
+    @RequestingUserClearance INT,
+    @PlanOnly BIT = 0 -- 1 = return the per-band plan only
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    BEGIN TRY
+        IF @TableName NOT IN ('Grades', 'Attendance')
+        BEGIN
+            RAISERROR('Invalid table name', 16, 1);
+            RETURN;
+        END
+        
+        -- RBAC Check
+        DECLARE @RequesterRole NVARCHAR(20), @RequesterInstructorID INT, @RequesterTACourses NVARCHAR(4000);
+        SELECT @RequesterRole = Role, @RequesterInstructorID = InstructorID, @RequesterTACourses = TACourses
+        FROM fn_SessionAuthContext(@RequestingUserID);
+        
+        IF @RequesterRole IS NULL
+            EXEC sp_ResolveAuthContext @RequestingUserID, @RequesterRole OUTPUT,
+                                       @RequesterInstructorID OUTPUT, @RequesterTACourses OUTPUT;
+        
+        IF @RequesterRole NOT IN ('Admin', 'Instructor')
+        BEGIN
+            RAISERROR('Access Denied: Only Instructors and Admins can export data', 16, 1);
+            RETURN;
+        END
+        
+        -- For Instructors: filter by their courses
+        DECLARE @InstructorID INT = CASE WHEN @RequesterRole = 'Instructor' THEN @RequesterInstructorID END;
+        
+        IF @RequesterRole = 'Instructor' AND @InstructorID IS NULL
+        BEGIN
+            RAISERROR('Instructor record not found', 16, 1);
+            RETURN;
+        END
+        
+        -- Inclusive date range, applied as a half-open range so it stays sargable
+        DECLARE @FromTime DATETIME = @FromDate;
+        DECLARE @ToTime DATETIME = DATEADD(DAY, 1, CAST(@ToDate AS DATETIME));
+        
+        -- Classification bands in the selection (rows without a level take the table default)
+        DECLARE @Bands TABLE (
+            ClassificationLevel INT PRIMARY KEY,
+            Records INT NOT NULL,
+            Allowed BIT NULL
+        );
+        
+        IF @TableName = 'Grades'
+            INSERT INTO @Bands (ClassificationLevel, Records)
+            SELECT ISNULL(g.ClassificationLevel, 3), COUNT(*)
+            FROM Grades g
+            INNER JOIN Course c ON g.CourseID = c.CourseID
+            WHERE (@CourseID IS NULL OR g.CourseID = @CourseID)
+            AND (@FromTime IS NULL OR g.DateEntered >= @FromTime)
+            AND (@ToTime IS NULL OR g.DateEntered < @ToTime)
+            AND (@RequesterRole = 'Admin' OR c.InstructorID = @InstructorID)
+            GROUP BY ISNULL(g.ClassificationLevel, 3)
+            OPTION (RECOMPILE);
+        ELSE
+            INSERT INTO @Bands (ClassificationLevel, Records)
+            SELECT ISNULL(a.ClassificationLevel, 3), COUNT(*)
+            FROM Attendance a
+            INNER JOIN Course c ON a.CourseID = c.CourseID
+            WHERE (@CourseID IS NULL OR a.CourseID = @CourseID)
+            AND (@FromTime IS NULL OR a.DateRecorded >= @FromTime)
+            AND (@ToTime IS NULL OR a.DateRecorded < @ToTime)
+            AND (@RequesterRole = 'Admin' OR c.InstructorID = @InstructorID)
+            GROUP BY ISNULL(a.ClassificationLevel, 3)
+            OPTION (RECOMPILE);
+        
+        -- Check Flow Control: once per band
+        UPDATE @Bands
+        SET Allowed = dbo.fn_CheckFlowControl(ClassificationLevel, @DestinationClassification, @RequestingUserClearance);
+        
+        DECLARE @DestinationName NVARCHAR(20) = CASE @DestinationClassification
+            WHEN 4 THEN 'Top Secret'
+            WHEN 3 THEN 'Secret'
+            WHEN 2 THEN 'Confidential'
+            WHEN 1 THEN 'Unclassified'
+        END;
+        
+        -- One summary per band, e.g. 'Secret: 1200 records'
+        DECLARE @Blocked NVARCHAR(400), @Summary NVARCHAR(400);
+        SELECT
+            @Blocked = STRING_AGG(CASE WHEN Allowed = 0 THEN CONCAT(b.Name, ': ', Records, ' records') END, ', '),
+            @Summary = STRING_AGG(CONCAT(b.Name, ': ', Records, ' records'), ', ')
+        FROM @Bands
+        CROSS APPLY (SELECT CASE ClassificationLevel
+                                WHEN 4 THEN 'Top Secret'
+                                WHEN 3 THEN 'Secret'
+                                WHEN 2 THEN 'Confidential'
+                                WHEN 1 THEN 'Unclassified'
+                            END AS Name) b;
+        
+        -- The plan reveals record counts per band, so it is audited like the export
+        IF @PlanOnly = 1
+        BEGIN
+            INSERT INTO AuditSink (UserID, Action, TableAffected, RecordID, NewValue)
+            VALUES (@RequestingUserID, 'Bulk Export Planned', @TableName, @CourseID,
+                    CONCAT('Plan for ', ISNULL(@DestinationName, 'unknown'), ' destination (',
+                           ISNULL(@Summary, 'no records'), ')'));
+            
+            SELECT
+                ClassificationLevel,
+                CASE ClassificationLevel
+                    WHEN 4 THEN 'Top Secret'
+                    WHEN 3 THEN 'Secret'
+                    WHEN 2 THEN 'Confidential'
+                    WHEN 1 THEN 'Unclassified'
+                END AS Classification,
+                Records,
+                Allowed
+            FROM @Bands
+            ORDER BY ClassificationLevel;
+            RETURN;
+        END
+        
+        IF @Blocked IS NOT NULL
+        BEGIN
+            DECLARE @ErrorMsg NVARCHAR(600) = 'Flow Control Violation: Cannot export ' + @Blocked +
+                ' to ' + ISNULL(@DestinationName, 'unknown') + ' destination';
+            
+            -- Audit log (one row for the whole export). The error row is returned
+            -- here rather than raised, so CATCH does not audit the refusal again
+            INSERT INTO AuditSink (UserID, Action, Success, ErrorMessage, TableAffected, RecordID)
+            VALUES (@RequestingUserID, 'Bulk Export Blocked', 0, @ErrorMsg, @TableName, @CourseID);
+            
+            SELECT 'Error' AS Result, @ErrorMsg AS ErrorMessage;
+            RETURN;
+        END
+        
+        DECLARE @Exported INT;
+        
+        IF @TableName = 'Grades'
+        BEGIN
+            -- Open symmetric key for decryption
+            OPEN SYMMETRIC KEY StudentRecordsKey
+            DECRYPTION BY CERTIFICATE StudentRecordsCert;
+            
+            -- Clustered-key order: rows go out as they are read, no sort to spool
+            SELECT
+                g.GradeID,
+                d.StudentID,
+                s.FullName AS StudentName,
+                g.CourseID,
+                c.CourseName,
+                CAST(CAST(DecryptByKey(g.GradeValueEncrypted) AS VARCHAR(10)) AS DECIMAL(5,2)) AS GradeValue,
+                g.DateEntered,
+                i.FullName AS EnteredBy
+            FROM Grades g
+            INNER JOIN Course c ON g.CourseID = c.CourseID
+            INNER JOIN Instructor i ON g.EnteredByInstructorID = i.InstructorID
+            CROSS APPLY (SELECT CAST(CAST(DecryptByKey(g.StudentIDEncrypted) AS VARCHAR(10)) AS INT) AS StudentID) d
+            LEFT JOIN Student s ON s.StudentID = d.StudentID
+            WHERE (@CourseID IS NULL OR g.CourseID = @CourseID)
+            AND (@FromTime IS NULL OR g.DateEntered >= @FromTime)
+            AND (@ToTime IS NULL OR g.DateEntered < @ToTime)
+            AND (@RequesterRole = 'Admin' OR c.InstructorID = @InstructorID)
+            ORDER BY g.GradeID
+            OPTION (RECOMPILE);
+            
+            SET @Exported = @@ROWCOUNT;
+            
+            CLOSE SYMMETRIC KEY StudentRecordsKey;
+        END
+        ELSE
+        BEGIN
+            SELECT
+                a.AttendanceID,
+                a.StudentID,
+                s.FullName AS StudentName,
+                a.CourseID,
+                c.CourseName,
+                a.Status,
+                a.DateRecorded
+            FROM Attendance a
+            INNER JOIN Student s ON a.StudentID = s.StudentID
+            INNER JOIN Course c ON a.CourseID = c.CourseID
+            WHERE (@CourseID IS NULL OR a.CourseID = @CourseID)
+            AND (@FromTime IS NULL OR a.DateRecorded >= @FromTime)
+            AND (@ToTime IS NULL OR a.DateRecorded < @ToTime)
+            AND (@RequesterRole = 'Admin' OR c.InstructorID = @InstructorID)
+            ORDER BY a.AttendanceID
+            OPTION (RECOMPILE);
+            
+            SET @Exported = @@ROWCOUNT;
+        END
+        
+        -- Audit log (one row for the whole export)
+        INSERT INTO AuditSink (UserID, Action, TableAffected, RecordID, NewValue)
+        VALUES (@RequestingUserID, 'Bulk Export Allowed', @TableName, @CourseID,
+                CONCAT(@Exported, ' records exported to ', @DestinationName, ' destination',
+                       ' (', ISNULL(@Summary, 'no records'), ')',
+                       CASE WHEN @FromDate IS NOT NULL OR @ToDate IS NOT NULL
+                            THEN CONCAT('; dates ', ISNULL(CONVERT(VARCHAR(10), @FromDate, 23), '...'),
+                                        ' to ', ISNULL(CONVERT(VARCHAR(10), @ToDate, 23), '...'))
+                       END));
+    
+    END TRY
+    BEGIN CATCH
+        IF (SELECT COUNT(*) FROM sys.openkeys WHERE key_name = 'StudentRecordsKey') > 0
+            CLOSE SYMMETRIC KEY StudentRecordsKey;
+        
+        INSERT INTO AuditSink (UserID, Action, Success, ErrorMessage, TableAffected, RecordID)
+        VALUES (@RequestingUserID, 'Bulk Export Failed', 0, ERROR_MESSAGE(), @TableName, @CourseID);
+        
+        SELECT 'Error' AS Result, ERROR_MESSAGE() AS ErrorMessage;
+    END CATCH
+END
+GO
+
+PRINT 'Bulk export procedure created successfully.';
+GO
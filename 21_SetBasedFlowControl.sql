@@ -0,0 +1,371 @@
+-- ============================================
+-- Database Security Term Project
+-- Performance: Set-Based Flow Control
+-- ============================================
+-- Multi-record versions of sp_ValidateDataFlow, sp_CanExportData and
+-- sp_TransferDataWithFlowControl. Each takes a RecordIDList table-valued
+-- parameter and returns one allow/deny row per record from a single query.
+-- The checks are inline table-valued functions and CASE expressions instead
+-- of the scalar dbo.fn_CheckFlowControl. Scalar UDFs run once per row and
+-- (before SQL Server 2019 inlining) force a serial plan; inline functions
+-- are expanded into the calling query, so the plan can go parallel.
+-- The single-record procedures in 08_FlowControl.sql are unchanged.
+-- Usage:
+--   DECLARE @Ids RecordIDList;
+--   INSERT INTO @Ids (RecordID) SELECT GradeID FROM Grades WHERE CourseID = 1;
+--   EXEC sp_ValidateDataFlowSet 'Grades', @Ids, 3, 3, 'Export';
+--   EXEC sp_BenchmarkFlowValidation @Records = 100000;
+
+USE SecureStudentRecords;
+GO
+
+-- ============================================
+-- TABLE TYPES
+-- ============================================
+
+IF TYPE_ID('RecordIDList') IS NULL
+    CREATE TYPE RecordIDList AS TABLE (
+        RecordID INT NOT NULL PRIMARY KEY
+    );
+GO
+
+-- ============================================
+-- INLINE FUNCTIONS
+-- ============================================
+
+-- fn_RecordClassification: ClassificationLevel of one record (no row if it does not exist)
+-- Only the branch for @TableName runs; the others are removed by startup filters
+CREATE OR ALTER FUNCTION fn_RecordClassification (@TableName NVARCHAR(50), @RecordID INT)
+RETURNS TABLE
+AS
+RETURN
+    SELECT ClassificationLevel FROM Student WHERE @TableName = 'Student' AND StudentID = @RecordID
+    UNION ALL
+    SELECT ClassificationLevel FROM Grades WHERE @TableName = 'Grades' AND GradeID = @RecordID
+    UNION ALL
+    SELECT ClassificationLevel FROM Attendance WHERE @TableName = 'Attendance' AND AttendanceID = @RecordID
+    UNION ALL
+    SELECT ClassificationLevel FROM Instructor WHERE @TableName = 'Instructor' AND InstructorID = @RecordID
+GO
+
+-- fn_FlowControlDecision: the fn_CheckFlowControl rules as an inline TVF, with the first failing rule
+CREATE OR ALTER FUNCTION fn_FlowControlDecision
+(
+    @SourceClassification INT,
+    @DestinationClassification INT,
+    @UserClearance INT
+)
+RETURNS TABLE
+AS
+RETURN
+    SELECT
+        CAST(CASE
+            WHEN @SourceClassification > @UserClearance THEN 0
+            WHEN @DestinationClassification < @UserClearance THEN 0
+            WHEN @SourceClassification > @DestinationClassification THEN 0
+            ELSE 1
+        END AS BIT) AS Allowed,
+        CASE
+            -- Bell-LaPadula No Read Up
+            WHEN @SourceClassification > @UserClearance
+                THEN 'MLS Violation: No Read Up - Cannot read data with higher classification'
+            -- Bell-LaPadula No Write Down
+            WHEN @DestinationClassification < @UserClearance
+                THEN 'MLS Violation: No Write Down - Cannot write to lower classification'
+            -- Flow Control: no flow from high to low
+            WHEN @SourceClassification > @DestinationClassification
+                THEN 'Flow Control Violation: Data cannot flow from high to low classification'
+            ELSE ''
+        END AS ViolationReason
+GO
+
+-- ============================================
+-- SET-BASED PROCEDURES
+-- ============================================
+
+-- SP: Validate Data Flow for many records of one table
+CREATE OR ALTER PROCEDURE sp_ValidateDataFlowSet
+    @TableName NVARCHAR(50),
+    @Records RecordIDList READONLY,
+    @DestinationClassification INT,
+    @UserClearance INT,
+    @Operation NVARCHAR(50)
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    BEGIN TRY
+        IF @TableName NOT IN ('Student', 'Grades', 'Attendance', 'Instructor')
+        BEGIN
+            RAISERROR('Invalid table name', 16, 1);
+            RETURN;
+        END
+        
+        SELECT
+            r.RecordID,
+            CASE WHEN c.ClassificationLevel IS NULL THEN CAST(0 AS BIT) ELSE d.Allowed END AS IsAllowed,
+            CASE WHEN c.ClassificationLevel IS NULL THEN 'Record not found' ELSE d.ViolationReason END AS ViolationReason,
+            c.ClassificationLevel AS SourceLevel,
+            @DestinationClassification AS DestinationLevel,
+            @UserClearance AS UserClearance,
+            @Operation AS Operation
+        FROM @Records r
+        OUTER APPLY fn_RecordClassification(@TableName, r.RecordID) c
+        OUTER APPLY fn_FlowControlDecision(c.ClassificationLevel, @DestinationClassification, @UserClearance) d
+        ORDER BY r.RecordID
+        OPTION (RECOMPILE); -- Estimate from the real number of records, not one
+    
+    END TRY
+    BEGIN CATCH
+        SELECT 'Error' AS Result, ERROR_MESSAGE() AS ErrorMessage;
+    END CATCH
+END
+GO
+
+-- SP: Check whether many records may be exported (Print/Copy/Download/Export)
+CREATE OR ALTER PROCEDURE sp_CanExportDataSet
+    @TableName NVARCHAR(50),
+    @Records RecordIDList READONLY,
+    @RequestingUserID INT,
+    @RequestingUserClearance INT,
+    @ExportType NVARCHAR(20) -- 'Print', 'Copy', 'Download', 'Export'
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    BEGIN TRY
+        IF @TableName NOT IN ('Student', 'Grades', 'Attendance', 'Instructor')
+        BEGIN
+            RAISERROR('Invalid table name', 16, 1);
+            RETURN;
+        END
+        
+        -- Same rules and order as sp_CanExportData, one row per record
+        CREATE TABLE #Decisions (
+            RecordID INT PRIMARY KEY,
+            Classification INT NULL,
+            CanExport BIT NOT NULL,
+            Reason NVARCHAR(100) NOT NULL,
+            AuditMessage NVARCHAR(100) NULL
+        );
+        
+        INSERT INTO #Decisions (RecordID, Classification, CanExport, Reason, AuditMessage)
+        SELECT
+            r.RecordID,
+            c.ClassificationLevel,
+            CASE
+                WHEN c.ClassificationLevel IS NULL THEN 0
+                WHEN c.ClassificationLevel >= 3 THEN 0
+                WHEN @RequestingUserClearance < c.ClassificationLevel THEN 0
+                ELSE 1
+            END,
+            CASE
+                WHEN c.ClassificationLevel IS NULL THEN 'Record not found'
+                WHEN c.ClassificationLevel >= 3 THEN 'Flow Control: Export of Secret/Top Secret data is prohibited'
+                WHEN @RequestingUserClearance < c.ClassificationLevel THEN 'MLS: Insufficient clearance level'
+                ELSE 'Export permitted'
+            END,
+            CASE
+                WHEN c.ClassificationLevel >= 3 THEN 'Flow Control: Cannot export Secret/Top Secret data'
+                WHEN @RequestingUserClearance < c.ClassificationLevel THEN 'MLS: Insufficient clearance'
+            END
+        FROM @Records r
+        OUTER APPLY fn_RecordClassification(@TableName, r.RecordID) c
+        OPTION (RECOMPILE);
+        
+        -- Audit every blocked record, in one statement
+        INSERT INTO AuditSink (UserID, Action, Success, ErrorMessage, TableAffected, RecordID)
+        SELECT @RequestingUserID, @ExportType + ' Blocked', 0, AuditMessage, @TableName, RecordID
+        FROM #Decisions
+        WHERE AuditMessage IS NOT NULL;
+        
+        SELECT
+            RecordID,
+            CASE WHEN CanExport = 1 THEN 'Allowed' ELSE 'Denied' END AS Result,
+            CanExport,
+            Reason,
+            Classification
+        FROM #Decisions
+        ORDER BY RecordID;
+    
+    END TRY
+    BEGIN CATCH
+        SELECT 'Error' AS Result, ERROR_MESSAGE() AS ErrorMessage;
+    END CATCH
+END
+GO
+
+-- SP: Transfer many records between classifications (Flow Control)
+CREATE OR ALTER PROCEDURE sp_TransferDataWithFlowControlSet
+    @SourceTable NVARCHAR(50),
+    @Records RecordIDList READONLY,
+    @DestinationTable NVARCHAR(50),
+    @RequestingUserID INT,
+    @RequestingUserClearance INT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    BEGIN TRY
+        IF @SourceTable NOT IN ('Student', 'Grades', 'Attendance')
+        BEGIN
+            RAISERROR('Invalid table name', 16, 1);
+            RETURN;
+        END
+        
+        -- Determine destination classification (default for table type)
+        DECLARE @DestinationClassification INT = CASE
+            WHEN @DestinationTable = 'Student' THEN 2 -- Confidential
+            WHEN @DestinationTable IN ('Grades', 'Attendance') THEN 3 -- Secret
+            WHEN @DestinationTable = 'Course' THEN 1 -- Unclassified
+        END;
+        
+        IF @DestinationClassification IS NULL
+        BEGIN
+            RAISERROR('Invalid destination table', 16, 1);
+            RETURN;
+        END
+        
+        -- Same checks and order as sp_TransferDataWithFlowControl, one row per record
+        CREATE TABLE #Decisions (
+            RecordID INT PRIMARY KEY,
+            SourceLevel INT NULL,
+            Allowed BIT NOT NULL,
+            Reason NVARCHAR(200) NOT NULL,
+            FlowViolation BIT NOT NULL
+        );
+        
+        INSERT INTO #Decisions (RecordID, SourceLevel, Allowed, Reason, FlowViolation)
+        SELECT
+            r.RecordID,
+            c.ClassificationLevel,
+            CASE
+                WHEN c.ClassificationLevel IS NULL THEN 0
+                WHEN c.ClassificationLevel > @DestinationClassification THEN 0
+                WHEN @RequestingUserClearance > @DestinationClassification THEN 0
+                ELSE 1
+            END,
+            CASE
+                WHEN c.ClassificationLevel IS NULL THEN 'Record not found'
+                WHEN c.ClassificationLevel > @DestinationClassification THEN
+                    'Flow Control Violation: Cannot transfer data from higher classification (' +
+                    CAST(c.ClassificationLevel AS VARCHAR) + ') to lower classification (' +
+                    CAST(@DestinationClassification AS VARCHAR) + ')'
+                WHEN @RequestingUserClearance > @DestinationClassification THEN
+                    'MLS Violation: Cannot write down to lower classification'
+                ELSE 'Data transfer allowed'
+            END,
+            CASE WHEN c.ClassificationLevel > @DestinationClassification THEN 1 ELSE 0 END
+        FROM @Records r
+        OUTER APPLY fn_RecordClassification(@SourceTable, r.RecordID) c
+        OPTION (RECOMPILE);
+        
+        -- Audit log: blocked flows and allowed transfers, in one statement
+        INSERT INTO AuditSink (UserID, Action, Success, ErrorMessage, TableAffected, RecordID)
+        SELECT
+            @RequestingUserID,
+            CASE WHEN FlowViolation = 1 THEN 'Data Transfer Blocked' ELSE 'Data Transfer Allowed' END,
+            CASE WHEN FlowViolation = 1 THEN 0 ELSE 1 END,
+            CASE WHEN FlowViolation = 1 THEN Reason END,
+            @SourceTable + ' -> ' + @DestinationTable,
+            RecordID
+        FROM #Decisions
+        WHERE FlowViolation = 1 OR Allowed = 1;
+        
+        SELECT
+            RecordID,
+            CASE WHEN Allowed = 1 THEN 'Success' ELSE 'Denied' END AS Result,
+            Allowed,
+            Reason,
+            SourceLevel,
+            @DestinationClassification AS DestinationLevel
+        FROM #Decisions
+        ORDER BY RecordID;
+    
+    END TRY
+    BEGIN CATCH
+        SELECT 'Error' AS Result, ERROR_MESSAGE() AS ErrorMessage;
+    END CATCH
+END
+GO
+
+-- ============================================
+-- MICRO-BENCHMARK
+-- ============================================
+
+-- SP: Per-record vs set-based flow validation over @Records attendance rows
+-- Runs inside one request, so round trips are excluded: only the evaluation cost is measured.
+-- Load 19_SyntheticData.sql first for a full 100k-record run.
+CREATE OR ALTER PROCEDURE sp_BenchmarkFlowValidation
+    @Records INT = 100000,
+    @DestinationClassification INT = 3,
+    @UserClearance INT = 3
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    DECLARE @i INT, @Count INT, @Started DATETIME2, @Reads BIGINT, @Allowed INT, @Source INT;
+    DECLARE @Results TABLE (Method NVARCHAR(40), Records INT, Allowed INT, TotalMs INT, MicrosecondsPerRecord DECIMAL(10,3), LogicalReads BIGINT);
+    
+    CREATE TABLE #Ids (Seq INT IDENTITY(1,1) PRIMARY KEY, RecordID INT NOT NULL);
+    INSERT INTO #Ids (RecordID)
+    SELECT TOP (@Records) AttendanceID FROM Attendance ORDER BY AttendanceID;
+    SET @Count = @@ROWCOUNT;
+    
+    IF @Count < @Records
+        PRINT CONCAT('Only ', @Count, ' attendance rows available; load 19_SyntheticData.sql for a full run.');
+    IF @Count = 0
+        RETURN;
+    
+    DECLARE @List RecordIDList;
+    INSERT INTO @List (RecordID) SELECT RecordID FROM #Ids;
+    
+    -- 1. One record at a time through the scalar UDF, as the single-record procedures do
+    SELECT @i = 1, @Allowed = 0, @Started = SYSDATETIME(),
+           @Reads = (SELECT logical_reads FROM sys.dm_exec_requests WHERE session_id = @@SPID);
+    WHILE @i <= @Count
+    BEGIN
+        SELECT @Source = a.ClassificationLevel
+        FROM #Ids i
+        INNER JOIN Attendance a ON a.AttendanceID = i.RecordID
+        WHERE i.Seq = @i;
+        IF dbo.fn_CheckFlowControl(@Source, @DestinationClassification, @UserClearance) = 1
+            SET @Allowed += 1;
+        SET @i += 1;
+    END
+    INSERT INTO @Results
+    SELECT 'Per record, scalar UDF', @Count, @Allowed, DATEDIFF(MILLISECOND, @Started, SYSDATETIME()),
+           DATEDIFF(MICROSECOND, @Started, SYSDATETIME()) * 1.0 / @Count,
+           (SELECT logical_reads FROM sys.dm_exec_requests WHERE session_id = @@SPID) - @Reads;
+    
+    -- 2. One query, still calling the scalar UDF per row
+    SELECT @Started = SYSDATETIME(),
+           @Reads = (SELECT logical_reads FROM sys.dm_exec_requests WHERE session_id = @@SPID);
+    SELECT @Allowed = SUM(CAST(dbo.fn_CheckFlowControl(a.ClassificationLevel, @DestinationClassification, @UserClearance) AS INT))
+    FROM @List r
+    INNER JOIN Attendance a ON a.AttendanceID = r.RecordID
+    OPTION (RECOMPILE);
+    INSERT INTO @Results
+    SELECT 'Set-based, scalar UDF', @Count, @Allowed, DATEDIFF(MILLISECOND, @Started, SYSDATETIME()),
+           DATEDIFF(MICROSECOND, @Started, SYSDATETIME()) * 1.0 / @Count,
+           (SELECT logical_reads FROM sys.dm_exec_requests WHERE session_id = @@SPID) - @Reads;
+    
+    -- 3. One query through the inline TVFs (what sp_ValidateDataFlowSet runs)
+    SELECT @Started = SYSDATETIME(),
+           @Reads = (SELECT logical_reads FROM sys.dm_exec_requests WHERE session_id = @@SPID);
+    SELECT @Allowed = SUM(CAST(d.Allowed AS INT))
+    FROM @List r
+    CROSS APPLY fn_RecordClassification('Attendance', r.RecordID) c
+    CROSS APPLY fn_FlowControlDecision(c.ClassificationLevel, @DestinationClassification, @UserClearance) d
+    OPTION (RECOMPILE);
+    INSERT INTO @Results
+    SELECT 'Set-based, inline TVF', @Count, @Allowed, DATEDIFF(MILLISECOND, @Started, SYSDATETIME()),
+           DATEDIFF(MICROSECOND, @Started, SYSDATETIME()) * 1.0 / @Count,
+           (SELECT logical_reads FROM sys.dm_exec_requests WHERE session_id = @@SPID) - @Reads;
+    
+    SELECT * FROM @Results;
+END
+GO
+
+PRINT 'Set-based flow control procedures created successfully.';
+GO
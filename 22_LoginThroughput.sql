@@ -0,0 +1,350 @@
+-- ============================================
+-- Database Security Term Project
+-- Performance: Login Throughput
+-- ============================================
+-- sp_Login used to open StudentRecordsKey, decrypt the stored password and
+-- update Users.LastLogin on every attempt. This script upgrades an existing
+-- database to the hashed login path:
+--   * Users gains a salted PBKDF2-HMAC-SHA256 hash (fn_PasswordHash), stored
+--     as its SHA2_256. Accounts keep their encrypted password until their
+--     next successful login, when sp_Login replaces it with a hash; no key is
+--     opened after that.
+--   * The client derives the PBKDF2 key itself from sp_GetLoginSalt's salt, so
+--     a login costs the server one HASHBYTES instead of the PBKDF2 loop.
+--   * LoginThrottle rejects a locked-out username with one index seek.
+--   * LoginActivityQueue takes the LastLogin write; sp_FlushLoginActivity
+--     applies queued logins to Users in batches.
+-- Safe to re-run: every step checks whether it has already been applied.
+-- After this script, re-run 05_StoredProcedures_Part1.sql to deploy the new
+-- sp_RegisterUser, sp_RecordLoginFailure, sp_GetLoginSalt and sp_Login.
+-- Usage:
+--   EXEC sp_BenchmarkPasswordHash @Iterations = 2000;   -- ms per server-side hash at a candidate cost
+--   EXEC sp_SetPasswordPolicy @HashIterations = 2000, @RequestingUserID = 1;
+--   EXEC sp_FlushLoginActivity;                         -- normally run by the Agent job below
+--   EXEC sp_GetLoginThroughputStatus;
+
+USE SecureStudentRecords;
+GO
+
+-- ============================================
+-- SCHEMA
+-- ============================================
+
+IF COL_LENGTH('Users', 'PasswordHash') IS NULL
+    ALTER TABLE Users ADD
+        PasswordHash BINARY(32) NULL,
+        PasswordSalt BINARY(16) NULL,
+        PasswordIterations INT NULL;
+GO
+
+-- Upgraded accounts no longer store an encrypted password
+IF EXISTS (SELECT 1 FROM sys.columns
+           WHERE object_id = OBJECT_ID('Users') AND name = 'PasswordEncrypted' AND is_nullable = 0)
+    ALTER TABLE Users ALTER COLUMN PasswordEncrypted VARBINARY(MAX) NULL;
+GO
+
+IF OBJECT_ID('PasswordPolicy', 'U') IS NULL
+BEGIN
+    CREATE TABLE PasswordPolicy (
+        PolicyID INT PRIMARY KEY DEFAULT 1 CHECK (PolicyID = 1),
+        HashIterations INT NOT NULL DEFAULT 2000 CHECK (HashIterations >= 1),
+        MaxFailedAttempts INT NOT NULL DEFAULT 5,
+        FailureWindowSeconds INT NOT NULL DEFAULT 900,
+        LockoutSeconds INT NOT NULL DEFAULT 300,
+        DecoySaltKey BINARY(32) NOT NULL DEFAULT CRYPT_GEN_RANDOM(32)
+    );
+END
+GO
+
+IF COL_LENGTH('PasswordPolicy', 'DecoySaltKey') IS NULL
+    ALTER TABLE PasswordPolicy ADD DecoySaltKey BINARY(32) NOT NULL DEFAULT CRYPT_GEN_RANDOM(32);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM PasswordPolicy)
+    INSERT INTO PasswordPolicy DEFAULT VALUES;
+GO
+
+IF OBJECT_ID('LoginThrottle', 'U') IS NULL
+BEGIN
+    CREATE TABLE LoginThrottle (
+        Username NVARCHAR(50) PRIMARY KEY,
+        FailedCount INT NOT NULL,
+        WindowStart DATETIME NOT NULL,
+        LockedUntil DATETIME NULL
+    );
+END
+GO
+
+IF OBJECT_ID('LoginActivityQueue', 'U') IS NULL
+BEGIN
+    CREATE TABLE LoginActivityQueue (
+        QueueID BIGINT IDENTITY(1,1) NOT NULL,
+        Lane TINYINT NOT NULL DEFAULT (@@SPID % 16),
+        UserID INT NOT NULL,
+        LoginTime DATETIME NOT NULL DEFAULT GETDATE(),
+        CONSTRAINT PK_LoginActivityQueue PRIMARY KEY CLUSTERED (Lane, QueueID)
+    );
+END
+GO
+
+-- Function: PBKDF2-HMAC-SHA256 password hash (as in 02_Tables.sql)
+CREATE OR ALTER FUNCTION fn_PasswordHash (
+    @Password NVARCHAR(100),
+    @Salt BINARY(16),
+    @Iterations INT
+)
+RETURNS BINARY(32)
+AS
+BEGIN
+    -- HMAC keys longer than the 64-byte block are hashed first
+    DECLARE @Key VARBINARY(200) = CAST(@Password AS VARBINARY(200));
+    IF DATALENGTH(@Key) > 64
+        SET @Key = HASHBYTES('SHA2_256', @Key);
+    
+    DECLARE @IPad VARBINARY(64), @OPad VARBINARY(64);
+    SELECT @IPad = IPad, @OPad = OPad FROM fn_HmacPads(CAST(@Key AS BINARY(64)));
+    
+    -- U1 = HMAC(password, salt || INT(1)); the result is U1 ^ U2 ^ ... ^ Un
+    DECLARE @U BINARY(32) = HASHBYTES('SHA2_256', @OPad + HASHBYTES('SHA2_256', @IPad + @Salt + 0x00000001));
+    DECLARE @Part1 BIGINT = CAST(SUBSTRING(@U, 1, 8) AS BIGINT),
+            @Part2 BIGINT = CAST(SUBSTRING(@U, 9, 8) AS BIGINT),
+            @Part3 BIGINT = CAST(SUBSTRING(@U, 17, 8) AS BIGINT),
+            @Part4 BIGINT = CAST(SUBSTRING(@U, 25, 8) AS BIGINT);
+    DECLARE @Round INT = 1;
+    
+    WHILE @Round < @Iterations
+    BEGIN
+        SET @U = HASHBYTES('SHA2_256', @OPad + HASHBYTES('SHA2_256', @IPad + @U));
+        SET @Part1 ^= CAST(SUBSTRING(@U, 1, 8) AS BIGINT);
+        SET @Part2 ^= CAST(SUBSTRING(@U, 9, 8) AS BIGINT);
+        SET @Part3 ^= CAST(SUBSTRING(@U, 17, 8) AS BIGINT);
+        SET @Part4 ^= CAST(SUBSTRING(@U, 25, 8) AS BIGINT);
+        SET @Round += 1;
+    END
+    
+    RETURN CAST(@Part1 AS BINARY(8)) + CAST(@Part2 AS BINARY(8)) +
+           CAST(@Part3 AS BINARY(8)) + CAST(@Part4 AS BINARY(8));
+END
+GO
+
+-- ============================================
+-- LAST LOGIN FLUSH
+-- ============================================
+
+-- SP: Apply queued logins to Users.LastLogin in batches
+CREATE OR ALTER PROCEDURE sp_FlushLoginActivity
+    @BatchSize INT = 5000,
+    @MaxBatches INT = 200
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    DECLARE @Flushed INT = 0, @Batches INT = 0, @BatchRows INT = 1;
+    DECLARE @Batch TABLE (UserID INT NOT NULL, LoginTime DATETIME NOT NULL);
+    
+    -- One flusher at a time; an overlapping run returns immediately
+    DECLARE @LockResult INT;
+    EXEC @LockResult = sp_getapplock @Resource = 'LoginActivityFlush', @LockMode = 'Exclusive',
+                                     @LockOwner = 'Session', @LockTimeout = 0;
+    IF @LockResult < 0
+    BEGIN
+        SELECT 'Skipped' AS Result, 0 AS LoginsFlushed, 0 AS Batches;
+        RETURN;
+    END
+    
+    BEGIN TRY
+        WHILE @BatchRows > 0 AND @Batches < @MaxBatches
+        BEGIN
+            DELETE FROM @Batch;
+            
+            -- Dequeue and update commit together; READPAST skips in-flight logins
+            BEGIN TRANSACTION;
+            
+            DELETE TOP (@BatchSize) FROM LoginActivityQueue WITH (READPAST)
+            OUTPUT deleted.UserID, deleted.LoginTime INTO @Batch (UserID, LoginTime);
+            
+            SET @BatchRows = @@ROWCOUNT;
+            
+            -- One update per user, however many times they logged in
+            UPDATE u
+            SET LastLogin = b.LoginTime
+            FROM Users u
+            INNER JOIN (SELECT UserID, MAX(LoginTime) AS LoginTime
+                        FROM @Batch
+                        GROUP BY UserID) b ON u.UserID = b.UserID
+            WHERE u.LastLogin IS NULL OR u.LastLogin < b.LoginTime;
+            
+            COMMIT TRANSACTION;
+            
+            SET @Flushed += @BatchRows;
+            IF @BatchRows > 0
+                SET @Batches += 1;
+        END
+        
+        EXEC sp_releaseapplock @Resource = 'LoginActivityFlush', @LockOwner = 'Session';
+        
+        SELECT 'Success' AS Result, @Flushed AS LoginsFlushed, @Batches AS Batches;
+    END TRY
+    BEGIN CATCH
+        IF @@TRANCOUNT > 0
+            ROLLBACK TRANSACTION;
+        
+        EXEC sp_releaseapplock @Resource = 'LoginActivityFlush', @LockOwner = 'Session';
+        
+        SELECT 'Error' AS Result, ERROR_MESSAGE() AS ErrorMessage;
+    END CATCH
+END
+GO
+
+-- SP: Remove throttle rows whose window and lockout have both expired
+CREATE OR ALTER PROCEDURE sp_PurgeLoginThrottle
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    DECLARE @WindowOpened DATETIME = DATEADD(SECOND, -(SELECT FailureWindowSeconds FROM PasswordPolicy), GETDATE());
+    
+    DELETE FROM LoginThrottle
+    WHERE WindowStart < @WindowOpened
+    AND (LockedUntil IS NULL OR LockedUntil < GETDATE());
+    
+    DECLARE @Purged INT = @@ROWCOUNT;
+    
+    SELECT 'Success' AS Result, @Purged AS RowsPurged;
+END
+GO
+
+-- ============================================
+-- POLICY AND STATUS
+-- ============================================
+
+-- SP: Change the hashing cost or throttle limits (Admin only)
+CREATE OR ALTER PROCEDURE sp_SetPasswordPolicy
+    @HashIterations INT = NULL,
+    @MaxFailedAttempts INT = NULL,
+    @FailureWindowSeconds INT = NULL,
+    @LockoutSeconds INT = NULL,
+    @RequestingUserID INT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    BEGIN TRY
+        -- RBAC Check
+        DECLARE @RequesterRole NVARCHAR(20), @RequesterInstructorID INT, @RequesterTACourses NVARCHAR(4000);
+        SELECT @RequesterRole = Role FROM fn_SessionAuthContext(@RequestingUserID);
+        
+        IF @RequesterRole IS NULL
+            EXEC sp_ResolveAuthContext @RequestingUserID, @RequesterRole OUTPUT,
+                                       @RequesterInstructorID OUTPUT, @RequesterTACourses OUTPUT;
+        
+        IF @RequesterRole IS NULL OR @RequesterRole != 'Admin'
+        BEGIN
+            RAISERROR('Access Denied: Only Admins can change the password policy', 16, 1);
+            RETURN;
+        END
+        
+        DECLARE @OldPolicy NVARCHAR(200) = (
+            SELECT CONCAT('Iterations=', HashIterations, '; MaxFailed=', MaxFailedAttempts,
+                          '; Window=', FailureWindowSeconds, 's; Lockout=', LockoutSeconds, 's')
+            FROM PasswordPolicy);
+        
+        UPDATE PasswordPolicy
+        SET HashIterations = ISNULL(@HashIterations, HashIterations),
+            MaxFailedAttempts = ISNULL(@MaxFailedAttempts, MaxFailedAttempts),
+            FailureWindowSeconds = ISNULL(@FailureWindowSeconds, FailureWindowSeconds),
+            LockoutSeconds = ISNULL(@LockoutSeconds, LockoutSeconds);
+        
+        DECLARE @NewPolicy NVARCHAR(200) = (
+            SELECT CONCAT('Iterations=', HashIterations, '; MaxFailed=', MaxFailedAttempts,
+                          '; Window=', FailureWindowSeconds, 's; Lockout=', LockoutSeconds, 's')
+            FROM PasswordPolicy);
+        
+        -- Audit log
+        INSERT INTO AuditSink (UserID, Action, TableAffected, OldValue, NewValue)
+        VALUES (@RequestingUserID, 'Password Policy Changed', 'PasswordPolicy', @OldPolicy, @NewPolicy);
+        
+        SELECT 'Success' AS Result, @NewPolicy AS Policy;
+    END TRY
+    BEGIN CATCH
+        INSERT INTO AuditSink (UserID, Action, Success, ErrorMessage, TableAffected)
+        VALUES (@RequestingUserID, 'Password Policy Change Failed', 0, ERROR_MESSAGE(), 'PasswordPolicy');
+        
+        SELECT 'Error' AS Result, ERROR_MESSAGE() AS ErrorMessage;
+    END CATCH
+END
+GO
+
+-- SP: Migration progress, throttle state and flush backlog
+CREATE OR ALTER PROCEDURE sp_GetLoginThroughputStatus
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    SELECT
+        p.HashIterations,
+        p.MaxFailedAttempts,
+        p.FailureWindowSeconds,
+        p.LockoutSeconds,
+        (SELECT COUNT(*) FROM Users WHERE PasswordHash IS NOT NULL) AS HashedAccounts,
+        (SELECT COUNT(*) FROM Users WHERE PasswordHash IS NULL) AS LegacyAccounts,
+        (SELECT COUNT(*) FROM Users WHERE PasswordIterations < p.HashIterations) AS AccountsBelowPolicy,
+        (SELECT COUNT(*) FROM LoginThrottle WHERE LockedUntil > GETDATE()) AS LockedUsernames,
+        (SELECT COUNT(*) FROM LoginActivityQueue) AS QueuedLogins,
+        (SELECT MIN(LoginTime) FROM LoginActivityQueue) AS OldestQueuedLogin
+    FROM PasswordPolicy p;
+END
+GO
+
+-- SP: Time fn_PasswordHash at a candidate iteration count
+-- The result is the server CPU each registration or hash upgrade spends;
+-- logins derive the key on the client and no longer pay it
+CREATE OR ALTER PROCEDURE sp_BenchmarkPasswordHash
+    @Iterations INT = 2000,
+    @Hashes INT = 20
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    DECLARE @Salt BINARY(16) = CRYPT_GEN_RANDOM(16);
+    DECLARE @Hash BINARY(32);
+    DECLARE @n INT = 0;
+    DECLARE @Start DATETIME2 = SYSDATETIME();
+    
+    WHILE @n < @Hashes
+    BEGIN
+        SET @Hash = dbo.fn_PasswordHash(CONCAT(N'Benchmark@', @n), @Salt, @Iterations);
+        SET @n += 1;
+    END
+    
+    DECLARE @ElapsedMs INT = DATEDIFF(MILLISECOND, @Start, SYSDATETIME());
+    
+    SELECT
+        @Iterations AS Iterations,
+        @Hashes AS Hashes,
+        CAST(@ElapsedMs * 1.0 / @Hashes AS DECIMAL(10,2)) AS MsPerHash,
+        CAST(@Hashes * 1000.0 / NULLIF(@ElapsedMs, 0) AS DECIMAL(10,1)) AS HashesPerSecPerCore;
+END
+GO
+
+-- ============================================
+-- FLUSH JOB (SQL Server Agent; not available on Express)
+-- On Express, run EXEC sp_FlushLoginActivity; from a scheduled task.
+-- ============================================
+
+IF SERVERPROPERTY('EngineEdition') <> 4
+    AND NOT EXISTS (SELECT 1 FROM msdb.dbo.sysjobs WHERE name = N'SRMS Login Activity Flush')
+BEGIN
+    EXEC msdb.dbo.sp_add_job @job_name = N'SRMS Login Activity Flush',
+        @description = N'Applies queued logins to Users.LastLogin and purges expired login throttle rows';
+    EXEC msdb.dbo.sp_add_jobstep @job_name = N'SRMS Login Activity Flush', @step_name = N'Flush',
+        @subsystem = N'TSQL', @database_name = N'SecureStudentRecords',
+        @command = N'EXEC sp_FlushLoginActivity; EXEC sp_PurgeLoginThrottle;';
+    EXEC msdb.dbo.sp_add_jobschedule @job_name = N'SRMS Login Activity Flush', @name = N'Every minute',
+        @freq_type = 4, @freq_interval = 1, @freq_subday_type = 4, @freq_subday_interval = 1;
+    EXEC msdb.dbo.sp_add_jobserver @job_name = N'SRMS Login Activity Flush';
+END
+GO
+
+PRINT 'Login throughput upgrade completed.';
+GO
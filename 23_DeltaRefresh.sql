@@ -0,0 +1,348 @@
+-- ============================================
+-- Database Security Term Project
+-- Performance: Incremental Delta Refresh
+-- ============================================
+-- The Grades, Attendance and Role Requests screens used to reload their whole
+-- result on every refresh. This script gives Grades, Attendance and
+-- RoleRequests a ROWVERSION column and adds "changes since" variants of the
+-- view procedures:
+--   * sp_ViewGradesSince, sp_ViewAttendanceSince and
+--     sp_ViewPendingRoleRequestsSince take the same parameters as their
+--     sp_View* counterparts plus @SinceVersion, and return the rows written
+--     after that version with a trailing RowVersion column.
+--   * @SinceVersion = NULL returns the full result, so one procedure serves
+--     both the first load and every poll after it.
+--   * Rows written by transactions that are still open are held back until
+--     they commit (MIN_ACTIVE_ROWVERSION), so the highest RowVersion a caller
+--     has received is always safe to pass as the next @SinceVersion. The
+--     watermark is taken before the first read, which keeps this true under
+--     the SNAPSHOT isolation of the GUI's read pool (24_ReadRouting.sql).
+--   * Role requests that have been approved or denied come back once with
+--     their new Status, so the caller can drop them from its pending list.
+--   * Polls that find nothing are not audited; every row returned still is.
+-- ROWVERSION does not see deleted rows. No procedure deletes grades,
+-- attendance or role requests; rows removed by hand, or hidden by a course
+-- changing instructor, disappear when the screen is next opened.
+-- Safe to re-run: every step checks whether it has already been applied.
+-- Usage:
+--   EXEC sp_ViewAttendanceSince NULL, NULL, 1, 4, NULL;                -- full load
+--   EXEC sp_ViewAttendanceSince NULL, NULL, 1, 4, 0x00000000000007D1;  -- changes after it
+--   EXEC sp_ViewPendingRoleRequestsSince 1, 0x00000000000007D1;
+
+USE SecureStudentRecords;
+GO
+
+-- ============================================
+-- SCHEMA
+-- ============================================
+
+IF COL_LENGTH('Grades', 'RowVersion') IS NULL
+    ALTER TABLE Grades ADD RowVersion ROWVERSION;
+GO
+
+IF COL_LENGTH('Attendance', 'RowVersion') IS NULL
+    ALTER TABLE Attendance ADD RowVersion ROWVERSION;
+GO
+
+IF COL_LENGTH('RoleRequests', 'RowVersion') IS NULL
+    ALTER TABLE RoleRequests ADD RowVersion ROWVERSION;
+GO
+
+-- A poll seeks the few rows above @SinceVersion instead of scanning the table
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Grades_RowVersion' AND object_id = OBJECT_ID('Grades'))
+    CREATE NONCLUSTERED INDEX IX_Grades_RowVersion ON Grades (RowVersion);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Attendance_RowVersion' AND object_id = OBJECT_ID('Attendance'))
+    CREATE NONCLUSTERED INDEX IX_Attendance_RowVersion ON Attendance (RowVersion);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_RoleRequests_RowVersion' AND object_id = OBJECT_ID('RoleRequests'))
+    CREATE NONCLUSTERED INDEX IX_RoleRequests_RowVersion ON RoleRequests (RowVersion);
+GO
+
+-- ============================================
+-- CHANGES-SINCE VIEWS
+-- ============================================
+
+-- SP: Grades written after @SinceVersion (RBAC and MLS as sp_ViewGrades)
+CREATE OR ALTER PROCEDURE sp_ViewGradesSince
+    @StudentID INT = NULL,
+    @CourseID INT = NULL,
+    @RequestingUserID INT,
+    @RequestingUserClearance INT,
+    @SinceVersion BINARY(8) = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    -- Versions at or above this belong to transactions that have not committed yet.
+    -- Taken before any table is read: under SNAPSHOT isolation the snapshot starts
+    -- at the first read, so every version below the watermark is visible to it
+    DECLARE @UpToVersion BINARY(8) = MIN_ACTIVE_ROWVERSION();
+    
+    BEGIN TRY
+        -- MLS Check: No Read Up (Level 3 - Secret)
+        IF @RequestingUserClearance < 3
+        BEGIN
+            RAISERROR('MLS Violation: Cannot read Secret level data', 16, 1);
+            RETURN;
+        END
+        
+        -- RBAC Check
+        DECLARE @RequesterRole NVARCHAR(20), @RequesterInstructorID INT, @RequesterTACourses NVARCHAR(4000);
+        SELECT @RequesterRole = Role, @RequesterInstructorID = InstructorID, @RequesterTACourses = TACourses
+        FROM fn_SessionAuthContext(@RequestingUserID);
+        
+        IF @RequesterRole IS NULL
+            EXEC sp_ResolveAuthContext @RequestingUserID, @RequesterRole OUTPUT,
+                                       @RequesterInstructorID OUTPUT, @RequesterTACourses OUTPUT;
+        
+        IF @RequesterRole NOT IN ('Admin', 'Instructor')
+        BEGIN
+            RAISERROR('Access Denied: Only Instructors and Admins can view all grades', 16, 1);
+            RETURN;
+        END
+        
+        DECLARE @InstructorID INT = CASE WHEN @RequesterRole = 'Instructor' THEN @RequesterInstructorID END;
+        
+        OPEN SYMMETRIC KEY StudentRecordsKey
+        DECRYPTION BY CERTIFICATE StudentRecordsCert;
+        
+        DECLARE @StudentBlindIndex BINARY(32);
+        IF @StudentID IS NOT NULL
+            SELECT @StudentBlindIndex = HASHBYTES('SHA2_256', OPad + HASHBYTES('SHA2_256', IPad + CAST(@StudentID AS BINARY(4))))
+            FROM fn_BlindIndexPads('GradesStudentID');
+        
+        -- Only changed rows are decrypted
+        SELECT
+            g.GradeID,
+            d.StudentID,
+            s.FullName AS StudentName,
+            g.CourseID,
+            c.CourseName,
+            CAST(CAST(DecryptByKey(g.GradeValueEncrypted) AS VARCHAR(10)) AS DECIMAL(5,2)) AS GradeValue,
+            g.DateEntered,
+            i.FullName AS EnteredBy,
+            g.RowVersion
+        FROM Grades g
+        INNER JOIN Course c ON g.CourseID = c.CourseID
+        INNER JOIN Instructor i ON g.EnteredByInstructorID = i.InstructorID
+        CROSS APPLY (SELECT CAST(CAST(DecryptByKey(g.StudentIDEncrypted) AS VARCHAR(10)) AS INT) AS StudentID) d
+        LEFT JOIN Student s ON s.StudentID = d.StudentID
+        WHERE
+            (@SinceVersion IS NULL OR g.RowVersion > @SinceVersion)
+            AND g.RowVersion < @UpToVersion
+            AND (@StudentID IS NULL OR g.StudentIDBlindIndex = @StudentBlindIndex)
+            AND (@CourseID IS NULL OR g.CourseID = @CourseID)
+            AND (@RequesterRole = 'Admin' OR c.InstructorID = @InstructorID)
+        OPTION (RECOMPILE); -- A poll seeks IX_Grades_RowVersion; a full load does not
+        
+        DECLARE @Changed INT = @@ROWCOUNT;
+        
+        CLOSE SYMMETRIC KEY StudentRecordsKey;
+        
+        IF @SinceVersion IS NULL OR @Changed > 0
+            INSERT INTO AuditSink (UserID, Action, TableAffected)
+            VALUES (@RequestingUserID, CASE WHEN @SinceVersion IS NULL THEN 'View Grades' ELSE 'View Grade Changes' END, 'Grades');
+    
+    END TRY
+    BEGIN CATCH
+        IF (SELECT COUNT(*) FROM sys.openkeys WHERE key_name = 'StudentRecordsKey') > 0
+            CLOSE SYMMETRIC KEY StudentRecordsKey;
+        
+        SELECT 'Error' AS Result, ERROR_MESSAGE() AS ErrorMessage;
+    END CATCH
+END
+GO
+
+-- SP: Attendance recorded or changed after @SinceVersion (RBAC and MLS as sp_ViewAttendance)
+CREATE OR ALTER PROCEDURE sp_ViewAttendanceSince
+    @StudentID INT = NULL,
+    @CourseID INT = NULL,
+    @RequestingUserID INT,
+    @RequestingUserClearance INT,
+    @SinceVersion BINARY(8) = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    -- Versions at or above this belong to transactions that have not committed yet.
+    -- Taken before any table is read: under SNAPSHOT isolation the snapshot starts
+    -- at the first read, so every version below the watermark is visible to it
+    DECLARE @UpToVersion BINARY(8) = MIN_ACTIVE_ROWVERSION();
+    
+    BEGIN TRY
+        -- MLS Check: No Read Up (Level 3 - Secret)
+        IF @RequestingUserClearance < 3
+        BEGIN
+            RAISERROR('MLS Violation: Cannot read Secret level data', 16, 1);
+            RETURN;
+        END
+        
+        -- RBAC Check
+        DECLARE @RequesterRole NVARCHAR(20), @RequesterInstructorID INT, @RequesterTACourses NVARCHAR(4000);
+        SELECT @RequesterRole = Role, @RequesterInstructorID = InstructorID, @RequesterTACourses = TACourses
+        FROM fn_SessionAuthContext(@RequestingUserID);
+        
+        IF @RequesterRole IS NULL
+            EXEC sp_ResolveAuthContext @RequestingUserID, @RequesterRole OUTPUT,
+                                       @RequesterInstructorID OUTPUT, @RequesterTACourses OUTPUT;
+        
+        IF @RequesterRole NOT IN ('Admin', 'Instructor', 'TA')
+        BEGIN
+            RAISERROR('Access Denied: Insufficient privileges', 16, 1);
+            RETURN;
+        END
+        
+        DECLARE @Changed INT;
+        
+        IF @RequesterRole = 'TA'
+        BEGIN
+            -- TAs can only see attendance for their assigned courses
+            SELECT
+                a.AttendanceID,
+                a.StudentID,
+                s.FullName AS StudentName,
+                a.CourseID,
+                c.CourseName,
+                a.Status,
+                a.DateRecorded,
+                a.RowVersion
+            FROM Attendance a
+            INNER JOIN Student s ON a.StudentID = s.StudentID
+            INNER JOIN Course c ON a.CourseID = c.CourseID
+            INNER JOIN TAAssignment ta ON a.CourseID = ta.CourseID
+            WHERE ta.UserID = @RequestingUserID
+            AND (@SinceVersion IS NULL OR a.RowVersion > @SinceVersion)
+            AND a.RowVersion < @UpToVersion
+            AND (@StudentID IS NULL OR a.StudentID = @StudentID)
+            AND (@CourseID IS NULL OR a.CourseID = @CourseID)
+            ORDER BY a.DateRecorded DESC
+            OPTION (RECOMPILE);
+            
+            SET @Changed = @@ROWCOUNT;
+        END
+        ELSE IF @RequesterRole = 'Instructor'
+        BEGIN
+            -- Instructors can see attendance for their courses
+            SELECT
+                a.AttendanceID,
+                a.StudentID,
+                s.FullName AS StudentName,
+                a.CourseID,
+                c.CourseName,
+                a.Status,
+                a.DateRecorded,
+                a.RowVersion
+            FROM Attendance a
+            INNER JOIN Student s ON a.StudentID = s.StudentID
+            INNER JOIN Course c ON a.CourseID = c.CourseID
+            WHERE c.InstructorID = @RequesterInstructorID
+            AND (@SinceVersion IS NULL OR a.RowVersion > @SinceVersion)
+            AND a.RowVersion < @UpToVersion
+            AND (@StudentID IS NULL OR a.StudentID = @StudentID)
+            AND (@CourseID IS NULL OR a.CourseID = @CourseID)
+            ORDER BY a.DateRecorded DESC
+            OPTION (RECOMPILE);
+            
+            SET @Changed = @@ROWCOUNT;
+        END
+        ELSE -- Admin
+        BEGIN
+            SELECT
+                a.AttendanceID,
+                a.StudentID,
+                s.FullName AS StudentName,
+                a.CourseID,
+                c.CourseName,
+                a.Status,
+                a.DateRecorded,
+                a.RowVersion
+            FROM Attendance a
+            INNER JOIN Student s ON a.StudentID = s.StudentID
+            INNER JOIN Course c ON a.CourseID = c.CourseID
+            WHERE (@SinceVersion IS NULL OR a.RowVersion > @SinceVersion)
+            AND a.RowVersion < @UpToVersion
+            AND (@StudentID IS NULL OR a.StudentID = @StudentID)
+            AND (@CourseID IS NULL OR a.CourseID = @CourseID)
+            ORDER BY a.DateRecorded DESC
+            OPTION (RECOMPILE);
+            
+            SET @Changed = @@ROWCOUNT;
+        END
+        
+        IF @SinceVersion IS NULL OR @Changed > 0
+            INSERT INTO AuditSink (UserID, Action, TableAffected)
+            VALUES (@RequestingUserID, CASE WHEN @SinceVersion IS NULL THEN 'View Attendance' ELSE 'View Attendance Changes' END, 'Attendance');
+    
+    END TRY
+    BEGIN CATCH
+        SELECT 'Error' AS Result, ERROR_MESSAGE() AS ErrorMessage;
+    END CATCH
+END
+GO
+
+-- SP: Role requests submitted or processed after @SinceVersion (Admin only)
+-- A full load (@SinceVersion = NULL) returns pending requests only; a poll also
+-- returns requests that have left Pending, so the caller can remove them
+CREATE OR ALTER PROCEDURE sp_ViewPendingRoleRequestsSince
+    @RequestingUserID INT,
+    @SinceVersion BINARY(8) = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    -- Versions at or above this belong to transactions that have not committed yet.
+    -- Taken before any table is read: under SNAPSHOT isolation the snapshot starts
+    -- at the first read, so every version below the watermark is visible to it
+    DECLARE @UpToVersion BINARY(8) = MIN_ACTIVE_ROWVERSION();
+    
+    BEGIN TRY
+        -- RBAC Check
+        DECLARE @RequesterRole NVARCHAR(20), @RequesterInstructorID INT, @RequesterTACourses NVARCHAR(4000);
+        SELECT @RequesterRole = Role, @RequesterInstructorID = InstructorID, @RequesterTACourses = TACourses
+        FROM fn_SessionAuthContext(@RequestingUserID);
+        
+        IF @RequesterRole IS NULL
+            EXEC sp_ResolveAuthContext @RequestingUserID, @RequesterRole OUTPUT,
+                                       @RequesterInstructorID OUTPUT, @RequesterTACourses OUTPUT;
+        
+        IF @RequesterRole != 'Admin'
+        BEGIN
+            RAISERROR('Access Denied: Only Admins can view role requests', 16, 1);
+            RETURN;
+        END
+        
+        SELECT
+            RequestID,
+            UserID,
+            Username,
+            CurrentRole,
+            RequestedRole,
+            Reason,
+            Comments,
+            Status,
+            RequestDate,
+            RowVersion
+        FROM RoleRequests
+        WHERE RowVersion < @UpToVersion
+        AND ((@SinceVersion IS NULL AND Status = 'Pending') OR RowVersion > @SinceVersion)
+        ORDER BY RequestDate ASC
+        OPTION (RECOMPILE);
+        
+        DECLARE @Changed INT = @@ROWCOUNT;
+        
+        IF @SinceVersion IS NULL OR @Changed > 0
+            INSERT INTO AuditSink (UserID, Action, TableAffected)
+            VALUES (@RequestingUserID, CASE WHEN @SinceVersion IS NULL THEN 'View Pending Role Requests' ELSE 'View Role Request Changes' END, 'RoleRequests');
+    
+    END TRY
+    BEGIN CATCH
+        SELECT 'Error' AS Result, ERROR_MESSAGE() AS ErrorMessage;
+    END CATCH
+END
+GO
+
+PRINT 'Delta refresh upgrade completed.';
+GO
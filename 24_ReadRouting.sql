@@ -0,0 +1,69 @@
+-- ============================================
+-- Database Security Term Project
+-- Performance: Read/Write Routing
+-- ============================================
+-- Reporting calls (sp_GetAggregatePerformanceReport, sp_ViewGrades,
+-- sp_BulkExport, ...) used to run on the same connections and at the same
+-- READ COMMITTED level as sp_EnterGrade and sp_RecordAttendance, so their
+-- scans held shared locks that writers queued behind. The GUI now sends
+-- procedures declared as reads to a separate connection pool that runs at
+-- SNAPSHOT isolation:
+--   * Snapshot readers see the last committed row versions and take no shared
+--     locks, so they neither block writers nor wait for them.
+--   * Writes stay on the primary pool at READ COMMITTED.
+--   * A read still writes its audit row. That insert only takes locks on the
+--     new row, so it cannot hit a snapshot update conflict.
+--   * Row versions are kept in tempdb for as long as the oldest snapshot
+--     transaction runs; sp_GetReadRoutingStatus reports both.
+-- Safe to re-run. After this script, re-run 23_DeltaRefresh.sql, whose
+-- "changes since" procedures now take their watermark before their first
+-- read.
+-- Usage:
+--   EXEC sp_GetReadRoutingStatus;
+
+USE SecureStudentRecords;
+GO
+
+-- ============================================
+-- SNAPSHOT ISOLATION
+-- ============================================
+
+-- Waits for transactions that are open when it runs
+IF NOT EXISTS (SELECT 1 FROM sys.databases
+               WHERE name = DB_NAME() AND snapshot_isolation_state IN (1, 3))
+    ALTER DATABASE SecureStudentRecords SET ALLOW_SNAPSHOT_ISOLATION ON;
+GO
+
+-- ============================================
+-- STATUS
+-- ============================================
+
+-- SP: Snapshot state, version store size and the longest-running snapshot readers
+CREATE OR ALTER PROCEDURE sp_GetReadRoutingStatus
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    SELECT
+        d.snapshot_isolation_state_desc AS SnapshotIsolation,
+        d.is_read_committed_snapshot_on AS ReadCommittedSnapshot,
+        (SELECT CAST(SUM(reserved_space_kb) / 1024.0 AS DECIMAL(12,1))
+         FROM sys.dm_tran_version_store_space_usage
+         WHERE database_id = d.database_id) AS VersionStoreMB,
+        (SELECT COUNT(*) FROM sys.dm_tran_active_snapshot_database_transactions) AS ActiveSnapshotTransactions,
+        (SELECT MAX(elapsed_time_seconds) FROM sys.dm_tran_active_snapshot_database_transactions) AS LongestSnapshotSeconds
+    FROM sys.databases d
+    WHERE d.name = DB_NAME();
+    
+    -- Sessions the read pool has open, by isolation level (5 = SNAPSHOT)
+    SELECT
+        s.transaction_isolation_level AS IsolationLevel,
+        COUNT(*) AS Sessions
+    FROM sys.dm_exec_sessions s
+    WHERE s.database_id = DB_ID() AND s.is_user_process = 1
+    GROUP BY s.transaction_isolation_level;
+END
+GO
+
+PRINT 'Read/write routing upgrade completed.';
+GO
@@ -0,0 +1,1011 @@
+"""
+Secure Student Records Management System (SRMS) - Client Benchmarks
+Measures the GUI data layer against a synthetic stand-in driver (no SQL Server needed),
+and server-side changes against a live test database
+
+Usage:
+    python SRMS_Benchmarks.py fetch --rows 200000 --arraysize 500
+    python SRMS_Benchmarks.py audit --threads 16 --seconds 30
+    python SRMS_Benchmarks.py load --sessions 32 --seconds 20
+    python SRMS_Benchmarks.py login --threads 16 --seconds 20 --invalid-pct 20
+    xvfb-run -a python SRMS_Benchmarks.py ui --rounds 5
+    python SRMS_Benchmarks.py contracts
+    python SRMS_Benchmarks.py contention --connection-string "<test server>" --writers 16 --reporters 4
+"""
+
+import argparse
+import glob
+import inspect
+import json
+import math
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is not reported
+    resource = None
+
+from SRMS_GUI_Enhanced import PROCEDURES, DatabaseConnection, load_settings, password_key
+
+
+# ============================================
+# SYNTHETIC STAND-IN DRIVER
+# Produces attendance-shaped rows lazily, like a server-side cursor
+# ============================================
+
+class SyntheticDriver:
+    """Minimal DB-API module stand-in; every EXEC returns `rows` attendance rows"""
+
+    class OperationalError(Exception):
+        pass
+
+    class InterfaceError(Exception):
+        pass
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def connect(self, connection_string):
+        return _SyntheticConnection(self.rows)
+
+
+class _SyntheticConnection:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def cursor(self):
+        return _SyntheticCursor(self.rows)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class _SyntheticCursor:
+    COLUMNS = ['AttendanceID', 'StudentID', 'StudentName', 'CourseID',
+               'CourseName', 'Status', 'DateRecorded']
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.arraysize = 1
+        self.description = None
+        self._source = iter(())
+
+    def execute(self, sql, params=None):
+        if sql == 'SELECT 1':
+            self.description = [('', int)]
+            self._source = iter([(1,)])
+        else:
+            self.description = [(name, None) for name in self.COLUMNS]
+            self._source = self._generate()
+        return self
+
+    def _generate(self):
+        start = datetime(2025, 1, 1)
+        for i in range(self.rows):
+            yield (i + 1, i % 5000 + 1, f"Student {i % 5000 + 1}", i % 40 + 1,
+                   f"Course {i % 40 + 1}", i % 7 != 0, start + timedelta(minutes=i))
+
+    def fetchall(self):
+        return list(self._source)
+
+    def fetchmany(self, size=None):
+        size = size or self.arraysize
+        batch = []
+        for row in self._source:
+            batch.append(row)
+            if len(batch) >= size:
+                break
+        return batch
+
+    def nextset(self):
+        self._source = iter(())
+        return False
+
+    def close(self):
+        pass
+
+
+# ============================================
+# FETCH BENCHMARK: fetchall vs streaming
+# ============================================
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_fetch_path(path, rows, arraysize):
+    db = DatabaseConnection(driver=SyntheticDriver(rows))
+    db.connect()
+    params = [None, None, 1, 4]
+    baseline = peak_rss_mb()
+
+    consumed = 0
+    first_row = None
+    started = time.perf_counter()
+    if path == 'fetchall':
+        results, columns = db.execute_procedure('sp_ViewAttendance', params)
+        first_row = time.perf_counter() - started
+        for row in results:
+            consumed += 1
+    else:
+        for columns, batch in db.stream_procedure('sp_ViewAttendance', params, arraysize):
+            if first_row is None:
+                first_row = time.perf_counter() - started
+            for row in batch:
+                consumed += 1
+    total = time.perf_counter() - started
+    db.close()
+
+    peak = peak_rss_mb()
+    return {
+        'path': path,
+        'rows': consumed,
+        'first_row_ms': round(first_row * 1000, 2),
+        'total_ms': round(total * 1000, 2),
+        'peak_rss_delta_mb': round(peak - baseline, 1) if peak is not None else None,
+    }
+
+
+def fetch_benchmark(args):
+    # Each path runs in a fresh process: peak RSS only ever grows
+    results = []
+    for path in ('fetchall', 'stream'):
+        out = subprocess.run([sys.executable, __file__, 'fetch', '--child', path,
+                              '--rows', str(args.rows), '--arraysize', str(args.arraysize)],
+                             capture_output=True, text=True, check=True)
+        results.append(json.loads(out.stdout))
+
+    print(f"Rows: {args.rows}   arraysize: {args.arraysize}")
+    print(f"{'path':<10} {'rows':>9} {'first row ms':>13} {'total ms':>10} {'peak RSS +MB':>13}")
+    for r in results:
+        rss = 'n/a' if r['peak_rss_delta_mb'] is None else r['peak_rss_delta_mb']
+        print(f"{r['path']:<10} {r['rows']:>9} {r['first_row_ms']:>13} {r['total_ms']:>10} {rss:>13}")
+
+
+# ============================================
+# LOAD HELPERS (live server)
+# ============================================
+
+def percentile(sorted_samples, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_samples:
+        return None
+    rank = math.ceil(pct / 100 * len(sorted_samples))
+    return sorted_samples[max(0, min(len(sorted_samples), rank) - 1)]
+
+
+def call_failed(results, columns):
+    # Procedures report most failures as a 'Result' = 'Error' row, not an exception
+    if results is None:
+        return True
+    return bool(columns) and columns[0] == 'Result' and bool(results) and results[0][0] == 'Error'
+
+
+def run_load(db, proc_name, params, threads, seconds):
+    """Call proc_name from `threads` workers for `seconds`; returns a summary dict"""
+    samples = [[] for _ in range(threads)]
+    deadline = time.perf_counter() + seconds
+    
+    def worker(out):
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            results, columns = db.execute_procedure(proc_name, params)
+            out.append((time.perf_counter() - started, call_failed(results, columns)))
+    
+    workers = [threading.Thread(target=worker, args=(out,)) for out in samples]
+    started = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - started
+    
+    calls = [sample for out in samples for sample in out]
+    latencies = sorted(latency * 1000 for latency, failed in calls if not failed)
+    return {
+        'calls': len(calls),
+        'errors': sum(1 for _, failed in calls if failed),
+        'per_sec': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50), 2) if latencies else None,
+        'p95_ms': round(percentile(latencies, 95), 2) if latencies else None,
+        'p99_ms': round(percentile(latencies, 99), 2) if latencies else None,
+    }
+
+
+def connect_live(args, pool_size, **options):
+    db = DatabaseConnection(connection_string=args.connection_string, pool_size=pool_size, **options)
+    if not db.connect():
+        sys.exit("Could not connect to the test database")
+    return db
+
+
+# ============================================
+# AUDIT BENCHMARK: synchronous AuditLog vs queued pipeline
+# ============================================
+
+def audit_benchmark(args):
+    db = connect_live(args, args.threads + 1)
+    status, columns = db.execute_procedure('sp_GetAuditPipelineStatus')
+    if not status:
+        sys.exit(f"Audit pipeline not installed (run 15_AuditPipeline.sql): {columns}")
+    original_mode = status[0][0]
+    params = [args.user_id, args.role]
+    
+    results = {}
+    try:
+        for mode in ('Sync', 'Async'):
+            db.execute_procedure('sp_SetAuditMode', [mode])
+            run_load(db, 'sp_ViewCourses', params, args.threads, min(2, args.seconds))  # warm-up
+            results[mode] = run_load(db, 'sp_ViewCourses', params, args.threads, args.seconds)
+            
+            if mode == 'Async':
+                started = time.perf_counter()
+                drained = db.execute_procedure('sp_DrainAuditQueue', [5000, 2147483647])
+                moved = drained.first.EventsMoved if drained.error is None and drained.first else None
+                results[mode]['drain'] = (moved, round((time.perf_counter() - started) * 1000, 1))
+    finally:
+        db.execute_procedure('sp_SetAuditMode', [original_mode])
+        db.close()
+    
+    print(f"sp_ViewCourses x {args.threads} threads x {args.seconds}s")
+    print(f"{'mode':<6} {'calls':>8} {'errors':>7} {'calls/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for mode, r in results.items():
+        print(f"{mode:<6} {r['calls']:>8} {r['errors']:>7} {r['per_sec']:>9} "
+              f"{r['p50_ms']!s:>8} {r['p95_ms']!s:>8} {r['p99_ms']!s:>8}")
+    if 'drain' in results.get('Async', {}):
+        moved, drain_ms = results['Async']['drain']
+        print(f"Drained {moved} queued events in {drain_ms} ms")
+
+
+# ============================================
+# LOAD TEST: concurrent role sessions
+# ============================================
+
+# Relative weights of what each kind of session does between logins. Students
+# read their grades through sp_StudentViewOwnGrades, as the GUI does, because
+# sp_ViewGrades is for Admins and Instructors only.
+SESSION_MIXES = {
+    'Admin': [('sp_ViewGrades', 80), ('sp_RecordAttendance', 10), ('sp_Login', 10)],
+    'Instructor': [('sp_ViewGrades', 35), ('sp_EnterGrade', 30),
+                   ('sp_RecordAttendance', 25), ('sp_Login', 10)],
+    'TA': [('sp_RecordAttendance', 60), ('sp_SubmitRoleRequest', 10), ('sp_Login', 30)],
+    'Student': [('sp_StudentViewOwnGrades', 60), ('sp_SubmitRoleRequest', 10), ('sp_Login', 30)],
+}
+
+# Passwords 09_SampleData.sql gives each role; the load test logs in with these
+SAMPLE_PASSWORDS = {
+    'Admin': 'Admin@123',
+    'Instructor': 'Prof@123',
+    'TA': 'TA@123',
+    'Student': 'Student@123',
+}
+
+
+def parse_role_weights(text):
+    """'Admin:1,Instructor:3' -> {'Admin': 1, 'Instructor': 3}"""
+    weights = {}
+    for part in text.split(','):
+        role, _, weight = part.partition(':')
+        role = role.strip()
+        if role not in SESSION_MIXES:
+            raise argparse.ArgumentTypeError(f"Unknown role '{role}'")
+        weights[role] = int(weight or 1)
+    return weights
+
+
+def load_catalog(db):
+    """Read the accounts, course ownership and enrollments of the test database"""
+    queries = {
+        'accounts': "SELECT Username, Role FROM Users WHERE IsActive = 1",
+        'instructor_courses': "SELECT i.UserID, c.CourseID FROM Course c "
+                              "JOIN Instructor i ON i.InstructorID = c.InstructorID",
+        'ta_courses': "SELECT UserID, CourseID FROM TAAssignment",
+        'enrolled': "SELECT CourseID, StudentID FROM CourseEnrollment",
+    }
+    catalog = {}
+    for name, sql in queries.items():
+        rows, columns = db.execute_query(sql)
+        if rows is None:
+            sys.exit(f"Could not read the test data ({name}): {columns}")
+        if name == 'accounts':
+            catalog[name] = [(user, SAMPLE_PASSWORDS[role], role) for user, role in rows
+                             if role in SAMPLE_PASSWORDS]
+        else:
+            grouped = {}
+            for key, value in rows:
+                grouped.setdefault(key, []).append(value)
+            catalog[name] = grouped
+    return catalog
+
+
+class RoleSession:
+    """One simulated user: logs in, then issues its role's call mix until the deadline"""
+    
+    def __init__(self, db, catalog, account, rng, think_ms):
+        self.db = db
+        self.catalog = catalog
+        self.username, self.password, self.role = account
+        self.rng = rng
+        self.think_ms = think_ms
+        self.user_id = None
+        self.clearance = None
+        self.samples = []  # (proc_name, seconds, outcome)
+        
+        procs, weights = zip(*SESSION_MIXES[self.role])
+        self.procs, self.weights = list(procs), list(weights)
+    
+    def call(self, proc_name, params):
+        return self.timed(proc_name, lambda: self.db.execute_procedure(proc_name, params))
+    
+    def timed(self, label, run):
+        started = time.perf_counter()
+        results, columns = run()
+        elapsed = time.perf_counter() - started
+        if results is None:
+            outcome = 'failed'
+        elif call_failed(results, columns):
+            outcome = 'denied'
+        else:
+            outcome = 'ok'
+        self.samples.append((label, elapsed, outcome))
+        return results, columns
+    
+    def login(self):
+        # sp_GetLoginSalt and sp_Login, timed together as one login
+        results, columns = self.timed('sp_Login', lambda: self.db.login(self.username, self.password))
+        if results and results[0].Result == 'Success':
+            self.user_id, self.clearance = results[0].UserID, results[0].ClearanceLevel
+    
+    def courses(self):
+        if self.role == 'Instructor':
+            return self.catalog['instructor_courses'].get(self.user_id)
+        if self.role == 'TA':
+            return self.catalog['ta_courses'].get(self.user_id)
+        return list(self.catalog['enrolled'])
+    
+    def params_for(self, proc_name):
+        rng = self.rng
+        if proc_name == 'sp_StudentViewOwnGrades':
+            return [self.user_id]
+        if proc_name == 'sp_GetAggregatePerformanceReport':
+            return [None, self.user_id, self.clearance]
+        if proc_name == 'sp_SubmitRoleRequest':
+            return [self.user_id, 'Instructor' if self.role == 'TA' else rng.choice(['TA', 'Instructor']),
+                    'Load test request', None]
+        
+        course_id = rng.choice(self.courses() or list(self.catalog['enrolled']))
+        students = self.catalog['enrolled'].get(course_id) or [None]
+        if proc_name == 'sp_ViewGrades':
+            return [None, course_id, self.user_id, self.clearance]
+        if proc_name == 'sp_EnterGrade':
+            return [rng.choice(students), course_id, round(rng.triangular(40, 100, 82), 2),
+                    self.user_id, self.clearance]
+        return [rng.choice(students), course_id, rng.random() < 0.9, self.user_id, self.clearance]
+    
+    def run(self, deadline):
+        self.login()
+        while self.user_id is not None and time.perf_counter() < deadline:
+            proc_name = self.rng.choices(self.procs, self.weights)[0]
+            if proc_name == 'sp_Login':
+                self.login()
+            else:
+                self.call(proc_name, self.params_for(proc_name))
+            if proc_name == 'sp_SubmitRoleRequest':
+                # A user files one upgrade request, not one per visit
+                index = self.procs.index(proc_name)
+                del self.procs[index], self.weights[index]
+            if self.think_ms:
+                time.sleep(self.rng.expovariate(1000 / self.think_ms))
+
+
+def summarize(samples, elapsed):
+    latencies = sorted(seconds * 1000 for _, seconds, outcome in samples if outcome != 'failed')
+    return {
+        'calls': len(samples),
+        'per_sec': round(len(samples) / elapsed, 1),
+        'denied_pct': round(100 * sum(1 for s in samples if s[2] == 'denied') / len(samples), 1),
+        'failed_pct': round(100 * sum(1 for s in samples if s[2] == 'failed') / len(samples), 1),
+        'p50_ms': round(percentile(latencies, 50), 2) if latencies else None,
+        'p95_ms': round(percentile(latencies, 95), 2) if latencies else None,
+        'p99_ms': round(percentile(latencies, 99), 2) if latencies else None,
+    }
+
+
+def load_benchmark(args):
+    if args.connection_string:
+        db = connect_live(args, args.sessions)
+        target = "live server"
+    else:
+        from SRMS_StandIn import SQLiteDriver
+        db = DatabaseConnection(driver=SQLiteDriver(), connection_string='', pool_size=args.sessions)
+        db.connect()
+        target = "SQLite stand-in (sample data)"
+    catalog = load_catalog(db)
+    
+    rng = random.Random(args.seed)
+    by_role = {}
+    for account in catalog['accounts']:
+        by_role.setdefault(account[2], []).append(account)
+    roles = [role for role in args.roles if by_role.get(role)]
+    if not roles:
+        sys.exit("No accounts for the requested roles")
+    
+    # Sessions are split across roles by weight; each picks a distinct account where possible
+    sessions = []
+    for n in range(args.sessions):
+        role = rng.choices(roles, [args.roles[r] for r in roles])[0]
+        pool = by_role[role]
+        account = pool[n % len(pool)]
+        sessions.append(RoleSession(db, catalog, account, random.Random(rng.random()), args.think_ms))
+    
+    deadline = time.perf_counter() + args.seconds
+    threads = [threading.Thread(target=s.run, args=(deadline,)) for s in sessions]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    pools = [db.pool_stats(route) for route in ('write', 'read')]
+    context_hits = sum(stats.get('context_hits', 0) for stats in pools)
+    context_calls = context_hits + sum(stats.get('context_misses', 0) for stats in pools)
+    db.close()
+    
+    samples = [sample for s in sessions for sample in s.samples]
+    if not samples:
+        sys.exit("No calls were made (did every login fail?)")
+    
+    role_counts = {role: sum(1 for s in sessions if s.role == role) for role in roles}
+    print(f"{args.sessions} sessions x {args.seconds}s against the {target}: "
+          + ", ".join(f"{count} {role}" for role, count in role_counts.items()))
+    print(f"{'procedure':<26} {'calls':>8} {'calls/s':>9} {'denied %':>9} {'failed %':>9} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    by_proc = {}
+    for sample in samples:
+        by_proc.setdefault(sample[0], []).append(sample)
+    for proc_name in sorted(by_proc) + ['(all)']:
+        r = summarize(by_proc.get(proc_name, samples), elapsed)
+        print(f"{proc_name:<26} {r['calls']:>8} {r['per_sec']:>9} {r['denied_pct']:>9} "
+              f"{r['failed_pct']:>9} {r['p50_ms']!s:>8} {r['p95_ms']!s:>8} {r['p99_ms']!s:>8}")
+    if context_calls:
+        print(f"Calls checked out on a session already holding the caller's authorization "
+              f"context: {round(100 * context_hits / context_calls, 1)}%")
+
+
+# ============================================
+# LOGIN BENCHMARK: logins per second under a brute-force storm
+# ============================================
+
+def login_outcome(results, columns):
+    if results is None:
+        return 'failed'
+    if results[0][0] == 'Success':
+        return 'ok'
+    if 'Too many failed attempts' in str(results[0][-1]):
+        return 'throttled'
+    return 'rejected'
+
+
+def login_benchmark(args):
+    if args.connection_string:
+        db = connect_live(args, args.threads + 1)
+        target = "live server"
+    else:
+        from SRMS_StandIn import SQLiteDriver
+        driver = SQLiteDriver()
+        conn = driver.connect()
+        conn.sqlite.execute("UPDATE PasswordPolicy SET HashIterations = ?", (args.iterations,))
+        conn.close()
+        db = DatabaseConnection(driver=driver, connection_string='', pool_size=args.threads + 1)
+        db.connect()
+        target = f"SQLite stand-in ({args.iterations} iterations)"
+    
+    rows, columns = db.execute_query("SELECT Username, Role FROM Users WHERE IsActive = 1")
+    if rows is None:
+        sys.exit(f"Could not read the test accounts: {columns}")
+    accounts = [(user, SAMPLE_PASSWORDS[role]) for user, role in rows if role in SAMPLE_PASSWORDS]
+    if len(accounts) <= args.attacked:
+        sys.exit(f"Need more than {args.attacked} accounts with sample passwords")
+    
+    # Wrong passwords go to the attacked accounts (which lock out); real users sign in to the rest
+    rng = random.Random(args.seed)
+    rng.shuffle(accounts)
+    attacked = [user for user, _ in accounts[:args.attacked]]
+    users = accounts[args.attacked:]
+    
+    samples = [[] for _ in range(args.threads)]
+    deadline = time.perf_counter() + args.seconds
+    
+    def worker(out, rng):
+        while time.perf_counter() < deadline:
+            invalid = rng.random() * 100 < args.invalid_pct
+            if invalid:
+                params = [rng.choice(attacked), f"guess-{rng.random():.8f}"]
+            else:
+                params = list(rng.choice(users))
+            started = time.perf_counter()
+            results, columns = db.login(*params)
+            out.append(('invalid' if invalid else 'valid', time.perf_counter() - started,
+                        login_outcome(results, columns)))
+    
+    threads = [threading.Thread(target=worker, args=(out, random.Random(rng.random()))) for out in samples]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    
+    # LastLogin for every login above is applied by one batched flush
+    flush_started = time.perf_counter()
+    flushed = db.execute_procedure('sp_FlushLoginActivity')
+    flush_ms = round((time.perf_counter() - flush_started) * 1000, 1)
+    db.close()
+    
+    calls = [sample for out in samples for sample in out]
+    if not calls:
+        sys.exit("No logins were attempted")
+    print(f"sp_Login x {args.threads} threads x {args.seconds}s against the {target}: "
+          f"{args.invalid_pct}% wrong passwords aimed at {args.attacked} accounts")
+    print(f"{'attempts':<10} {'outcome':<10} {'calls':>8} {'calls/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    groups = {}
+    for kind, seconds, outcome in calls:
+        groups.setdefault((kind, outcome), []).append(seconds * 1000)
+    for (kind, outcome), latencies in sorted(groups.items()):
+        latencies.sort()
+        print(f"{kind:<10} {outcome:<10} {len(latencies):>8} {round(len(latencies) / elapsed, 1):>9} "
+              f"{round(percentile(latencies, 50), 2):>8} {round(percentile(latencies, 95), 2):>8} "
+              f"{round(percentile(latencies, 99), 2):>8}")
+    successes = sum(1 for _, _, outcome in calls if outcome == 'ok')
+    print(f"Successful logins/s: {round(successes / elapsed, 1)}")
+    if flushed.error is None and flushed.first:
+        print(f"Flushed {flushed.first.LoginsFlushed} queued logins in {flush_ms} ms")
+
+
+# ============================================
+# UI BENCHMARK: startup, login and screen navigation
+# Drives the real Tk GUI against the SQLite stand-in; needs a display (e.g. xvfb-run)
+# ============================================
+
+def elapsed_ms(started):
+    return (time.perf_counter() - started) * 1000
+
+
+def wait_until_interactive(root, executor, timeout=30.0):
+    """Pump Tk until every request in flight has been delivered and drawn"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        root.update()
+        if executor.queue_depth() == 0:
+            break
+        time.sleep(0.001)
+    root.update_idletasks()
+
+
+def ui_benchmark(args):
+    import tkinter as tk
+    from SRMS_GUI_Enhanced import LoginWindow, MainApplication
+    from SRMS_StandIn import SAMPLE_USERS, SQLiteDriver
+    
+    samples = {}  # (user, step) -> [(shown ms, interactive ms)]
+    
+    def record(user, step, shown, interactive):
+        samples.setdefault((user, step), []).append((shown, interactive))
+    
+    started = time.perf_counter()
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        sys.exit(f"No display: {e} (run under xvfb-run)")
+    root.update()
+    record('-', 'Tk root', elapsed_ms(started), elapsed_ms(started))
+    
+    started = time.perf_counter()
+    db = DatabaseConnection(driver=SQLiteDriver(), connection_string='', pool_size=args.pool_size)
+    if not db.connect():
+        sys.exit("Could not connect to the stand-in")
+    record('-', 'connect', elapsed_ms(started), elapsed_ms(started))
+    
+    # The same wiring as start_application(): one root and one pool for every session
+    session = {}
+    
+    def show_login():
+        session['login'] = LoginWindow(root, db, on_login_success)
+    
+    def on_login_success(user_info):
+        for widget in root.winfo_children():
+            widget.destroy()
+        session['app'] = MainApplication(root, db, user_info, refresh_interval=0,
+                                         on_logout=show_login)
+    
+    passwords = {username: password for username, password, _, _ in SAMPLE_USERS}
+    started = time.perf_counter()
+    show_login()
+    root.update()
+    record('-', 'login form', elapsed_ms(started), elapsed_ms(started))
+    
+    for _ in range(args.rounds):
+        for user in args.users:
+            login = session['login']
+            login.username_entry.insert(0, user)
+            login.password_entry.insert(0, passwords.get(user, ''))
+            session.pop('app', None)
+            started = time.perf_counter()
+            login.login()
+            app = session.get('app')
+            if app is None:
+                sys.exit(f"Login failed for {user}: {login.status_label.cget('text')}")
+            root.update_idletasks()
+            shown = elapsed_ms(started)
+            wait_until_interactive(root, app.executor)
+            record(user, 'login -> dashboard', shown, elapsed_ms(started))
+            
+            # First pass builds every screen; the second finds them built
+            for visit in ('first', 'repeat'):
+                for text, show in app.navigation:
+                    started = time.perf_counter()
+                    app.open_screen(show)
+                    root.update_idletasks()
+                    shown = elapsed_ms(started)
+                    wait_until_interactive(root, app.executor)
+                    record(user, f"{show.__name__.replace('show_', '')} ({visit})",
+                           shown, elapsed_ms(started))
+            
+            started = time.perf_counter()
+            app.close()
+            app.on_logout()
+            root.update()
+            record(user, 'logout -> login form', elapsed_ms(started), elapsed_ms(started))
+    
+    root.destroy()
+    db.close()
+    
+    print(f"GUI against the SQLite stand-in, {args.rounds} round(s); medians in ms "
+          f"(shown = built and laid out, interactive = every request delivered)")
+    print(f"{'user':<16} {'step':<30} {'shown':>9} {'interactive':>12}")
+    for (user, step), values in samples.items():
+        shown = sorted(v[0] for v in values)
+        interactive = sorted(v[1] for v in values)
+        print(f"{user:<16} {step:<30} {round(percentile(shown, 50), 1):>9} "
+              f"{round(percentile(interactive, 50), 1):>12}")
+
+
+# ============================================
+# CONTENTION BENCHMARK: grade and attendance entry next to reports
+# The same writers alone, beside reports on the primary pool, and beside
+# reports on the snapshot read pool (24_ReadRouting.sql)
+# ============================================
+
+CONTENTION_WRITES = ('sp_EnterGrade', 'sp_RecordAttendance')
+CONTENTION_REPORT = 'sp_GetAggregatePerformanceReport'
+
+# (phase, runs reports, read pool size; None sizes it to the reporters)
+CONTENTION_PHASES = (
+    ('writers alone', False, 0),
+    ('reports on primary', True, 0),
+    ('reports on snapshot', True, None),
+)
+
+
+def run_contention_phase(db, catalog, args, reports):
+    """Instructor sessions entering grades and attendance, and Admin sessions running reports"""
+    by_role = {}
+    for account in catalog['accounts']:
+        by_role.setdefault(account[2], []).append(account)
+    if not by_role.get('Instructor') or not by_role.get('Admin'):
+        sys.exit("The test data needs Instructor and Admin accounts")
+    
+    rng = random.Random(args.seed)
+    sessions = []
+    for role, count, procs in (('Instructor', args.writers, CONTENTION_WRITES),
+                               ('Admin', args.reporters if reports else 0, (CONTENTION_REPORT,))):
+        for n in range(count):
+            session = RoleSession(db, catalog, by_role[role][n % len(by_role[role])],
+                                  random.Random(rng.random()), 0)
+            session.procs, session.weights = list(procs), [1] * len(procs)
+            sessions.append(session)
+    
+    deadline = time.perf_counter() + args.seconds
+    threads = [threading.Thread(target=s.run, args=(deadline,)) for s in sessions]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    
+    samples = [sample for s in sessions for sample in s.samples]
+    writes = [sample for sample in samples if sample[0] in CONTENTION_WRITES]
+    report_calls = [sample for sample in samples if sample[0] == CONTENTION_REPORT]
+    return (summarize(writes, elapsed) if writes else None,
+            summarize(report_calls, elapsed) if report_calls else None)
+
+
+def contention_benchmark(args):
+    # Live server only: a SQLite reader never blocks its writer, so the stand-in
+    # would show the phases equal by construction
+    pool_size = args.writers + args.reporters
+    db = connect_live(args, 1, read_pool_size=0)
+    catalog = load_catalog(db)
+    db.close()
+    
+    results = []
+    for phase, reports, read_pool_size in CONTENTION_PHASES:
+        db = connect_live(args, pool_size,
+                          read_pool_size=args.reporters if read_pool_size is None else read_pool_size)
+        try:
+            results.append((phase, *run_contention_phase(db, catalog, args, reports)))
+        finally:
+            db.close()
+    
+    print(f"{args.writers} writers ({', '.join(CONTENTION_WRITES)}) and {args.reporters} reporters "
+          f"({CONTENTION_REPORT}) x {args.seconds}s per phase against the live server")
+    print(f"{'phase':<22} {'writes/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'failed %':>9} {'reports/s':>10} {'report p50':>11}")
+    for phase, writes, report_calls in results:
+        if writes is None:
+            print(f"{phase:<22} {'no writes completed':>9}")
+            continue
+        print(f"{phase:<22} {writes['per_sec']:>9} {writes['p50_ms']!s:>8} {writes['p95_ms']!s:>8} "
+              f"{writes['p99_ms']!s:>8} {writes['failed_pct']:>9} "
+              f"{report_calls['per_sec'] if report_calls else '-':>10} "
+              f"{report_calls['p50_ms'] if report_calls else '-'!s:>11}")
+
+
+# ============================================
+# STAND-IN CONTRACT CHECK
+# Every declared procedure against the T-SQL scripts and the SQLite stand-in,
+# through DatabaseConnection.from_settings() as the GUI connects
+# ============================================
+
+# Audit pipeline administration exists only on the server (15_AuditPipeline.sql)
+SERVER_ONLY_PROCEDURES = frozenset({'sp_SetAuditMode', 'sp_GetAuditPipelineStatus',
+                                    'sp_DrainAuditQueue'})
+
+TSQL_PROCEDURE = re.compile(r"^\s*CREATE\s+(?:OR\s+ALTER\s+)?PROC(?:EDURE)?\s+(?:dbo\.)?(\w+)(.*?)^\s*AS\b",
+                            re.IGNORECASE | re.MULTILINE | re.DOTALL)
+
+
+def tsql_signatures(directory='.'):
+    """{procedure: (script, [(parameter, has default)])} from the numbered scripts
+    
+    Scripts are read in deployment order, so a later CREATE OR ALTER wins.
+    """
+    signatures = {}
+    for path in sorted(glob.glob(os.path.join(directory, '[0-9][0-9]_*.sql'))):
+        with open(path, encoding='utf-8') as f:
+            text = f.read()
+        for match in TSQL_PROCEDURE.finditer(text):
+            header = re.sub(r"--[^\n]*", "", match.group(2))
+            params = []
+            # Commas inside a type, as in DECIMAL(5,2), do not separate parameters
+            for part in re.split(r",(?![^()]*\))", header):
+                param = re.match(r"\s*@(\w+)\s+(.*)$", part, re.DOTALL)
+                if param:
+                    params.append((param.group(1), '=' in param.group(2)))
+            signatures[match.group(1)] = (os.path.basename(path), params)
+    return signatures
+
+
+def contract_calls(db):
+    """(procedure, parameters) for one successful call of each stand-in procedure, in order
+    
+    Uses the 09_SampleData.sql records: prof.smith teaches course 1, and
+    student 1 (student.john) is enrolled in it.
+    """
+    users = {}
+    for username, password in (('admin1', 'Admin@123'), ('prof.smith', 'Prof@123'),
+                               ('student.john', 'Student@123')):
+        login = db.login(username, password)
+        if login.error is not None:
+            sys.exit(f"sp_Login failed for {username}: {login.error}")
+        users[username] = login.first.UserID
+    admin, prof, student_user = users['admin1'], users['prof.smith'], users['student.john']
+    course, student = 1, 1
+    
+    salt = (yield 'sp_GetLoginSalt', ['admin1']).first
+    yield 'sp_Login', ['admin1', None, password_key('Admin@123', salt.Salt, salt.Iterations)]
+    yield 'sp_Login', ['admin1', 'Admin@123']
+    registered = yield 'sp_RegisterUser', ['contract.check', 'Contract@123', 'Student', 1, admin]
+    yield 'sp_ViewCourses', [admin, 'Admin']
+    yield 'sp_ViewGrades', [None, course, admin, 4]
+    yield 'sp_ViewGradesSince', [None, course, admin, 4, None]
+    yield 'sp_StudentViewOwnGrades', [student_user]
+    yield 'sp_EnterGrade', [student, course, 88.5, prof, 3]
+    yield 'sp_EnterGradesBulk', [course, [(student, 91.0)], prof, 3]
+    yield 'sp_ViewAttendance', [None, course, admin, 4]
+    yield 'sp_ViewAttendanceSince', [None, course, admin, 4, None]
+    yield 'sp_StudentViewOwnAttendance', [student_user, None]
+    yield 'sp_RecordAttendance', [student, course, 1, prof, 3]
+    yield 'sp_GetCourseRoster', [course, None, prof, 3]
+    yield 'sp_RecordAttendanceBatch', [course, None, [(student, True)], prof, 3]
+    yield 'sp_GetGradeStatsByDepartment', [None, None, admin, 4]
+    yield 'sp_GetAttendanceStats', [None, None, admin, 4]
+    yield 'sp_GetAggregatePerformanceReport', [None, admin, 4]
+    yield 'sp_GetCourseEnrollmentStats', [None]
+    yield 'sp_ViewStudentProfile', [student, admin, 4]
+    yield 'sp_BulkExport', ['Grades', course, None, None, 4, admin, 4, 1]
+    yield 'sp_BulkExport', ['Grades', course, None, None, 4, admin, 4, 0]
+    submitted = yield 'sp_SubmitRoleRequest', [registered.first.UserID, 'TA', 'Contract check', None]
+    yield 'sp_ViewPendingRoleRequests', [admin]
+    yield 'sp_ViewPendingRoleRequestsSince', [admin, None]
+    yield 'sp_ProcessRoleRequest', [submitted.first.RequestID, admin, 'Deny', None]
+    yield 'sp_FlushLoginActivity', []
+
+
+def contracts_check(args):
+    failures = []
+    signatures = tsql_signatures(args.scripts)
+    
+    # Declarations against the T-SQL, and the stand-in's methods against the declarations
+    from SRMS_StandIn import Procedures
+    for name, proc in PROCEDURES.items():
+        if name not in signatures:
+            failures.append((name, "not created by any numbered script"))
+            continue
+        script, params = signatures[name]
+        if tuple(p for p, _ in params) != proc.params:
+            failures.append((name, f"{script} declares ({', '.join(p for p, _ in params)}), "
+                                   f"PROCEDURES has ({', '.join(proc.params)})"))
+        if {p for p, has_default in params if has_default} != set(proc.defaults):
+            failures.append((name, f"defaults differ from {script}"))
+        if name in SERVER_ONLY_PROCEDURES:
+            continue
+        method = getattr(Procedures, name, None)
+        if method is None:
+            failures.append((name, "not implemented by the stand-in"))
+            continue
+        arity = inspect.signature(method).parameters
+        if len(arity) - 2 != len(proc.params):  # self, conn
+            failures.append((name, f"stand-in takes {len(arity) - 2} parameters, "
+                                   f"PROCEDURES declares {len(proc.params)}"))
+    
+    # Every stand-in procedure, called as the GUI calls it
+    settings = dict(load_settings(), backend='standin', standin_database='')
+    db = DatabaseConnection.from_settings(settings)
+    if not db.connect():
+        sys.exit("Could not open the stand-in")
+    called = set()
+    calls = contract_calls(db)
+    try:
+        name, params = next(calls)
+        while True:
+            called.add(name)
+            try:
+                result = db.execute_procedure(name, params)
+            except TypeError as e:
+                # The arguments no longer bind to the declaration
+                failures.append((name, str(e)))
+                result = None
+            if result is None:
+                pass
+            elif result.rows is None:
+                failures.append((name, f"raised: {result.error}"))
+            elif result.error is not None:
+                failures.append((name, f"returned an error row: {result.error}"))
+            elif not result.columns:
+                failures.append((name, "returned no result set"))
+            name, params = calls.send(result)
+    except StopIteration:
+        pass
+    except AttributeError as e:
+        # A failed call whose result a later call needed
+        failures.append((name, f"could not continue: {e}"))
+    finally:
+        db.close()
+    for name in sorted(set(PROCEDURES) - SERVER_ONLY_PROCEDURES - called):
+        failures.append((name, "declared but not exercised by contract_calls()"))
+    
+    print(f"{len(PROCEDURES)} declared procedures: signatures checked against "
+          f"{len(signatures)} T-SQL procedures, {len(called)} called on the stand-in, "
+          f"{len(SERVER_ONLY_PROCEDURES)} server-only")
+    for name, problem in failures:
+        print(f"FAIL {name}: {problem}")
+    if failures:
+        sys.exit(1)
+    print("OK")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SRMS client-side benchmarks")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    fetch = commands.add_parser('fetch', help="fetchall vs streaming fetchmany")
+    fetch.add_argument('--rows', type=int, default=200000)
+    fetch.add_argument('--arraysize', type=int, default=DatabaseConnection.STREAM_ARRAYSIZE)
+    fetch.add_argument('--child', choices=['fetchall', 'stream'], help=argparse.SUPPRESS)
+
+    audit = commands.add_parser('audit', help="synchronous vs queued audit logging (live server)")
+    audit.add_argument('--connection-string', help="defaults to the GUI's connection string")
+    audit.add_argument('--threads', type=int, default=16)
+    audit.add_argument('--seconds', type=int, default=30)
+    audit.add_argument('--user-id', type=int, default=1)
+    audit.add_argument('--role', default='Admin')
+    
+    load = commands.add_parser('load', help="concurrent role sessions (SQLite stand-in or live server)")
+    load.add_argument('--connection-string',
+                      help="run against this live test database instead of the SQLite stand-in")
+    load.add_argument('--sessions', type=int, default=32)
+    load.add_argument('--seconds', type=int, default=20)
+    load.add_argument('--roles', type=parse_role_weights,
+                      default=parse_role_weights('Admin:1,Instructor:3,TA:3,Student:13'),
+                      help="relative session weights, e.g. Admin:1,Instructor:3,TA:3,Student:13")
+    load.add_argument('--think-ms', type=float, default=0,
+                      help="mean pause between a session's calls")
+    load.add_argument('--seed', type=int, default=1)
+    
+    login = commands.add_parser('login', help="logins per second with a brute-force mix "
+                                              "(SQLite stand-in or live server)")
+    login.add_argument('--connection-string',
+                       help="run against this live test database instead of the stand-in")
+    login.add_argument('--threads', type=int, default=16)
+    login.add_argument('--seconds', type=int, default=20)
+    login.add_argument('--invalid-pct', type=float, default=20,
+                       help="share of attempts that use a wrong password")
+    login.add_argument('--attacked', type=int, default=2,
+                       help="accounts the wrong passwords are aimed at")
+    login.add_argument('--iterations', type=int, default=2000,
+                       help="stand-in only: PasswordPolicy.HashIterations (accounts rehash on first login)")
+    login.add_argument('--seed', type=int, default=1)
+    
+    ui = commands.add_parser('ui', help="GUI startup, login and navigation times "
+                                        "(SQLite stand-in; needs a display, e.g. xvfb-run)")
+    ui.add_argument('--users', type=lambda text: [u.strip() for u in text.split(',') if u.strip()],
+                    default=['admin1', 'prof.smith', 'ta.alice', 'student.john'],
+                    help="comma-separated sample accounts to log in as, in turn")
+    ui.add_argument('--rounds', type=int, default=3)
+    ui.add_argument('--pool-size', type=int, default=5)
+    
+    contention = commands.add_parser('contention', help="write latency next to reports, on the primary "
+                                                        "and on the snapshot read pool")
+    contention.add_argument('--connection-string', required=True,
+                            help="live test database with 24_ReadRouting.sql applied")
+    contention.add_argument('--writers', type=int, default=16)
+    contention.add_argument('--reporters', type=int, default=4)
+    contention.add_argument('--seconds', type=int, default=20, help="per phase")
+    contention.add_argument('--seed', type=int, default=1)
+    
+    contracts = commands.add_parser('contracts', help="check PROCEDURES against the T-SQL scripts "
+                                                      "and call each one on the SQLite stand-in")
+    contracts.add_argument('--scripts', default=os.path.dirname(os.path.abspath(__file__)),
+                           help="directory holding the numbered .sql scripts")
+    
+    args = parser.parse_args()
+    if args.command == 'contracts':
+        contracts_check(args)
+    elif args.command == 'audit':
+        audit_benchmark(args)
+    elif args.command == 'load':
+        load_benchmark(args)
+    elif args.command == 'login':
+        login_benchmark(args)
+    elif args.command == 'ui':
+        ui_benchmark(args)
+    elif args.command == 'contention':
+        contention_benchmark(args)
+    elif args.command == 'fetch':
+        if args.child:
+            print(json.dumps(run_fetch_path(args.child, args.rows, args.arraysize)))
+        else:
+            fetch_benchmark(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,54 +4,1548 @@ Fully Interactive Implementation with All Features
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
-import pyodbc
+from tkinter import ttk, messagebox, scrolledtext, filedialog
+import configparser
+import cProfile
+import csv
+import hashlib
+import io
+import os
+import pstats
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+
+try:
+    import pyodbc
+except ImportError:  # pyodbc is only required when talking to a real SQL Server
+    pyodbc = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pyarrow is only required for Parquet exports
+    pyarrow = None
+
+
+# ============================================
+# CONFIGURATION
+# srms.ini next to this file (or $SRMS_CONFIG); SRMS_<KEY> environment variables win
+# ============================================
+
+DEFAULT_SETTINGS = {
+    'backend': 'sqlserver',
+    'connection_string': ("Driver={ODBC Driver 17 for SQL Server};Server=localhost;"
+                          "Database=SecureStudentRecords;Trusted_Connection=yes;"),
+    'pool_size': '5',
+    'read_pool_size': '5',
+    'read_isolation': 'snapshot',
+    'replica_connection_string': '',
+    'checkout_timeout': '10',
+    'health_check_interval': '30',
+    'cache_size': '128',
+    'cache_ttl': '60',
+    'slow_call_ms': '500',
+    'profiling': 'no',
+    'refresh_interval': '5',
+    'standin_database': '',
+    'standin_cipher': 'auto',
+    'standin_key': '',
+}
+
+BACKENDS = ('sqlserver', 'standin')
+
+
+def load_settings(path=None):
+    """The [database] section of srms.ini as a dict, over DEFAULT_SETTINGS
+    
+    SRMS_BACKEND, SRMS_CONNECTION_STRING and so on override the file, so a test
+    run can switch to the stand-in without editing it.
+    """
+    path = path or os.environ.get('SRMS_CONFIG') or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'srms.ini')
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.read(path, encoding='utf-8')
+    settings = dict(DEFAULT_SETTINGS)
+    if parser.has_section('database'):
+        settings.update(parser.items('database'))
+    for key in DEFAULT_SETTINGS:
+        value = os.environ.get(f'SRMS_{key.upper()}')
+        if value is not None:
+            settings[key] = value
+    if settings['backend'] not in BACKENDS:
+        raise ValueError(f"Unknown backend '{settings['backend']}' in {path} "
+                         f"(expected one of {', '.join(BACKENDS)})")
+    return settings
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes free within the checkout timeout"""
+
+
+class PooledConnection:
+    """A driver connection plus the cursors it reuses between calls
+    
+    Each statement text keeps its own cursor (the least recently used is closed
+    past MAX_STATEMENTS). pyodbc re-executes the statement a cursor last ran
+    without preparing it again, so a repeated call skips SQLPrepare.
+    """
+    
+    MAX_STATEMENTS = 32
+    
+    def __init__(self, raw):
+        self.raw = raw
+        self.created = time.monotonic()
+        self.last_used = self.created
+        # The user whose authorization context this session last cached
+        # (fn_SessionAuthContext); the pool hands it back to that user first
+        self.user = None
+        self._cursor = None
+        self._statements = OrderedDict()  # sql -> cursor; least recently used first
+    
+    def cursor(self, sql=None):
+        """The shared cursor, or with `sql`, the cursor that statement is prepared on"""
+        if sql is None:
+            if self._cursor is None:
+                self._cursor = self.raw.cursor()
+            return self._cursor
+        cursor = self._statements.get(sql)
+        if cursor is None:
+            cursor = self._statements[sql] = self.raw.cursor()
+            if len(self._statements) > self.MAX_STATEMENTS:
+                self._statements.popitem(last=False)[1].close()
+        else:
+            self._statements.move_to_end(sql)
+        return cursor
+    
+    def discard_cursor(self, sql):
+        """Close a statement's cursor after a failure, so the next call starts clean"""
+        cursor = self._statements.pop(sql, None)
+        if cursor is not None:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+    
+    def close(self):
+        try:
+            for cursor in self._statements.values():
+                cursor.close()
+            if self._cursor is not None:
+                self._cursor.close()
+            self.raw.close()
+        except Exception:
+            pass
+        self._statements.clear()
+        self._cursor = None
+
+
+class ConnectionPool:
+    """Bounded pool of driver connections with health checks and reconnect"""
+    
+    HEALTH_CHECK_QUERY = "SELECT 1"
+    
+    def __init__(self, driver, connection_string, max_size=5, min_size=1,
+                 checkout_timeout=10.0, health_check_interval=30.0, session_sql=None):
+        self.driver = driver
+        self.connection_string = connection_string
+        # Run once on every new connection, e.g. to set its isolation level
+        self.session_sql = session_sql
+        self.max_size = max_size
+        self.min_size = min(min_size, max_size)
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+        
+        self._idle = []
+        self._size = 0
+        self._closed = False
+        self._lock = threading.Condition()
+        self._stats = {
+            'created': 0,
+            'discarded': 0,
+            'checkouts': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'health_checks': 0,
+            'health_check_failures': 0,
+            'wait_time': 0.0,
+            'context_hits': 0,
+            'context_misses': 0,
+        }
+    
+    # Connections that fail with these errors are dropped instead of returned
+    def _disconnect_errors(self):
+        names = ('OperationalError', 'InterfaceError')
+        return tuple(getattr(self.driver, n) for n in names if hasattr(self.driver, n))
+    
+    def warm_up(self):
+        """Open min_size connections so the first screen does not pay for connect"""
+        conns = [self.acquire() for _ in range(self.min_size)]
+        for conn in conns:
+            self.release(conn)
+    
+    def _open(self):
+        conn = PooledConnection(self.driver.connect(self.connection_string))
+        if self.session_sql:
+            try:
+                cursor = conn.raw.cursor()
+                cursor.execute(self.session_sql)
+                cursor.close()
+                conn.raw.commit()
+            except Exception:
+                conn.close()
+                raise
+        with self._lock:
+            self._stats['created'] += 1
+        return conn
+    
+    def _is_healthy(self, conn):
+        if time.monotonic() - conn.last_used < self.health_check_interval:
+            return True
+        with self._lock:
+            self._stats['health_checks'] += 1
+        try:
+            cursor = conn.cursor()
+            cursor.execute(self.HEALTH_CHECK_QUERY)
+            cursor.fetchall()
+            return True
+        except Exception:
+            with self._lock:
+                self._stats['health_check_failures'] += 1
+            return False
+    
+    def _take_idle(self, user):
+        # Most recently used first, but a session that already holds `user`'s
+        # context wins, so the server skips sp_ResolveAuthContext
+        if user is not None:
+            for i in range(len(self._idle) - 1, -1, -1):
+                if self._idle[i].user == user:
+                    return self._idle.pop(i)
+        return self._idle.pop()
+    
+    def acquire(self, user=None):
+        deadline = time.monotonic() + self.checkout_timeout
+        waited = False
+        started = time.monotonic()
+        
+        with self._lock:
+            while True:
+                if self._closed:
+                    raise PoolTimeoutError("Connection pool is closed")
+                if self._idle:
+                    conn = self._take_idle(user)
+                    break
+                if self._size < self.max_size:
+                    # Reserve the slot now, connect outside the lock
+                    self._size += 1
+                    conn = None
+                    break
+                
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise PoolTimeoutError(
+                        f"No database connection available after {self.checkout_timeout}s")
+                waited = True
+                self._lock.wait(remaining)
+            
+            self._stats['checkouts'] += 1
+            if waited:
+                self._stats['waits'] += 1
+                self._stats['wait_time'] += time.monotonic() - started
+            if user is not None:
+                hit = conn is not None and conn.user == user
+                self._stats['context_hits' if hit else 'context_misses'] += 1
+        
+        if conn is not None and self._is_healthy(conn):
+            return self._assign(conn, user)
+        
+        # Either a fresh slot or a stale connection: (re)connect transparently
+        if conn is not None:
+            conn.close()
+            with self._lock:
+                self._stats['discarded'] += 1
+        try:
+            return self._assign(self._open(), user)
+        except Exception:
+            with self._lock:
+                self._size -= 1
+                self._lock.notify()
+            raise
+    
+    @staticmethod
+    def _assign(conn, user):
+        if user is not None:
+            conn.user = user
+        return conn
+    
+    def release(self, conn, discard=False):
+        with self._lock:
+            if discard or self._closed:
+                self._size -= 1
+                self._stats['discarded'] += 1
+            else:
+                conn.last_used = time.monotonic()
+                self._idle.append(conn)
+            self._lock.notify()
+        if discard or self._closed:
+            conn.close()
+    
+    def connection(self, user=None):
+        """Context manager: check out a connection, preferring one that last served `user`"""
+        return _PoolCheckout(self, user)
+    
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = self._size
+            stats['idle'] = len(self._idle)
+            stats['in_use'] = self._size - len(self._idle)
+            stats['max_size'] = self.max_size
+        return stats
+    
+    def close(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._lock.notify_all()
+        for conn in idle:
+            conn.close()
+
+
+class _PoolCheckout:
+    def __init__(self, pool, user=None):
+        self.pool = pool
+        self.user = user
+        self.conn = None
+    
+    def __enter__(self):
+        self.conn = self.pool.acquire(self.user)
+        return self.conn
+    
+    def __exit__(self, exc_type, exc, tb):
+        broken = exc_type is not None and issubclass(exc_type, self.pool._disconnect_errors())
+        if exc_type is not None and not broken:
+            # Leave no half-finished transaction behind on a reused connection
+            try:
+                self.conn.raw.rollback()
+            except Exception:
+                broken = True
+        self.pool.release(self.conn, discard=broken)
+        return False
+
+
+class ResultCache:
+    """Thread-safe LRU cache of (results, columns) pairs that expire after `ttl` seconds
+    
+    Each entry carries the tags (usually table names) it was read from, so a
+    write can drop exactly the entries it makes stale with invalidate().
+    """
+    
+    def __init__(self, max_entries=128, ttl=60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires, tags, value); oldest first
+        self._invalidated = {}  # tag -> monotonic time of its last invalidate(); None = all tags
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'expired': 0,
+            'evictions': 0,
+            'invalidations': 0,
+        }
+    
+    def get(self, key):
+        """Return the cached value, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                self._stats['expired'] += 1
+                entry = None
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry[2]
+    
+    def put(self, key, value, tags=()):
+        if self.max_entries <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, frozenset(tags), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+    
+    def get_or_load(self, key, loader, tags=()):
+        """Return the cached value or call loader() and cache what it returns
+        
+        The loader runs outside the lock. Failed calls, (None, error), are not
+        cached, and neither is a result whose tags were invalidated while it
+        loaded: it may predate the write that invalidated them.
+        """
+        value = self.get(key)
+        if value is None:
+            started = time.monotonic()
+            value = loader()
+            if value[0] is not None and not self.invalidated_since(tags, started):
+                self.put(key, value, tags)
+        return value
+    
+    def invalidate(self, *tags):
+        """Drop every entry carrying any of `tags`; with no tags, drop everything"""
+        with self._lock:
+            if not tags:
+                stale = list(self._entries)
+            else:
+                wanted = set(tags)
+                stale = [key for key, entry in self._entries.items() if entry[1] & wanted]
+            for key in stale:
+                del self._entries[key]
+            self._stats['invalidations'] += len(stale)
+            invalidated = time.monotonic()
+            for tag in tags or (None,):
+                self._invalidated[tag] = invalidated
+    
+    def invalidated_since(self, tags, since):
+        """True if any of `tags` (or the whole cache) was invalidated at or after `since`"""
+        with self._lock:
+            return any(self._invalidated.get(tag, float('-inf')) >= since
+                       for tag in (None, *tags))
+    
+    def clear(self):
+        self.invalidate()
+    
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+            stats['max_entries'] = self.max_entries
+            lookups = stats['hits'] + stats['misses']
+            stats['hit_ratio'] = round(stats['hits'] / lookups, 3) if lookups else None
+        return stats
+
+
+class PerformanceMonitor:
+    """Latency histograms per call, render times per screen and a slow-call log
+    
+    Database calls record from worker threads and rendering from the Tk thread.
+    With profiling on, profile(label) captures a cProfile report for each screen
+    action and database call; the last `profile_limit` reports are kept.
+    """
+    
+    # Upper bounds (ms) of the latency histogram buckets; one more bucket holds the rest
+    BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+    
+    def __init__(self, slow_call_ms=500.0, slow_log_size=200, profiling=False,
+                 profile_limit=20):
+        self.slow_call_ms = slow_call_ms
+        self.profiling = profiling
+        self.screen = None  # Set on navigation; tags calls with the screen that made them
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._renders = {}
+        self._slow = deque(maxlen=slow_log_size)
+        self._profiles = deque(maxlen=profile_limit)
+        self._profiler_busy = threading.Lock()
+    
+    def record_call(self, name, seconds, rows, error=None):
+        ms = seconds * 1000
+        bucket = next((i for i, bound in enumerate(self.BUCKETS_MS) if ms <= bound),
+                      len(self.BUCKETS_MS))
+        with self._lock:
+            stats = self._calls.get(name)
+            if stats is None:
+                stats = self._calls[name] = {'calls': 0, 'errors': 0, 'total_ms': 0.0,
+                                             'max_ms': 0.0, 'rows': 0,
+                                             'histogram': [0] * (len(self.BUCKETS_MS) + 1)}
+            stats['calls'] += 1
+            stats['errors'] += error is not None
+            stats['total_ms'] += ms
+            stats['max_ms'] = max(stats['max_ms'], ms)
+            stats['rows'] += rows
+            stats['histogram'][bucket] += 1
+            if ms >= self.slow_call_ms:
+                self._slow.append((datetime.now().strftime("%H:%M:%S"), self.screen, name,
+                                   round(ms, 1), rows, error))
+    
+    def record_render(self, screen, seconds, rows):
+        ms = seconds * 1000
+        with self._lock:
+            stats = self._renders.setdefault(screen or '—', {'renders': 0, 'total_ms': 0.0,
+                                                             'max_ms': 0.0, 'rows': 0})
+            stats['renders'] += 1
+            stats['total_ms'] += ms
+            stats['max_ms'] = max(stats['max_ms'], ms)
+            stats['rows'] += rows
+    
+    @contextmanager
+    def profile(self, label):
+        """Profile the block when profiling is on; a no-op otherwise
+        
+        Only one profiler runs at a time; a block that overlaps another
+        profiled block runs unprofiled.
+        """
+        if not self.profiling or not self._profiler_busy.acquire(blocking=False):
+            yield
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # Another profiler or debugger owns the hook
+            self._profiler_busy.release()
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            self._profiler_busy.release()
+            elapsed = time.perf_counter() - started
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(30)
+            with self._lock:
+                self._profiles.append((datetime.now().strftime("%H:%M:%S"), self.screen, label,
+                                       round(elapsed * 1000, 1), out.getvalue()))
+    
+    def percentile(self, histogram, count, pct, max_ms):
+        """Upper bound of the bucket holding the pct-th call (max_ms for the last bucket)"""
+        target = count * pct / 100
+        seen = 0
+        for bound, n in zip(self.BUCKETS_MS, histogram):
+            seen += n
+            if seen >= target:
+                return min(bound, round(max_ms, 1))
+        return round(max_ms, 1)
+    
+    def call_stats(self):
+        """Per-call summary rows, slowest total first"""
+        with self._lock:
+            calls = {name: dict(stats, histogram=list(stats['histogram']))
+                     for name, stats in self._calls.items()}
+        rows = []
+        for name, s in calls.items():
+            rows.append({'name': name, 'calls': s['calls'], 'errors': s['errors'],
+                         'avg_ms': round(s['total_ms'] / s['calls'], 1),
+                         'p50_ms': self.percentile(s['histogram'], s['calls'], 50, s['max_ms']),
+                         'p95_ms': self.percentile(s['histogram'], s['calls'], 95, s['max_ms']),
+                         'max_ms': round(s['max_ms'], 1),
+                         'avg_rows': round(s['rows'] / s['calls'], 1),
+                         'total_ms': round(s['total_ms'], 1)})
+        return sorted(rows, key=lambda r: r['total_ms'], reverse=True)
+    
+    def render_stats(self):
+        with self._lock:
+            return sorted(({'screen': screen, 'renders': s['renders'],
+                            'avg_ms': round(s['total_ms'] / s['renders'], 1),
+                            'max_ms': round(s['max_ms'], 1), 'rows': s['rows']}
+                           for screen, s in self._renders.items()),
+                          key=lambda r: r['max_ms'], reverse=True)
+    
+    def slow_calls(self):
+        """(time, screen, call, ms, rows, error) tuples, newest first"""
+        with self._lock:
+            return list(reversed(self._slow))
+    
+    def profiles(self):
+        """(time, screen, label, ms, report) tuples, newest first"""
+        with self._lock:
+            return list(reversed(self._profiles))
+    
+    def reset(self):
+        with self._lock:
+            self._calls.clear()
+            self._renders.clear()
+            self._slow.clear()
+            self._profiles.clear()
+
+
+@lru_cache(maxsize=256)
+def row_type(columns):
+    """namedtuple class for a result's column names; invalid or repeated names become _0, _1, ..."""
+    return namedtuple('Row', columns, rename=True)
+
+
+def make_rows(columns, rows):
+    make = row_type(tuple(columns))._make
+    return [make(row) for row in rows]
+
+
+class QueryResult(namedtuple('QueryResult', 'rows columns')):
+    """What DatabaseConnection calls return: (rows, columns), or (None, error message)
+    
+    Unpacks like the plain pair. Rows are namedtuples named after the result's
+    columns, so callers read result.first.Result instead of building a dict.
+    """
+    
+    __slots__ = ()
+    
+    @property
+    def error(self):
+        """The failure message, whether the call raised or returned an error row"""
+        return DatabaseConnection.error_of(self.rows, self.columns)
+    
+    @property
+    def first(self):
+        """The first row, or None"""
+        return self.rows[0] if self.rows else None
+
+
+def password_key(password, salt, iterations):
+    """fn_PasswordHash on the client: PBKDF2-HMAC-SHA256 over the NVARCHAR (UTF-16LE) password"""
+    return hashlib.pbkdf2_hmac('sha256', password.encode('utf-16-le'), bytes(salt), iterations)
+
+
+class Procedure:
+    """A stored procedure's parameters, declared once in PROCEDURES
+    
+    Plain names are required; (name, default) pairs have a server-side default
+    and may be left off the end of a call. The {CALL} text for each argument
+    count is built once, so every call of a procedure sends the same statement.
+    
+    reads=True marks a procedure that changes no records, which may run on the
+    snapshot read pool; audited=False marks one that writes no audit row
+    either, which may also run on a read-only replica.
+    """
+    
+    # Parameters naming the user whose authorization context the call resolves
+    CALLER_PARAMS = ('RequestingUserID', 'AdminUserID')
+    
+    __slots__ = ('name', 'params', 'defaults', 'min_args', 'reads', 'audited', 'caller',
+                 '_statements')
+    
+    def __init__(self, name, *params, reads=False, audited=True):
+        self.name = name
+        self.reads = reads
+        self.audited = audited
+        self.params = tuple(p if isinstance(p, str) else p[0] for p in params)
+        self.defaults = dict(p for p in params if not isinstance(p, str))
+        required = [i for i, p in enumerate(params) if isinstance(p, str)]
+        self.min_args = required[-1] + 1 if required else 0
+        self.caller = next((self.params.index(p) for p in self.CALLER_PARAMS if p in self.params),
+                           None)
+        self._statements = {}
+    
+    def bind(self, args):
+        """Positional arguments from a list in declaration order or a dict by parameter name"""
+        if isinstance(args, dict):
+            unknown = set(args) - set(self.params)
+            if unknown:
+                raise TypeError(f"{self.name} has no parameter {', '.join(sorted(unknown))}")
+            # Defaults between supplied parameters are sent explicitly
+            last = max([self.params.index(name) for name in args] + [self.min_args - 1])
+            missing = [name for name in self.params[:last + 1]
+                       if name not in args and name not in self.defaults]
+            if missing:
+                raise TypeError(f"{self.name} is missing {', '.join(missing)}")
+            args = [args[name] if name in args else self.defaults[name]
+                    for name in self.params[:last + 1]]
+        else:
+            args = list(args or ())
+        if not self.min_args <= len(args) <= len(self.params):
+            expected = (f"{self.min_args} to {len(self.params)}" if self.min_args < len(self.params)
+                        else str(self.min_args))
+            raise TypeError(f"{self.name} takes {expected} parameters ({len(args)} given)")
+        return args
+    
+    def caller_of(self, args):
+        """The calling user's ID among bound arguments, or None"""
+        if self.caller is None or self.caller >= len(args):
+            return None
+        return args[self.caller]
+    
+    def statement(self, count):
+        """ODBC call text for `count` arguments"""
+        sql = self._statements.get(count)
+        if sql is None:
+            placeholders = f" ({', '.join(['?'] * count)})" if count else ''
+            sql = self._statements[count] = f"{{CALL {self.name}{placeholders}}}"
+        return sql
+
+
+# Every procedure the client calls, with its parameters in T-SQL declaration order
+PROCEDURES = {proc.name: proc for proc in (
+    Procedure('sp_GetLoginSalt', 'Username', reads=True),
+    Procedure('sp_Login', 'Username', ('Password', None), ('PasswordKey', None)),
+    Procedure('sp_RegisterUser', 'Username', 'Password', 'Role', 'ClearanceLevel',
+              ('CreatedByAdminID', None)),
+    Procedure('sp_ViewCourses', ('RequestingUserID', None), ('RequestingUserRole', 'Guest'),
+              reads=True),
+    Procedure('sp_ViewGrades', ('StudentID', None), ('CourseID', None),
+              'RequestingUserID', 'RequestingUserClearance', reads=True),
+    Procedure('sp_ViewGradesSince', ('StudentID', None), ('CourseID', None),
+              'RequestingUserID', 'RequestingUserClearance', ('SinceVersion', None), reads=True),
+    Procedure('sp_StudentViewOwnGrades', 'RequestingUserID', reads=True),
+    Procedure('sp_EnterGrade', 'StudentID', 'CourseID', 'GradeValue',
+              'RequestingUserID', 'RequestingUserClearance'),
+    Procedure('sp_EnterGradesBulk', 'CourseID', 'Grades', 'RequestingUserID', 'RequestingUserClearance'),
+    Procedure('sp_ViewAttendance', ('StudentID', None), ('CourseID', None),
+              'RequestingUserID', 'RequestingUserClearance', reads=True),
+    Procedure('sp_ViewAttendanceSince', ('StudentID', None), ('CourseID', None),
+              'RequestingUserID', 'RequestingUserClearance', ('SinceVersion', None), reads=True),
+    Procedure('sp_StudentViewOwnAttendance', 'RequestingUserID', ('CourseID', None), reads=True),
+    Procedure('sp_RecordAttendance', 'StudentID', 'CourseID', 'Status',
+              'RequestingUserID', 'RequestingUserClearance'),
+    Procedure('sp_GetCourseRoster', 'CourseID', ('AttendanceDate', None),
+              'RequestingUserID', 'RequestingUserClearance', reads=True),
+    Procedure('sp_RecordAttendanceBatch', 'CourseID', ('AttendanceDate', None), 'Attendance',
+              'RequestingUserID', 'RequestingUserClearance'),
+    Procedure('sp_GetGradeStatsByDepartment', ('Department', None), ('CourseID', None),
+              'RequestingUserID', 'RequestingUserClearance', reads=True),
+    Procedure('sp_GetAttendanceStats', ('CourseID', None), ('Department', None),
+              'RequestingUserID', 'RequestingUserClearance', reads=True),
+    Procedure('sp_GetAggregatePerformanceReport', ('Department', None),
+              'RequestingUserID', 'RequestingUserClearance', reads=True),
+    Procedure('sp_GetCourseEnrollmentStats', ('CourseID', None), reads=True, audited=False),
+    Procedure('sp_ViewStudentProfile', 'StudentID', 'RequestingUserID', 'RequestingUserClearance',
+              reads=True),
+    Procedure('sp_BulkExport', 'TableName', ('CourseID', None), ('FromDate', None), ('ToDate', None),
+              'DestinationClassification', 'RequestingUserID', 'RequestingUserClearance',
+              ('PlanOnly', 0), reads=True),
+    Procedure('sp_SubmitRoleRequest', 'RequestingUserID', 'RequestedRole', 'Reason', ('Comments', None)),
+    Procedure('sp_ViewPendingRoleRequests', 'RequestingUserID', reads=True),
+    Procedure('sp_ViewPendingRoleRequestsSince', 'RequestingUserID', ('SinceVersion', None),
+              reads=True),
+    Procedure('sp_ProcessRoleRequest', 'RequestID', 'AdminUserID', 'Action', ('AdminComments', None)),
+    Procedure('sp_SetAuditMode', 'Mode'),
+    Procedure('sp_GetAuditPipelineStatus'),
+    Procedure('sp_DrainAuditQueue', ('BatchSize', 5000), ('MaxBatches', 200)),
+    Procedure('sp_FlushLoginActivity', ('BatchSize', 5000), ('MaxBatches', 200)),
+)}
+
 
 class DatabaseConnection:
     """Handles all database connections and operations"""
     
-    def __init__(self):
-        self.connection_string = (
-            "Driver={SQL Server};"
-            "Server=MOHAMMED_SALAH;"
-            "Database=SecureStudentRecords;"
-            "Trusted_Connection=yes;"
-        )
-        self.connection = None
+    STREAM_ARRAYSIZE = 500
+    
+    # Secret-level results (grades, attendance, their statistics and rosters) are
+    # never kept in client memory; calls to these always go to the server
+    UNCACHED_PROCEDURES = frozenset({
+        'sp_ViewGrades', 'sp_ViewGradesSince', 'sp_StudentViewOwnGrades', 'sp_EnterGrade',
+        'sp_EnterGradesBulk', 'sp_ViewAttendance', 'sp_ViewAttendanceSince',
+        'sp_StudentViewOwnAttendance', 'sp_GetCourseRoster',
+        'sp_GetGradeStatsByDepartment', 'sp_GetAttendanceStats',
+        'sp_GetAggregatePerformanceReport', 'sp_ViewStudentProfile', 'sp_BulkExport',
+    })
+    
+    # Session setting for the read pool's connections (24_ReadRouting.sql)
+    READ_ISOLATION = {
+        'snapshot': "SET TRANSACTION ISOLATION LEVEL SNAPSHOT",
+        'read committed': None,
+    }
+    
+    # Raw SQL that only reads; anything else stays on the primary pool
+    READ_QUERY = re.compile(r"\s*(SELECT|WITH)\s", re.IGNORECASE)
+    
+    def __init__(self, driver=None, connection_string=None, pool_size=5,
+                 checkout_timeout=10.0, health_check_interval=30.0,
+                 cache_size=128, cache_ttl=60.0, uncached_procedures=None,
+                 slow_call_ms=500.0, profiling=False, read_pool_size=None,
+                 read_isolation='snapshot', replica_connection_string=None):
+        if connection_string is None:
+            connection_string = load_settings()['connection_string']
+        if read_isolation not in self.READ_ISOLATION:
+            raise ValueError(f"Unknown read isolation '{read_isolation}' "
+                             f"(expected one of {', '.join(self.READ_ISOLATION)})")
+        self.connection_string = connection_string
+        self.driver = driver or pyodbc
+        self.pool_size = pool_size
+        # None sizes the read pool like the primary; 0 sends reads to the primary
+        self.read_pool_size = pool_size if read_pool_size is None else read_pool_size
+        self.read_isolation = read_isolation
+        self.replica_connection_string = replica_connection_string or None
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+        self.pool = None
+        self.read_pool = None
+        self.replica_pool = None
+        self.cache = ResultCache(max_entries=cache_size, ttl=cache_ttl)
+        self.monitor = PerformanceMonitor(slow_call_ms=slow_call_ms, profiling=profiling)
+        self.uncached_procedures = frozenset(
+            self.UNCACHED_PROCEDURES if uncached_procedures is None else uncached_procedures)
+    
+    @classmethod
+    def from_settings(cls, settings=None):
+        """Build the connection load_settings() describes
+        
+        backend = standin runs against SRMS_StandIn's SQLite database instead of
+        SQL Server, with the same procedure contracts.
+        """
+        settings = settings or load_settings()
+        driver = None
+        if settings['backend'] == 'standin':
+            from SRMS_StandIn import SQLiteDriver, make_cipher
+            key = bytes.fromhex(settings['standin_key']) if settings['standin_key'] else None
+            driver = SQLiteDriver(path=settings['standin_database'] or None,
+                                  cipher=make_cipher(settings['standin_cipher'], key))
+        return cls(driver=driver, connection_string=settings['connection_string'],
+                   pool_size=int(settings['pool_size']),
+                   checkout_timeout=float(settings['checkout_timeout']),
+                   health_check_interval=float(settings['health_check_interval']),
+                   cache_size=int(settings['cache_size']),
+                   cache_ttl=float(settings['cache_ttl']),
+                   slow_call_ms=float(settings['slow_call_ms']),
+                   profiling=settings['profiling'].lower() in ('1', 'yes', 'true', 'on'),
+                   read_pool_size=int(settings['read_pool_size']),
+                   read_isolation=settings['read_isolation'].lower(),
+                   replica_connection_string=settings['replica_connection_string'])
+    
+    def _pool(self, connection_string, size, session_sql=None):
+        return ConnectionPool(self.driver, connection_string, max_size=size,
+                              checkout_timeout=self.checkout_timeout,
+                              health_check_interval=self.health_check_interval,
+                              session_sql=session_sql)
     
     def connect(self):
         try:
-            self.connection = pyodbc.connect(self.connection_string)
+            if self.driver is None:
+                raise RuntimeError("pyodbc is not installed")
+            self.pool = self._pool(self.connection_string, self.pool_size)
+            self.pool.warm_up()
+            if self.read_pool_size:
+                self.read_pool = self._pool(self.connection_string, self.read_pool_size,
+                                            self.READ_ISOLATION[self.read_isolation])
+                self.read_pool.warm_up()
+                if self.replica_connection_string:
+                    self.replica_pool = self._pool(self.replica_connection_string,
+                                                   self.read_pool_size)
+                    self.replica_pool.warm_up()
             return True
         except Exception as e:
             messagebox.showerror("Connection Error", f"Failed to connect:\n{str(e)}")
             return False
     
+    @staticmethod
+    def procedure(proc_name):
+        """The declared signature of proc_name; calling an undeclared procedure is a bug"""
+        try:
+            return PROCEDURES[proc_name]
+        except KeyError:
+            raise LookupError(f"{proc_name} is not declared in PROCEDURES") from None
+    
+    def call_statement(self, proc_name, params):
+        """({CALL} text, bound arguments) for a procedure call"""
+        proc = self.procedure(proc_name)
+        args = proc.bind(params)
+        return proc.statement(len(args)), args
+    
     def execute_procedure(self, proc_name, params=None):
+        """Call a declared procedure; params is a list in declaration order or a dict by name"""
+        sql, args = self.call_statement(proc_name, params)
+        proc = self.procedure(proc_name)
+        return self._call(sql, args, proc_name, self.route(proc), proc.caller_of(args))
+    
+    def login(self, username, password):
+        """sp_Login with the PBKDF2 key derived here, so the server hashes it only once
+        
+        sp_GetLoginSalt gives the account's salt and iteration count. When it
+        asks for an upgrade (a legacy or below-policy hash), the password is
+        sent instead, once, and sp_Login stores a fresh hash. A locked-out
+        username is sent without either, for sp_Login to reject.
+        """
+        salt = self.execute_procedure('sp_GetLoginSalt', [username])
+        if salt.error is not None or salt.first is None:
+            return salt
+        if salt.first.Locked:
+            return self.execute_procedure('sp_Login', [username])
+        if salt.first.Upgrade:
+            return self.execute_procedure('sp_Login', [username, password])
+        key = password_key(password, salt.first.Salt, salt.first.Iterations)
+        return self.execute_procedure('sp_Login', [username, None, key])
+    
+    def route(self, proc):
+        """The pool a call runs on
+        
+        Writes go to the primary pool. Reads go to the snapshot read pool, so
+        reports never hold locks that grade and attendance entry wait on. A
+        read-only replica only takes reads that write no audit row.
+        """
+        if not proc.reads:
+            return self.pool
+        if not proc.audited and self.replica_pool:
+            return self.replica_pool
+        return self.read_pool or self.pool
+    
+    def query_route(self, sql):
+        """The pool raw SQL runs on: plain SELECTs are reads like any other"""
+        if not self.READ_QUERY.match(sql):
+            return self.pool
+        return self.replica_pool or self.read_pool or self.pool
+    
+    # Procedures go through execute_procedure(), which checks them against PROCEDURES
+    PROCEDURE_TEXT = re.compile(r"\s*(EXEC(UTE)?\s|\{\s*CALL\s)", re.IGNORECASE)
+    
+    def check_query(self, sql):
+        if self.PROCEDURE_TEXT.match(sql):
+            raise ValueError("Stored procedures are called through execute_procedure(), not as query text")
+    
+    @staticmethod
+    def query_label(sql):
+        """Name raw SQL by its first table for the performance monitor"""
+        match = re.search(r"\bFROM\s+(\w+)", sql, re.IGNORECASE)
+        return f"SQL {match.group(1)}" if match else f"SQL {' '.join(sql.split())[:40]}"
+    
+    @staticmethod
+    def error_of(results, columns):
+        """The failure message of a call, whether it raised or returned an error row"""
+        if results is None:
+            return columns
+        if results and columns and columns[0] == 'Result' and results[0][0] == 'Error':
+            return results[0][-1]
+        return None
+    
+    def execute_query(self, sql, params=None, label=None):
+        """Run a SELECT (or other plain statement); returns a QueryResult"""
+        self.check_query(sql)
+        return self._call(sql, params, label or self.query_label(sql), self.query_route(sql))
+    
+    def _call(self, sql, params, label, pool, user=None):
+        started = time.perf_counter()
+        with self.monitor.profile(label):
+            result = self._execute(sql, params, pool, user)
+        error = result.error
+        self.monitor.record_call(label, time.perf_counter() - started,
+                                 len(result.rows) if result.rows and error is None else 0, error)
+        return result
+    
+    def _execute(self, sql, params, pool, user=None):
         try:
-            cursor = self.connection.cursor()
-            if params:
-                placeholders = ', '.join(['?'] * len(params))
-                query = f"EXEC {proc_name} {placeholders}"
-                cursor.execute(query, params)
-            else:
-                cursor.execute(f"EXEC {proc_name}")
-            
+            with pool.connection(user) as conn:
+                cursor = conn.cursor(sql)
+                try:
+                    if params:
+                        cursor.execute(sql, params)
+                    else:
+                        cursor.execute(sql)
+                    
+                    if cursor.description:
+                        columns = [column[0] for column in cursor.description]
+                        results = make_rows(columns, cursor.fetchall())
+                    else:
+                        results, columns = [], []
+                    # Drain any trailing result sets so the reused cursor is clean
+                    while cursor.nextset():
+                        pass
+                except Exception:
+                    conn.discard_cursor(sql)
+                    raise
+                conn.raw.commit()
+                return QueryResult(results, columns)
+        except Exception as e:
+            return QueryResult(None, str(e))
+    
+    def stream_procedure(self, proc_name, params=None, arraysize=None):
+        sql, args = self.call_statement(proc_name, params)
+        proc = self.procedure(proc_name)
+        return self._monitored_stream(sql, args, arraysize, proc_name, self.route(proc),
+                                      proc.caller_of(args))
+    
+    def stream_query(self, sql, params=None, arraysize=None, label=None):
+        """Yield (columns, rows) batches of at most arraysize rows
+        
+        Only one batch is held in memory at a time. The pooled connection is
+        kept until the generator is exhausted or closed. The monitor records the
+        call once the stream ends.
+        """
+        self.check_query(sql)
+        return self._monitored_stream(sql, params, arraysize, label or self.query_label(sql),
+                                      self.query_route(sql))
+    
+    def _monitored_stream(self, sql, params, arraysize, label, pool, user=None):
+        arraysize = arraysize or self.STREAM_ARRAYSIZE
+        started = time.perf_counter()
+        count, error = 0, None
+        batches = self._stream(sql, params, arraysize, pool, user)
+        try:
+            for columns, rows in batches:
+                count += len(rows)
+                yield columns, rows
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            # Closing here, not at garbage collection, returns the connection to the pool
+            batches.close()
+            self.monitor.record_call(label, time.perf_counter() - started, count, error)
+    
+    def _stream(self, sql, params, arraysize, pool, user=None):
+        with pool.connection(user) as conn:
+            # A dedicated cursor, so an abandoned stream never leaks into the shared one
+            cursor = conn.raw.cursor()
             try:
-                results = cursor.fetchall()
-                columns = [column[0] for column in cursor.description] if cursor.description else []
-                cursor.commit()
-                return results, columns
-            except:
-                cursor.commit()
-                return [], []
+                cursor.arraysize = arraysize
+                if params:
+                    cursor.execute(sql, params)
+                else:
+                    cursor.execute(sql)
+                
+                try:
+                    if cursor.description:
+                        columns = [column[0] for column in cursor.description]
+                        make = row_type(tuple(columns))._make
+                        while True:
+                            rows = cursor.fetchmany(arraysize)
+                            if not rows:
+                                break
+                            yield columns, [make(row) for row in rows]
+                finally:
+                    # Read to the end or abandoned, skipping what is left lets the
+                    # procedure finish its audit insert before we commit
+                    while cursor.nextset():
+                        pass
+                    conn.raw.commit()
+            finally:
+                cursor.close()
+    
+    def fetch_in_batches(self, proc_name, params, on_batch, arraysize=None):
+        """Call on_batch(columns, rows) per batch; returning False from it stops early
+        
+        Returns (row_count, None) or (None, error message).
+        """
+        count = 0
+        stream = self.stream_procedure(proc_name, params, arraysize)
+        try:
+            for columns, rows in stream:
+                count += len(rows)
+                if on_batch(columns, rows) is False:
+                    break
+            return count, None
         except Exception as e:
             return None, str(e)
+        finally:
+            stream.close()
+    
+    def export_procedure(self, proc_name, params, writer, cancelled=None, arraysize=None):
+        """Stream a procedure's result into an ExportWriter, yielding (rows written,) per batch
+        
+        The writer is committed once the result has been read to the end. An
+        error row, an exception or setting the `cancelled` event aborts it instead.
+        """
+        finished = False
+        stream = self.stream_procedure(proc_name, params, arraysize)
+        try:
+            for columns, rows in stream:
+                error = self.error_of(rows, columns)
+                if error is not None:
+                    raise RuntimeError(error)
+                if cancelled is not None and cancelled.is_set():
+                    return
+                writer.write(columns, rows)
+                yield (writer.rows,)
+            writer.close()
+            finished = True
+        finally:
+            stream.close()
+            if not finished:
+                writer.abort()
+    
+    def cached_procedure(self, proc_name, params, clearance, tags=()):
+        """execute_procedure() through the result cache
+        
+        The key is the procedure, its parameters and the caller's clearance, so
+        users at different levels never share an entry. Procedures listed in
+        uncached_procedures always go to the server.
+        """
+        if proc_name in self.uncached_procedures:
+            return self.execute_procedure(proc_name, params)
+        key = (proc_name, tuple(params or ()), clearance)
+        return self.cache.get_or_load(key, lambda: self.execute_procedure(proc_name, params),
+                                      tags)
+    
+    def cached_query(self, sql, params, clearance, tags=()):
+        """execute_query() through the result cache; see cached_procedure()"""
+        key = (sql, tuple(params or ()), clearance)
+        return self.cache.get_or_load(key, lambda: self.execute_query(sql, params), tags)
+    
+    def invalidate(self, *tags):
+        """Drop cached results read from any of `tags`; call after every write"""
+        self.cache.invalidate(*tags)
+    
+    def cache_stats(self):
+        return self.cache.stats()
+    
+    def pool_stats(self, route='write'):
+        """Statistics of the 'write', 'read' or 'replica' pool; {} if it is not open"""
+        pool = {'write': self.pool, 'read': self.read_pool, 'replica': self.replica_pool}[route]
+        return pool.stats() if pool else {}
     
     def close(self):
-        if self.connection:
-            self.connection.close()
+        self.cache.clear()
+        for pool in (self.pool, self.read_pool, self.replica_pool):
+            if pool:
+                pool.close()
+
+
+class BackgroundExecutor:
+    """Runs database calls on worker threads and delivers results on the Tk thread
+    
+    Every request belongs to a group (by default the current `group`, which the
+    GUI sets to the screen being shown); cancel_pending() discards one group's
+    requests, or all of them.
+    """
+    
+    def __init__(self, root, max_workers=4, poll_interval=50):
+        self.root = root
+        self.poll_interval = poll_interval
+        self.group = None
+        self.generation = 0
+        self._generations = {}  # group -> generation, bumped when that group is cancelled
+        
+        self._workers = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix='srms-db')
+        # Workers never touch Tk; finished futures are handed over through this queue
+        self._done = queue.Queue()
+        self._pending = {}  # future -> group
+        self._writes = set()  # Never cancelled; only their callbacks are dropped
+        self._lock = threading.Lock()
+        self._stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'cancelled': 0,
+            'stale': 0,
+            'max_queue_depth': 0,
+        }
+        self._after_id = self.root.after(self.poll_interval, self._poll)
+    
+    def token(self, group):
+        """Identifies the current generation of `group`; see current()"""
+        return self.generation, group, self._generations.get(group, 0)
+    
+    def current(self, token):
+        """False once the group the token was taken for has been cancelled"""
+        return token == self.token(token[1])
+    
+    def submit(self, fn, *args, callback=None, cancellable=True, group=None):
+        token = self.token(self.group if group is None else group)
+        future = self._workers.submit(fn, *args)
+        with self._lock:
+            self._pending[future] = token[1]
+            if not cancellable:
+                self._writes.add(future)
+            self._stats['submitted'] += 1
+            self._stats['max_queue_depth'] = max(self._stats['max_queue_depth'],
+                                                 len(self._pending))
+        future.add_done_callback(lambda f: self._done.put((token, f, callback)))
+        return future
+    
+    def submit_stream(self, batches, on_batch, on_done=None, group=None):
+        """Consume the `batches` iterator on a worker, calling on_batch(*item) on the Tk thread
+        
+        on_done(error) runs once the iterator is exhausted; error is None on success.
+        """
+        token = self.token(self.group if group is None else group)
+        
+        def pump():
+            try:
+                for item in batches:
+                    if not self.current(token):
+                        break
+                    self._done.put((token, None, lambda item=item: on_batch(*item)))
+                return None
+            except Exception as e:
+                return str(e)
+            finally:
+                batches.close()
+        
+        return self.submit(pump, callback=on_done, group=token[1])
+    
+    def cancel_pending(self, group=None):
+        """Discard the requests made so far for `group`, e.g. a screen being rebuilt;
+        with no group, discard every request"""
+        with self._lock:
+            if group is None:
+                self.generation += 1
+            else:
+                self._generations[group] = self._generations.get(group, 0) + 1
+            for future, owner in list(self._pending.items()):
+                if future in self._writes or group not in (None, owner):
+                    continue
+                if future.cancel():
+                    self._stats['cancelled'] += 1
+    
+    def queue_depth(self):
+        with self._lock:
+            return len(self._pending)
+    
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['queue_depth'] = len(self._pending)
+        return stats
+    
+    def _poll(self):
+        while True:
+            try:
+                token, future, callback = self._done.get_nowait()
+            except queue.Empty:
+                break
+            
+            if future is None:
+                # Intermediate delivery from submit_stream
+                if self.current(token):
+                    callback()
+                continue
+            
+            with self._lock:
+                self._pending.pop(future, None)
+                self._writes.discard(future)
+                if future.cancelled():
+                    continue
+                if not self.current(token):
+                    # Finished after the screen that asked for it was rebuilt or closed
+                    self._stats['stale'] += 1
+                    continue
+                if future.exception() is not None:
+                    self._stats['failed'] += 1
+                else:
+                    self._stats['completed'] += 1
+            
+            if callback:
+                error = future.exception()
+                callback(QueryResult(None, str(error)) if error is not None else future.result())
+        
+        if self._after_id is not None:  # None once a callback has shut us down
+            self._after_id = self.root.after(self.poll_interval, self._poll)
+    
+    def shutdown(self):
+        self.cancel_pending()
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except tk.TclError:
+                pass
+            self._after_id = None
+        self._workers.shutdown(wait=False)
+
+
+class VirtualTable:
+    """Treeview that only materializes the rows currently scrolled into view
+    
+    Rows are either given up front, pushed in with append_rows() while a
+    stream is running, or fetched a page at a time through
+    page_loader(offset, limit, deliver); deliver(rows) must be called on the
+    Tk thread. Clicking a heading sorts the rows already held client-side.
+    """
+    
+    PAGE_SIZE = 200
+    ROW_HEIGHT = 20
+    
+    def __init__(self, parent, columns, rows=None, page_loader=None,
+                 page_size=PAGE_SIZE, height=20, streaming=False):
+        self.columns = list(columns)
+        self.rows = list(rows) if rows else []
+        self.page_loader = page_loader
+        self.page_size = page_size
+        self.exhausted = page_loader is None and not streaming
+        self.loading = streaming
+        self.offset = 0
+        self.selected_index = None
+        self.sort_column = None
+        self.sort_reverse = False
+        
+        self.frame = tk.Frame(parent, bg='white')
+        self.frame.pack(padx=20, pady=10, fill='both', expand=True)
+        
+        self.status_label = tk.Label(self.frame, text="", font=('Arial', 9),
+                                     bg='white', fg='#7f8c8d', anchor='e')
+        self.status_label.pack(side='bottom', fill='x')
+        
+        self.tree = ttk.Treeview(self.frame, columns=self.columns, show='headings',
+                                 height=height, selectmode='browse')
+        for col in self.columns:
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort_by(c))
+            self.tree.column(col, width=120)
+        self.tree.pack(side='left', fill='both', expand=True)
+        
+        self.scrollbar = ttk.Scrollbar(self.frame, orient='vertical', command=self.on_scroll)
+        self.scrollbar.pack(side='right', fill='y')
+        
+        # A fixed set of item slots is reused; scrolling only rewrites their values
+        self.slots = []
+        self.resize_slots(height)
+        
+        self.tree.bind('<Configure>', self.on_configure)
+        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+        self.tree.bind('<MouseWheel>', lambda e: self.scroll_by(-1 if e.delta > 0 else 1, 'units'))
+        self.tree.bind('<Button-4>', lambda e: self.scroll_by(-1, 'units'))
+        self.tree.bind('<Button-5>', lambda e: self.scroll_by(1, 'units'))
+        
+        if self.page_loader is not None:
+            self.load_more()
+        else:
+            self.refresh()
+    
+    def __len__(self):
+        return len(self.rows)
+    
+    def resize_slots(self, count):
+        count = max(1, count)
+        while len(self.slots) < count:
+            self.slots.append(self.tree.insert('', 'end', values=()))
+        while len(self.slots) > count:
+            self.tree.delete(self.slots.pop())
+    
+    def on_configure(self, event):
+        # Header takes roughly one row; keep one slot per visible line
+        visible = max(1, event.height // self.ROW_HEIGHT - 1)
+        if visible != len(self.slots):
+            self.resize_slots(visible)
+            self.refresh()
+    
+    def on_scroll(self, action, *args):
+        if action == 'moveto':
+            self.scroll_to(int(float(args[0]) * self.scroll_extent()))
+        elif action == 'scroll':
+            self.scroll_by(int(args[0]), args[1])
+    
+    def scroll_by(self, amount, what='units'):
+        step = len(self.slots) if what == 'pages' else 3
+        self.scroll_to(self.offset + amount * step)
+        return 'break'
+    
+    def scroll_to(self, offset):
+        self.offset = max(0, min(offset, len(self.rows) - len(self.slots)))
+        self.refresh()
+    
+    def scroll_extent(self):
+        # While more pages may exist, leave room below the last row to scroll into
+        return max(1, len(self.rows) + (0 if self.exhausted else self.page_size))
+    
+    def refresh(self):
+        visible = len(self.slots)
+        for i, item in enumerate(self.slots):
+            index = self.offset + i
+            self.tree.item(item, values=self.rows[index] if index < len(self.rows) else ())
+        
+        self.tree.selection_remove(self.tree.selection())
+        if self.selected_index is not None and 0 <= self.selected_index - self.offset < visible:
+            self.tree.selection_set(self.slots[self.selected_index - self.offset])
+        
+        extent = self.scroll_extent()
+        self.scrollbar.set(self.offset / extent, min(1.0, (self.offset + visible) / extent))
+        
+        shown = min(len(self.rows), self.offset + visible)
+        total = f"{len(self.rows)}" if self.exhausted else f"{len(self.rows)}+"
+        status = f"Rows {self.offset + 1 if self.rows else 0}-{shown} of {total}"
+        self.status_label.config(text=status + ("  ⏳ Loading..." if self.loading else ""))
+        
+        if (self.page_loader is not None and not self.exhausted and not self.loading
+                and self.offset + 2 * visible >= len(self.rows)):
+            self.load_more()
+    
+    def load_more(self):
+        self.loading = True
+        self.page_loader(len(self.rows), self.page_size, self.on_page)
+    
+    def on_page(self, rows):
+        self.loading = False
+        self.rows.extend(rows)
+        if len(rows) < self.page_size:
+            self.exhausted = True
+        if self.sort_column is not None:
+            self.apply_sort()
+        self.refresh()
+    
+    def append_rows(self, rows):
+        self.rows.extend(rows)
+        if self.sort_column is not None:
+            self.apply_sort()
+        self.refresh()
+    
+    def finish(self):
+        self.loading = False
+        self.exhausted = True
+        self.refresh()
+    
+    def apply_changes(self, rows, keep=None, newest_first=False):
+        """Merge changed rows in by key (their first column) without reloading the rest
+        
+        A row replaces the one with the same key or is added, at the top with
+        newest_first; rows for which keep(row) is false are removed instead.
+        """
+        selected = self.selected_row()
+        index = {row[0]: i for i, row in enumerate(self.rows)}
+        removed, added = set(), []
+        for row in rows:
+            i = index.get(row[0])
+            if keep is not None and not keep(row):
+                if i is not None:
+                    removed.add(i)
+            elif i is None:
+                added.append(row)
+            else:
+                self.rows[i] = row
+        
+        if removed:
+            self.rows = [row for i, row in enumerate(self.rows) if i not in removed]
+        if newest_first:
+            self.rows[:0] = added
+        else:
+            self.rows.extend(added)
+        if self.sort_column is not None:
+            self.apply_sort()
+        
+        self.selected_index = None
+        if selected is not None:
+            self.selected_index = next((i for i, row in enumerate(self.rows) if row[0] == selected[0]),
+                                       None)
+        self.scroll_to(self.offset)
+    
+    def on_select(self, event=None):
+        sel = self.tree.selection()
+        if sel and sel[0] in self.slots:
+            index = self.offset + self.slots.index(sel[0])
+            self.selected_index = index if index < len(self.rows) else None
+    
+    def selected_row(self):
+        if self.selected_index is None or self.selected_index >= len(self.rows):
+            return None
+        return self.rows[self.selected_index]
+    
+    def sort_by(self, column):
+        if self.sort_column == column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column, self.sort_reverse = column, False
+        
+        for col in self.columns:
+            arrow = (' ▼' if self.sort_reverse else ' ▲') if col == column else ''
+            self.tree.heading(col, text=col + arrow)
+        
+        selected = self.selected_row()
+        self.apply_sort()
+        self.selected_index = None
+        if selected is not None:
+            self.selected_index = next(i for i, row in enumerate(self.rows) if row is selected)
+        self.refresh()
+    
+    def apply_sort(self):
+        index = self.columns.index(self.sort_column)
+        
+        try:
+            # NULLs group together; columns of mixed types fall back to text comparison
+            self.rows.sort(key=lambda row: (row[index] is None, row[index]),
+                           reverse=self.sort_reverse)
+        except TypeError:
+            self.rows.sort(key=lambda row: (row[index] is None, str(row[index])),
+                           reverse=self.sort_reverse)
+
+
+def parse_grade_rows(text):
+    """Parse pasted or CSV 'StudentID,Grade' lines into (rows, errors)
+    
+    Tab-separated text (pasted from a spreadsheet) is accepted as well.
+    A non-numeric first line is treated as a header.
+    """
+    delimiter = '\t' if '\t' in text else ','
+    rows, errors, seen = [], [], set()
+    
+    for line_no, record in enumerate(csv.reader(io.StringIO(text), delimiter=delimiter), start=1):
+        record = [field.strip() for field in record]
+        if not any(record):
+            continue
+        if len(record) < 2:
+            errors.append(f"Line {line_no}: expected StudentID,Grade")
+            continue
+        try:
+            student_id = int(record[0])
+            grade = Decimal(record[1]).quantize(Decimal('0.01'))
+        except (ValueError, InvalidOperation):
+            if line_no != 1:
+                errors.append(f"Line {line_no}: not a number")
+            continue
+        if not 0 <= grade <= 100:
+            errors.append(f"Line {line_no}: grade {grade} outside 0-100")
+        elif student_id in seen:
+            errors.append(f"Line {line_no}: StudentID {student_id} listed twice")
+        else:
+            seen.add(student_id)
+            rows.append((student_id, grade))
+    
+    return rows, errors
+
+
+class ExportWriter:
+    """Writes (columns, rows) batches to a CSV or Parquet file as they arrive
+    
+    Only the batch being written is held in memory. Rows go to a '.part' file
+    that close() renames into place; abort() deletes it, so an interrupted
+    export never leaves a truncated file behind. An export that received no
+    rows writes nothing: there are no columns to build a header or Parquet
+    schema from, and a zero-byte file is not valid Parquet.
+    """
+    
+    FORMATS = ('csv', 'parquet')
+    
+    def __init__(self, path, fmt='csv'):
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Unknown export format '{fmt}'")
+        if fmt == 'parquet' and pyarrow is None:
+            raise ValueError("Parquet export requires pyarrow (pip install pyarrow)")
+        self.path = path
+        self.fmt = fmt
+        self.part_path = path + '.part'
+        self.rows = 0
+        self._file = None
+        self._writer = None
+    
+    @classmethod
+    def available_formats(cls):
+        return tuple(fmt for fmt in cls.FORMATS if fmt != 'parquet' or pyarrow is not None)
+    
+    def write(self, columns, rows):
+        if self.fmt == 'csv':
+            if self._writer is None:
+                self._file = open(self.part_path, 'w', newline='', encoding='utf-8')
+                self._writer = csv.writer(self._file)
+                self._writer.writerow(columns)
+            self._writer.writerows(rows)
+        else:
+            # Later batches are held to the schema inferred from the first one
+            schema = self._writer.schema if self._writer is not None else None
+            table = pyarrow.Table.from_pydict(
+                {name: [row[i] for row in rows] for i, name in enumerate(columns)}, schema=schema)
+            if self._writer is None:
+                self._writer = pyarrow.parquet.ParquetWriter(self.part_path, table.schema)
+            self._writer.write_table(table)
+        self.rows += len(rows)
+    
+    def _close_file(self):
+        if self.fmt == 'csv':
+            if self._file is not None:
+                self._file.close()
+        elif self._writer is not None:
+            self._writer.close()
+        self._file = self._writer = None
+    
+    def close(self):
+        if self.rows == 0:
+            self.abort()
+            return
+        self._close_file()
+        os.replace(self.part_path, self.path)
+    
+    def abort(self):
+        self._close_file()
+        try:
+            os.remove(self.part_path)
+        except OSError:
+            pass
 
 
 class LoginWindow:
@@ -59,6 +1553,7 @@ class LoginWindow:
         self.root = root
         self.db = db
         self.on_login_success = on_login_success
+        self.executor = BackgroundExecutor(self.root, max_workers=1)
         
         self.root.title("SRMS - Secure Login")
         self.root.geometry("500x450")
@@ -99,9 +1594,10 @@ class LoginWindow:
         self.password_entry = tk.Entry(form_frame, font=('Arial', 12), show='●')
         self.password_entry.pack(fill='x', pady=(0, 25))
         
-        tk.Button(form_frame, text="LOGIN", font=('Arial', 12, 'bold'),
-                 bg='#27ae60', fg='white', command=self.login,
-                 cursor='hand2', relief='flat', padx=20, pady=12).pack(fill='x')
+        self.login_btn = tk.Button(form_frame, text="LOGIN", font=('Arial', 12, 'bold'),
+                                   bg='#27ae60', fg='white', command=self.login,
+                                   cursor='hand2', relief='flat', padx=20, pady=12)
+        self.login_btn.pack(fill='x')
         
         self.password_entry.bind('<Return>', lambda e: self.login())
         
@@ -116,6 +1612,9 @@ class LoginWindow:
                 font=('Arial', 9), bg='#2c3e50', fg='#95a5a6').pack()
     
     def login(self):
+        if str(self.login_btn['state']) == 'disabled':
+            return  # Return pressed while an attempt is still out
+        
         username = self.username_entry.get().strip()
         password = self.password_entry.get()
         
@@ -123,29 +1622,102 @@ class LoginWindow:
             self.status_label.config(text="Please enter username and password")
             return
         
-        results, columns = self.db.execute_procedure('sp_Login', [username, password])
-        
-        if results and len(results) > 0:
-            result_dict = dict(zip(columns, results[0]))
-            if result_dict.get('Result') == 'Success':
-                user_info = {
-                    'UserID': result_dict.get('UserID'),
-                    'Username': result_dict.get('Username'),
-                    'Role': result_dict.get('Role'),
-                    'ClearanceLevel': result_dict.get('ClearanceLevel')
-                }
-                self.on_login_success(user_info)
-            else:
-                self.status_label.config(text=result_dict.get('Message', 'Login failed'))
-        else:
+        # Two round trips plus the key derivation; keep them off the Tk thread
+        self.login_btn.config(state='disabled')
+        self.status_label.config(text="⏳ Logging in...")
+        self.executor.submit(self.db.login, username, password, callback=self.finish_login)
+    
+    def finish_login(self, result):
+        self.login_btn.config(state='normal')
+        self.status_label.config(text="")
+        row = result.first
+        
+        if row is None:
             self.status_label.config(text="Invalid credentials")
+        elif row.Result == 'Success':
+            user_info = {
+                'UserID': row.UserID,
+                'Username': row.Username,
+                'Role': row.Role,
+                'ClearanceLevel': row.ClearanceLevel
+            }
+            self.executor.shutdown()
+            self.on_login_success(user_info)
+        else:
+            self.status_label.config(text=result.error or 'Login failed')
+
+
+class Screen:
+    """One sidebar destination, built into its own frame on first visit and then kept
+    
+    Leaving a screen only hides its frame. A later visit rebuilds it when
+    stale(): older than max_age seconds (None: never, 0: every visit) or
+    built before a cache invalidation of one of the tags its data was read
+    under. Hooks in on_show/on_hide run as a kept screen is shown again or
+    hidden, e.g. to pause delta polling.
+    """
+    
+    def __init__(self, name, parent, max_age=None):
+        self.name = name
+        self.frame = tk.Frame(parent, bg='#ecf0f1')
+        self.max_age = max_age
+        self.tags = set()
+        self.built_at = time.monotonic()
+        self.on_show = []
+        self.on_hide = []
+    
+    def stale(self, cache):
+        if self.max_age is not None and time.monotonic() - self.built_at >= self.max_age:
+            return True
+        return cache.invalidated_since(self.tags, self.built_at)
+    
+    def show(self):
+        self.frame.pack(fill='both', expand=True)
+        for hook in self.on_show:
+            hook()
+    
+    def hide(self):
+        for hook in self.on_hide:
+            hook()
+        self.frame.pack_forget()
+    
+    def destroy(self):
+        self.hide()
+        self.frame.destroy()
 
 
 class MainApplication:
-    def __init__(self, root, db, user_info):
+    REFRESH_INTERVAL = 5.0
+    
+    # Seconds a built screen is reused (see Screen); screens not listed here
+    # are cached views, kept for the result cache TTL
+    SCREEN_MAX_AGE = {
+        'dashboard': 0,
+        'performance': 0,
+        # Live screens poll for their own changes
+        'grades': None,
+        'attendance': None,
+        'role_requests': None,
+        # Forms keep what was typed into them
+        'role_request': None,
+        'enter_grades': None,
+        'bulk_grades': None,
+        'roll_call': None,
+        'export': None,
+    }
+    
+    def __init__(self, root, db, user_info, refresh_interval=REFRESH_INTERVAL, on_logout=None):
+        """on_logout() runs after logout has cleared the root, e.g. to show the login form again"""
         self.root = root
         self.db = db
         self.user_info = user_info
+        self.on_logout = on_logout
+        self.executor = BackgroundExecutor(self.root)
+        # Seconds between delta polls on live screens; 0 turns polling off
+        self.refresh_interval = refresh_interval
+        self.screens = {}  # name -> Screen, built on first visit
+        self.screen = None
+        self.navigation = []  # (label, show) per sidebar button
         
         self.root.title(f"SRMS - {user_info['Role']} Dashboard")
         self.root.geometry("1400x800")
@@ -168,6 +1740,10 @@ class MainApplication:
                  bg='#e74c3c', fg='white', command=self.logout,
                  cursor='hand2', relief='flat', padx=15, pady=8).pack(side='right', padx=20)
         
+        self.activity_label = tk.Label(header, text="", font=('Arial', 10),
+                                       bg='#34495e', fg='#f1c40f')
+        self.activity_label.pack(side='right', padx=10)
+        
         # Content
         content = tk.Frame(self.root, bg='#ecf0f1')
         content.pack(fill='both', expand=True)
@@ -177,11 +1753,13 @@ class MainApplication:
         sidebar.pack(side='left', fill='y')
         sidebar.pack_propagate(False)
         
-        self.main_panel = tk.Frame(content, bg='#ecf0f1')
-        self.main_panel.pack(side='right', fill='both', expand=True)
+        # Each screen packs its own frame in here; main_panel is the current screen's frame
+        self.screen_area = tk.Frame(content, bg='#ecf0f1')
+        self.screen_area.pack(side='right', fill='both', expand=True)
+        self.main_panel = None
         
         self.create_navigation(sidebar)
-        self.show_dashboard()
+        self.open_screen(self.show_dashboard)
     
     def create_navigation(self, sidebar):
         tk.Label(sidebar, text="📋 MENU", font=('Arial', 12, 'bold'),
@@ -198,16 +1776,22 @@ class MainApplication:
             self.nav_btn("📚 Courses", self.show_courses, sidebar)
             self.nav_btn("📊 Grades", self.show_grades, sidebar)
             self.nav_btn("📅 Attendance", self.show_attendance, sidebar)
+            self.nav_btn("📤 Export", self.show_export, sidebar)
+            self.nav_btn("⏱️ Performance", self.show_performance, sidebar)
         
         elif role == 'Instructor':
             self.nav_btn("📚 My Courses", self.show_my_courses, sidebar)
             self.nav_btn("✏️ Enter Grades", self.show_enter_grades, sidebar)
+            self.nav_btn("📥 Bulk Grades", self.show_bulk_grades, sidebar)
             self.nav_btn("📊 View Grades", self.show_grades, sidebar)
             self.nav_btn("📅 Attendance", self.show_attendance, sidebar)
+            self.nav_btn("✅ Roll Call", self.show_roll_call, sidebar)
+            self.nav_btn("📤 Export", self.show_export, sidebar)
         
         elif role == 'TA':
             self.nav_btn("📚 My Courses", self.show_ta_courses, sidebar)
             self.nav_btn("📅 Attendance", self.show_attendance, sidebar)
+            self.nav_btn("✅ Roll Call", self.show_roll_call, sidebar)
             self.nav_btn("🔄 Request Upgrade", self.show_role_request, sidebar)
         
         elif role == 'Student':
@@ -220,20 +1804,105 @@ class MainApplication:
             self.nav_btn("📚 View Courses", self.show_public_courses, sidebar)
     
     def nav_btn(self, text, command, parent):
+        self.navigation.append((text, command))
         btn = tk.Button(parent, text=text, font=('Arial', 10), bg='#34495e',
-                       fg='white', command=command, cursor='hand2', relief='flat',
-                       anchor='w', padx=20, pady=12)
+                       fg='white', command=lambda: self.open_screen(command),
+                       cursor='hand2', relief='flat', anchor='w', padx=20, pady=12)
         btn.pack(fill='x', padx=5, pady=2)
         btn.bind('<Enter>', lambda e: btn.config(bg='#3498db'))
         btn.bind('<Leave>', lambda e: btn.config(bg='#34495e'))
     
-    def clear_panel(self):
-        for widget in self.main_panel.winfo_children():
-            widget.destroy()
+    def open_screen(self, show):
+        """Navigate to the screen show() builds, reusing it if it was built before and
+        is not stale; calls and renders are attributed to the screen, and the action
+        is profiled when the monitor's profiling mode is on"""
+        monitor = self.db.monitor
+        name = show.__name__.replace('show_', '')
+        monitor.screen = self.executor.group = name
+        with monitor.profile(f"screen {name}"):
+            if self.screen is not None:
+                self.screen.hide()
+            self.screen = self.screens.get(name)
+            if self.screen is not None and self.screen.stale(self.db.cache):
+                # Requests still in flight for the old widgets are dropped; other
+                # screens' requests keep running and land in their hidden frames
+                self.executor.cancel_pending(name)
+                self.screen.destroy()
+                self.screen = None
+            if self.screen is None:
+                self.screen = self.screens[name] = Screen(
+                    name, self.screen_area, self.SCREEN_MAX_AGE.get(name, self.db.cache.ttl))
+                self.main_panel = self.screen.frame
+                self.main_panel.pack(fill='both', expand=True)
+                show()
+            else:
+                self.main_panel = self.screen.frame
+                self.screen.show()
+        self.update_activity()
+    
+    def reopen_screen(self):
+        """Show the current screen again, rebuilding it if a write has made it stale"""
+        self.open_screen(getattr(self, f"show_{self.screen.name}"))
+    
+    def timed_render(self, rows, render, screen=None):
+        """Run render() and record its Tk time against `screen` (default: the current one)"""
+        started = time.perf_counter()
+        result = render()
+        self.db.monitor.record_render(screen or self.db.monitor.screen,
+                                      time.perf_counter() - started, rows)
+        return result
+    
+    def update_activity(self):
+        depth = self.executor.queue_depth()
+        self.activity_label.config(text=f"⏳ Loading ({depth})..." if depth else "")
+    
+    def load_procedure(self, proc_name, params, on_result, cache_tags=None):
+        """Run a procedure off the UI thread and call on_result(screen, results, columns)
+        when done; screen is the one being built, which may be hidden by then
+        
+        With cache_tags, the result is served from and stored in the client result
+        cache under those tags, keyed by the user's clearance, and a write that
+        invalidates them makes the screen stale.
+        """
+        screen = self.screen
+        loading = tk.Label(self.main_panel, text="⏳ Loading...", font=('Arial', 12),
+                          bg='#ecf0f1', fg='#7f8c8d')
+        loading.pack(pady=20)
+        
+        def deliver(result):
+            loading.destroy()
+            self.update_activity()
+            on_result(screen, *result)
+        
+        if cache_tags is None:
+            self.executor.submit(self.db.execute_procedure, proc_name, params, callback=deliver)
+        else:
+            screen.tags.update(cache_tags)
+            self.executor.submit(self.db.cached_procedure, proc_name, params,
+                                 self.user_info['ClearanceLevel'], cache_tags, callback=deliver)
+        self.update_activity()
+    
+    def write_procedure(self, proc_name, params, on_done, invalidate=()):
+        """Run a write off the UI thread and call on_done(result) when it commits
+        
+        Writes are never cancelled. The cache tags in `invalidate` are dropped on
+        the worker as soon as the call returns, so a screen rebuilt before
+        on_done runs already reads past them.
+        """
+        def write():
+            result = self.db.execute_procedure(proc_name, params)
+            if invalidate:
+                self.db.invalidate(*invalidate)
+            return result
+        
+        def deliver(result):
+            self.update_activity()
+            on_done(result)
+        
+        self.executor.submit(write, callback=deliver, cancellable=False)
+        self.update_activity()
     
     def show_dashboard(self):
-        self.clear_panel()
-        
         tk.Label(self.main_panel, text=f"{self.user_info['Role']} Dashboard",
                 font=('Arial', 22, 'bold'), bg='#ecf0f1', fg='#2c3e50').pack(pady=30)
         
@@ -244,6 +1913,15 @@ class MainApplication:
                  self.get_clearance_name(self.user_info['ClearanceLevel']))
         self.card(cards, "👤 Role", self.user_info['Role'], "Active")
         self.card(cards, "✅ Status", "Logged In", datetime.now().strftime("%H:%M"))
+        
+        if self.user_info['Role'] == 'Admin':
+            cache = self.db.cache_stats()
+            ratio = "—" if cache['hit_ratio'] is None else f"{cache['hit_ratio']:.0%}"
+            self.card(cards, "⚡ Result Cache", ratio,
+                     f"{cache['hits']} hits / {cache['misses']} misses")
+            slow = len(self.db.monitor.slow_calls())
+            self.card(cards, "⏱️ Slow Calls", slow,
+                     f"≥ {self.db.monitor.slow_call_ms:g} ms this session")
     
     def card(self, parent, title, value, subtitle):
         c = tk.Frame(parent, bg='white', relief='raised', bd=2)
@@ -256,7 +1934,6 @@ class MainApplication:
         return {1: "Unclassified", 2: "Confidential", 3: "Secret", 4: "Top Secret"}.get(level, "Unknown")
     
     def show_users(self):
-        self.clear_panel()
         tk.Label(self.main_panel, text="User Management", font=('Arial', 18, 'bold'),
                 bg='#ecf0f1', fg='#2c3e50').pack(pady=20)
         
@@ -265,13 +1942,12 @@ class MainApplication:
                  cursor='hand2', relief='flat', padx=20, pady=10).pack(pady=10)
         
         # Show users table
-        results, columns = self.db.execute_procedure(
-            "SELECT UserID, Username, Role, ClearanceLevel, IsActive, LastLogin FROM Users")
-        
-        if results:
-            self.create_table(self.main_panel, 
-                            ['UserID', 'Username', 'Role', 'Clearance', 'Active', 'Last Login'], 
-                            results)
+        self.create_paged_table(self.main_panel,
+                                ['UserID', 'Username', 'Role', 'Clearance', 'Active', 'Last Login'],
+                                "SELECT UserID, Username, Role, ClearanceLevel, IsActive, LastLogin "
+                                "FROM Users ORDER BY UserID "
+                                "OFFSET ? ROWS FETCH NEXT ? ROWS ONLY",
+                                cache_tags=('Users',))
     
     def add_user_dialog(self):
         dialog = tk.Toplevel(self.root)
@@ -309,66 +1985,76 @@ class MainApplication:
                 return
             
             clearance = {'Admin': 4, 'Instructor': 3, 'TA': 2, 'Student': 1, 'Guest': 1}[role]
-            results, _ = self.db.execute_procedure('sp_RegisterUser',
-                                                   [username, password, role, clearance, self.user_info['UserID']])
             
-            if results and dict(zip(['Result'], results[0])).get('Result') == 'Success':
-                messagebox.showinfo("Success", "User created!")
-                dialog.destroy()
-                self.show_users()
-            else:
-                messagebox.showerror("Error", "Failed to create user")
-        
-        tk.Button(form, text="Create User", command=save, bg='#27ae60',
-                 fg='white', font=('Arial', 11, 'bold'), padx=20, pady=10).pack(pady=20)
+            def done(result):
+                if result.error is None:
+                    messagebox.showinfo("Success", "User created!")
+                    dialog.destroy()
+                    self.reopen_screen()
+                else:
+                    save_btn.config(state='normal')
+                    messagebox.showerror("Error", f"Failed to create user:\n{result.error}")
+            
+            save_btn.config(state='disabled')
+            self.write_procedure('sp_RegisterUser',
+                                 [username, password, role, clearance, self.user_info['UserID']],
+                                 done, invalidate=('Users',))
+        
+        save_btn = tk.Button(form, text="Create User", command=save, bg='#27ae60',
+                            fg='white', font=('Arial', 11, 'bold'), padx=20, pady=10)
+        save_btn.pack(pady=20)
     
     def show_role_requests(self):
-        self.clear_panel()
         tk.Label(self.main_panel, text="Role Requests", font=('Arial', 18, 'bold'),
                 bg='#ecf0f1', fg='#2c3e50').pack(pady=20)
         
-        results, columns = self.db.execute_procedure('sp_ViewPendingRoleRequests',
-                                                     [self.user_info['UserID']])
-        
-        if not results:
-            tk.Label(self.main_panel, text="No pending requests", font=('Arial', 12),
-                    bg='#ecf0f1', fg='#7f8c8d').pack(pady=50)
-            return
-        
-        tree = self.create_table(self.main_panel, columns, results)
-        
-        btn_frame = tk.Frame(self.main_panel, bg='#ecf0f1')
+        # Processed requests come back once with their new Status and are dropped
+        self.live_procedure('sp_ViewPendingRoleRequestsSince', [self.user_info['UserID']],
+                            "No pending requests", keep=lambda row: row.Status == 'Pending',
+                            on_table=self.render_role_requests)
+    
+    def render_role_requests(self, panel, table, refresh):
+        btn_frame = tk.Frame(panel, bg='#ecf0f1')
         btn_frame.pack(pady=15)
         
-        def approve():
-            sel = tree.selection()
-            if not sel:
+        def process(action, message, invalidate):
+            row = table.selected_row()
+            if row is None:
                 messagebox.showwarning("Warning", "Select a request")
                 return
-            request_id = tree.item(sel[0])['values'][0]
-            self.db.execute_procedure('sp_ProcessRoleRequest',
-                                     [request_id, self.user_info['UserID'], 'Approve', None])
-            messagebox.showinfo("Success", "Request approved")
-            self.show_role_requests()
+            
+            def done(result):
+                for button in buttons:
+                    button.config(state='normal')
+                if result.error is None:
+                    messagebox.showinfo("Success", message)
+                else:
+                    messagebox.showerror("Error", result.error)
+                refresh()
+            
+            for button in buttons:
+                button.config(state='disabled')
+            self.write_procedure('sp_ProcessRoleRequest',
+                                 [row[0], self.user_info['UserID'], action, None],
+                                 done, invalidate=invalidate)
         
-        def deny():
-            sel = tree.selection()
-            if not sel:
-                messagebox.showwarning("Warning", "Select a request")
-                return
-            request_id = tree.item(sel[0])['values'][0]
-            self.db.execute_procedure('sp_ProcessRoleRequest',
-                                     [request_id, self.user_info['UserID'], 'Deny', None])
-            messagebox.showinfo("Success", "Request denied")
-            self.show_role_requests()
+        def approve():
+            # Approval changes the user's role
+            process('Approve', "Request approved", ('Users', 'RoleRequests'))
         
-        tk.Button(btn_frame, text="✓ Approve", command=approve, bg='#27ae60',
-                 fg='white', font=('Arial', 11, 'bold'), padx=25, pady=10).pack(side='left', padx=10)
-        tk.Button(btn_frame, text="✗ Deny", command=deny, bg='#e74c3c',
-                 fg='white', font=('Arial', 11, 'bold'), padx=25, pady=10).pack(side='left', padx=10)
+        def deny():
+            process('Deny', "Request denied", ('RoleRequests',))
+        
+        buttons = [
+            tk.Button(btn_frame, text="✓ Approve", command=approve, bg='#27ae60',
+                     fg='white', font=('Arial', 11, 'bold'), padx=25, pady=10),
+            tk.Button(btn_frame, text="✗ Deny", command=deny, bg='#e74c3c',
+                     fg='white', font=('Arial', 11, 'bold'), padx=25, pady=10),
+        ]
+        for button in buttons:
+            button.pack(side='left', padx=10)
     
     def show_role_request(self):
-        self.clear_panel()
         tk.Label(self.main_panel, text="Request Role Upgrade", font=('Arial', 18, 'bold'),
                 bg='#ecf0f1', fg='#2c3e50').pack(pady=20)
         
@@ -401,61 +2087,53 @@ class MainApplication:
                 messagebox.showerror("Error", "Fill required fields")
                 return
             
-            results, columns = self.db.execute_procedure('sp_SubmitRoleRequest',
-                                                         [self.user_info['UserID'], role, reason, comments])
-            
-            if results:
-                result = dict(zip(columns, results[0]))
-                if result.get('Result') == 'Success':
-                    messagebox.showinfo("Success", result.get('Message'))
+            def done(result):
+                submit_btn.config(state='normal')
+                if result.error is None:
+                    messagebox.showinfo("Success", result.first.Message)
                     reason_text.delete('1.0', 'end')
                     comments_text.delete('1.0', 'end')
                 else:
-                    messagebox.showerror("Error", result.get('ErrorMessage'))
-        
-        tk.Button(form, text="Submit Request", command=submit, bg='#3498db',
-                 fg='white', font=('Arial', 11, 'bold'), padx=20, pady=10).pack(pady=20)
+                    messagebox.showerror("Error", result.error)
+            
+            submit_btn.config(state='disabled')
+            self.write_procedure('sp_SubmitRoleRequest',
+                                 [self.user_info['UserID'], role, reason, comments],
+                                 done)
+        
+        submit_btn = tk.Button(form, text="Submit Request", command=submit, bg='#3498db',
+                              fg='white', font=('Arial', 11, 'bold'), padx=20, pady=10)
+        submit_btn.pack(pady=20)
     
     def show_students(self):
-        self.clear_panel()
         tk.Label(self.main_panel, text="Student Management", font=('Arial', 18, 'bold'),
                 bg='#ecf0f1', fg='#2c3e50').pack(pady=20)
         
-        results, _ = self.db.execute_procedure(
-            "SELECT StudentID, FullName, Email, Department FROM Student")
-        
-        if results:
-            self.create_table(self.main_panel, 
-                            ['ID', 'Name', 'Email', 'Department'], results)
+        self.create_paged_table(self.main_panel,
+                                ['ID', 'Name', 'Email', 'Department'],
+                                "SELECT StudentID, FullName, Email, Department FROM Student "
+                                "ORDER BY StudentID "
+                                "OFFSET ? ROWS FETCH NEXT ? ROWS ONLY",
+                                cache_tags=('Student',))
     
     def show_courses(self):
-        self.clear_panel()
         tk.Label(self.main_panel, text="Course Management", font=('Arial', 18, 'bold'),
                 bg='#ecf0f1', fg='#2c3e50').pack(pady=20)
         
-        results, columns = self.db.execute_procedure('sp_ViewCourses',
-                                                     [self.user_info['UserID'], self.user_info['Role']])
-        
-        if results:
-            self.create_table(self.main_panel, columns, results)
+        self.load_procedure('sp_ViewCourses',
+                            [self.user_info['UserID'], self.user_info['Role']],
+                            self.render_results, cache_tags=('Course', 'Instructor'))
     
     def show_grades(self):
-        self.clear_panel()
         tk.Label(self.main_panel, text="Grades View", font=('Arial', 18, 'bold'),
                 bg='#ecf0f1', fg='#2c3e50').pack(pady=20)
         
-        results, columns = self.db.execute_procedure('sp_ViewGrades',
-                                                     [None, None, self.user_info['UserID'], 
-                                                      self.user_info['ClearanceLevel']])
-        
-        if results:
-            self.create_table(self.main_panel, columns, results)
-        else:
-            tk.Label(self.main_panel, text="No grades available or insufficient clearance",
-                    font=('Arial', 12), bg='#ecf0f1', fg='#7f8c8d').pack(pady=50)
+        self.live_procedure('sp_ViewGradesSince',
+                            [None, None, self.user_info['UserID'],
+                             self.user_info['ClearanceLevel']],
+                            "No grades available or insufficient clearance")
     
     def show_enter_grades(self):
-        self.clear_panel()
         tk.Label(self.main_panel, text="Enter Grades", font=('Arial', 18, 'bold'),
                 bg='#ecf0f1', fg='#2c3e50').pack(pady=20)
         
@@ -479,69 +2157,372 @@ class MainApplication:
                 student_id = int(student_entry.get())
                 course_id = int(course_entry.get())
                 grade = float(grade_entry.get())
-                
-                results, columns = self.db.execute_procedure('sp_EnterGrade',
-                                                             [student_id, course_id, grade,
-                                                              self.user_info['UserID'],
-                                                              self.user_info['ClearanceLevel']])
-                
-                if results:
-                    result = dict(zip(columns, results[0]))
-                    if result.get('Result') == 'Success':
-                        messagebox.showinfo("Success", "Grade entered successfully")
-                        student_entry.delete(0, 'end')
-                        course_entry.delete(0, 'end')
-                        grade_entry.delete(0, 'end')
-                    else:
-                        messagebox.showerror("Error", result.get('ErrorMessage'))
             except ValueError:
                 messagebox.showerror("Error", "Invalid input")
+                return
+            
+            def done(result):
+                submit_btn.config(state='normal')
+                if result.error is None:
+                    messagebox.showinfo("Success", "Grade entered successfully")
+                    student_entry.delete(0, 'end')
+                    course_entry.delete(0, 'end')
+                    grade_entry.delete(0, 'end')
+                else:
+                    messagebox.showerror("Error", result.error)
+            
+            submit_btn.config(state='disabled')
+            self.write_procedure('sp_EnterGrade',
+                                 [student_id, course_id, grade, self.user_info['UserID'],
+                                  self.user_info['ClearanceLevel']],
+                                 done)
+        
+        submit_btn = tk.Button(form, text="Submit Grade", command=submit, bg='#27ae60',
+                              fg='white', font=('Arial', 11, 'bold'), padx=20, pady=10)
+        submit_btn.pack(pady=20)
+    
+    def show_bulk_grades(self):
+        tk.Label(self.main_panel, text="Bulk Grade Entry", font=('Arial', 18, 'bold'),
+                bg='#ecf0f1', fg='#2c3e50').pack(pady=20)
+        
+        form = tk.Frame(self.main_panel, bg='white', relief='raised', bd=2)
+        form.pack(padx=50, pady=20, fill='both', expand=True)
         
-        tk.Button(form, text="Submit Grade", command=submit, bg='#27ae60',
-                 fg='white', font=('Arial', 11, 'bold'), padx=20, pady=10).pack(pady=20)
+        tk.Label(form, text="Course ID:", font=('Arial', 11, 'bold'), bg='white').pack(pady=5)
+        course_entry = tk.Entry(form, font=('Arial', 11))
+        course_entry.pack(pady=5)
+        
+        tk.Label(form, text="Grades (one 'StudentID,Grade' per line, or paste from a spreadsheet):",
+                font=('Arial', 11, 'bold'), bg='white').pack(pady=5)
+        grades_text = scrolledtext.ScrolledText(form, height=14, width=60)
+        grades_text.pack(pady=5)
+        
+        status_label = tk.Label(form, text="", font=('Arial', 10), bg='white', fg='#7f8c8d')
+        
+        def load_csv():
+            path = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+            if path:
+                with open(path, newline='', encoding='utf-8-sig') as f:
+                    grades_text.delete('1.0', 'end')
+                    grades_text.insert('1.0', f.read())
+        
+        def submit():
+            try:
+                course_id = int(course_entry.get())
+            except ValueError:
+                messagebox.showerror("Error", "Invalid Course ID")
+                return
+            
+            rows, errors = parse_grade_rows(grades_text.get('1.0', 'end-1c'))
+            if errors:
+                messagebox.showerror("Error", "\n".join(errors[:10]))
+                return
+            if not rows:
+                messagebox.showerror("Error", "No grades to submit")
+                return
+            
+            def done(result):
+                submit_btn.config(state='normal')
+                status_label.config(text="")
+                if result.error is None:
+                    messagebox.showinfo("Success", f"{result.first.GradesEntered} grades entered")
+                    grades_text.delete('1.0', 'end')
+                else:
+                    messagebox.showerror("Error", result.error)
+            
+            # The rows travel as one table-valued parameter
+            submit_btn.config(state='disabled')
+            status_label.config(text=f"⏳ Submitting {len(rows)} grades...")
+            self.write_procedure('sp_EnterGradesBulk',
+                                 [course_id, rows, self.user_info['UserID'],
+                                  self.user_info['ClearanceLevel']],
+                                 done, invalidate=('Grades',))
+        
+        btn_frame = tk.Frame(form, bg='white')
+        btn_frame.pack(pady=15)
+        tk.Button(btn_frame, text="📂 Load CSV...", command=load_csv, bg='#3498db',
+                 fg='white', font=('Arial', 11, 'bold'), padx=20, pady=10).pack(side='left', padx=10)
+        submit_btn = tk.Button(btn_frame, text="Submit Grades", command=submit, bg='#27ae60',
+                              fg='white', font=('Arial', 11, 'bold'), padx=20, pady=10)
+        submit_btn.pack(side='left', padx=10)
+        status_label.pack()
     
     def show_attendance(self):
-        self.clear_panel()
         tk.Label(self.main_panel, text="Attendance Management", font=('Arial', 18, 'bold'),
                 bg='#ecf0f1', fg='#2c3e50').pack(pady=20)
         
-        results, columns = self.db.execute_procedure('sp_ViewAttendance',
-                                                     [None, None, self.user_info['UserID'],
-                                                      self.user_info['ClearanceLevel']])
+        self.live_procedure('sp_ViewAttendanceSince',
+                            [None, None, self.user_info['UserID'],
+                             self.user_info['ClearanceLevel']],
+                            "No attendance records", newest_first=True)
+    
+    def show_roll_call(self):
+        tk.Label(self.main_panel, text="Roll Call", font=('Arial', 18, 'bold'),
+                bg='#ecf0f1', fg='#2c3e50').pack(pady=20)
         
-        if results:
-            self.create_table(self.main_panel, columns, results)
-        else:
-            tk.Label(self.main_panel, text="No attendance records",
-                    font=('Arial', 12), bg='#ecf0f1', fg='#7f8c8d').pack(pady=50)
+        controls = tk.Frame(self.main_panel, bg='#ecf0f1')
+        controls.pack(pady=5)
+        tk.Label(controls, text="Course ID:", font=('Arial', 11, 'bold'), bg='#ecf0f1').pack(side='left')
+        course_entry = tk.Entry(controls, font=('Arial', 11), width=8)
+        course_entry.pack(side='left', padx=5)
+        tk.Label(controls, text="Date (YYYY-MM-DD):", font=('Arial', 11, 'bold'), bg='#ecf0f1').pack(side='left', padx=(15, 0))
+        date_entry = tk.Entry(controls, font=('Arial', 11), width=12)
+        date_entry.insert(0, datetime.now().strftime("%Y-%m-%d"))
+        date_entry.pack(side='left', padx=5)
+        
+        # Scrollable checkbox grid, one row per enrolled student
+        grid_frame = tk.Frame(self.main_panel, bg='white', relief='raised', bd=2)
+        grid_frame.pack(padx=50, pady=10, fill='both', expand=True)
+        canvas = tk.Canvas(grid_frame, bg='white', highlightthickness=0)
+        vsb = ttk.Scrollbar(grid_frame, orient='vertical', command=canvas.yview)
+        canvas.configure(yscrollcommand=vsb.set)
+        vsb.pack(side='right', fill='y')
+        canvas.pack(side='left', fill='both', expand=True)
+        roster_frame = tk.Frame(canvas, bg='white')
+        canvas.create_window((0, 0), window=roster_frame, anchor='nw')
+        roster_frame.bind('<Configure>', lambda e: canvas.configure(scrollregion=canvas.bbox('all')))
+        
+        status_label = tk.Label(self.main_panel, text="", font=('Arial', 10), bg='#ecf0f1', fg='#7f8c8d')
+        marks = {}  # StudentID -> BooleanVar (checked = present)
+        loaded = {}
+        
+        def read_inputs():
+            try:
+                course_id = int(course_entry.get())
+            except ValueError:
+                messagebox.showerror("Error", "Invalid Course ID")
+                return None
+            try:
+                day = datetime.strptime(date_entry.get().strip(), "%Y-%m-%d").date()
+            except ValueError:
+                messagebox.showerror("Error", "Invalid date, expected YYYY-MM-DD")
+                return None
+            return course_id, day
+        
+        def render_roster(results, columns):
+            for widget in roster_frame.winfo_children():
+                widget.destroy()
+            marks.clear()
+            loaded.clear()
+            status_label.config(text="")
+            if not results:
+                messagebox.showerror("Error", columns or "No students enrolled")
+                return
+            if columns[0] == 'Result':
+                messagebox.showerror("Error", results[0].ErrorMessage)
+                return
+            for i, (student_id, name, status) in enumerate(results):
+                # Students not yet marked default to present
+                var = tk.BooleanVar(value=True if status is None else bool(status))
+                marks[student_id] = var
+                tk.Checkbutton(roster_frame, text=f"{student_id}  {name}", variable=var,
+                              bg='white', anchor='w', font=('Arial', 10)).grid(
+                    row=i // 3, column=i % 3, sticky='w', padx=10, pady=2)
+            recorded = sum(1 for row in results if row[2] is not None)
+            status_label.config(text=f"{len(results)} students, {recorded} already marked for this date")
+        
+        def load_roster():
+            inputs = read_inputs()
+            if inputs:
+                course_id, day = inputs
+                loaded_key = (course_id, day)
+                
+                def done(result):
+                    render_roster(*result)
+                    if marks:
+                        loaded['key'] = loaded_key
+                
+                status_label.config(text="⏳ Loading roster...")
+                self.executor.submit(self.db.execute_procedure, 'sp_GetCourseRoster',
+                                     [course_id, day, self.user_info['UserID'],
+                                      self.user_info['ClearanceLevel']],
+                                     callback=done)
+        
+        def set_all(present):
+            for var in marks.values():
+                var.set(present)
+        
+        def submit():
+            inputs = read_inputs()
+            if not inputs:
+                return
+            if not marks or loaded.get('key') != inputs:
+                messagebox.showerror("Error", "Load the roster for this course and date first")
+                return
+            course_id, day = inputs
+            rows = [(student_id, var.get()) for student_id, var in marks.items()]
+            
+            def done(result):
+                submit_btn.config(state='normal')
+                status_label.config(text="")
+                if result.error is None:
+                    present = sum(1 for _, status in rows if status)
+                    messagebox.showinfo("Success", f"Attendance saved: {present} present, "
+                                                   f"{len(rows) - present} absent")
+                else:
+                    messagebox.showerror("Error", result.error)
+            
+            # The whole class travels as one table-valued parameter
+            submit_btn.config(state='disabled')
+            status_label.config(text=f"⏳ Saving {len(rows)} marks...")
+            self.write_procedure('sp_RecordAttendanceBatch',
+                                 [course_id, day, rows, self.user_info['UserID'],
+                                  self.user_info['ClearanceLevel']],
+                                 done, invalidate=('Attendance',))
+        
+        tk.Button(controls, text="Load Roster", command=load_roster, bg='#3498db',
+                 fg='white', font=('Arial', 10, 'bold'), padx=10).pack(side='left', padx=10)
+        
+        btn_frame = tk.Frame(self.main_panel, bg='#ecf0f1')
+        btn_frame.pack(pady=10)
+        tk.Button(btn_frame, text="All Present", command=lambda: set_all(True), bg='#95a5a6',
+                 fg='white', font=('Arial', 10, 'bold'), padx=15, pady=6).pack(side='left', padx=5)
+        tk.Button(btn_frame, text="All Absent", command=lambda: set_all(False), bg='#95a5a6',
+                 fg='white', font=('Arial', 10, 'bold'), padx=15, pady=6).pack(side='left', padx=5)
+        submit_btn = tk.Button(btn_frame, text="Submit Roll Call", command=submit, bg='#27ae60',
+                              fg='white', font=('Arial', 11, 'bold'), padx=20, pady=8)
+        submit_btn.pack(side='left', padx=5)
+        status_label.pack()
+    
+    def show_export(self):
+        tk.Label(self.main_panel, text="Bulk Export", font=('Arial', 18, 'bold'),
+                bg='#ecf0f1', fg='#2c3e50').pack(pady=20)
+        
+        form = tk.Frame(self.main_panel, bg='white', relief='raised', bd=2)
+        form.pack(padx=50, pady=20, fill='x')
+        fields = tk.Frame(form, bg='white')
+        fields.pack(pady=15)
+        
+        levels = [f"{level} - {self.get_clearance_name(level)}" for level in range(1, 5)]
+        table_var = tk.StringVar(value='Grades')
+        destination_var = tk.StringVar(value=levels[self.user_info['ClearanceLevel'] - 1])
+        format_var = tk.StringVar(value='csv')
+        
+        def field(row, label, widget):
+            tk.Label(fields, text=label, font=('Arial', 11, 'bold'),
+                    bg='white').grid(row=row, column=0, sticky='e', padx=5, pady=4)
+            widget.grid(row=row, column=1, sticky='w', padx=5, pady=4)
+            return widget
+        
+        field(0, "Data:", ttk.Combobox(fields, textvariable=table_var,
+                                       values=('Grades', 'Attendance'), state='readonly'))
+        course_entry = field(1, "Course ID (blank = all):", tk.Entry(fields, font=('Arial', 11), width=10))
+        from_entry = field(2, "From (YYYY-MM-DD, optional):", tk.Entry(fields, font=('Arial', 11), width=12))
+        to_entry = field(3, "To (YYYY-MM-DD, optional):", tk.Entry(fields, font=('Arial', 11), width=12))
+        field(4, "Destination classification:", ttk.Combobox(fields, textvariable=destination_var,
+                                                             values=levels, state='readonly'))
+        field(5, "Format:", ttk.Combobox(fields, textvariable=format_var,
+                                         values=ExportWriter.available_formats(), state='readonly'))
+        
+        progress = ttk.Progressbar(form, orient='horizontal', length=400, mode='determinate')
+        status_label = tk.Label(form, text="", font=('Arial', 10), bg='white', fg='#7f8c8d')
+        cancelled = threading.Event()
+        
+        def read_inputs():
+            try:
+                course_id = int(course_entry.get()) if course_entry.get().strip() else None
+            except ValueError:
+                messagebox.showerror("Error", "Invalid Course ID")
+                return None
+            try:
+                from_date, to_date = (
+                    datetime.strptime(entry.get().strip(), "%Y-%m-%d").date() if entry.get().strip() else None
+                    for entry in (from_entry, to_entry))
+            except ValueError:
+                messagebox.showerror("Error", "Invalid date, expected YYYY-MM-DD")
+                return None
+            return [table_var.get(), course_id, from_date, to_date, int(destination_var.get()[0]),
+                    self.user_info['UserID'], self.user_info['ClearanceLevel']]
+        
+        def finish(text=""):
+            export_btn.config(state='normal')
+            cancel_btn.config(state='disabled')
+            status_label.config(text=text)
+            self.update_activity()
+        
+        def export():
+            params = read_inputs()
+            if params is None:
+                return
+            fmt = format_var.get()
+            path = filedialog.asksaveasfilename(
+                defaultextension=f".{fmt}", initialfile=f"{params[0].lower()}_export.{fmt}",
+                filetypes=[(f"{fmt.upper()} files", f"*.{fmt}"), ("All files", "*.*")])
+            if not path:
+                return
+            
+            def planned(result):
+                if result.error is not None:
+                    finish()
+                    messagebox.showerror("Error", result.error)
+                    return
+                
+                # A blocked band is still sent to the server, which refuses and audits it
+                total = sum(band.Records for band in result.rows)
+                bands = ', '.join(f"{band.Classification}: {band.Records:,}" for band in result.rows)
+                progress.config(maximum=max(total, 1), value=0)
+                status_label.config(text=f"⏳ Exporting {total:,} records ({bands or 'none'})...")
+                writer = ExportWriter(path, fmt)
+                
+                def on_batch(count):
+                    progress.config(value=count)
+                    status_label.config(text=f"⏳ {count:,} / {total:,} records written")
+                
+                def on_done(error):
+                    if error:
+                        finish()
+                        messagebox.showerror("Error", error)
+                    elif cancelled.is_set():
+                        finish("Export cancelled")
+                    elif writer.rows == 0:
+                        finish("No records matched; no file written")
+                    else:
+                        progress.config(value=max(total, 1))
+                        finish(f"✅ {writer.rows:,} records written to {os.path.basename(path)}")
+                
+                self.executor.submit_stream(
+                    self.db.export_procedure('sp_BulkExport', params + [0], writer, cancelled),
+                    on_batch, on_done)
+            
+            # Per-band counts first, so the progress bar has a total
+            cancelled.clear()
+            export_btn.config(state='disabled')
+            cancel_btn.config(state='normal')
+            status_label.config(text="⏳ Checking flow control...")
+            self.executor.submit(self.db.execute_procedure, 'sp_BulkExport', params + [1],
+                                 callback=planned)
+            self.update_activity()
+        
+        def cancel():
+            cancelled.set()
+            status_label.config(text="⏳ Cancelling...")
+        
+        btn_frame = tk.Frame(form, bg='white')
+        btn_frame.pack(pady=10)
+        export_btn = tk.Button(btn_frame, text="📤 Export...", command=export, bg='#27ae60',
+                              fg='white', font=('Arial', 11, 'bold'), padx=20, pady=8)
+        export_btn.pack(side='left', padx=5)
+        cancel_btn = tk.Button(btn_frame, text="Cancel", command=cancel, bg='#e74c3c', fg='white',
+                              font=('Arial', 11, 'bold'), padx=20, pady=8, state='disabled')
+        cancel_btn.pack(side='left', padx=5)
+        progress.pack(pady=5)
+        status_label.pack(pady=(0, 15))
     
     def show_my_grades(self):
-        self.clear_panel()
         tk.Label(self.main_panel, text="My Grades", font=('Arial', 18, 'bold'),
                 bg='#ecf0f1', fg='#2c3e50').pack(pady=20)
         
-        results, columns = self.db.execute_procedure('sp_StudentViewOwnGrades',
-                                                     [self.user_info['UserID']])
-        
-        if results:
-            self.create_table(self.main_panel, columns, results)
-        else:
-            tk.Label(self.main_panel, text="No grades available",
-                    font=('Arial', 12), bg='#ecf0f1', fg='#7f8c8d').pack(pady=50)
+        self.load_procedure('sp_StudentViewOwnGrades', [self.user_info['UserID']],
+                            lambda screen, results, columns: self.render_results(
+                                screen, results, columns, "No grades available"))
     
     def show_my_attendance(self):
-        self.clear_panel()
         tk.Label(self.main_panel, text="My Attendance", font=('Arial', 18, 'bold'),
                 bg='#ecf0f1', fg='#2c3e50').pack(pady=20)
         
-        results, columns = self.db.execute_procedure('sp_StudentViewOwnAttendance',
-                                                     [self.user_info['UserID'], None])
-        
-        if results:
-            self.create_table(self.main_panel, columns, results)
-        else:
-            tk.Label(self.main_panel, text="No attendance records",
-                    font=('Arial', 12), bg='#ecf0f1', fg='#7f8c8d').pack(pady=50)
+        self.load_procedure('sp_StudentViewOwnAttendance', [self.user_info['UserID'], None],
+                            lambda screen, results, columns: self.render_results(
+                                screen, results, columns, "No attendance records"))
     
     def show_my_courses(self):
         self.show_courses()
@@ -553,58 +2534,277 @@ class MainApplication:
         self.show_courses()
     
     def show_public_courses(self):
-        self.clear_panel()
         tk.Label(self.main_panel, text="Available Courses", font=('Arial', 18, 'bold'),
                 bg='#ecf0f1', fg='#2c3e50').pack(pady=20)
         
-        results, columns = self.db.execute_procedure('sp_ViewCourses',
-                                                     [self.user_info['UserID'], 'Guest'])
-        
-        if results:
-            self.create_table(self.main_panel, columns, results)
+        self.load_procedure('sp_ViewCourses', [self.user_info['UserID'], 'Guest'],
+                            self.render_results, cache_tags=('Course',))
     
-    def create_table(self, parent, columns, data):
-        frame = tk.Frame(parent, bg='white')
-        frame.pack(padx=20, pady=10, fill='both', expand=True)
-        
-        tree = ttk.Treeview(frame, columns=columns, show='headings', height=20)
-        
-        for col in columns:
-            tree.heading(col, text=col)
-            tree.column(col, width=120)
+    def show_performance(self):
+        monitor = self.db.monitor
+        tk.Label(self.main_panel, text="Performance", font=('Arial', 18, 'bold'),
+                bg='#ecf0f1', fg='#2c3e50').pack(pady=20)
         
-        for row in data:
-            tree.insert('', 'end', values=row)
+        controls = tk.Frame(self.main_panel, bg='#ecf0f1')
+        controls.pack(pady=5)
         
-        tree.pack(side='left', fill='both', expand=True)
+        tk.Label(controls, text="Slow call threshold (ms):", font=('Arial', 10),
+                bg='#ecf0f1').pack(side='left')
+        threshold = tk.Entry(controls, font=('Arial', 10), width=8)
+        threshold.insert(0, f"{monitor.slow_call_ms:g}")
+        threshold.pack(side='left', padx=5)
+        profiling = tk.BooleanVar(value=monitor.profiling)
         
-        scrollbar = ttk.Scrollbar(frame, orient='vertical', command=tree.yview)
-        scrollbar.pack(side='right', fill='y')
-        tree.configure(yscrollcommand=scrollbar.set)
+        def apply_threshold():
+            try:
+                monitor.slow_call_ms = float(threshold.get())
+            except ValueError:
+                messagebox.showerror("Error", "Invalid threshold")
+                return
+            self.reopen_screen()
+        
+        def toggle_profiling():
+            monitor.profiling = profiling.get()
+        
+        def reset():
+            monitor.reset()
+            self.reopen_screen()
+        
+        tk.Button(controls, text="Apply", command=apply_threshold, bg='#3498db', fg='white',
+                 font=('Arial', 10), relief='flat', padx=10).pack(side='left', padx=5)
+        tk.Checkbutton(controls, text="cProfile screen actions and calls", variable=profiling,
+                      command=toggle_profiling, font=('Arial', 10),
+                      bg='#ecf0f1').pack(side='left', padx=15)
+        tk.Button(controls, text="🔄 Refresh", command=self.reopen_screen, bg='#27ae60',
+                 fg='white', font=('Arial', 10), relief='flat', padx=10).pack(side='left', padx=5)
+        tk.Button(controls, text="Reset", command=reset, bg='#e74c3c', fg='white',
+                 font=('Arial', 10), relief='flat', padx=10).pack(side='left', padx=5)
+        
+        tabs = ttk.Notebook(self.main_panel)
+        tabs.pack(fill='both', expand=True, padx=20, pady=10)
+        
+        def tab(title, columns, rows):
+            frame = tk.Frame(tabs, bg='white')
+            tabs.add(frame, text=title)
+            return VirtualTable(frame, columns, rows=rows, height=12)
+        
+        tab("Calls", ['Call', 'Calls', 'Errors', 'Avg ms', 'p50 ms', 'p95 ms', 'Max ms', 'Avg Rows'],
+            [(r['name'], r['calls'], r['errors'], r['avg_ms'], r['p50_ms'], r['p95_ms'],
+              r['max_ms'], r['avg_rows']) for r in monitor.call_stats()])
+        tab("Screen Rendering", ['Screen', 'Renders', 'Avg ms', 'Max ms', 'Rows'],
+            [(r['screen'], r['renders'], r['avg_ms'], r['max_ms'], r['rows'])
+             for r in monitor.render_stats()])
+        tab(f"Slow Calls (≥ {monitor.slow_call_ms:g} ms)",
+            ['Time', 'Screen', 'Call', 'ms', 'Rows', 'Error'], monitor.slow_calls())
+        
+        # Reports are looked up by their summary row, which survives column sorting
+        reports = {profile[:4]: profile[4] for profile in monitor.profiles()}
+        profile_table = tab("Profiles", ['Time', 'Screen', 'Action', 'ms'], list(reports))
+        
+        def view_profile():
+            row = profile_table.selected_row()
+            if row is None:
+                messagebox.showwarning("Warning", "Select a profile")
+                return
+            dialog = tk.Toplevel(self.root)
+            dialog.title(f"Profile: {row[2]} ({row[3]} ms)")
+            dialog.geometry("900x600")
+            text = scrolledtext.ScrolledText(dialog, font=('Courier', 9), wrap='none')
+            text.insert('1.0', reports[tuple(row)])
+            text.config(state='disabled')
+            text.pack(fill='both', expand=True)
+        
+        tk.Button(self.main_panel, text="🔍 View Profile", command=view_profile, bg='#3498db',
+                 fg='white', font=('Arial', 11, 'bold'), relief='flat', padx=20,
+                 pady=8).pack(pady=10)
+    
+    def live_procedure(self, proc_name, params, empty_message, keep=None, newest_first=False,
+                       on_table=None):
+        """Stream a "changes since" procedure into a table as rows arrive, then keep it current
+        
+        proc_name takes params plus a trailing SinceVersion and returns rows ending
+        in a RowVersion column, which is not shown. Every refresh_interval seconds
+        only the rows written after the newest version seen are fetched and merged
+        into the table (VirtualTable.apply_changes). Polling pauses while the screen
+        is hidden and catches up when it is shown again. on_table(panel, table,
+        refresh) runs once the table exists; refresh() polls straight away, e.g.
+        after a write.
+        """
+        screen = self.screen
+        panel = self.main_panel
+        placeholder = tk.Label(panel, text="⏳ Loading...", font=('Arial', 12),
+                               bg='#ecf0f1', fg='#7f8c8d')
+        placeholder.pack(pady=20)
+        state = {'table': None, 'placeholder': placeholder, 'since': None,
+                 'busy': True, 'again': False, 'live': True, 'hidden': False, 'after': None}
+        
+        def split(columns, rows):
+            # Any column set without a trailing RowVersion is an error row
+            if columns[-1] != 'RowVersion':
+                state['live'] = False
+                return columns, rows
+            shown = columns[:-1]
+            make = row_type(tuple(shown))._make
+            versions = [row[-1] for row in rows]
+            if state['since'] is not None:
+                versions.append(state['since'])
+            state['since'] = max(versions)
+            return shown, [make(row[:-1]) for row in rows]
+        
+        def show_table(columns, streaming=False):
+            state['placeholder'].destroy()
+            state['table'] = VirtualTable(panel, columns, streaming=streaming)
+            if on_table is not None:
+                on_table(panel, state['table'], refresh)
+        
+        def on_batch(columns, rows):
+            columns, rows = split(columns, rows)
+            if state['table'] is None:
+                show_table(columns, streaming=True)
+            self.timed_render(len(rows), lambda: state['table'].append_rows(rows), screen.name)
+        
+        def on_done(error):
+            self.update_activity()
+            state['busy'] = False
+            if state['table'] is not None:
+                state['table'].finish()
+            else:
+                state['placeholder'].config(text=empty_message)
+            if error is None and state['live']:
+                if state['since'] is None:
+                    # After an empty first load, poll from version zero
+                    state['since'] = bytes(8)
+                schedule()
+        
+        def schedule():
+            if state['again']:
+                state['again'] = False
+                poll()
+            elif self.refresh_interval > 0 and not state['hidden']:
+                state['after'] = self.root.after(int(self.refresh_interval * 1000), poll)
+        
+        def cancel_timer():
+            if state['after'] is not None:
+                self.root.after_cancel(state['after'])
+                state['after'] = None
+        
+        def poll():
+            state['after'] = None
+            if state['busy']:
+                state['again'] = True
+                return
+            state['busy'] = True
+            self.executor.submit(self.db.execute_procedure, proc_name,
+                                 list(params) + [state['since']], callback=on_changes,
+                                 group=screen.name)
+        
+        def on_changes(result):
+            state['busy'] = False
+            if result.error is None and result.rows:
+                columns, rows = split(result.columns, result.rows)
+                if state['table'] is None and any(keep is None or keep(row) for row in rows):
+                    show_table(columns)
+                if state['table'] is not None:
+                    self.timed_render(len(rows), lambda: state['table'].apply_changes(
+                        rows, keep, newest_first), screen.name)
+            # A failed poll is in the performance monitor; the next one retries
+            schedule()
+        
+        def refresh():
+            if state['live']:
+                cancel_timer()
+                poll()
+        
+        def pause():
+            state['hidden'] = True
+            cancel_timer()
+        
+        def resume():
+            state['hidden'] = False
+            refresh()
+        
+        screen.on_hide.append(pause)
+        screen.on_show.append(resume)
+        self.executor.submit_stream(self.db.stream_procedure(proc_name, list(params) + [None]),
+                                    on_batch, on_done, group=screen.name)
+        self.update_activity()
+        return refresh
+    
+    def render_results(self, screen, results, columns, empty_message=None):
+        if results:
+            self.create_table(screen.frame, columns, results, screen.name)
+        elif empty_message:
+            tk.Label(screen.frame, text=empty_message,
+                    font=('Arial', 12), bg='#ecf0f1', fg='#7f8c8d').pack(pady=50)
+    
+    def create_table(self, parent, columns, data, screen=None):
+        return self.timed_render(len(data), lambda: VirtualTable(parent, columns, rows=data),
+                                 screen)
+    
+    def create_paged_table(self, parent, columns, sql, page_size=VirtualTable.PAGE_SIZE,
+                           cache_tags=None):
+        """Table whose rows come from `sql`, which must end in OFFSET ? ROWS FETCH NEXT ? ROWS ONLY
+        
+        With cache_tags, each page is cached like load_procedure() results.
+        """
+        screen = self.screen
+        if cache_tags is not None:
+            screen.tags.update(cache_tags)
+        
+        def load_page(offset, limit, deliver):
+            def on_result(result):
+                rows = result[0] or []
+                self.timed_render(len(rows), lambda: deliver(rows), screen.name)
+            
+            if cache_tags is None:
+                self.executor.submit(self.db.execute_query, sql, [offset, limit],
+                                     callback=on_result, group=screen.name)
+            else:
+                self.executor.submit(self.db.cached_query, sql, [offset, limit],
+                                     self.user_info['ClearanceLevel'], cache_tags,
+                                     callback=on_result, group=screen.name)
         
-        return tree
+        return VirtualTable(parent, columns, page_loader=load_page, page_size=page_size)
     
     def logout(self):
         if messagebox.askyesno("Logout", "Logout?"):
-            self.root.destroy()
-            start_application()
+            self.close()
+            if self.on_logout is not None:
+                self.on_logout()
+    
+    def close(self):
+        """End the session but keep the Tk root and the connection pool for the next one"""
+        for screen in self.screens.values():
+            screen.destroy()  # Stops live screens polling
+        self.screens.clear()
+        self.screen = None
+        self.executor.shutdown()
+        self.db.invalidate()
+        for widget in self.root.winfo_children():
+            widget.destroy()
 
 
 def start_application():
     root = tk.Tk()
-    db = DatabaseConnection()
+    settings = load_settings()
+    db = DatabaseConnection.from_settings(settings)
     
     if not db.connect():
         root.destroy()
         return
     
+    # One root and one pool serve every session; logging out only swaps the widgets
+    def show_login():
+        LoginWindow(root, db, on_login_success)
+    
     def on_login_success(user_info):
-        root.destroy()
-        main_root = tk.Tk()
-        MainApplication(main_root, db, user_info)
-        main_root.mainloop()
+        for widget in root.winfo_children():
+            widget.destroy()
+        MainApplication(root, db, user_info,
+                        refresh_interval=float(settings['refresh_interval']),
+                        on_logout=show_login)
     
-    LoginWindow(root, db, on_login_success)
+    show_login()
     root.mainloop()
 
 
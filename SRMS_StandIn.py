@@ -0,0 +1,1512 @@
+"""
+Secure Student Records Management System (SRMS) - In-Process Stand-In Backend
+SQLite implementation of the stored-procedure contracts the GUI calls, so its data
+paths can be tested and profiled on any machine without SQL Server
+
+Usage:
+    from SRMS_StandIn import SQLiteDriver
+    db = DatabaseConnection(driver=SQLiteDriver(), connection_string='')
+    
+    or set backend = standin in srms.ini (SRMS_BACKEND=standin)
+"""
+
+import atexit
+import hashlib
+import hmac
+import os
+import re
+import sqlite3
+import struct
+import tempfile
+import threading
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+
+try:
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+except ImportError:  # cryptography is optional; the stand-in falls back to NullCipher
+    AESGCM = None
+
+
+# ============================================
+# CIPHERS
+# Play the part of EncryptByKey/DecryptByKey on StudentRecordsKey
+# ============================================
+
+class NullCipher:
+    """Stores values as plain UTF-8; for profiling query shape, never for real data"""
+    
+    name = 'none'
+    
+    def encrypt(self, text):
+        return str(text).encode('utf-8')
+    
+    def decrypt(self, blob):
+        return None if blob is None else bytes(blob).decode('utf-8')
+
+
+class AesGcmCipher:
+    """AES-256-GCM with a random 96-bit nonce per value (needs the cryptography package)"""
+    
+    name = 'aes-256-gcm'
+    NONCE_SIZE = 12
+    
+    def __init__(self, key=None):
+        if AESGCM is None:
+            raise RuntimeError("cryptography is not installed")
+        self._aead = AESGCM(key or AESGCM.generate_key(bit_length=256))
+    
+    def encrypt(self, text):
+        nonce = os.urandom(self.NONCE_SIZE)
+        return nonce + self._aead.encrypt(nonce, str(text).encode('utf-8'), None)
+    
+    def decrypt(self, blob):
+        if blob is None:
+            return None
+        blob = bytes(blob)
+        return self._aead.decrypt(blob[:self.NONCE_SIZE], blob[self.NONCE_SIZE:], None).decode('utf-8')
+
+
+CIPHERS = {'none': NullCipher, 'aes-256-gcm': AesGcmCipher}
+
+
+def make_cipher(name='auto', key=None):
+    """'auto' picks AES-256-GCM when cryptography is installed, otherwise NullCipher"""
+    if name == 'auto':
+        name = 'aes-256-gcm' if AESGCM is not None else 'none'
+    if name not in CIPHERS:
+        raise ValueError(f"Unknown cipher '{name}' (expected auto, {', '.join(CIPHERS)})")
+    return CIPHERS[name](key) if name != 'none' else NullCipher()
+
+
+# ============================================
+# SCHEMA
+# The tables of 02_Tables.sql and the indexes of 12_Indexes.sql, in SQLite types
+# ============================================
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS Users (
+    UserID INTEGER PRIMARY KEY AUTOINCREMENT,
+    Username TEXT UNIQUE NOT NULL,
+    PasswordEncrypted BLOB NULL,
+    PasswordHash BLOB NULL,
+    PasswordSalt BLOB NULL,
+    PasswordIterations INTEGER NULL,
+    Role TEXT NOT NULL CHECK (Role IN ('Admin', 'Instructor', 'TA', 'Student', 'Guest')),
+    ClearanceLevel INTEGER NOT NULL CHECK (ClearanceLevel BETWEEN 1 AND 4),
+    IsActive INTEGER DEFAULT 1,
+    CreatedDate TEXT DEFAULT (datetime('now', 'localtime')),
+    LastLogin TEXT NULL,
+    CONSTRAINT CK_Role_Clearance CHECK (
+        (Role = 'Admin' AND ClearanceLevel = 4) OR
+        (Role = 'Instructor' AND ClearanceLevel >= 3) OR
+        (Role = 'TA' AND ClearanceLevel >= 2) OR
+        (Role = 'Student' AND ClearanceLevel >= 1) OR
+        (Role = 'Guest' AND ClearanceLevel = 1)
+    )
+);
+
+CREATE TABLE IF NOT EXISTS Student (
+    StudentID INTEGER PRIMARY KEY AUTOINCREMENT,
+    StudentIDEncrypted BLOB NULL,
+    FullName TEXT NOT NULL,
+    Email TEXT UNIQUE NOT NULL,
+    PhoneEncrypted BLOB NULL,
+    DOB TEXT NOT NULL,
+    Department TEXT NOT NULL,
+    ClearanceLevel INTEGER DEFAULT 1,
+    ClassificationLevel INTEGER DEFAULT 2,
+    UserID INTEGER NULL REFERENCES Users(UserID),
+    CreatedDate TEXT DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS Instructor (
+    InstructorID INTEGER PRIMARY KEY AUTOINCREMENT,
+    FullName TEXT NOT NULL,
+    Email TEXT UNIQUE NOT NULL,
+    Department TEXT NOT NULL,
+    ClearanceLevel INTEGER DEFAULT 3,
+    ClassificationLevel INTEGER DEFAULT 2,
+    UserID INTEGER NULL REFERENCES Users(UserID),
+    CreatedDate TEXT DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS Course (
+    CourseID INTEGER PRIMARY KEY AUTOINCREMENT,
+    CourseName TEXT NOT NULL,
+    Description TEXT NULL,
+    PublicInfo TEXT NULL,
+    InstructorID INTEGER NULL REFERENCES Instructor(InstructorID),
+    ClassificationLevel INTEGER DEFAULT 1,
+    CreatedDate TEXT DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS Grades (
+    GradeID INTEGER PRIMARY KEY AUTOINCREMENT,
+    StudentIDEncrypted BLOB NOT NULL,
+    StudentIDBlindIndex BLOB NOT NULL,
+    CourseID INTEGER NOT NULL REFERENCES Course(CourseID),
+    GradeValueEncrypted BLOB NOT NULL,
+    DateEntered TEXT DEFAULT (datetime('now', 'localtime')),
+    EnteredByInstructorID INTEGER NOT NULL REFERENCES Instructor(InstructorID),
+    ClassificationLevel INTEGER DEFAULT 3,
+    RowVersion INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS Attendance (
+    AttendanceID INTEGER PRIMARY KEY AUTOINCREMENT,
+    StudentID INTEGER NOT NULL REFERENCES Student(StudentID),
+    CourseID INTEGER NOT NULL REFERENCES Course(CourseID),
+    Status INTEGER NOT NULL,
+    DateRecorded TEXT DEFAULT (datetime('now', 'localtime')),
+    RecordedByUserID INTEGER NULL REFERENCES Users(UserID),
+    ClassificationLevel INTEGER DEFAULT 3,
+    RowVersion INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS CourseEnrollment (
+    EnrollmentID INTEGER PRIMARY KEY AUTOINCREMENT,
+    StudentID INTEGER NOT NULL REFERENCES Student(StudentID),
+    CourseID INTEGER NOT NULL REFERENCES Course(CourseID),
+    EnrollmentDate TEXT DEFAULT (datetime('now', 'localtime')),
+    CONSTRAINT UK_Student_Course UNIQUE (StudentID, CourseID)
+);
+
+CREATE TABLE IF NOT EXISTS TAAssignment (
+    AssignmentID INTEGER PRIMARY KEY AUTOINCREMENT,
+    UserID INTEGER NOT NULL REFERENCES Users(UserID),
+    CourseID INTEGER NOT NULL REFERENCES Course(CourseID),
+    AssignedDate TEXT DEFAULT (datetime('now', 'localtime')),
+    CONSTRAINT UK_TA_Course UNIQUE (UserID, CourseID)
+);
+
+CREATE TABLE IF NOT EXISTS GradeAggregate (
+    Department TEXT NOT NULL,
+    CourseID INTEGER NOT NULL REFERENCES Course(CourseID),
+    StudentCount INTEGER NOT NULL,
+    GradeCount INTEGER NOT NULL,
+    GradeSum REAL NOT NULL,
+    MinGrade REAL NOT NULL,
+    MaxGrade REAL NOT NULL,
+    PRIMARY KEY (Department, CourseID)
+);
+
+CREATE TABLE IF NOT EXISTS GradeAggregateMember (
+    CourseID INTEGER NOT NULL,
+    StudentIDBlindIndex BLOB NOT NULL,
+    GradeCount INTEGER NOT NULL,
+    PRIMARY KEY (CourseID, StudentIDBlindIndex)
+);
+
+CREATE TABLE IF NOT EXISTS AttendanceAggregate (
+    Department TEXT NOT NULL,
+    CourseID INTEGER NOT NULL REFERENCES Course(CourseID),
+    StudentCount INTEGER NOT NULL,
+    PresentCount INTEGER NOT NULL,
+    AbsentCount INTEGER NOT NULL,
+    PRIMARY KEY (Department, CourseID)
+);
+
+CREATE TABLE IF NOT EXISTS AttendanceAggregateMember (
+    CourseID INTEGER NOT NULL,
+    StudentID INTEGER NOT NULL,
+    RecordCount INTEGER NOT NULL,
+    PRIMARY KEY (CourseID, StudentID)
+);
+
+CREATE TABLE IF NOT EXISTS RoleRequests (
+    RequestID INTEGER PRIMARY KEY AUTOINCREMENT,
+    UserID INTEGER NOT NULL REFERENCES Users(UserID),
+    Username TEXT NOT NULL,
+    CurrentRole TEXT NOT NULL,
+    RequestedRole TEXT NOT NULL CHECK (RequestedRole IN ('Admin', 'Instructor', 'TA', 'Student')),
+    Reason TEXT NOT NULL,
+    Comments TEXT NULL,
+    Status TEXT DEFAULT 'Pending' CHECK (Status IN ('Pending', 'Approved', 'Denied')),
+    RequestDate TEXT DEFAULT (datetime('now', 'localtime')),
+    ProcessedDate TEXT NULL,
+    ProcessedByAdminID INTEGER NULL REFERENCES Users(UserID),
+    AdminComments TEXT NULL,
+    RowVersion INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS AuditLog (
+    LogID INTEGER PRIMARY KEY AUTOINCREMENT,
+    UserID INTEGER NULL,
+    Username TEXT NULL,
+    Action TEXT NOT NULL,
+    TableAffected TEXT NULL,
+    RecordID INTEGER NULL,
+    OldValue TEXT NULL,
+    NewValue TEXT NULL,
+    ActionDate TEXT DEFAULT (datetime('now', 'localtime')),
+    IPAddress TEXT NULL,
+    Success INTEGER DEFAULT 1,
+    ErrorMessage TEXT NULL
+);
+
+CREATE TABLE IF NOT EXISTS PasswordPolicy (
+    PolicyID INTEGER PRIMARY KEY DEFAULT 1 CHECK (PolicyID = 1),
+    HashIterations INTEGER NOT NULL DEFAULT 2000 CHECK (HashIterations >= 1),
+    MaxFailedAttempts INTEGER NOT NULL DEFAULT 5,
+    FailureWindowSeconds INTEGER NOT NULL DEFAULT 900,
+    LockoutSeconds INTEGER NOT NULL DEFAULT 300,
+    DecoySaltKey BLOB NOT NULL DEFAULT (randomblob(32))
+);
+
+INSERT OR IGNORE INTO PasswordPolicy (PolicyID) VALUES (1);
+
+CREATE TABLE IF NOT EXISTS LoginThrottle (
+    Username TEXT PRIMARY KEY,
+    FailedCount INTEGER NOT NULL,
+    WindowStart TEXT NOT NULL,
+    LockedUntil TEXT NULL
+);
+
+CREATE TABLE IF NOT EXISTS LoginActivityQueue (
+    QueueID INTEGER PRIMARY KEY AUTOINCREMENT,
+    UserID INTEGER NOT NULL,
+    LoginTime TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime'))
+);
+
+-- @@DBTS: the last ROWVERSION handed out, shared by every versioned table
+CREATE TABLE IF NOT EXISTS RowVersionCounter (
+    CounterID INTEGER PRIMARY KEY DEFAULT 1 CHECK (CounterID = 1),
+    Value INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO RowVersionCounter (CounterID) VALUES (1);
+
+CREATE TABLE IF NOT EXISTS BlindIndexKey (
+    KeyName TEXT PRIMARY KEY,
+    KeyEncrypted BLOB NOT NULL,
+    CreatedDate TEXT DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE INDEX IF NOT EXISTS IX_Grades_StudentIDBlindIndex ON Grades (StudentIDBlindIndex);
+CREATE INDEX IF NOT EXISTS IX_Grades_CourseID ON Grades (CourseID);
+CREATE INDEX IF NOT EXISTS IX_Attendance_StudentID_CourseID ON Attendance (StudentID, CourseID, DateRecorded);
+CREATE INDEX IF NOT EXISTS IX_Attendance_CourseID_DateRecorded ON Attendance (CourseID, DateRecorded DESC);
+CREATE INDEX IF NOT EXISTS IX_Course_InstructorID ON Course (InstructorID);
+CREATE INDEX IF NOT EXISTS IX_Instructor_UserID ON Instructor (UserID);
+CREATE INDEX IF NOT EXISTS IX_Student_UserID ON Student (UserID) WHERE UserID IS NOT NULL;
+CREATE INDEX IF NOT EXISTS IX_Student_Department ON Student (Department);
+CREATE INDEX IF NOT EXISTS IX_CourseEnrollment_CourseID ON CourseEnrollment (CourseID, StudentID);
+CREATE INDEX IF NOT EXISTS IX_TAAssignment_CourseID ON TAAssignment (CourseID);
+CREATE INDEX IF NOT EXISTS IX_RoleRequests_Status_RequestDate ON RoleRequests (Status, RequestDate);
+CREATE INDEX IF NOT EXISTS IX_RoleRequests_UserID_Status ON RoleRequests (UserID, Status);
+CREATE INDEX IF NOT EXISTS IX_AuditLog_ActionDate ON AuditLog (ActionDate);
+CREATE INDEX IF NOT EXISTS IX_AuditLog_UserID_ActionDate ON AuditLog (UserID, ActionDate);
+CREATE INDEX IF NOT EXISTS IX_Grades_RowVersion ON Grades (RowVersion);
+CREATE INDEX IF NOT EXISTS IX_Attendance_RowVersion ON Attendance (RowVersion);
+CREATE INDEX IF NOT EXISTS IX_RoleRequests_RowVersion ON RoleRequests (RowVersion);
+"""
+
+# ROWVERSION columns of 23_DeltaRefresh.sql: every insert and update takes the next
+# counter value. SQLite has one writer at a time, so versions become visible in order.
+ROWVERSION_TRIGGERS = "".join(f"""
+CREATE TRIGGER IF NOT EXISTS TR_{table}_RowVersion_{event.title()} AFTER {event} ON {table}
+BEGIN
+    UPDATE RowVersionCounter SET Value = Value + 1;
+    UPDATE {table} SET RowVersion = (SELECT Value FROM RowVersionCounter) WHERE {key} = NEW.{key};
+END;
+""" for table, key in (('Grades', 'GradeID'), ('Attendance', 'AttendanceID'), ('RoleRequests', 'RequestID'))
+    for event in ('INSERT', 'UPDATE'))
+
+ROLE_CLEARANCE = {'Student': 1, 'TA': 2, 'Instructor': 3, 'Admin': 4}
+
+# Role upgrade paths accepted by sp_SubmitRoleRequest
+UPGRADE_PATHS = {
+    'Guest': ('Student', 'TA'),
+    'Student': ('TA', 'Instructor'),
+    'TA': ('Instructor',),
+}
+
+
+CLASSIFICATION_NAMES = {1: 'Unclassified', 2: 'Confidential', 3: 'Secret', 4: 'Top Secret'}
+
+
+def check_flow_control(source, destination, clearance):
+    """fn_CheckFlowControl: no read up, no write down, no flow from high to low"""
+    return source <= clearance and destination >= clearance and source <= destination
+
+
+class ProcedureError(Exception):
+    """RAISERROR inside a procedure; reported as an ('Error', message) row"""
+
+
+def now(seconds=0):
+    """GETDATE() as text, optionally DATEADD(SECOND, seconds, ...)"""
+    return (datetime.now() + timedelta(seconds=seconds)).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+
+
+def password_hash(password, salt, iterations):
+    """fn_PasswordHash: PBKDF2-HMAC-SHA256 over the NVARCHAR (UTF-16LE) password"""
+    return hashlib.pbkdf2_hmac('sha256', password.encode('utf-16-le'), salt, iterations)
+
+
+def stored_hash(key):
+    """Users.PasswordHash: HASHBYTES('SHA2_256') of the PBKDF2 key"""
+    return hashlib.sha256(key).digest()
+
+
+def day_range(day):
+    """[start, end) text bounds of a calendar day, sargable on DateRecorded"""
+    start = day.isoformat()
+    end = date.fromordinal(day.toordinal() + 1).isoformat()
+    return start, end
+
+
+def as_date(value):
+    if value is None or isinstance(value, date) and not isinstance(value, datetime):
+        return value
+    if isinstance(value, datetime):
+        return value.date()
+    return datetime.strptime(str(value)[:10], '%Y-%m-%d').date()
+
+
+def as_rowversion(value):
+    """BINARY(8) ROWVERSION as the counter value, or None"""
+    if value is None or isinstance(value, int):
+        return value
+    return int.from_bytes(bytes(value), 'big')
+
+
+def rowversion(value):
+    """The counter value as the BINARY(8) the server returns"""
+    return value.to_bytes(8, 'big')
+
+
+def as_grade(value):
+    """DECIMAL(5,2) as the procedures receive it"""
+    try:
+        return Decimal(str(value)).quantize(Decimal('0.01'))
+    except (InvalidOperation, ValueError):
+        raise ProcedureError(f"Error converting '{value}' to numeric")
+
+
+# ============================================
+# STORED PROCEDURES
+# One method per procedure; parameters and result columns match the T-SQL
+# ============================================
+
+class Procedures:
+    """The stored procedures the GUI and benchmarks call, over a SQLite connection
+    
+    Each sp_* method takes the connection and the positional EXEC parameters and
+    returns (columns, rows). RBAC and MLS checks run in the same order as on the
+    server; the caller's role is resolved per call rather than from SESSION_CONTEXT.
+    """
+    
+    def __init__(self, cipher, blind_index_key):
+        self.cipher = cipher
+        self.blind_index_key = blind_index_key
+    
+    def call(self, conn, name, params):
+        procedure = getattr(self, name, None) if name.startswith('sp_') else None
+        if procedure is None:
+            raise SQLiteDriver.ProgrammingError(
+                f"Could not find stored procedure '{name}' in the stand-in backend")
+        try:
+            return procedure(conn, *params)
+        except (ProcedureError, sqlite3.IntegrityError) as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            return ['Result', 'ErrorMessage'], [('Error', str(e))]
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+    
+    # -------- helpers --------
+    
+    def blind_index(self, student_id):
+        """HMAC-SHA256 over the big-endian INT, as fn_BlindIndexPads + HASHBYTES compute it"""
+        return hmac.new(self.blind_index_key, struct.pack('>i', int(student_id)),
+                        hashlib.sha256).digest()
+    
+    def decrypt_int(self, blob):
+        return int(self.cipher.decrypt(blob))
+    
+    def decrypt_grade(self, blob):
+        return Decimal(self.cipher.decrypt(blob)).quantize(Decimal('0.01'))
+    
+    @staticmethod
+    def audit(conn, action, user_id=None, username=None, table=None, record_id=None,
+              new_value=None, success=1, error=None):
+        conn.execute("INSERT INTO AuditLog (UserID, Username, Action, TableAffected, RecordID, "
+                     "NewValue, ActionDate, Success, ErrorMessage) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                     (user_id, username, action, table, record_id, new_value, now(), success, error))
+    
+    @staticmethod
+    def auth_context(conn, user_id):
+        """(Role, InstructorID, TA course ids) as sp_ResolveAuthContext returns them"""
+        row = conn.execute("SELECT Role FROM Users WHERE UserID = ?", (user_id,)).fetchone()
+        if row is None:
+            return 'Unknown', None, frozenset()
+        instructor = conn.execute("SELECT InstructorID FROM Instructor WHERE UserID = ?",
+                                  (user_id,)).fetchone()
+        ta_courses = frozenset(r[0] for r in conn.execute(
+            "SELECT CourseID FROM TAAssignment WHERE UserID = ?", (user_id,)))
+        return row[0], instructor[0] if instructor else None, ta_courses
+    
+    @staticmethod
+    def begin(conn):
+        # Take the write lock up front, like UPDLOCK, so concurrent writers queue
+        # on busy_timeout instead of failing on lock upgrade
+        conn.execute("BEGIN IMMEDIATE")
+    
+    def check_course_access(self, conn, role, instructor_id, ta_courses, course_id):
+        if role == 'TA' and course_id not in ta_courses:
+            raise ProcedureError('Access Denied: You are not assigned to this course')
+        if role == 'Instructor' and conn.execute(
+                "SELECT 1 FROM Course WHERE CourseID = ? AND InstructorID = ?",
+                (course_id, instructor_id)).fetchone() is None:
+            raise ProcedureError('Access Denied: You do not teach this course')
+    
+    def add_grade_aggregate(self, conn, course_id, student_id, blind_index, grade):
+        department = conn.execute("SELECT Department FROM Student WHERE StudentID = ?",
+                                  (student_id,)).fetchone()[0]
+        cursor = conn.execute("UPDATE GradeAggregateMember SET GradeCount = GradeCount + 1 "
+                              "WHERE CourseID = ? AND StudentIDBlindIndex = ?", (course_id, blind_index))
+        new_student = 0
+        if cursor.rowcount == 0:
+            conn.execute("INSERT INTO GradeAggregateMember (CourseID, StudentIDBlindIndex, GradeCount) "
+                         "VALUES (?, ?, 1)", (course_id, blind_index))
+            new_student = 1
+        value = float(grade)
+        conn.execute(
+            "INSERT INTO GradeAggregate (Department, CourseID, StudentCount, GradeCount, GradeSum, "
+            "MinGrade, MaxGrade) VALUES (?, ?, ?, 1, ?, ?, ?) "
+            "ON CONFLICT (Department, CourseID) DO UPDATE SET "
+            "StudentCount = StudentCount + excluded.StudentCount, GradeCount = GradeCount + 1, "
+            "GradeSum = GradeSum + excluded.GradeSum, MinGrade = MIN(MinGrade, excluded.MinGrade), "
+            "MaxGrade = MAX(MaxGrade, excluded.MaxGrade)",
+            (department, course_id, new_student, value, value, value))
+    
+    @staticmethod
+    def add_attendance_aggregate(conn, course_id, student_id, old_status, new_status):
+        """old_status is None for a new record"""
+        department = conn.execute("SELECT Department FROM Student WHERE StudentID = ?",
+                                  (student_id,)).fetchone()[0]
+        new_student = 0
+        if old_status is None:
+            cursor = conn.execute("UPDATE AttendanceAggregateMember SET RecordCount = RecordCount + 1 "
+                                  "WHERE CourseID = ? AND StudentID = ?", (course_id, student_id))
+            if cursor.rowcount == 0:
+                conn.execute("INSERT INTO AttendanceAggregateMember (CourseID, StudentID, RecordCount) "
+                             "VALUES (?, ?, 1)", (course_id, student_id))
+                new_student = 1
+            present, absent = new_status, 1 - new_status
+        else:
+            present = new_status - old_status
+            absent = -present
+        conn.execute(
+            "INSERT INTO AttendanceAggregate (Department, CourseID, StudentCount, PresentCount, "
+            "AbsentCount) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (Department, CourseID) DO UPDATE SET "
+            "StudentCount = StudentCount + excluded.StudentCount, "
+            "PresentCount = PresentCount + excluded.PresentCount, "
+            "AbsentCount = AbsentCount + excluded.AbsentCount",
+            (department, course_id, new_student, present, absent))
+    
+    # -------- authentication and users --------
+    
+    def sp_RecordLoginFailure(self, conn, username, user_id=None):
+        max_failed, window, lockout = conn.execute(
+            "SELECT MaxFailedAttempts, FailureWindowSeconds, LockoutSeconds FROM PasswordPolicy").fetchone()
+        self.begin(conn)
+        conn.execute(
+            "INSERT INTO LoginThrottle (Username, FailedCount, WindowStart) VALUES (?, 1, ?) "
+            "ON CONFLICT (Username) DO UPDATE SET "
+            "FailedCount = CASE WHEN WindowStart < ? THEN 1 ELSE FailedCount + 1 END, "
+            "WindowStart = CASE WHEN WindowStart < ? THEN excluded.WindowStart ELSE WindowStart END",
+            (username, now(), now(-window), now(-window)))
+        cursor = conn.execute("UPDATE LoginThrottle SET LockedUntil = ?, FailedCount = 0, WindowStart = ? "
+                              "WHERE Username = ? AND FailedCount >= ?",
+                              (now(lockout), now(), username, max_failed))
+        if cursor.rowcount > 0:
+            self.audit(conn, 'Login Throttled', user_id, username, table='LoginThrottle', success=0,
+                       error=f'{max_failed} failed attempts; locked for {lockout} seconds')
+        conn.execute("COMMIT")
+    
+    def sp_GetLoginSalt(self, conn, username):
+        policy_iterations, decoy_key = conn.execute(
+            "SELECT HashIterations, DecoySaltKey FROM PasswordPolicy").fetchone()
+        row = conn.execute("SELECT PasswordSalt, PasswordIterations, PasswordHash FROM Users "
+                           "WHERE Username = ?", (username,)).fetchone()
+        upgrade = 0
+        if row is not None:
+            salt, iterations, hashed = row
+            upgrade = int(hashed is None or iterations < policy_iterations)
+        if row is None or salt is None:
+            salt = hashlib.sha256(decoy_key + username.encode('utf-16-le')).digest()[:16]
+            iterations = policy_iterations
+        locked = int(conn.execute("SELECT 1 FROM LoginThrottle WHERE Username = ? AND LockedUntil > ?",
+                                  (username, now())).fetchone() is not None)
+        return ['Salt', 'Iterations', 'Upgrade', 'Locked'], [(salt, iterations, upgrade, locked)]
+    
+    def sp_Login(self, conn, username, password=None, password_key=None):
+        columns = ['Result', 'Message']
+        if conn.execute("SELECT 1 FROM LoginThrottle WHERE Username = ? AND LockedUntil > ?",
+                        (username, now())).fetchone() is not None:
+            return columns, [('Error', 'Too many failed attempts. Try again later')]
+        
+        row = conn.execute("SELECT UserID, PasswordHash, PasswordSalt, PasswordIterations, PasswordEncrypted, "
+                           "Role, ClearanceLevel, IsActive FROM Users WHERE Username = ?", (username,)).fetchone()
+        if row is None:
+            self.audit(conn, 'Login Failed', username=username, success=0, error='User not found')
+            self.sp_RecordLoginFailure(conn, username)
+            return columns, [('Error', 'Invalid credentials')]
+        user_id, hashed, salt, iterations, stored, role, clearance, is_active = row
+        if not is_active:
+            self.audit(conn, 'Login Failed', user_id, username, success=0, error='Account disabled')
+            return columns, [('Error', 'Account is disabled')]
+        
+        policy_iterations = conn.execute("SELECT HashIterations FROM PasswordPolicy").fetchone()[0]
+        rehash = None  # password to store under a fresh salt
+        verified = False
+        if hashed is not None:
+            if password_key is not None:
+                verified = hmac.compare_digest(stored_hash(password_key), hashed)
+            elif password is not None:
+                verified = hmac.compare_digest(stored_hash(password_hash(password, salt, iterations)), hashed)
+                if verified and iterations < policy_iterations:
+                    rehash = password
+        elif password is not None:
+            # Legacy account: decrypt and compare once, then upgrade
+            verified = self.cipher.decrypt(stored) == password
+            rehash = password
+        if not verified:
+            self.audit(conn, 'Login Failed', user_id, username, success=0, error='Invalid password')
+            self.sp_RecordLoginFailure(conn, username, user_id)
+            return columns, [('Error', 'Invalid credentials')]
+        
+        self.begin(conn)
+        if rehash is not None:
+            new_salt = os.urandom(16)
+            conn.execute("UPDATE Users SET PasswordHash = ?, PasswordSalt = ?, PasswordIterations = ?, "
+                         "PasswordEncrypted = NULL WHERE UserID = ?",
+                         (stored_hash(password_hash(rehash, new_salt, policy_iterations)), new_salt,
+                          policy_iterations, user_id))
+        if conn.execute("SELECT 1 FROM LoginThrottle WHERE Username = ?", (username,)).fetchone() is not None:
+            conn.execute("DELETE FROM LoginThrottle WHERE Username = ?", (username,))
+        conn.execute("INSERT INTO LoginActivityQueue (UserID, LoginTime) VALUES (?, ?)", (user_id, now()))
+        self.audit(conn, 'Login Successful', user_id, username)
+        conn.execute("COMMIT")
+        return (['Result', 'UserID', 'Username', 'Role', 'ClearanceLevel'],
+                [('Success', user_id, username, role, clearance)])
+    
+    def sp_FlushLoginActivity(self, conn, batch_size=5000, max_batches=200):
+        flushed = batches = 0
+        while batches < max_batches:
+            self.begin(conn)
+            queued = conn.execute("SELECT QueueID, UserID, LoginTime FROM LoginActivityQueue "
+                                  "ORDER BY QueueID LIMIT ?", (batch_size,)).fetchall()
+            if not queued:
+                conn.execute("COMMIT")
+                break
+            latest = {}
+            for _, user_id, login_time in queued:
+                latest[user_id] = max(login_time, latest.get(user_id, login_time))
+            conn.execute("DELETE FROM LoginActivityQueue WHERE QueueID <= ?", (queued[-1][0],))
+            conn.executemany("UPDATE Users SET LastLogin = ? WHERE UserID = ? "
+                             "AND (LastLogin IS NULL OR LastLogin < ?)",
+                             [(login_time, user_id, login_time) for user_id, login_time in latest.items()])
+            conn.execute("COMMIT")
+            flushed += len(queued)
+            batches += 1
+        return ['Result', 'LoginsFlushed', 'Batches'], [('Success', flushed, batches)]
+    
+    def sp_RegisterUser(self, conn, username, password, role, clearance, created_by=None):
+        try:
+            if created_by is not None:
+                admin = conn.execute("SELECT Role FROM Users WHERE UserID = ?", (created_by,)).fetchone()
+                if admin is not None and admin[0] != 'Admin':
+                    raise ProcedureError('Only Admin can create users')
+            iterations = conn.execute("SELECT HashIterations FROM PasswordPolicy").fetchone()[0]
+            salt = os.urandom(16)
+            self.begin(conn)
+            cursor = conn.execute("INSERT INTO Users (Username, PasswordHash, PasswordSalt, PasswordIterations, "
+                                  "Role, ClearanceLevel) VALUES (?, ?, ?, ?, ?, ?)",
+                                  (username, stored_hash(password_hash(password, salt, iterations)), salt,
+                                   iterations, role, clearance))
+            self.audit(conn, 'User Registration', username=username, table='Users',
+                       record_id=cursor.lastrowid)
+            conn.execute("COMMIT")
+            return ['Result', 'UserID'], [('Success', cursor.lastrowid)]
+        except (ProcedureError, sqlite3.IntegrityError) as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            self.audit(conn, 'User Registration Failed', username=username, success=0, error=str(e))
+            raise
+    
+    # -------- courses --------
+    
+    def sp_ViewCourses(self, conn, user_id=None, role='Guest'):
+        if role == 'Guest':
+            cursor = conn.execute("SELECT CourseID, CourseName, PublicInfo FROM Course")
+        else:
+            cursor = conn.execute(
+                "SELECT c.CourseID, c.CourseName, c.Description, c.PublicInfo, c.InstructorID, "
+                "i.FullName AS InstructorName "
+                "FROM Course c LEFT JOIN Instructor i ON c.InstructorID = i.InstructorID")
+        columns = [d[0] for d in cursor.description]
+        rows = cursor.fetchall()
+        if user_id is not None:
+            self.audit(conn, 'View Courses', user_id, table='Course')
+        return columns, rows
+    
+    # -------- grades --------
+    
+    def sp_ViewGrades(self, conn, student_id, course_id, user_id, clearance):
+        columns, rows = self.select_grades(conn, student_id, course_id, user_id, clearance)
+        self.audit(conn, 'View Grades', user_id, table='Grades')
+        return columns, rows
+    
+    def sp_ViewGradesSince(self, conn, student_id, course_id, user_id, clearance, since=None):
+        columns, rows = self.select_grades(conn, student_id, course_id, user_id, clearance,
+                                           versions=True, since=as_rowversion(since))
+        # Polls that find nothing are not audited
+        if since is None or rows:
+            self.audit(conn, 'View Grades' if since is None else 'View Grade Changes', user_id,
+                       table='Grades')
+        return columns, rows
+    
+    def select_grades(self, conn, student_id, course_id, user_id, clearance, versions=False, since=None):
+        """sp_ViewGrades' result; with versions, a trailing RowVersion and only rows after `since`"""
+        if clearance < 3:
+            raise ProcedureError('MLS Violation: Cannot read Secret level data')
+        role, instructor_id, _ = self.auth_context(conn, user_id)
+        if role not in ('Admin', 'Instructor'):
+            raise ProcedureError('Access Denied: Only Instructors and Admins can view all grades')
+        
+        sql = ("SELECT g.GradeID, g.StudentIDEncrypted, g.CourseID, c.CourseName, "
+               "g.GradeValueEncrypted, g.DateEntered, i.FullName, g.RowVersion "
+               "FROM Grades g "
+               "JOIN Course c ON g.CourseID = c.CourseID "
+               "JOIN Instructor i ON g.EnteredByInstructorID = i.InstructorID WHERE 1 = 1")
+        params = []
+        if since is not None:
+            sql += " AND g.RowVersion > ?"
+            params.append(since)
+        # Filter by student through the blind index: only matching rows are decrypted
+        if student_id is not None:
+            sql += " AND g.StudentIDBlindIndex = ?"
+            params.append(self.blind_index(student_id))
+        if course_id is not None:
+            sql += " AND g.CourseID = ?"
+            params.append(course_id)
+        if role != 'Admin':
+            sql += " AND c.InstructorID = ?"
+            params.append(instructor_id)
+        
+        rows = [(grade_id, self.decrypt_int(sid), cid, course, self.decrypt_grade(value), entered, by,
+                 version)
+                for grade_id, sid, cid, course, value, entered, by, version in conn.execute(sql, params)]
+        names = self.student_names(conn, {row[1] for row in rows})
+        columns = ['GradeID', 'StudentID', 'StudentName', 'CourseID', 'CourseName', 'GradeValue',
+                   'DateEntered', 'EnteredBy']
+        if versions:
+            columns.append('RowVersion')
+            return columns, [(r[0], r[1], names.get(r[1])) + r[2:7] + (rowversion(r[7]),) for r in rows]
+        return columns, [(r[0], r[1], names.get(r[1])) + r[2:7] for r in rows]
+    
+    @staticmethod
+    def student_names(conn, student_ids):
+        names = {}
+        ids = list(student_ids)
+        # Stay under SQLite's bound-parameter limit
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            names.update(conn.execute(
+                f"SELECT StudentID, FullName FROM Student WHERE StudentID IN ({','.join('?' * len(chunk))})",
+                chunk))
+        return names
+    
+    def sp_StudentViewOwnGrades(self, conn, user_id):
+        row = conn.execute("SELECT StudentID FROM Student WHERE UserID = ?", (user_id,)).fetchone()
+        if row is None:
+            raise ProcedureError('Student record not found')
+        rows = [(course, self.decrypt_grade(value), entered) for course, value, entered in conn.execute(
+            "SELECT c.CourseName, g.GradeValueEncrypted, g.DateEntered FROM Grades g "
+            "JOIN Course c ON g.CourseID = c.CourseID WHERE g.StudentIDBlindIndex = ?",
+            (self.blind_index(row[0]),))]
+        self.audit(conn, 'View Own Grades', user_id, table='Grades')
+        return ['CourseName', 'GradeValue', 'DateEntered'], rows
+    
+    def check_grade_writer(self, conn, course_id, user_id, clearance):
+        role, instructor_id, _ = self.auth_context(conn, user_id)
+        if role not in ('Admin', 'Instructor'):
+            raise ProcedureError('Access Denied: Only Instructors and Admins can enter grades')
+        if clearance < 3:
+            raise ProcedureError('MLS Violation: Cannot write to Secret level')
+        if instructor_id is None and role != 'Admin':
+            raise ProcedureError('Instructor record not found')
+        if role == 'Instructor':
+            self.check_course_access(conn, role, instructor_id, frozenset(), course_id)
+        return role, instructor_id
+    
+    def insert_grade(self, conn, student_id, course_id, grade, instructor_id):
+        blind_index = self.blind_index(student_id)
+        cursor = conn.execute(
+            "INSERT INTO Grades (StudentIDEncrypted, StudentIDBlindIndex, CourseID, GradeValueEncrypted, "
+            "DateEntered, EnteredByInstructorID) VALUES (?, ?, ?, ?, ?, ?)",
+            (self.cipher.encrypt(student_id), blind_index, course_id, self.cipher.encrypt(grade),
+             now(), instructor_id or 1))
+        self.add_grade_aggregate(conn, course_id, student_id, blind_index, grade)
+        return cursor.lastrowid
+    
+    def sp_EnterGrade(self, conn, student_id, course_id, grade, user_id, clearance):
+        _, instructor_id = self.check_grade_writer(conn, course_id, user_id, clearance)
+        grade = as_grade(grade)
+        if conn.execute("SELECT 1 FROM Student WHERE StudentID = ?", (student_id,)).fetchone() is None:
+            raise ProcedureError('Student not found')
+        
+        self.begin(conn)
+        grade_id = self.insert_grade(conn, student_id, course_id, grade, instructor_id)
+        self.audit(conn, 'Enter Grade', user_id, table='Grades', record_id=grade_id)
+        conn.execute("COMMIT")
+        return ['Result', 'GradeID'], [('Success', grade_id)]
+    
+    def sp_EnterGradesBulk(self, conn, course_id, grades, user_id, clearance):
+        role, instructor_id = self.check_grade_writer(conn, course_id, user_id, clearance)
+        if role == 'Admin' and conn.execute("SELECT 1 FROM Course WHERE CourseID = ?",
+                                            (course_id,)).fetchone() is None:
+            raise ProcedureError('Course not found')
+        grades = [(int(sid), as_grade(value)) for sid, value in grades or ()]
+        if not grades:
+            raise ProcedureError('No grades supplied')
+        
+        # Validate every row up front: the batch is all-or-nothing
+        known = set(self.student_names(conn, {sid for sid, _ in grades}))
+        invalid = sorted(sid for sid, value in grades if sid not in known or not 0 <= value <= 100)
+        if invalid:
+            raise ProcedureError('Unknown student or grade outside 0-100 for StudentID: '
+                                 + ', '.join(str(sid) for sid in invalid[:20]))
+        
+        self.begin(conn)
+        for sid, value in grades:
+            grade_id = self.insert_grade(conn, sid, course_id, value, instructor_id)
+            self.audit(conn, 'Enter Grade (Bulk)', user_id, table='Grades', record_id=grade_id)
+        self.audit(conn, 'Enter Grades Bulk', user_id, table='Course', record_id=course_id,
+                   new_value=f"{len(grades)} grades")
+        conn.execute("COMMIT")
+        return ['Result', 'GradesEntered'], [('Success', len(grades))]
+    
+    # -------- attendance --------
+    
+    def check_attendance_access(self, conn, course_id, user_id, clearance, write):
+        if clearance < 3:
+            raise ProcedureError('MLS Violation: Cannot write to Secret level' if write
+                                 else 'MLS Violation: Cannot read Secret level data')
+        role, instructor_id, ta_courses = self.auth_context(conn, user_id)
+        if role not in ('Admin', 'Instructor', 'TA'):
+            raise ProcedureError('Access Denied: Insufficient privileges')
+        if course_id is not None:
+            self.check_course_access(conn, role, instructor_id, ta_courses, course_id)
+        return role, instructor_id
+    
+    def sp_ViewAttendance(self, conn, student_id, course_id, user_id, clearance):
+        columns, rows = self.select_attendance(conn, student_id, course_id, user_id, clearance)
+        self.audit(conn, 'View Attendance', user_id, table='Attendance')
+        return columns, rows
+    
+    def sp_ViewAttendanceSince(self, conn, student_id, course_id, user_id, clearance, since=None):
+        columns, rows = self.select_attendance(conn, student_id, course_id, user_id, clearance,
+                                               versions=True, since=as_rowversion(since))
+        if since is None or rows:
+            self.audit(conn, 'View Attendance' if since is None else 'View Attendance Changes', user_id,
+                       table='Attendance')
+        return columns, rows
+    
+    def select_attendance(self, conn, student_id, course_id, user_id, clearance, versions=False, since=None):
+        """sp_ViewAttendance's result; with versions, a trailing RowVersion and only rows after `since`"""
+        role, instructor_id = self.check_attendance_access(conn, None, user_id, clearance, write=False)
+        sql = ("SELECT a.AttendanceID, a.StudentID, s.FullName AS StudentName, a.CourseID, "
+               "c.CourseName, a.Status, a.DateRecorded" + (", a.RowVersion" if versions else "") +
+               " FROM Attendance a "
+               "JOIN Student s ON a.StudentID = s.StudentID "
+               "JOIN Course c ON a.CourseID = c.CourseID")
+        params = []
+        if role == 'TA':
+            sql += " JOIN TAAssignment ta ON a.CourseID = ta.CourseID WHERE ta.UserID = ?"
+            params.append(user_id)
+        elif role == 'Instructor':
+            sql += " WHERE c.InstructorID = ?"
+            params.append(instructor_id)
+        else:
+            sql += " WHERE 1 = 1"
+        if student_id is not None:
+            sql += " AND a.StudentID = ?"
+            params.append(student_id)
+        if course_id is not None:
+            sql += " AND a.CourseID = ?"
+            params.append(course_id)
+        if since is not None:
+            sql += " AND a.RowVersion > ?"
+            params.append(since)
+        cursor = conn.execute(sql + " ORDER BY a.DateRecorded DESC", params)
+        columns = [d[0] for d in cursor.description]
+        if versions:
+            return columns, [row[:-1] + (rowversion(row[-1]),) for row in cursor]
+        return columns, cursor.fetchall()
+    
+    def sp_RecordAttendance(self, conn, student_id, course_id, status, user_id, clearance):
+        self.check_attendance_access(conn, course_id, user_id, clearance, write=True)
+        if conn.execute("SELECT 1 FROM Student WHERE StudentID = ?", (student_id,)).fetchone() is None:
+            raise ProcedureError('Student not found')
+        status = 1 if status in (1, True, '1') else 0
+        start, end = day_range(date.today())
+        
+        self.begin(conn)
+        existing = conn.execute("SELECT AttendanceID, Status FROM Attendance WHERE StudentID = ? "
+                                "AND CourseID = ? AND DateRecorded >= ? AND DateRecorded < ?",
+                                (student_id, course_id, start, end)).fetchall()
+        if existing:
+            conn.execute("UPDATE Attendance SET Status = ?, RecordedByUserID = ? WHERE StudentID = ? "
+                         "AND CourseID = ? AND DateRecorded >= ? AND DateRecorded < ?",
+                         (status, user_id, student_id, course_id, start, end))
+            for _, old_status in existing:
+                if old_status != status:
+                    self.add_attendance_aggregate(conn, course_id, student_id, old_status, status)
+            self.audit(conn, 'Update Attendance', user_id, table='Attendance')
+            conn.execute("COMMIT")
+            return ['Result', 'Message'], [('Success', 'Attendance updated')]
+        
+        cursor = conn.execute("INSERT INTO Attendance (StudentID, CourseID, Status, DateRecorded, "
+                              "RecordedByUserID) VALUES (?, ?, ?, ?, ?)",
+                              (student_id, course_id, status, now(), user_id))
+        self.add_attendance_aggregate(conn, course_id, student_id, None, status)
+        self.audit(conn, 'Record Attendance', user_id, table='Attendance', record_id=cursor.lastrowid)
+        conn.execute("COMMIT")
+        return ['Result', 'AttendanceID'], [('Success', cursor.lastrowid)]
+    
+    def sp_GetCourseRoster(self, conn, course_id, attendance_date, user_id, clearance):
+        self.check_attendance_access(conn, course_id, user_id, clearance, write=False)
+        start, end = day_range(as_date(attendance_date) or date.today())
+        # Status is NULL for students not yet marked that day
+        cursor = conn.execute(
+            "SELECT ce.StudentID, s.FullName AS StudentName, "
+            "(SELECT att.Status FROM Attendance att WHERE att.StudentID = ce.StudentID "
+            " AND att.CourseID = ce.CourseID AND att.DateRecorded >= ? AND att.DateRecorded < ? "
+            " ORDER BY att.DateRecorded DESC LIMIT 1) AS Status "
+            "FROM CourseEnrollment ce JOIN Student s ON ce.StudentID = s.StudentID "
+            "WHERE ce.CourseID = ? ORDER BY s.FullName", (start, end, course_id))
+        columns = [d[0] for d in cursor.description]
+        rows = cursor.fetchall()
+        self.audit(conn, 'View Course Roster', user_id, table='CourseEnrollment', record_id=course_id)
+        return columns, rows
+    
+    def sp_RecordAttendanceBatch(self, conn, course_id, attendance_date, marks, user_id, clearance):
+        role, _ = self.check_attendance_access(conn, course_id, user_id, clearance, write=True)
+        if role == 'Admin' and conn.execute("SELECT 1 FROM Course WHERE CourseID = ?",
+                                            (course_id,)).fetchone() is None:
+            raise ProcedureError('Course not found')
+        today = date.today()
+        day = as_date(attendance_date) or today
+        if day > today:
+            raise ProcedureError('Cannot record attendance for a future date')
+        marks = [(int(sid), 1 if status else 0) for sid, status in marks or ()]
+        if not marks:
+            raise ProcedureError('No attendance marks supplied')
+        
+        # Enrollment check for every row: the roll call is all-or-nothing
+        enrolled = {r[0] for r in conn.execute(
+            "SELECT StudentID FROM CourseEnrollment WHERE CourseID = ?", (course_id,))}
+        not_enrolled = sorted(sid for sid, _ in marks if sid not in enrolled)
+        if not_enrolled:
+            raise ProcedureError('Not enrolled in this course: StudentID '
+                                 + ', '.join(str(sid) for sid in not_enrolled[:20]))
+        
+        start, end = day_range(day)
+        recorded_at = now() if day == today else start + ' 00:00:00.000'
+        inserted = updated = 0
+        self.begin(conn)
+        existing = {}
+        for attendance_id, sid, old_status in conn.execute(
+                "SELECT AttendanceID, StudentID, Status FROM Attendance WHERE CourseID = ? "
+                "AND DateRecorded >= ? AND DateRecorded < ?", (course_id, start, end)):
+            existing.setdefault(sid, []).append((attendance_id, old_status))
+        for sid, status in marks:
+            if sid in existing:
+                for attendance_id, old_status in existing[sid]:
+                    conn.execute("UPDATE Attendance SET Status = ?, RecordedByUserID = ? "
+                                 "WHERE AttendanceID = ?", (status, user_id, attendance_id))
+                    if old_status != status:
+                        self.add_attendance_aggregate(conn, course_id, sid, old_status, status)
+                    self.audit(conn, 'Update Attendance (Batch)', user_id, table='Attendance',
+                               record_id=attendance_id)
+                    updated += 1
+            else:
+                cursor = conn.execute("INSERT INTO Attendance (StudentID, CourseID, Status, DateRecorded, "
+                                      "RecordedByUserID) VALUES (?, ?, ?, ?, ?)",
+                                      (sid, course_id, status, recorded_at, user_id))
+                self.add_attendance_aggregate(conn, course_id, sid, None, status)
+                self.audit(conn, 'Record Attendance (Batch)', user_id, table='Attendance',
+                           record_id=cursor.lastrowid)
+                inserted += 1
+        self.audit(conn, 'Record Attendance Batch', user_id, table='Course', record_id=course_id,
+                   new_value=f"{day.isoformat()}: {inserted} recorded, {updated} updated")
+        conn.execute("COMMIT")
+        return ['Result', 'Recorded', 'Updated'], [('Success', inserted, updated)]
+    
+    def sp_StudentViewOwnAttendance(self, conn, user_id, course_id=None):
+        row = conn.execute("SELECT StudentID FROM Student WHERE UserID = ?", (user_id,)).fetchone()
+        if row is None:
+            raise ProcedureError('Student record not found')
+        cursor = conn.execute(
+            "SELECT c.CourseName, a.Status, a.DateRecorded, "
+            "CASE WHEN a.Status = 1 THEN 'Present' ELSE 'Absent' END AS StatusText "
+            "FROM Attendance a JOIN Course c ON a.CourseID = c.CourseID "
+            "WHERE a.StudentID = ? AND (? IS NULL OR a.CourseID = ?) ORDER BY a.DateRecorded DESC",
+            (row[0], course_id, course_id))
+        columns = [d[0] for d in cursor.description]
+        rows = cursor.fetchall()
+        self.audit(conn, 'View Own Attendance', user_id, table='Attendance')
+        return columns, rows
+    
+    # -------- statistics (inference control, minimum group of 3) --------
+    
+    def check_statistics_access(self, conn, user_id, clearance, roles, denied, mls):
+        if clearance < 3:
+            raise ProcedureError(mls)
+        if self.auth_context(conn, user_id)[0] not in roles:
+            raise ProcedureError(denied)
+    
+    def sp_GetGradeStatsByDepartment(self, conn, department, course_id, user_id, clearance):
+        self.check_statistics_access(conn, user_id, clearance, ('Admin', 'Instructor'),
+                                     'Access Denied: Insufficient privileges',
+                                     'MLS Violation: Cannot access Secret level statistics')
+        rows = [(dept, cid, name, count, as_grade(total / grades), as_grade(low), as_grade(high))
+                for dept, cid, name, count, grades, total, low, high in conn.execute(
+                    "SELECT a.Department, a.CourseID, c.CourseName, a.StudentCount, a.GradeCount, "
+                    "a.GradeSum, a.MinGrade, a.MaxGrade FROM GradeAggregate a "
+                    "JOIN Course c ON a.CourseID = c.CourseID "
+                    "WHERE (? IS NULL OR a.Department = ?) AND (? IS NULL OR a.CourseID = ?) "
+                    "AND a.StudentCount >= 3", (department, department, course_id, course_id))]
+        self.audit(conn, 'View Grade Statistics', user_id, table='Grades')
+        return (['Department', 'CourseID', 'CourseName', 'StudentCount', 'AverageGrade',
+                 'MinGrade', 'MaxGrade'], rows)
+    
+    def sp_GetAttendanceStats(self, conn, course_id, department, user_id, clearance):
+        self.check_statistics_access(conn, user_id, clearance, ('Admin', 'Instructor', 'TA'),
+                                     'Access Denied: Insufficient privileges',
+                                     'MLS Violation: Cannot access Secret level statistics')
+        rows = [(cid, name, dept, students, present, absent,
+                 as_grade(present * 100.0 / (present + absent)) if present + absent else None)
+                for cid, name, dept, students, present, absent in conn.execute(
+                    "SELECT c.CourseID, c.CourseName, a.Department, a.StudentCount, a.PresentCount, "
+                    "a.AbsentCount FROM AttendanceAggregate a JOIN Course c ON a.CourseID = c.CourseID "
+                    "WHERE (? IS NULL OR a.CourseID = ?) AND (? IS NULL OR a.Department = ?) "
+                    "AND a.StudentCount >= 3", (course_id, course_id, department, department))]
+        self.audit(conn, 'View Attendance Statistics', user_id, table='Attendance')
+        return (['CourseID', 'CourseName', 'Department', 'TotalStudents', 'TotalPresent',
+                 'TotalAbsent', 'AttendancePercentage'], rows)
+    
+    def sp_GetAggregatePerformanceReport(self, conn, department, user_id, clearance):
+        self.check_statistics_access(
+            conn, user_id, clearance, ('Admin', 'Instructor'),
+            'Access Denied: Only Admins and Instructors can view performance reports',
+            'MLS Violation: Cannot access Secret level data')
+        rows = [(dept, students, grades or 0, as_grade(total / grades) if grades else None,
+                 as_grade(present * 100.0 / marks) if marks else None)
+                for dept, students, grades, total, present, marks in conn.execute(
+                    "SELECT d.Department, d.TotalStudents, g.GradeCount, g.GradeSum, "
+                    "at.PresentCount, at.MarkCount FROM ("
+                    " SELECT Department, COUNT(*) AS TotalStudents FROM Student"
+                    " WHERE (? IS NULL OR Department = ?) GROUP BY Department HAVING COUNT(*) >= 3) d "
+                    "LEFT JOIN (SELECT Department, SUM(GradeCount) AS GradeCount, SUM(GradeSum) AS GradeSum"
+                    " FROM GradeAggregate GROUP BY Department) g ON g.Department = d.Department "
+                    "LEFT JOIN (SELECT Department, SUM(PresentCount) AS PresentCount,"
+                    " SUM(PresentCount + AbsentCount) AS MarkCount FROM AttendanceAggregate"
+                    " GROUP BY Department) at ON at.Department = d.Department",
+                    (department, department))]
+        self.audit(conn, 'View Performance Report', user_id, table='Multiple')
+        return (['Department', 'TotalStudents', 'TotalGradeRecords', 'OverallAverageGrade',
+                 'OverallAttendanceRate'], rows)
+    
+    def sp_GetCourseEnrollmentStats(self, conn, course_id=None):
+        # Public aggregates: no access check and no audit row
+        cursor = conn.execute(
+            "SELECT c.CourseID, c.CourseName, COUNT(DISTINCT ce.StudentID) AS EnrolledStudents, "
+            "i.FullName AS InstructorName FROM Course c "
+            "LEFT JOIN CourseEnrollment ce ON c.CourseID = ce.CourseID "
+            "LEFT JOIN Instructor i ON c.InstructorID = i.InstructorID "
+            "WHERE (? IS NULL OR c.CourseID = ?) GROUP BY c.CourseID, c.CourseName, i.FullName "
+            "HAVING COUNT(DISTINCT ce.StudentID) >= 3 OR COUNT(DISTINCT ce.StudentID) = 0",
+            (course_id, course_id))
+        return [d[0] for d in cursor.description], cursor.fetchall()
+    
+    # -------- students --------
+    
+    def sp_ViewStudentProfile(self, conn, student_id, user_id, clearance):
+        row = conn.execute("SELECT ClassificationLevel, UserID FROM Student WHERE StudentID = ?",
+                           (student_id,)).fetchone()
+        if row is not None and clearance < row[0]:
+            raise ProcedureError('MLS Violation: Cannot read higher classification')
+        if self.auth_context(conn, user_id)[0] == 'Student' and row is not None and row[1] != user_id:
+            raise ProcedureError('Access Denied: Can only view own profile')
+        rows = [(sid, name, email, self.cipher.decrypt(phone), dob, dept, level)
+                for sid, name, email, phone, dob, dept, level in conn.execute(
+                    "SELECT StudentID, FullName, Email, PhoneEncrypted, DOB, Department, ClearanceLevel "
+                    "FROM Student WHERE StudentID = ?", (student_id,))]
+        self.audit(conn, 'View Student Profile', user_id, table='Student', record_id=student_id)
+        return ['StudentID', 'FullName', 'Email', 'Phone', 'DOB', 'Department', 'ClearanceLevel'], rows
+    
+    # -------- flow control --------
+    
+    def sp_BulkExport(self, conn, table, course_id, from_date, to_date, destination, user_id, clearance,
+                      plan_only=0):
+        if table not in ('Grades', 'Attendance'):
+            raise ProcedureError('Invalid table name')
+        role, instructor_id, _ = self.auth_context(conn, user_id)
+        if role not in ('Admin', 'Instructor'):
+            raise ProcedureError('Access Denied: Only Instructors and Admins can export data')
+        if role == 'Instructor' and instructor_id is None:
+            raise ProcedureError('Instructor record not found')
+        
+        alias, date_column = ('g', 'DateEntered') if table == 'Grades' else ('a', 'DateRecorded')
+        where = " WHERE 1 = 1"
+        params = []
+        if course_id is not None:
+            where += f" AND {alias}.CourseID = ?"
+            params.append(course_id)
+        if from_date is not None:
+            where += f" AND {alias}.{date_column} >= ?"
+            params.append(day_range(as_date(from_date))[0])
+        if to_date is not None:
+            where += f" AND {alias}.{date_column} < ?"
+            params.append(day_range(as_date(to_date))[1])
+        if role != 'Admin':
+            where += " AND c.InstructorID = ?"
+            params.append(instructor_id)
+        
+        # Check Flow Control: once per classification band, not per record
+        bands = conn.execute(
+            f"SELECT IFNULL({alias}.ClassificationLevel, 3), COUNT(*) FROM {table} {alias} "
+            f"JOIN Course c ON {alias}.CourseID = c.CourseID{where} "
+            f"GROUP BY IFNULL({alias}.ClassificationLevel, 3) ORDER BY 1", params).fetchall()
+        bands = [(level, CLASSIFICATION_NAMES.get(level), records,
+                  int(check_flow_control(level, destination, clearance)))
+                 for level, records in bands]
+        summary = ', '.join(f"{name}: {records} records" for _, name, records, _ in bands) or 'no records'
+        if plan_only:
+            self.audit(conn, 'Bulk Export Planned', user_id, table=table, record_id=course_id,
+                       new_value=f"Plan for {CLASSIFICATION_NAMES.get(destination, 'unknown')} "
+                                 f"destination ({summary})")
+            return ['ClassificationLevel', 'Classification', 'Records', 'Allowed'], bands
+        
+        blocked = ', '.join(f"{name}: {records} records" for _, name, records, allowed in bands if not allowed)
+        if blocked:
+            message = (f"Flow Control Violation: Cannot export {blocked} to "
+                       f"{CLASSIFICATION_NAMES.get(destination, 'unknown')} destination")
+            # Returned, not raised: the refusal is audited once, as on the server
+            self.audit(conn, 'Bulk Export Blocked', user_id, table=table, record_id=course_id,
+                       success=0, error=message)
+            return ['Result', 'ErrorMessage'], [('Error', message)]
+        
+        if table == 'Grades':
+            columns = ['GradeID', 'StudentID', 'StudentName', 'CourseID', 'CourseName', 'GradeValue',
+                       'DateEntered', 'EnteredBy']
+            cursor = conn.execute(
+                "SELECT g.GradeID, g.StudentIDEncrypted, g.CourseID, c.CourseName, g.GradeValueEncrypted, "
+                "g.DateEntered, i.FullName FROM Grades g JOIN Course c ON g.CourseID = c.CourseID "
+                f"JOIN Instructor i ON g.EnteredByInstructorID = i.InstructorID{where} ORDER BY g.GradeID",
+                params)
+        else:
+            columns = ['AttendanceID', 'StudentID', 'StudentName', 'CourseID', 'CourseName', 'Status',
+                       'DateRecorded']
+            cursor = conn.execute(
+                "SELECT a.AttendanceID, a.StudentID, s.FullName, a.CourseID, c.CourseName, a.Status, "
+                "a.DateRecorded FROM Attendance a JOIN Student s ON a.StudentID = s.StudentID "
+                f"JOIN Course c ON a.CourseID = c.CourseID{where} ORDER BY a.AttendanceID", params)
+        
+        def stream():
+            # Rows are produced as the client fetches them; the summary audit row is
+            # written once the result set has been read to the end, as on the server
+            exported = 0
+            for row in cursor:
+                if table == 'Grades':
+                    grade_id, sid, cid, course, value, entered, by = row
+                    sid = self.decrypt_int(sid)
+                    row = (grade_id, sid, self.student_names(conn, (sid,)).get(sid), cid, course,
+                           self.decrypt_grade(value), entered, by)
+                exported += 1
+                yield row
+            dates = ''
+            if from_date is not None or to_date is not None:
+                dates = (f"; dates {as_date(from_date) or '...'} to {as_date(to_date) or '...'}")
+            self.audit(conn, 'Bulk Export Allowed', user_id, table=table, record_id=course_id,
+                       new_value=f"{exported} records exported to {CLASSIFICATION_NAMES.get(destination)} "
+                                 f"destination ({summary}){dates}")
+        
+        return columns, stream()
+    
+    # -------- role requests --------
+    
+    def sp_SubmitRoleRequest(self, conn, user_id, requested_role, reason, comments=None):
+        row = conn.execute("SELECT Username, Role FROM Users WHERE UserID = ?", (user_id,)).fetchone()
+        if row is None:
+            raise ProcedureError('User not found')
+        username, current_role = row
+        if current_role == 'Admin':
+            raise ProcedureError('Admins cannot request role changes')
+        if current_role in UPGRADE_PATHS and requested_role not in UPGRADE_PATHS[current_role]:
+            raise ProcedureError('Invalid role upgrade path')
+        if current_role == requested_role:
+            raise ProcedureError('Cannot request same role')
+        
+        self.begin(conn)
+        if conn.execute("SELECT 1 FROM RoleRequests WHERE UserID = ? AND Status = 'Pending'",
+                        (user_id,)).fetchone() is not None:
+            raise ProcedureError('You already have a pending role request')
+        cursor = conn.execute("INSERT INTO RoleRequests (UserID, Username, CurrentRole, RequestedRole, "
+                              "Reason, Comments, RequestDate) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                              (user_id, username, current_role, requested_role, reason, comments, now()))
+        self.audit(conn, 'Submit Role Request', user_id, username, table='RoleRequests',
+                   record_id=cursor.lastrowid, new_value=f"Requested: {requested_role}")
+        conn.execute("COMMIT")
+        return (['Result', 'RequestID', 'Message'],
+                [('Success', cursor.lastrowid,
+                  'Your request has been submitted and is pending admin approval')])
+    
+    def sp_ViewPendingRoleRequests(self, conn, user_id):
+        if self.auth_context(conn, user_id)[0] != 'Admin':
+            raise ProcedureError('Access Denied: Only Admins can view role requests')
+        cursor = conn.execute("SELECT RequestID, UserID, Username, CurrentRole, RequestedRole, Reason, "
+                              "Comments, Status, RequestDate FROM RoleRequests "
+                              "WHERE Status = 'Pending' ORDER BY RequestDate ASC")
+        columns = [d[0] for d in cursor.description]
+        rows = cursor.fetchall()
+        self.audit(conn, 'View Pending Role Requests', user_id, table='RoleRequests')
+        return columns, rows
+    
+    def sp_ViewPendingRoleRequestsSince(self, conn, user_id, since=None):
+        if self.auth_context(conn, user_id)[0] != 'Admin':
+            raise ProcedureError('Access Denied: Only Admins can view role requests')
+        # A poll also returns requests that have left Pending, so the caller can drop them
+        where, params = (("Status = 'Pending'", ()) if since is None
+                         else ("RowVersion > ?", (as_rowversion(since),)))
+        cursor = conn.execute("SELECT RequestID, UserID, Username, CurrentRole, RequestedRole, Reason, "
+                              "Comments, Status, RequestDate, RowVersion FROM RoleRequests "
+                              f"WHERE {where} ORDER BY RequestDate ASC", params)
+        columns = [d[0] for d in cursor.description]
+        rows = [row[:-1] + (rowversion(row[-1]),) for row in cursor]
+        if since is None or rows:
+            self.audit(conn, 'View Pending Role Requests' if since is None else 'View Role Request Changes',
+                       user_id, table='RoleRequests')
+        return columns, rows
+    
+    def sp_ProcessRoleRequest(self, conn, request_id, admin_id, action, comments=None):
+        try:
+            self.begin(conn)
+            admin = conn.execute("SELECT Role FROM Users WHERE UserID = ?", (admin_id,)).fetchone()
+            if admin is not None and admin[0] != 'Admin':
+                raise ProcedureError('Access Denied: Only Admins can process role requests')
+            row = conn.execute("SELECT UserID, RequestedRole, Status, Username FROM RoleRequests "
+                               "WHERE RequestID = ?", (request_id,)).fetchone()
+            if row is None:
+                raise ProcedureError('Request not found')
+            user_id, requested_role, status, username = row
+            if status != 'Pending':
+                raise ProcedureError('Request has already been processed')
+            if action not in ('Approve', 'Deny'):
+                raise ProcedureError('Invalid action. Must be Approve or Deny')
+            
+            conn.execute("UPDATE RoleRequests SET Status = ?, ProcessedDate = ?, ProcessedByAdminID = ?, "
+                         "AdminComments = ? WHERE RequestID = ?",
+                         ('Approved' if action == 'Approve' else 'Denied', now(), admin_id, comments,
+                          request_id))
+            if action == 'Approve':
+                conn.execute("UPDATE Users SET Role = ?, ClearanceLevel = ? WHERE UserID = ?",
+                             (requested_role, ROLE_CLEARANCE[requested_role], user_id))
+                self.audit(conn, 'Approve Role Request', admin_id, table='RoleRequests',
+                           record_id=request_id,
+                           new_value=f"User: {username} upgraded to {requested_role}")
+                message = f"Role request approved. User upgraded to {requested_role}"
+            else:
+                self.audit(conn, 'Deny Role Request', admin_id, table='RoleRequests', record_id=request_id)
+                message = 'Role request denied'
+            conn.execute("COMMIT")
+            return ['Result', 'Message'], [('Success', message)]
+        except (ProcedureError, sqlite3.IntegrityError) as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            self.audit(conn, 'Process Role Request Failed', admin_id, success=0, error=str(e))
+            raise
+
+
+# ============================================
+# SAMPLE DATA
+# The accounts and records of 09_SampleData.sql
+# ============================================
+
+SAMPLE_USERS = [
+    ('admin1', 'Admin@123', 'Admin', 4),
+    ('prof.smith', 'Prof@123', 'Instructor', 3),
+    ('prof.jones', 'Prof@123', 'Instructor', 3),
+    ('prof.brown', 'Prof@123', 'Instructor', 3),
+    ('ta.alice', 'TA@123', 'TA', 2),
+    ('ta.bob', 'TA@123', 'TA', 2),
+    ('ta.charlie', 'TA@123', 'TA', 2),
+    ('student.john', 'Student@123', 'Student', 1),
+    ('student.mary', 'Student@123', 'Student', 1),
+    ('student.david', 'Student@123', 'Student', 1),
+    ('student.sarah', 'Student@123', 'Student', 1),
+    ('student.mike', 'Student@123', 'Student', 1),
+    ('student.emma', 'Student@123', 'Student', 1),
+    ('student.james', 'Student@123', 'Student', 1),
+    ('student.lisa', 'Student@123', 'Student', 1),
+    ('guest1', 'Guest@123', 'Guest', 1),
+]
+
+SAMPLE_INSTRUCTORS = [
+    ('Dr. John Smith', 'john.smith@university.edu', 'Computer Science', 'prof.smith'),
+    ('Dr. Emily Jones', 'emily.jones@university.edu', 'Mathematics', 'prof.jones'),
+    ('Dr. Michael Brown', 'michael.brown@university.edu', 'Computer Science', 'prof.brown'),
+]
+
+SAMPLE_STUDENTS = [
+    ('John Doe', 'john.doe@student.edu', '555-0101', '2002-05-15', 'Computer Science', 'student.john'),
+    ('Mary Johnson', 'mary.johnson@student.edu', '555-0102', '2001-08-22', 'Computer Science', 'student.mary'),
+    ('David Wilson', 'david.wilson@student.edu', '555-0103', '2002-03-10', 'Computer Science', 'student.david'),
+    ('Sarah Martinez', 'sarah.martinez@student.edu', '555-0104', '2002-11-30', 'Mathematics', 'student.sarah'),
+    ('Mike Anderson', 'mike.anderson@student.edu', '555-0105', '2001-07-18', 'Mathematics', 'student.mike'),
+    ('Emma Taylor', 'emma.taylor@student.edu', '555-0106', '2002-01-25', 'Computer Science', 'student.emma'),
+    ('James Lee', 'james.lee@student.edu', '555-0107', '2001-09-12', 'Computer Science', 'student.james'),
+    ('Lisa Chen', 'lisa.chen@student.edu', '555-0108', '2002-06-05', 'Mathematics', 'student.lisa'),
+]
+
+SAMPLE_COURSES = [
+    ('Database Systems', 'Advanced database design, SQL, and database security',
+     'Learn about relational databases and SQL. No prerequisites required.', 1),
+    ('Data Structures and Algorithms', 'Fundamental data structures and algorithmic techniques',
+     'Study arrays, linked lists, trees, graphs, and sorting algorithms.', 1),
+    ('Calculus I', 'Differential and integral calculus',
+     'Introduction to calculus: limits, derivatives, and integrals.', 2),
+    ('Linear Algebra', 'Matrices, vector spaces, and linear transformations',
+     'Mathematical foundations for computer science and engineering.', 2),
+    ('Network Security', 'Cryptography, secure protocols, and network defense',
+     'Learn about securing computer networks and communications.', 3),
+]
+
+SAMPLE_ENROLLMENTS = {1: (1, 2, 3, 6, 7), 2: (1, 2, 3, 6), 3: (4, 5, 8, 1), 4: (4, 5, 8), 5: (2, 3, 7)}
+
+SAMPLE_TA_ASSIGNMENTS = [('ta.alice', 1), ('ta.bob', 2), ('ta.charlie', 5), ('ta.alice', 3)]
+
+SAMPLE_GRADES = [
+    ('prof.smith', 1, 1, '85.5'), ('prof.smith', 2, 1, '92.0'), ('prof.smith', 3, 1, '78.5'),
+    ('prof.smith', 6, 1, '88.0'), ('prof.smith', 7, 1, '91.5'), ('prof.smith', 1, 2, '90.0'),
+    ('prof.smith', 2, 2, '95.5'), ('prof.smith', 3, 2, '82.0'), ('prof.smith', 6, 2, '87.5'),
+    ('prof.jones', 4, 3, '88.0'), ('prof.jones', 5, 3, '76.5'), ('prof.jones', 8, 3, '93.0'),
+    ('prof.jones', 1, 3, '84.5'),
+]
+
+SAMPLE_ATTENDANCE = [(1, 1, 1), (2, 1, 1), (3, 1, 0), (6, 1, 1), (7, 1, 1),
+                     (1, 2, 1), (2, 2, 1), (3, 2, 1), (6, 2, 0)]
+
+SAMPLE_ROLE_REQUESTS = [
+    ('student.john', 'TA', 'I have completed Database Systems with an A grade and want to help other students',
+     'I am available 10 hours per week'),
+    ('student.mary', 'TA', 'Strong academic performance and teaching experience',
+     'Tutored students for 2 years'),
+    ('ta.alice', 'Instructor', 'Completed PhD in Computer Science and have 3 years of TA experience',
+     'Specialization in database systems'),
+]
+
+
+def load_sample_data(conn, procedures):
+    """Insert the 09_SampleData.sql records through the stand-in procedures"""
+    users = {}
+    for username, password, role, clearance in SAMPLE_USERS:
+        _, rows = procedures.sp_RegisterUser(conn, username, password, role, clearance)
+        users[username] = rows[0][1]
+    
+    cipher = procedures.cipher
+    conn.execute("BEGIN")
+    conn.executemany("INSERT INTO Instructor (FullName, Email, Department, ClearanceLevel, UserID) "
+                     "VALUES (?, ?, ?, 3, ?)",
+                     [(name, email, dept, users[username]) for name, email, dept, username in SAMPLE_INSTRUCTORS])
+    for name, email, phone, dob, dept, username in SAMPLE_STUDENTS:
+        cursor = conn.execute("INSERT INTO Student (FullName, Email, PhoneEncrypted, DOB, Department, UserID) "
+                              "VALUES (?, ?, ?, ?, ?, ?)",
+                              (name, email, cipher.encrypt(phone), dob, dept, users[username]))
+        conn.execute("UPDATE Student SET StudentIDEncrypted = ? WHERE StudentID = ?",
+                     (cipher.encrypt(cursor.lastrowid), cursor.lastrowid))
+    conn.executemany("INSERT INTO Course (CourseName, Description, PublicInfo, InstructorID) "
+                     "VALUES (?, ?, ?, ?)", SAMPLE_COURSES)
+    conn.executemany("INSERT INTO CourseEnrollment (StudentID, CourseID) VALUES (?, ?)",
+                     [(sid, cid) for cid, sids in SAMPLE_ENROLLMENTS.items() for sid in sids])
+    conn.executemany("INSERT INTO TAAssignment (UserID, CourseID) VALUES (?, ?)",
+                     [(users[username], cid) for username, cid in SAMPLE_TA_ASSIGNMENTS])
+    conn.execute("COMMIT")
+    
+    for username, sid, cid, grade in SAMPLE_GRADES:
+        procedures.sp_EnterGrade(conn, sid, cid, grade, users[username], 3)
+    for sid, cid, status in SAMPLE_ATTENDANCE:
+        procedures.sp_RecordAttendance(conn, sid, cid, status, users['prof.smith'], 3)
+    for username, role, reason, comments in SAMPLE_ROLE_REQUESTS:
+        procedures.sp_SubmitRoleRequest(conn, users[username], role, reason, comments)
+
+
+# ============================================
+# DB-API DRIVER
+# What DatabaseConnection(driver=...) expects of pyodbc
+# ============================================
+
+class SQLiteDriver:
+    """DB-API module stand-in backed by a SQLite file
+    
+    Every connect() opens a new SQLite connection to the same database, so the
+    GUI's ConnectionPool, BackgroundExecutor and streaming paths run unchanged.
+    EXEC and {CALL} statements run the stand-in procedures; any other statement
+    goes to SQLite after the T-SQL paging clause is rewritten.
+    """
+    
+    OperationalError = sqlite3.OperationalError
+    InterfaceError = sqlite3.InterfaceError
+    ProgrammingError = sqlite3.ProgrammingError
+    
+    BUSY_TIMEOUT_MS = 5000
+    
+    def __init__(self, path=None, cipher=None, sample_data=True):
+        """path=None creates a temporary database that is removed by close()
+        
+        A persistent path keeps its data between runs; pass the same cipher (and
+        key) each time, since stored values cannot be decrypted with another.
+        """
+        self._temporary = path is None
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix='srms_standin_', suffix='.db')
+            os.close(fd)
+            atexit.register(self.close)
+        self.path = path
+        self.cipher = cipher or make_cipher()
+        self._lock = threading.Lock()
+        
+        conn = self._open()
+        try:
+            fresh = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'Users'").fetchone() is None
+            conn.executescript(SCHEMA + ROWVERSION_TRIGGERS)
+            self.procedures = Procedures(self.cipher, self._blind_index_key(conn))
+            if fresh and sample_data:
+                load_sample_data(conn, self.procedures)
+        finally:
+            conn.close()
+    
+    def _open(self):
+        conn = sqlite3.connect(self.path, timeout=self.BUSY_TIMEOUT_MS / 1000,
+                               isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute(f"PRAGMA busy_timeout = {self.BUSY_TIMEOUT_MS}")
+        return conn
+    
+    def _blind_index_key(self, conn):
+        """The 64-byte HMAC key, stored encrypted like BlindIndexKey on the server"""
+        row = conn.execute("SELECT KeyEncrypted FROM BlindIndexKey WHERE KeyName = 'GradesStudentID'").fetchone()
+        if row is not None:
+            return bytes.fromhex(self.cipher.decrypt(row[0]))
+        key = os.urandom(64)
+        conn.execute("INSERT INTO BlindIndexKey (KeyName, KeyEncrypted) VALUES ('GradesStudentID', ?)",
+                     (self.cipher.encrypt(key.hex()),))
+        return key
+    
+    def connect(self, connection_string=None):
+        with self._lock:
+            return _SQLiteConnection(self._open(), self.procedures)
+    
+    def close(self):
+        """Delete a temporary database; open connections must be closed first"""
+        if self._temporary:
+            for suffix in ('', '-wal', '-shm'):
+                try:
+                    os.remove(self.path + suffix)
+                except OSError:
+                    pass
+
+
+class _SQLiteConnection:
+    def __init__(self, conn, procedures):
+        self.sqlite = conn
+        self.procedures = procedures
+    
+    def cursor(self):
+        return _SQLiteCursor(self)
+    
+    def commit(self):
+        # Procedures commit their own transactions; this ends any left open by raw SQL
+        if self.sqlite.in_transaction:
+            self.sqlite.execute("COMMIT")
+    
+    def rollback(self):
+        if self.sqlite.in_transaction:
+            self.sqlite.execute("ROLLBACK")
+    
+    def close(self):
+        self.sqlite.close()
+
+
+class _SQLiteCursor:
+    # EXEC name ?, ? or the ODBC escape {CALL name (?, ?)}
+    EXEC_PATTERN = re.compile(r"\s*(?:EXEC\s+|\{\s*CALL\s+)(\w+)", re.IGNORECASE)
+    PAGING_PATTERN = re.compile(r"OFFSET\s+\?\s+ROWS\s+FETCH\s+NEXT\s+\?\s+ROWS\s+ONLY", re.IGNORECASE)
+    # The read pool's session setting; a WAL reader already sees one committed snapshot
+    ISOLATION_PATTERN = re.compile(r"\s*SET\s+TRANSACTION\s+ISOLATION\s+LEVEL\s", re.IGNORECASE)
+    
+    def __init__(self, connection):
+        self.connection = connection
+        self.arraysize = 1
+        self.description = None
+        self.rowcount = -1
+        self._rows = iter(())
+    
+    def execute(self, sql, params=None):
+        params = list(params or ())
+        match = self.EXEC_PATTERN.match(sql)
+        if match:
+            columns, rows = self.connection.procedures.call(self.connection.sqlite, match.group(1), params)
+            self.description = [(name, None, None, None, None, None, True) for name in columns]
+            # Streaming procedures (sp_BulkExport) return a generator rather than a list
+            self.rowcount = len(rows) if isinstance(rows, list) else -1
+            self._rows = iter(rows)
+            return self
+        if self.ISOLATION_PATTERN.match(sql):
+            self.description = None
+            self._rows = iter(())
+            return self
+        
+        # OFFSET ? ROWS FETCH NEXT ? ROWS ONLY takes (offset, count); LIMIT ? OFFSET ? the reverse
+        if self.PAGING_PATTERN.search(sql):
+            sql = self.PAGING_PATTERN.sub("LIMIT ? OFFSET ?", sql)
+            params[-2:] = [params[-1], params[-2]]
+        cursor = self.connection.sqlite.execute(sql, params)
+        self.description = cursor.description
+        self.rowcount = cursor.rowcount
+        self._rows = cursor
+        return self
+    
+    def fetchone(self):
+        return next(self._rows, None)
+    
+    def fetchall(self):
+        rows = list(self._rows)
+        self._rows = iter(())
+        return rows
+    
+    def fetchmany(self, size=None):
+        size = size or self.arraysize
+        rows = []
+        for row in self._rows:
+            rows.append(row)
+            if len(rows) >= size:
+                break
+        return rows
+    
+    def nextset(self):
+        return False
+    
+    def close(self):
+        self._rows = iter(())
@@ -0,0 +1,42 @@
+"""ExportWriter's file handling, on the CSV format"""
+
+import os
+import tempfile
+import unittest
+
+from SRMS_GUI_Enhanced import ExportWriter
+
+
+class ExportWriterTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'grades.csv')
+
+    def test_close_moves_the_rows_into_place(self):
+        writer = ExportWriter(self.path)
+        writer.write(['GradeID', 'Grade'], [(1, 90), (2, 75)])
+        writer.write(['GradeID', 'Grade'], [(3, 60)])
+        writer.close()
+        with open(self.path, encoding='utf-8') as f:
+            self.assertEqual(f.read().splitlines(), ['GradeID,Grade', '1,90', '2,75', '3,60'])
+        self.assertFalse(os.path.exists(writer.part_path))
+
+    def test_no_rows_leaves_no_file(self):
+        writer = ExportWriter(self.path)
+        writer.close()
+        self.assertEqual(writer.rows, 0)
+        self.assertFalse(os.path.exists(self.path))
+        self.assertFalse(os.path.exists(writer.part_path))
+
+    def test_abort_deletes_the_partial_file(self):
+        writer = ExportWriter(self.path)
+        writer.write(['GradeID', 'Grade'], [(1, 90)])
+        writer.abort()
+        self.assertFalse(os.path.exists(self.path))
+        self.assertFalse(os.path.exists(writer.part_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
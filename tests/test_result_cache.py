@@ -0,0 +1,112 @@
+"""ResultCache and DatabaseConnection's cached calls; no database needed"""
+
+import unittest
+from unittest import mock
+
+from SRMS_GUI_Enhanced import DatabaseConnection, ResultCache
+
+
+class FakeClock:
+    """Stands in for time.monotonic() so TTL tests don't sleep"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class ResultCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch('SRMS_GUI_Enhanced.time.monotonic', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def loader(self, value, calls):
+        def load():
+            calls.append(value)
+            return [value], ['Value']
+        return load
+
+    def test_get_or_load_caches_until_ttl(self):
+        cache = ResultCache(max_entries=4, ttl=60)
+        calls = []
+        cache.get_or_load('k', self.loader(1, calls))
+        self.assertEqual(cache.get_or_load('k', self.loader(2, calls)), ([1], ['Value']))
+        self.clock.now += 60
+        self.assertEqual(cache.get_or_load('k', self.loader(3, calls)), ([3], ['Value']))
+        self.assertEqual(calls, [1, 3])
+        self.assertEqual(cache.stats()['expired'], 1)
+
+    def test_failed_loads_are_not_cached(self):
+        cache = ResultCache()
+        cache.get_or_load('k', lambda: (None, 'timeout'))
+        self.assertIsNone(cache.get('k'))
+
+    def test_lru_evicts_least_recently_used(self):
+        cache = ResultCache(max_entries=2, ttl=60)
+        cache.put('a', ([1], ['Value']))
+        cache.put('b', ([2], ['Value']))
+        cache.get('a')
+        cache.put('c', ([3], ['Value']))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('c'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_invalidate_drops_only_matching_tags(self):
+        cache = ResultCache()
+        cache.put('grades', ([1], ['Value']), tags=('Grades',))
+        cache.put('attendance', ([2], ['Value']), tags=('Attendance',))
+        cache.put('roster', ([3], ['Value']), tags=('Grades', 'Attendance'))
+        cache.invalidate('Grades')
+        self.assertIsNone(cache.get('grades'))
+        self.assertIsNone(cache.get('roster'))
+        self.assertIsNotNone(cache.get('attendance'))
+        cache.invalidate()
+        self.assertIsNone(cache.get('attendance'))
+
+    def test_invalidation_during_load_is_not_overwritten(self):
+        cache = ResultCache()
+
+        def load():
+            # A write lands while the read is still in flight
+            cache.invalidate('Grades')
+            return [1], ['Value']
+
+        self.assertEqual(cache.get_or_load('k', load, tags=('Grades',)), ([1], ['Value']))
+        self.assertIsNone(cache.get('k'))
+
+    def test_invalidating_other_tags_during_load_still_caches(self):
+        cache = ResultCache()
+
+        def load():
+            cache.invalidate('Attendance')
+            return [1], ['Value']
+
+        cache.get_or_load('k', load, tags=('Grades',))
+        self.assertIsNotNone(cache.get('k'))
+
+
+class CachedProcedureTest(unittest.TestCase):
+
+    def test_clearance_levels_never_share_an_entry(self):
+        db = DatabaseConnection(connection_string='')
+        calls = []
+
+        def execute_procedure(proc_name, params):
+            # The server filters by the session's clearance, not by a parameter
+            calls.append(proc_name)
+            return [('row',)], ['Result']
+
+        db.execute_procedure = execute_procedure
+        for clearance in (4, 1, 4, 1):
+            db.cached_procedure('sp_ViewCourses', [], clearance, tags=('Courses',))
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(db.cache.stats()['hits'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
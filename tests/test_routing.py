@@ -0,0 +1,62 @@
+"""DatabaseConnection.route(): which pool each declared procedure runs on"""
+
+import unittest
+
+from SRMS_GUI_Enhanced import PROCEDURES, DatabaseConnection
+from SRMS_StandIn import SQLiteDriver
+
+
+class RouteTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.driver = SQLiteDriver()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.driver.close()
+
+    def connect(self, **options):
+        db = DatabaseConnection(driver=self.driver, connection_string='', pool_size=2, **options)
+        self.assertTrue(db.connect())
+        self.addCleanup(db.close)
+        return db
+
+    def test_reads_go_to_the_read_pool_and_writes_to_the_primary(self):
+        db = self.connect(read_pool_size=2)
+        self.assertIsNotNone(db.read_pool)
+        for name, proc in PROCEDURES.items():
+            with self.subTest(name):
+                self.assertIs(db.route(proc), db.read_pool if proc.reads else db.pool)
+
+    def test_unaudited_reads_go_to_the_replica(self):
+        db = self.connect(read_pool_size=2, replica_connection_string='replica')
+        for name, proc in PROCEDURES.items():
+            with self.subTest(name):
+                if not proc.reads:
+                    expected = db.pool
+                elif proc.audited:
+                    expected = db.read_pool
+                else:
+                    expected = db.replica_pool
+                self.assertIs(db.route(proc), expected)
+
+    def test_no_read_pool_keeps_everything_on_the_primary(self):
+        db = self.connect(read_pool_size=0)
+        self.assertIsNone(db.read_pool)
+        for name, proc in PROCEDURES.items():
+            with self.subTest(name):
+                self.assertIs(db.route(proc), db.pool)
+
+    def test_reads_succeed_on_the_read_pool(self):
+        db = self.connect(read_pool_size=2)
+        before = {route: db.pool_stats(route)['checkouts'] for route in ('write', 'read')}
+        result = db.execute_procedure('sp_GetCourseEnrollmentStats', [None])
+        self.assertIsNone(result.error)
+        self.assertTrue(result.rows)
+        self.assertEqual(db.pool_stats('read')['checkouts'], before['read'] + 1)
+        self.assertEqual(db.pool_stats('write')['checkouts'], before['write'])
+
+
+if __name__ == '__main__':
+    unittest.main()